@@ -0,0 +1,55 @@
+"""Add document_page_texts table for persisted page-text extraction.
+
+Revision ID: 20260217_0001
+Revises: 20260216_0005
+Create Date: 2026-02-17
+
+Stores compressed per-page text so re-analysis endpoints do not re-run
+PyMuPDF/OCR extraction on every call.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = "20260217_0001"
+down_revision = "20260216_0005"
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists (idempotent migration)."""
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade() -> None:
+    if not table_exists("document_page_texts"):
+        op.create_table(
+            "document_page_texts",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+            sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("file_hash", sa.String(64), nullable=False),
+            sa.Column("extraction_method", sa.String(20), nullable=False),
+            sa.Column("page_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("page_char_counts", JSONB(), nullable=True, server_default=sa.text("'[]'::jsonb")),
+            sa.Column("compressed_pages", sa.LargeBinary(), nullable=False),
+            sa.Column("organization_id", UUID(as_uuid=True), sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_document_page_texts_document_id", "document_page_texts", ["document_id"], unique=True)
+        op.create_index("ix_document_page_texts_file_hash", "document_page_texts", ["file_hash"])
+        op.create_index("ix_document_page_texts_organization_id", "document_page_texts", ["organization_id"])
+
+
+def downgrade() -> None:
+    if table_exists("document_page_texts"):
+        op.drop_table("document_page_texts")
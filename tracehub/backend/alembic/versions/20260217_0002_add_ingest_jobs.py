@@ -0,0 +1,58 @@
+"""Add ingest_jobs table for asynchronous document ingest.
+
+Revision ID: 20260217_0002
+Revises: 20260217_0001
+Create Date: 2026-02-17
+
+Tracks per-stage progress of uploads processed on the background
+ingest worker pool (POST /api/documents/upload?async_processing=true).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = "20260217_0002"
+down_revision = "20260217_0001"
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists (idempotent migration)."""
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade() -> None:
+    if not table_exists("ingest_jobs"):
+        op.create_table(
+            "ingest_jobs",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+            sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("shipment_id", UUID(as_uuid=True), sa.ForeignKey("shipments.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+            sa.Column("stages", JSONB(), nullable=True, server_default=sa.text("'[]'::jsonb")),
+            sa.Column("options", JSONB(), nullable=True, server_default=sa.text("'{}'::jsonb")),
+            sa.Column("result", JSONB(), nullable=True),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("organization_id", UUID(as_uuid=True), sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("created_by", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_ingest_jobs_document_id", "ingest_jobs", ["document_id"])
+        op.create_index("ix_ingest_jobs_organization_id", "ingest_jobs", ["organization_id"])
+
+
+def downgrade() -> None:
+    if table_exists("ingest_jobs"):
+        op.drop_table("ingest_jobs")
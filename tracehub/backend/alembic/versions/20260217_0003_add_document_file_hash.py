@@ -0,0 +1,50 @@
+"""Add file_hash to documents.
+
+Revision ID: 20260217_0003
+Revises: 20260217_0002
+Create Date: 2026-02-17
+
+SHA-256 of the uploaded file, computed while the upload is streamed to
+disk. Later stages key their caches on it instead of re-reading the file.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260217_0003"
+down_revision = "20260217_0002"
+branch_labels = None
+depends_on = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists (idempotent migration)."""
+    bind = op.get_bind()
+    result = bind.execute(
+        sa.text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :col"
+        ),
+        {"table": table_name, "col": column_name},
+    )
+    return result.fetchone() is not None
+
+
+def upgrade() -> None:
+    if not column_exists("documents", "file_hash"):
+        op.add_column(
+            "documents",
+            sa.Column(
+                "file_hash",
+                sa.String(64),
+                nullable=True,
+                comment="SHA-256 of file content (hex)",
+            ),
+        )
+        op.create_index("ix_documents_file_hash", "documents", ["file_hash"])
+
+
+def downgrade() -> None:
+    if column_exists("documents", "file_hash"):
+        op.drop_index("ix_documents_file_hash", table_name="documents")
+        op.drop_column("documents", "file_hash")
@@ -0,0 +1,50 @@
+"""Add file_blobs table for content-addressed document storage.
+
+Revision ID: 20260217_0004
+Revises: 20260217_0003
+Create Date: 2026-02-17
+
+Uploaded files are stored once per SHA-256 under documents/blobs/ and
+shared by every document with identical content. file_blobs counts the
+references so a blob is only removed when its last document is deleted.
+Existing documents keep their per-shipment paths.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260217_0004"
+down_revision = "20260217_0003"
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists (idempotent migration)."""
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade() -> None:
+    if not table_exists("file_blobs"):
+        op.create_table(
+            "file_blobs",
+            sa.Column("file_hash", sa.String(64), primary_key=True),
+            sa.Column("storage_path", sa.String(500), nullable=False),
+            sa.Column("size", sa.BigInteger(), nullable=False),
+            sa.Column("mime_type", sa.String(100), nullable=True),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column("last_referenced_at", sa.DateTime(timezone=True), nullable=True, server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    if table_exists("file_blobs"):
+        op.drop_table("file_blobs")
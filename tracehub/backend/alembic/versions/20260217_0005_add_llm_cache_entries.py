@@ -0,0 +1,52 @@
+"""Add llm_cache_entries table for cached LLM classifications.
+
+Revision ID: 20260217_0005
+Revises: 20260217_0004
+Create Date: 2026-02-17
+
+Classification results are cached by a hash of the normalized document
+text plus model name and prompt version. This table is the tier shared by
+all API workers; each worker also keeps a small in-process LRU.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "20260217_0005"
+down_revision = "20260217_0004"
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists (idempotent migration)."""
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade() -> None:
+    if not table_exists("llm_cache_entries"):
+        op.create_table(
+            "llm_cache_entries",
+            sa.Column("cache_key", sa.String(64), primary_key=True),
+            sa.Column("model", sa.String(100), nullable=False),
+            sa.Column("prompt_version", sa.String(50), nullable=False),
+            sa.Column("result", JSONB(), nullable=False),
+            sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index("ix_llm_cache_entries_expires_at", "llm_cache_entries", ["expires_at"])
+
+
+def downgrade() -> None:
+    if table_exists("llm_cache_entries"):
+        op.drop_index("ix_llm_cache_entries_expires_at", table_name="llm_cache_entries")
+        op.drop_table("llm_cache_entries")
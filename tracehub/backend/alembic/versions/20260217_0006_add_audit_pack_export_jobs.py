@@ -0,0 +1,56 @@
+"""Add audit_pack_export_jobs table for bulk audit pack exports.
+
+Revision ID: 20260217_0006
+Revises: 20260217_0005
+Create Date: 2026-02-17
+
+Tracks organization-wide audit pack exports (POST
+/api/shipments/audit-pack-exports) built on the export worker pool,
+with the outcome for each shipment.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = "20260217_0006"
+down_revision = "20260217_0005"
+branch_labels = None
+depends_on = None
+
+
+def table_exists(table_name: str) -> bool:
+    """Check if a table exists (idempotent migration)."""
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade() -> None:
+    if not table_exists("audit_pack_export_jobs"):
+        op.create_table(
+            "audit_pack_export_jobs",
+            sa.Column("id", UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+            sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+            sa.Column("output", sa.String(20), nullable=False, server_default="urls"),
+            sa.Column("filters", JSONB(), nullable=True, server_default=sa.text("'{}'::jsonb")),
+            sa.Column("shipments", JSONB(), nullable=True, server_default=sa.text("'[]'::jsonb")),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("organization_id", UUID(as_uuid=True), sa.ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("created_by", UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_audit_pack_export_jobs_organization_id", "audit_pack_export_jobs", ["organization_id"])
+
+
+def downgrade() -> None:
+    if table_exists("audit_pack_export_jobs"):
+        op.drop_table("audit_pack_export_jobs")
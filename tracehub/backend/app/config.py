@@ -45,6 +45,29 @@ class Settings(BaseSettings):
     )
     anthropic_api_key: SecretStr = SecretStr("")  # Anthropic API key
     classification_confidence_threshold: float = 0.70  # Auto-upgrade threshold
+    classification_cascade_enabled: bool = True  # Skip the LLM when keyword scoring is decisive
+    classification_cascade_min_confidence: float = 0.80  # Escalate below this keyword score
+    classification_cascade_min_margin: float = 0.30  # Escalate when runner-up type is this close
+    llm_cache_enabled: bool = True  # Reuse classifications of identical text
+    llm_cache_max_entries: int = 1024  # In-process LRU tier (per API worker)
+    llm_cache_ttl_hours: int = 720  # Entries expire after 30 days
+    llm_cache_persistent: bool = True  # Share entries across workers via the database
+    llm_concurrent_sections: bool = True  # Classify PDF sections concurrently
+    llm_max_concurrency: int = 4  # Section classifications in flight per analysis
+    llm_call_timeout_seconds: float = 30.0  # Per-call limit; timed-out sections keep keyword results
+    llm_batch_sections: bool = False  # Pack several sections into one classification prompt
+    llm_batch_token_budget: int = 6000  # Estimated section-text tokens per batched prompt
+    llm_batch_max_sections: int = 10  # Sections per batched prompt
+    llm_async_client: bool = True  # Pooled async Anthropic client (False: sync client)
+    llm_max_connections: int = 20  # Pooled HTTP connections to the provider
+    llm_max_retries: int = 2  # Retries for 429/5xx/timeouts within the call deadline
+    llm_retry_base_delay_seconds: float = 0.5  # Backoff base (full jitter, doubled per retry)
+    llm_retry_max_delay_seconds: float = 8.0
+    llm_breaker_failure_threshold: int = 5  # Failed calls in a row before failing fast
+    llm_breaker_reset_seconds: float = 30.0  # Open period before a probe call
+    llm_metrics_window_minutes: int = 60  # Rolling window for LLM latency/token aggregates
+    llm_input_cost_per_mtok: float = 1.00  # USD per million input tokens (cost estimates)
+    llm_output_cost_per_mtok: float = 5.00  # USD per million output tokens
 
     # Email (PRD-020)
     email_provider: str = "console"  # "resend", "console"
@@ -73,6 +96,22 @@ class Settings(BaseSettings):
     max_upload_size_mb: int = 50
     storage_backend: str = "local"  # "local" or "supabase"
 
+    # Document Ingest
+    ingest_max_workers: int = 2  # Background workers for async uploads (per API process)
+    background_job_lease_seconds: int = 300  # Running jobs without a heartbeat this long are failed
+    bulk_upload_max_files: int = 50  # Files per bulk upload, after expanding ZIP archives
+    bulk_upload_max_mb: int = 500  # Size limit for one ZIP archive in a bulk upload
+
+    # Audit Packs (PRD-017)
+    audit_pack_store_precompressed: bool = True  # Store PDFs/images/archives without re-deflating
+    audit_pack_json_compress_level: int = 1  # zlib level for JSON entries (1 = fastest)
+    audit_pack_fetch_concurrency: int = 8  # Document bodies fetched ahead of the ZIP writer
+    audit_pack_incremental: bool = True  # Rebuilds copy unchanged entries from the previous pack
+    audit_pack_export_workers: int = 4  # Shipments built concurrently by a bulk export
+    audit_pack_export_max_shipments: int = 500  # Shipments per bulk export
+    audit_pack_export_url_expiry: int = 86400  # Seconds signed URLs in an export manifest stay valid
+    audit_pack_export_retention_days: int = 7  # Days an export's pack copies are kept after it finished
+
     # Supabase Storage (PRD-005) — empty disables Supabase storage
     supabase_url: str = ""
     supabase_service_key: str = (
@@ -87,6 +126,37 @@ class Settings(BaseSettings):
     ocr_dpi: int = 300  # DPI for PDF to image conversion
     ocr_timeout: int = 30  # Timeout per page in seconds
     ocr_language: str = "eng"  # Tesseract language code
+    ocr_workers: int = 0  # OCR worker processes (0 = one per CPU core)
+    ocr_adaptive_dpi: bool = True  # OCR at ocr_initial_dpi first, re-render at ocr_dpi if unsure
+    ocr_initial_dpi: int = 150  # First-pass DPI in adaptive mode
+    ocr_min_confidence: float = 70.0  # Mean Tesseract word confidence (0-100) to accept a pass
+    ocr_cache_enabled: bool = True  # Cache OCR results by rendered page bitmap hash
+    ocr_cache_dir: str = ""  # Empty = <upload_dir>/.ocr-cache
+    ocr_cache_max_mb: int = 256  # LRU-evicted above this size
+
+    # Load-test simulation (PRD-021 mocks, mock LLM, local storage only)
+    simulation_enabled: bool = False  # Inject latency/faults into mock and local backends
+    simulation_seed: int = 0  # Fixed seed for reproducible runs (0 = random)
+    sim_llm_latency_ms: float = 1200.0  # Median delay per call
+    sim_llm_latency_p95_ms: float = 4000.0  # Log-normal tail
+    sim_llm_error_rate: float = 0.01
+    sim_llm_rate_limit_rate: float = 0.0
+    sim_llm_max_in_flight: int = 8  # Concurrent calls before 429s (0 = unlimited)
+    sim_storage_latency_ms: float = 80.0
+    sim_storage_latency_p95_ms: float = 400.0
+    sim_storage_error_rate: float = 0.0
+    sim_storage_rate_limit_rate: float = 0.0
+    sim_storage_max_in_flight: int = 0
+    sim_customs_latency_ms: float = 600.0
+    sim_customs_latency_p95_ms: float = 3000.0
+    sim_customs_error_rate: float = 0.02
+    sim_customs_rate_limit_rate: float = 0.0
+    sim_customs_max_in_flight: int = 0
+    sim_banking_latency_ms: float = 400.0
+    sim_banking_latency_p95_ms: float = 1500.0
+    sim_banking_error_rate: float = 0.01
+    sim_banking_rate_limit_rate: float = 0.0
+    sim_banking_max_in_flight: int = 0
 
     # Monitoring
     sentry_dsn: str = ""  # Sentry DSN — empty disables Sentry
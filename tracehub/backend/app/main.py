@@ -254,12 +254,49 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to initialize document classifier: {e}")
 
+    # Resume ingest jobs interrupted by the last shutdown or a worker crash
+    try:
+        from .services.document_ingest import document_ingest_service
+
+        document_ingest_service.recover_jobs()
+    except Exception as e:
+        logger.warning(f"Failed to recover ingest jobs: {e}")
+
+    # Resume audit pack exports interrupted by the last shutdown
+    try:
+        from .services.audit_pack_export import audit_pack_export_service
+
+        audit_pack_export_service.recover_jobs()
+    except Exception as e:
+        logger.warning(f"Failed to recover audit pack exports: {e}")
+
     logger.info("TraceHub API startup complete")
     yield
 
     # Shutdown: cleanup if needed
     logger.info("TraceHub API shutting down...")
 
+    # Do not hold shutdown for long OCR jobs; recover_jobs() picks up
+    # queued ones at the next startup and fails ones left running
+    from .services.document_ingest import document_ingest_service
+
+    document_ingest_service.shutdown(wait=False)
+
+    # Do not hold shutdown for long exports; recover_jobs() picks them
+    # up at the next startup
+    from .services.audit_pack_export import audit_pack_export_service
+
+    audit_pack_export_service.shutdown(wait=False)
+
+    # Finish mirroring new uploads to remote storage; nothing retries them
+    from .services.blob_store import blob_store
+
+    blob_store.shutdown(wait=True)
+
+    from .services.ocr_engine import ocr_engine
+
+    ocr_engine.shutdown()
+
 
 app = FastAPI(
     title="TraceHub API",
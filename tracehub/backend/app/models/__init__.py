@@ -6,6 +6,11 @@ from .product import Product
 from .origin import Origin, RiskLevel
 from .document import Document, DocumentType, DocumentStatus, DocumentIssue
 from .document_content import DocumentContent
+from .document_page_text import DocumentPageText
+from .ingest_job import IngestJob
+from .audit_pack_export_job import AuditPackExportJob
+from .file_blob import FileBlob
+from .llm_cache_entry import LLMCacheEntry
 from .compliance_result import ComplianceResult
 from .document_transition import DocumentTransition
 from .reference_registry import ReferenceRegistry
@@ -27,6 +32,11 @@ __all__ = [
     "DocumentStatus",
     "DocumentIssue",
     "DocumentContent",
+    "DocumentPageText",
+    "IngestJob",
+    "AuditPackExportJob",
+    "FileBlob",
+    "LLMCacheEntry",
     "ComplianceResult",
     "DocumentTransition",
     "ReferenceRegistry",
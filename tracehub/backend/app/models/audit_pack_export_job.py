@@ -0,0 +1,57 @@
+"""AuditPackExportJob model - bulk audit pack export for an organization.
+
+Created by POST /api/shipments/audit-pack-exports. The shipments matching
+the filters are snapshotted when the job is created; the export worker
+pool then builds (or reuses) each shipment's audit pack and records the
+outcome here, so the status endpoint can report progress from any API
+worker.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from ..database import Base
+
+
+class AuditPackExportJob(Base):
+    """Background export of audit packs for a filtered set of shipments.
+
+    shipments is an ordered list of
+    {"shipment_id", "reference", "status", "storage_path", "generated_at", "error"}
+    entries, one per shipment; status is pending, reused (the cached pack
+    was current), generated or failed.
+
+    A worker claims a queued export by setting it running; heartbeat_at
+    is its lease (see services.job_lease). Once the retention period has
+    passed, the export's pack copies are deleted and it becomes expired.
+    """
+
+    __tablename__ = "audit_pack_export_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Job state
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed, expired
+    output = Column(String(20), nullable=False, default="urls")  # urls, archive
+    filters = Column(JSONB, default=dict)  # date_from, date_to, status, product_type
+    shipments = Column(JSONB, default=list)
+    error_message = Column(Text, nullable=True)
+
+    # Organization (multi-tenancy)
+    organization_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Refreshed by the worker running the export
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<AuditPackExportJob {self.id}: {self.status}>"
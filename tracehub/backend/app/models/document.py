@@ -88,6 +88,7 @@ class Document(Base):
     file_path = Column(String(500))
     file_size = Column(Integer)  # Named file_size in DB, not file_size_bytes
     mime_type = Column(String(100))
+    file_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of file content, hex
 
     # Document metadata
     document_date = Column(DateTime(timezone=True))  # Named document_date in DB, not issue_date
@@ -153,6 +154,8 @@ class Document(Base):
     shipment = relationship("Shipment", back_populates="documents")
     contents = relationship("DocumentContent", back_populates="document", cascade="all, delete-orphan")
     compliance_results = relationship("ComplianceResult", back_populates="document", cascade="all, delete-orphan")
+    page_text = relationship("DocumentPageText", back_populates="document", uselist=False,
+                             cascade="all, delete-orphan")
 
     # Validation enhancement relationships
     issues = relationship("DocumentIssue", back_populates="document", cascade="all, delete-orphan")
@@ -0,0 +1,61 @@
+"""DocumentPageText model - persisted page-level text extraction for a document.
+
+Stores the result of PDF text extraction (PyMuPDF or OCR) so re-analysis
+endpoints can read page text from the database instead of re-running
+extraction. Page texts are stored zlib-compressed.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class DocumentPageText(Base):
+    """Extracted page texts for a document's file.
+
+    One row per document. The row is keyed to the SHA-256 of the file it
+    was extracted from; if the file on disk changes, the row is stale and
+    is replaced on the next extraction. DocumentContent sections read their
+    text by slicing pages page_start..page_end from this row.
+    """
+
+    __tablename__ = "document_page_texts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        index=True
+    )
+
+    # Source file identity (invalidation key)
+    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hex
+
+    # Extraction details
+    extraction_method = Column(String(20), nullable=False)  # pymupdf, ocr, hybrid, none
+    page_count = Column(Integer, nullable=False, default=0)
+    page_char_counts = Column(JSONB, default=list)  # [chars_page_1, chars_page_2, ...]
+    compressed_pages = Column(LargeBinary, nullable=False)  # zlib(JSON [{text, method, dpi?, confidence?}, ...])
+
+    # Organization (multi-tenancy)
+    organization_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True
+    )
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    document = relationship("Document", back_populates="page_text")
+
+    def __repr__(self):
+        return f"<DocumentPageText {self.document_id}: {self.page_count} pages ({self.extraction_method})>"
@@ -0,0 +1,31 @@
+"""FileBlob model - content-addressed document file with a reference count.
+
+Uploaded files are stored once per distinct content, keyed by SHA-256.
+Every Document whose file_hash points at a blob holds one reference; the
+blob is removed from storage only when the last reference is released.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger
+from ..database import Base
+
+
+class FileBlob(Base):
+    """A stored file shared by all documents with identical content."""
+
+    __tablename__ = "file_blobs"
+
+    file_hash = Column(String(64), primary_key=True)  # SHA-256 hex
+    storage_path = Column(String(500), nullable=False)  # {bucket}/{path} in the storage backend
+    size = Column(BigInteger, nullable=False)
+    mime_type = Column(String(100))
+
+    # Number of documents referencing this blob
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    last_referenced_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<FileBlob {self.file_hash[:12]}: {self.ref_count} refs>"
@@ -0,0 +1,70 @@
+"""IngestJob model - background processing of an uploaded document.
+
+Created when a document is uploaded with async_processing=true. The upload
+returns 202 immediately; the heavy stages (text extraction, section
+detection, enrichment, container extraction, BoL auto-parse) run on the
+ingest worker pool and record their progress here.
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class IngestJob(Base):
+    """Background ingest job for a single uploaded document.
+
+    stages is an ordered list of
+    {"name", "status", "started_at", "completed_at", "result", "error"}
+    entries, one per pipeline stage. result holds the same payload the
+    synchronous upload endpoint returns, once the job has completed.
+
+    A worker claims a queued job by setting it running; heartbeat_at is
+    its lease (see services.job_lease).
+    """
+
+    __tablename__ = "ingest_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    shipment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("shipments.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Job state
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    stages = Column(JSONB, default=list)
+    options = Column(JSONB, default=dict)  # Upload options (requested type, auto_detect)
+    result = Column(JSONB, nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    # Organization (multi-tenancy)
+    organization_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Refreshed by the worker running the job
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    document = relationship("Document")
+
+    def __repr__(self):
+        return f"<IngestJob {self.id}: {self.status}>"
@@ -0,0 +1,30 @@
+"""LLMCacheEntry model - persistent tier of the LLM classification cache.
+
+Classification results are keyed by a hash of the normalized document
+text, the model name and the prompt version, so every API worker can
+reuse a result another worker already paid for.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+from ..database import Base
+
+
+class LLMCacheEntry(Base):
+    """A cached LLM classification result."""
+
+    __tablename__ = "llm_cache_entries"
+
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 hex
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    result = Column(JSONB, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry {self.cache_key[:12]} ({self.model})>"
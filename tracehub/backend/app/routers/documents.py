@@ -2,7 +2,7 @@
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Body, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from uuid import UUID
@@ -10,10 +10,12 @@ from datetime import datetime, date
 from pydantic import BaseModel
 import os
 import shutil
+import zipfile
+import zlib
 
 from ..database import get_db
 from ..config import get_settings
-from ..models import Document, DocumentType, DocumentStatus, DocumentContent, ReferenceRegistry, Shipment
+from ..models import Document, DocumentType, DocumentStatus, DocumentContent, IngestJob, ReferenceRegistry, Shipment
 from ..routers.auth import get_current_active_user
 from ..schemas.user import CurrentUser
 from ..services.validation import (
@@ -31,23 +33,37 @@ from ..services.workflow import (
 )
 from ..services.notifications import (
     notify_document_uploaded,
+    notify_documents_uploaded,
     notify_document_validated,
     notify_document_rejected
 )
 from ..services.permissions import Permission, has_permission
 from ..services.pdf_processor import pdf_processor
+from ..services.page_text_store import page_text_store
 from ..services.document_classifier import document_classifier
 from ..services.document_classifier_v2 import document_classifier_v2
 from ..services.llm_factory import get_llm
+from ..services.llm_metrics import llm_metrics
 from ..schemas.classification import (
     ClassificationResponse,
     ClassificationAlternative,
-    ClassificationInUpload,
     ReclassifyResponse,
 )
 from ..services.shipment_enrichment import shipment_enrichment_service
+from ..services.document_ingest import (
+    IngestOutcome,
+    document_ingest_service,
+    detect_sections_async,
+    extract_bol_container,
+    is_pdf_upload,
+    run_extract_stage_async,
+    save_detected_contents,
+    select_document_type,
+)
 from ..services.compliance import validate_document_content as validate_compliance
-from ..services.shipment_data_extractor import ShipmentDataExtractor
+from ..services.upload_writer import UploadTooLargeError
+from ..services.blob_store import blob_store
+from ..services.bulk_upload import BulkUploadError, BulkUploadReader
 from ..services.bol_parser import bol_parser
 from ..services.bol_rules import (
     RulesEngine,
@@ -64,7 +80,7 @@ from ..services.bol_auto_parse import (
 from ..schemas.bol_parse_result import BolParsedResponse, BolSyncPreviewResponse
 from ..services.entity_factory import create_document
 from ..services.access_control import can_access_shipment
-from ..services.file_utils import get_full_path, delete_file, file_exists
+from ..services.file_utils import get_full_path, file_exists
 from ..services.compliance import get_required_documents
 from ..services.audit_log import AuditLogger, get_audit_logger
 from ..schemas.document import (
@@ -133,6 +149,18 @@ class ConfirmDetectionRequest(BaseModel):
     contents: List[dict]  # List of {document_type, page_start, page_end, reference_number}
 
 
+def get_upload_notification_recipients(db: Session, current_user: CurrentUser) -> List[str]:
+    """IDs of the organization's active admins to notify about an upload (excluding the uploader)."""
+    from ..models import User, UserRole
+    admins = db.query(User).filter(
+        User.organization_id == current_user.organization_id,
+        User.role == UserRole.ADMIN,
+        User.is_active == True,
+        User.id != current_user.id  # Don't notify uploader
+    ).all()
+    return [str(admin.id) for admin in admins]
+
+
 @router.post("/upload")
 async def upload_document(
     shipment_id: UUID = Form(...),
@@ -140,6 +168,7 @@ async def upload_document(
     file: UploadFile = File(...),
     reference_number: Optional[str] = Form(None),
     auto_detect: bool = Form(False),
+    async_processing: bool = Form(False),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_active_user)
 ):
@@ -149,6 +178,11 @@ async def upload_document(
 
     If auto_detect=true or the PDF has >3 pages, the system will analyze
     the PDF to detect multiple document types within it.
+
+    If async_processing=true, the file and document record are saved and
+    the endpoint returns 202 with an ingest job id. Detection, enrichment
+    and BoL parsing run in the background; poll
+    GET /api/documents/ingest-jobs/{job_id} for progress and results.
     """
     # Check permission
     check_permission(current_user, Permission.DOCUMENTS_UPLOAD)
@@ -161,317 +195,368 @@ async def upload_document(
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
 
-    # Create upload directory if needed
-    upload_dir = os.path.join(settings.upload_dir, str(shipment_id))
-    os.makedirs(upload_dir, exist_ok=True)
+    # Stream file into content-addressed storage, hashing and enforcing
+    # the size limit as it arrives. Identical content is stored once.
+    try:
+        stored = await blob_store.store_upload(
+            db, file, settings.max_upload_size_mb * 1024 * 1024, file.content_type
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    file_path = stored.file_path
+    file_size = stored.size
 
-    # Save file
-    file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    document_saved = False
+    try:
+        outcome = IngestOutcome(
+            requested_type=document_type,
+            final_document_type=document_type,
+            is_pdf=is_pdf_upload(file.filename, file.content_type),
+        )
 
-    # Get file size
-    file_size = os.path.getsize(file_path)
+        if not async_processing:
+            await run_extract_stage_async(
+                outcome, file_path, auto_detect, file_hash=stored.file_hash,
+                db=db, organization_id=shipment.organization_id,
+            )
 
-    # Check page count for PDFs
-    page_count = 1
-    is_pdf = file.content_type == "application/pdf" or file.filename.lower().endswith(".pdf")
-    if is_pdf and pdf_processor.is_available():
-        page_count = pdf_processor.get_page_count(file_path)
+            if outcome.should_auto_detect and outcome.is_pdf and pdf_processor.is_available():
+                # Analyze PDF for multiple document types
+                # Wrap in try-except to prevent auto-detect failures from breaking upload
+                try:
+                    outcome.detected_contents, outcome.duplicates_found = await detect_sections_async(
+                        db, shipment_id, file_path, outcome.extraction
+                    )
+                except Exception as e:
+                    # Log but don't fail upload if auto-detect fails
+                    logger.warning(f"Auto-detection failed for {file.filename}: {e}")
+                    # Reset detected contents to empty - upload will proceed without auto-detect results
+                    outcome.detected_contents = []
+                    outcome.duplicates_found = []
+
+            # PRD-019: Classification with configurable threshold
+            outcome.final_document_type, outcome.classification_info = select_document_type(
+                document_type,
+                outcome.detected_contents,
+                settings.classification_confidence_threshold,
+            )
 
-    # Auto-detect if requested or PDF has multiple pages
-    should_auto_detect = auto_detect or (is_pdf and page_count > 3)
-    detected_contents = []
-    duplicates_found = []
+        # Create document record using factory (ensures organization_id is always set)
+        document = create_document(
+            shipment=shipment,
+            document_type=outcome.final_document_type,
+            name=file.filename,
+            file_path=file_path,
+            file_name=file.filename,
+            file_size=file_size,
+            mime_type=file.content_type,
+            file_hash=stored.file_hash,
+            status=DocumentStatus.UPLOADED,
+            reference_number=reference_number,
+            uploaded_by=current_user.id
+        )
 
-    if should_auto_detect and is_pdf and pdf_processor.is_available():
-        # Analyze PDF for multiple document types
-        # Wrap in try-except to prevent auto-detect failures from breaking upload
+        # PRD-019: Store classification metadata
+        if outcome.classification_info:
+            document.classification_confidence = outcome.classification_info.confidence
+            document.classification_method = outcome.classification_info.method
+        else:
+            document.classification_method = "manual"
+
+        db.add(document)
+        db.flush()  # Get document.id
+
+        if not async_processing:
+            # Persist page text so re-analysis endpoints never re-extract
+            if outcome.extraction is not None:
+                page_text_store.save(db, document, outcome.extraction)
+
+            # Create DocumentContent records for detected sections
+            if outcome.detected_contents:
+                save_detected_contents(
+                    db, document, shipment_id, outcome.detected_contents, outcome.duplicates_found
+                )
+
+        # Notify compliance team/admins about new document
+        # Note: notify_users expects user UUIDs, not emails
         try:
-            sections = document_classifier.analyze_pdf(file_path, use_ai=True)
-
-            for section in sections:
-                detected_contents.append({
-                    "document_type": section.document_type.value if section.document_type else "other",
-                    "page_start": section.page_start,
-                    "page_end": section.page_end,
-                    "reference_number": section.reference_number,
-                    "confidence": section.confidence,
-                    "detection_method": section.detection_method,
-                    "detected_fields": section.detected_fields
-                })
-
-                # Check for duplicates
-                if section.reference_number and section.document_type:
-                    existing = db.query(ReferenceRegistry).filter(
-                        ReferenceRegistry.shipment_id == shipment_id,
-                        ReferenceRegistry.reference_number == section.reference_number,
-                        ReferenceRegistry.document_type == section.document_type
-                    ).first()
-
-                    if existing:
-                        duplicates_found.append({
-                            "reference_number": section.reference_number,
-                            "document_type": section.document_type.value,
-                            "existing_document_id": str(existing.document_id),
-                            "first_seen_at": existing.first_seen_at.isoformat() if existing.first_seen_at else None
-                        })
+            admin_ids = get_upload_notification_recipients(db, current_user)
+
+            if admin_ids:
+                notify_document_uploaded(
+                    db=db,
+                    document=document,
+                    uploader=current_user.email,
+                    notify_users=admin_ids
+                )
         except Exception as e:
-            # Log but don't fail upload if auto-detect fails
-            logger.warning(f"Auto-detection failed for {file.filename}: {e}")
-            # Reset detected contents to empty - upload will proceed without auto-detect results
-            detected_contents = []
-            duplicates_found = []
-
-    # Determine if this is a combined document
-    is_combined = len(detected_contents) > 1
-
-    # PRD-019: Classification with configurable threshold
-    final_document_type = document_type
-    classification_info = None
-    confidence_threshold = settings.classification_confidence_threshold
-
-    if document_type == DocumentType.OTHER and detected_contents:
-        # Find the highest confidence detection that's not "other"
-        best_detection = None
-        for dc in detected_contents:
-            if dc["document_type"] != "other" and dc["confidence"] >= confidence_threshold:
-                if best_detection is None or dc["confidence"] > best_detection["confidence"]:
-                    best_detection = dc
-
-        if best_detection:
+            # Don't fail upload if notification fails
+            logger.warning(f"Failed to send document upload notification: {e}")
+
+        if async_processing:
+            job = document_ingest_service.create_job(
+                db,
+                document,
+                shipment,
+                requested_type=document_type,
+                auto_detect=auto_detect,
+                created_by=current_user.id,
+            )
+            db.commit()
+            document_saved = True
+            document_ingest_service.submit(job.id)
+
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "id": str(document.id),
+                    "name": document.name,
+                    "type": document.document_type.value,
+                    "status": document.status.value,
+                    "message": "Document uploaded; processing in background",
+                    "job_id": str(job.id),
+                    "job_status": job.status,
+                    "status_url": f"/api/documents/ingest-jobs/{job.id}",
+                },
+            )
+
+        # Auto-enrich shipment with extracted data from document
+        if outcome.is_pdf and pdf_processor.is_available():
             try:
-                final_document_type = DocumentType(best_detection["document_type"])
-                classification_info = ClassificationInUpload(
-                    suggested_type=final_document_type.value,
-                    confidence=best_detection["confidence"],
-                    method=best_detection.get("detection_method", "keyword"),
-                    auto_applied=True,
+                outcome.enrichment_result = shipment_enrichment_service.enrich_from_document(
+                    shipment=shipment,
+                    document=document,
+                    db=db,
+                    auto_create_products=True,
+                    overwrite_existing=False,  # Don't overwrite existing data
+                    extraction=outcome.extraction,
+                )
+            except Exception as e:
+                # Log but don't fail the upload
+                logger.warning(f"Enrichment failed: {e}")
+
+        # Extract container number from Bill of Lading documents
+        # Store on document for later suggestion to user
+        is_bol = outcome.final_document_type == DocumentType.BILL_OF_LADING
+        if is_bol and outcome.is_pdf and pdf_processor.is_available():
+            try:
+                outcome.extracted_container = extract_bol_container(
+                    document, shipment, file_path, outcome.extraction
+                )
+            except Exception as e:
+                # Log but don't fail the upload
+                logger.warning(f"Container extraction failed: {e}")
+
+        # PRD-018: Auto-parse BoL on upload
+        if is_bol and outcome.is_pdf:
+            try:
+                outcome.bol_parse_result = auto_parse_bol(
+                    document, db, auto_sync=True, extraction=outcome.extraction
                 )
                 logger.info(
-                    "Auto-classified document as %s (confidence: %.2f)",
-                    final_document_type.value,
-                    best_detection["confidence"],
+                    "Auto-parsed BoL for document %s (status=%s, confidence=%.2f, auto_synced=%s)",
+                    document.id,
+                    outcome.bol_parse_result.parse_status,
+                    outcome.bol_parse_result.confidence_score,
+                    outcome.bol_parse_result.auto_synced,
                 )
-            except ValueError:
-                pass  # Keep user's selection if AI type is invalid
+            except Exception as e:
+                logger.warning(f"BoL auto-parse failed (non-blocking): {e}")
 
-    # Create document record using factory (ensures organization_id is always set)
-    document = create_document(
-        shipment=shipment,
-        document_type=final_document_type,
-        name=file.filename,
-        file_path=file_path,
-        file_name=file.filename,
-        file_size=file_size,
-        mime_type=file.content_type,
-        status=DocumentStatus.UPLOADED,
-        reference_number=reference_number,
-        uploaded_by=current_user.id
-    )
+        db.commit()
+        document_saved = True
+        db.refresh(document)
 
-    # PRD-019: Store classification metadata
-    if classification_info:
-        document.classification_confidence = classification_info.confidence
-        document.classification_method = classification_info.method
-    else:
-        document.classification_method = "manual"
-
-    db.add(document)
-    db.flush()  # Get document.id
-
-    # Create DocumentContent records for detected sections
-    if detected_contents:
-        for dc in detected_contents:
-            doc_type_enum = DocumentType(dc["document_type"]) if dc["document_type"] != "other" else DocumentType.OTHER
-            content = DocumentContent(
-                document_id=document.id,
-                document_type=doc_type_enum,
-                status=DocumentStatus.UPLOADED,
-                page_start=dc["page_start"],
-                page_end=dc["page_end"],
-                reference_number=dc.get("reference_number"),
-                confidence_score=dc["confidence"],
-                detection_method=dc["detection_method"],
-                detected_fields=dc.get("detected_fields", {})
-            )
-            db.add(content)
-            db.flush()
-
-            # Register reference numbers for duplicate detection (if not a duplicate)
-            if dc.get("reference_number") and not any(
-                d["reference_number"] == dc["reference_number"] for d in duplicates_found
-            ):
-                # Check if reference already exists (to avoid IntegrityError on commit)
-                existing_registry = db.query(ReferenceRegistry).filter(
-                    ReferenceRegistry.shipment_id == shipment_id,
-                    ReferenceRegistry.reference_number == dc["reference_number"],
-                    ReferenceRegistry.document_type == doc_type_enum
-                ).first()
-
-                if not existing_registry:
-                    registry = ReferenceRegistry(
-                        shipment_id=shipment_id,
-                        reference_number=dc["reference_number"],
-                        document_type=doc_type_enum,
-                        document_content_id=content.id,
-                        document_id=document.id,
-                        first_seen_at=datetime.utcnow()
-                    )
-                    db.add(registry)
-                else:
-                    logger.info(
-                        f"Reference {dc['reference_number']} already registered for shipment "
-                        f"{shipment_id}, document type {doc_type_enum.value} - skipping duplicate registry"
-                    )
+        return outcome.to_response(document)
+    except BaseException:
+        # The blob reference is already committed; give it back if no
+        # document holds it
+        if not document_saved:
+            db.rollback()
+            await blob_store.discard(db, stored.file_hash)
+        raise
 
-    # Notify compliance team/admins about new document
-    # Note: notify_users expects user UUIDs, not emails
-    try:
-        # Get admins in the organization to notify
-        from ..models import User, UserRole
-        admins = db.query(User).filter(
-            User.organization_id == current_user.organization_id,
-            User.role.in_([UserRole.ADMIN, UserRole.SUPER_ADMIN]),
-            User.is_active == True,
-            User.id != current_user.id  # Don't notify uploader
-        ).all()
-        admin_ids = [str(admin.id) for admin in admins]
-
-        if admin_ids:
-            notify_document_uploaded(
-                db=db,
-                document=document,
-                uploader=current_user.email,
-                notify_users=admin_ids
-            )
-    except Exception as e:
-        # Don't fail upload if notification fails
-        logger.warning(f"Failed to send document upload notification: {e}")
 
-    # Auto-enrich shipment with extracted data from document
-    enrichment_result = None
-    if is_pdf and pdf_processor.is_available():
-        try:
-            enrichment_result = shipment_enrichment_service.enrich_from_document(
-                shipment=shipment,
-                document=document,
-                db=db,
-                auto_create_products=True,
-                overwrite_existing=False  # Don't overwrite existing data
-            )
-        except Exception as e:
-            # Log but don't fail the upload
-            import logging
-            logging.getLogger(__name__).warning(f"Enrichment failed: {e}")
-
-    # Extract container number from Bill of Lading documents
-    # Store on document for later suggestion to user
-    extracted_container = None
-    if final_document_type == DocumentType.BILL_OF_LADING and is_pdf and pdf_processor.is_available():
+@router.post("/upload/bulk", status_code=status.HTTP_202_ACCEPTED)
+async def upload_documents_bulk(
+    shipment_id: UUID = Form(...),
+    files: List[UploadFile] = File(...),
+    document_type: DocumentType = Form(DocumentType.OTHER),
+    auto_detect: bool = Form(True),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Upload many documents for a shipment in one request.
+
+    Requires: documents:upload permission (admin, compliance, supplier roles)
+
+    Accepts any mix of files and ZIP archives (expanded server-side, up to
+    settings.bulk_upload_max_files files). All Document rows and ingest
+    jobs are created in one transaction with a single notification to
+    admins; detection, enrichment and BoL parsing run on the background
+    ingest worker pool. Poll each job's status_url for results.
+
+    Files that cannot be stored (too large, invalid archive) are listed
+    under "rejected"; the rest of the batch is still accepted.
+    """
+    check_permission(current_user, Permission.DOCUMENTS_UPLOAD)
+
+    shipment = db.query(Shipment).filter(
+        Shipment.id == shipment_id,
+        Shipment.organization_id == current_user.organization_id
+    ).first()
+    if not shipment:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+
+    reader = BulkUploadReader(
+        max_files=settings.bulk_upload_max_files,
+        max_archive_bytes=settings.bulk_upload_max_mb * 1024 * 1024,
+    )
+    documents = []
+    try:
         try:
-            extractor = ShipmentDataExtractor()
-            # Extract text from the PDF
-            pages = pdf_processor.extract_text(file_path)
-            if pages:
-                full_text = "\n".join(page.text for page in pages)
-                result = extractor.extract_container_with_confidence(full_text)
-                if result:
-                    container_number, confidence = result
-                    extracted_container = {
-                        "container_number": container_number,
-                        "confidence": confidence
-                    }
-                    # Store extraction metadata in document extra_data for later use
-                    document.extra_data = document.extra_data or {}
-                    document.extra_data["extracted_container"] = {
-                        "container_number": container_number,
-                        "confidence": confidence,
-                        "extraction_method": "keyword"
-                    }
-                    logger.info(
-                        f"Extracted container {container_number} from BOL "
-                        f"(confidence: {confidence:.2f}) for shipment {shipment.reference}"
+            try:
+                await reader.index(files)
+            except BulkUploadError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            # Stream every file into content-addressed storage
+            for item in reader.items:
+                upload = reader.open(item)
+                try:
+                    stored = await blob_store.store_upload(
+                        db, upload, settings.max_upload_size_mb * 1024 * 1024, item.content_type
                     )
-        except Exception as e:
-            # Log but don't fail the upload
-            logger.warning(f"Container extraction failed: {e}")
+                except UploadTooLargeError as e:
+                    reader.reject(item, str(e))
+                    continue
+                except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+                    # Corrupt member: only detected while it is decompressed
+                    logger.warning(f"Corrupt archive member {item.filename}: {e}")
+                    reader.reject(item, f"Corrupt archive member: {e}")
+                    continue
+                finally:
+                    if item.member is not None:
+                        await upload.close()
+
+                document = create_document(
+                    shipment=shipment,
+                    document_type=document_type,
+                    name=item.filename,
+                    file_path=stored.file_path,
+                    file_name=item.filename,
+                    file_size=stored.size,
+                    mime_type=item.content_type,
+                    file_hash=stored.file_hash,
+                    status=DocumentStatus.UPLOADED,
+                    uploaded_by=current_user.id,
+                )
+                document.classification_method = "manual"
+                documents.append(document)
+        finally:
+            reader.close()
 
-    # PRD-018: Auto-parse BoL on upload
-    bol_parse_result = None
-    if final_document_type == DocumentType.BILL_OF_LADING and is_pdf:
-        try:
-            bol_parse_result = auto_parse_bol(document, db, auto_sync=True)
-            logger.info(
-                "Auto-parsed BoL for document %s (status=%s, confidence=%.2f, auto_synced=%s)",
-                document.id,
-                bol_parse_result.parse_status,
-                bol_parse_result.confidence_score,
-                bol_parse_result.auto_synced,
+        if not documents:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "No documents could be uploaded", "rejected": reader.rejected},
             )
+
+        # One batched insert for the documents and one for their ingest jobs
+        db.add_all(documents)
+        db.flush()
+        jobs = document_ingest_service.create_jobs(
+            db,
+            documents,
+            shipment,
+            requested_type=document_type,
+            auto_detect=auto_detect,
+            created_by=current_user.id,
+        )
+
+        # One notification for the whole batch
+        try:
+            admin_ids = get_upload_notification_recipients(db, current_user)
+            if admin_ids:
+                notify_documents_uploaded(
+                    db=db,
+                    documents=documents,
+                    uploader=current_user.email,
+                    notify_users=admin_ids
+                )
         except Exception as e:
-            logger.warning(f"BoL auto-parse failed (non-blocking): {e}")
+            logger.warning(f"Failed to send bulk upload notification: {e}")
 
-    db.commit()
-    db.refresh(document)
+        db.commit()
+    except BaseException:
+        # Blob references are committed as each file is stored; give back
+        # the ones no saved document holds
+        db.rollback()
+        for document in documents:
+            await blob_store.discard(db, document.file_hash)
+        raise
+
+    # Fan analysis out over the ingest worker pool
+    for job in jobs:
+        document_ingest_service.submit(job.id)
 
-    # Calculate content_count from detected_contents
-    content_count = len(detected_contents) if detected_contents else 1
+    logger.info(
+        f"Bulk upload of {len(documents)} documents for shipment {shipment_id} "
+        f"({len(reader.rejected)} rejected)"
+    )
 
-    response = {
-        "id": str(document.id),
-        "name": document.name,
-        "type": document.document_type.value,
-        "status": document.status.value,
-        "message": "Document uploaded successfully",
-        "page_count": page_count,
-        "is_combined": is_combined,
-        "content_count": content_count
+    return {
+        "shipment_id": str(shipment_id),
+        "count": len(documents),
+        "documents": [
+            {
+                "id": str(document.id),
+                "name": document.name,
+                "type": document.document_type.value,
+                "status": document.status.value,
+                "job_id": str(job.id),
+                "job_status": job.status,
+                "status_url": f"/api/documents/ingest-jobs/{job.id}",
+            }
+            for document, job in zip(documents, jobs)
+        ],
+        "rejected": reader.rejected,
+        "message": f"{len(documents)} documents uploaded; processing in background",
     }
 
-    # Include detection results if auto-detect was used
-    if should_auto_detect and detected_contents:
-        response["detection"] = {
-            "detected_contents": detected_contents,
-            "duplicates_found": duplicates_found,
-            "ai_available": document_classifier.is_ai_available(),
-            "ai_reclassified": final_document_type != document_type,
-            "original_type": document_type.value if final_document_type != document_type else None,
-            "detected_type": final_document_type.value if final_document_type != document_type else None
-        }
 
-    # Include enrichment results if extraction was performed
-    if enrichment_result:
-        response["enrichment"] = {
-            "success": enrichment_result.success,
-            "updates_applied": enrichment_result.updates_applied,
-            "products_created": enrichment_result.products_created,
-            "warnings": enrichment_result.warnings,
-            "extracted_data": enrichment_result.extracted_data
-        }
+@router.get("/ingest-jobs/{job_id}")
+async def get_ingest_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Get the progress of an asynchronous document ingest job.
 
-    # PRD-019: Include classification info
-    if classification_info:
-        response["classification"] = classification_info.model_dump()
-
-    # Include extracted container from BOL (for suggesting container update)
-    if extracted_container:
-        response["extracted_container"] = extracted_container
-
-    # PRD-018: Include BoL auto-parse results
-    if bol_parse_result:
-        response["bol_parse"] = {
-            "parse_status": bol_parse_result.parse_status,
-            "confidence_score": bol_parse_result.confidence_score,
-            "auto_synced": bol_parse_result.auto_synced,
-            "compliance_decision": (
-                bol_parse_result.compliance.decision
-                if bol_parse_result.compliance
-                else None
-            ),
-        }
+    Returns per-stage status (pending, running, completed, failed, skipped)
+    and, once the job has completed, the same payload the synchronous
+    upload endpoint returns.
+    """
+    job = db.query(IngestJob).filter(
+        IngestJob.id == job_id,
+        IngestJob.organization_id == current_user.organization_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
 
-    return response
+    return {
+        "job_id": str(job.id),
+        "document_id": str(job.document_id),
+        "shipment_id": str(job.shipment_id),
+        "status": job.status,
+        "stages": job.stages or [],
+        "result": job.result,
+        "error": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
 
 
 @router.get("/{document_id}")
@@ -647,8 +732,8 @@ async def delete_document(
         "deletion_reason": delete_request.reason,
     }
 
-    # Delete file if exists (using shared path resolution)
-    delete_file(document.file_path)
+    # Drop the file reference; shared blobs stay until their last document goes
+    orphaned_blob = blob_store.release(db, document)
 
     db.delete(document)
 
@@ -667,6 +752,9 @@ async def delete_document(
 
     db.commit()
 
+    if orphaned_blob:
+        await blob_store.purge(db, orphaned_blob)
+
     return DocumentDeleteResponse(
         success=True,
         message=f"Document '{doc_name}' deleted successfully",
@@ -696,17 +784,23 @@ async def delete_all_shipment_documents(
         return {"message": "No documents found for this shipment", "deleted_count": 0}
 
     deleted_count = 0
+    orphaned_blobs = set()
     for document in documents:
-        # Delete file if exists (using shared path resolution)
+        # Drop the file reference (shared blobs are purged after commit)
         try:
-            delete_file(document.file_path)
+            orphaned = blob_store.release(db, document)
+            if orphaned:
+                orphaned_blobs.add(orphaned)
         except Exception as e:
-            logger.warning(f"Failed to delete file {document.file_path}: {e}")
+            logger.warning(f"Failed to release file {document.file_path}: {e}")
 
         db.delete(document)
         deleted_count += 1
 
     db.commit()
+
+    for file_hash in orphaned_blobs:
+        await blob_store.purge(db, file_hash)
     logger.info(f"Deleted {deleted_count} documents for shipment {shipment_id}")
 
     return {"message": f"Deleted {deleted_count} documents", "deleted_count": deleted_count}
@@ -1389,13 +1483,19 @@ async def analyze_document(
             detail="PDF processing is not available. Install PyMuPDF."
         )
 
-    # Analyze the PDF
-    sections = document_classifier.analyze_pdf(document.file_path, use_ai=True)
+    # Analyze the PDF using stored page text (read-only: nothing is saved)
+    extraction = page_text_store.get_or_extract(db, document, store=False)
+    sections = await document_classifier.analyze_pdf_async(
+        document.file_path, use_ai=True, extraction=extraction
+    )
 
     return {
         "document_id": str(document_id),
         "file_name": document.file_name,
-        "page_count": pdf_processor.get_page_count(document.file_path),
+        "page_count": (
+            len(extraction.pages) if extraction and extraction.pages
+            else pdf_processor.get_page_count(document.file_path)
+        ),
         "detected_sections": [
             {
                 "document_type": s.document_type.value if s.document_type else "other",
@@ -1519,8 +1619,11 @@ async def get_ai_status(
     - Whether AI classification is active
     - Fallback status (keyword-based classification always available)
     - Error messages if AI is unavailable
+    - Cache hit rates and how often keyword results escalate to AI
+    - Circuit breaker state of the LLM provider
     """
     status = document_classifier.get_ai_status()
+    llm_status = document_classifier_v2.get_ai_status()
 
     return {
         "ai_classification": {
@@ -1538,6 +1641,9 @@ async def get_ai_status(
             "available": pdf_processor.is_available(),
             "library": "PyMuPDF"
         },
+        "classification_cache": status["cache"],
+        "classification_cascade": status["cascade"],
+        "llm_circuit_breaker": llm_status.get("circuit_breaker"),
         "message": (
             "AI classification is active" if status["available"]
             else f"Using keyword-based fallback: {status['last_error'] or 'AI unavailable'}"
@@ -1545,6 +1651,19 @@ async def get_ai_status(
     }
 
 
+@router.get("/ai/metrics")
+async def get_ai_metrics(
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Get LLM call metrics over the rolling window.
+
+    Returns call counts, p50/p95/p99 latency, token usage and estimated
+    cost per hour, overall and per prompt kind, plus breakdowns by
+    outcome (ok, timeout, rate_limited, ...) and cache status.
+    """
+    return llm_metrics.get_summary()
+
+
 @router.post("/ai/test")
 async def test_ai_classification(
     text: str = Body(..., embed=True, description="Sample text to classify"),
@@ -1555,7 +1674,7 @@ async def test_ai_classification(
 
     Useful for verifying AI/keyword classification is working correctly.
     """
-    result = document_classifier.classify(text, prefer_ai=prefer_ai)
+    result = await document_classifier.classify_async(text, prefer_ai=prefer_ai)
 
     return {
         "classification": {
@@ -1619,17 +1738,19 @@ async def extract_shipment_data(
             detail="PDF processing is not available. Install PyMuPDF."
         )
 
-    # Run extraction and enrichment
+    # Run extraction and enrichment from stored page text
+    extraction = page_text_store.get_or_extract(db, document)
     result = shipment_enrichment_service.enrich_from_document(
         shipment=shipment,
         document=document,
         db=db,
         auto_create_products=auto_create_products,
-        overwrite_existing=overwrite_existing
+        overwrite_existing=overwrite_existing,
+        extraction=extraction,
     )
 
+    db.commit()
     if result.updates_applied or result.products_created:
-        db.commit()
         db.refresh(shipment)
 
     return {
@@ -1680,10 +1801,12 @@ async def preview_extraction(
     # Import extractor
     from ..services.shipment_data_extractor import shipment_data_extractor
 
-    # Extract data without applying
+    # Extract data without applying (from stored page text, nothing is saved)
+    extraction = page_text_store.get_or_extract(db, document, store=False)
     extracted = shipment_data_extractor.extract_from_document(
         document.file_path,
-        document.document_type
+        document.document_type,
+        extraction=extraction,
     )
 
     # Get current shipment data for comparison (verify org ownership)
@@ -1866,8 +1989,9 @@ async def parse_bol_document(
             detail="PDF processing is not available. Install PyMuPDF."
         )
 
-    # Extract text from PDF
-    pages = pdf_processor.extract_text(document.file_path)
+    # Load stored page text (extracted and stored on first use)
+    extraction = page_text_store.get_or_extract(db, document)
+    pages = extraction.pages if extraction else []
     if not pages:
         # Check OCR status to provide better error message
         ocr_status = pdf_processor.get_ocr_status()
@@ -2003,7 +2127,8 @@ async def check_bol_compliance(
                 detail="PDF processing is not available. Install PyMuPDF."
             )
 
-        pages = pdf_processor.extract_text(document.file_path)
+        extraction = page_text_store.get_or_extract(db, document)
+        pages = extraction.pages if extraction else []
         if not pages:
             # Check OCR status to provide better error message
             ocr_status = pdf_processor.get_ocr_status()
@@ -2686,7 +2811,7 @@ async def classify_document_endpoint(
             )
 
         # Classify
-        result = document_classifier_v2.classify(text, prefer_ai=True)
+        result = await document_classifier_v2.classify_async(text, prefer_ai=True)
 
         alternatives = [
             ClassificationAlternative(
@@ -2741,12 +2866,11 @@ async def reclassify_document(
                 detail="Document file not found for reclassification",
             )
 
-    # Extract text
+    # Load stored page text (extracted and stored on first use)
     text = None
-    if pdf_processor.is_available():
-        pages = pdf_processor.extract_text(full_path)
-        if pages:
-            text = "\n".join(page.text for page in pages)
+    extraction = page_text_store.get_or_extract(db, document)
+    if extraction and extraction.pages:
+        text = extraction.full_text
 
     if not text:
         raise HTTPException(
@@ -2755,7 +2879,7 @@ async def reclassify_document(
         )
 
     # Classify
-    result = document_classifier_v2.classify(text, prefer_ai=True)
+    result = await document_classifier_v2.classify_async(text, prefer_ai=True)
     previous_type = document.document_type.value
 
     alternatives = [
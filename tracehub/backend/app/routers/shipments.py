@@ -19,9 +19,16 @@ from ..schemas.shipment import ShipmentResponse, ShipmentDetailResponse, Shipmen
 from ..schemas.user import CurrentUser
 from ..routers.auth import get_current_active_user
 from ..services.compliance import get_required_documents, check_document_completeness
-from ..services.audit_pack import generate_audit_pack, get_or_generate_audit_pack, get_audit_pack_status
+from ..services.audit_pack import get_or_generate_audit_pack, get_audit_pack_status, stream_audit_pack
 from ..services.storage_factory import get_storage
-from ..schemas.audit_pack import AuditPackStatusResponse
+from ..services.blob_store import blob_store
+from ..schemas.audit_pack import (
+    AuditPackExportRequest,
+    AuditPackExportStatusResponse,
+    AuditPackStatusResponse,
+)
+from ..models.audit_pack_export_job import AuditPackExportJob
+from ..services.audit_pack_export import ExportTooLargeError, audit_pack_export_service
 from ..services.permissions import Permission, has_permission
 from ..services.access_control import get_accessible_shipments_filter, get_accessible_shipment, user_is_shipment_owner
 from ..services.shipment_state_machine import validate_transition, get_transition_error_message
@@ -171,6 +178,84 @@ async def list_shipments(
     return shipments
 
 
+@router.post(
+    "/audit-pack-exports",
+    response_model=AuditPackExportStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_audit_pack_export(
+    request: AuditPackExportRequest,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Start a bulk audit pack export for the shipments matching the filters.
+
+    Packs are built in the background, reusing stored packs that are
+    still current. Poll GET /audit-pack-exports/{job_id} for progress;
+    once completed it lists signed URLs (output="urls") or links to the
+    combined archive (output="archive").
+    """
+    check_permission(current_user, Permission.AUDIT_PACK_DOWNLOAD)
+    try:
+        job = audit_pack_export_service.create_job(db, current_user, request)
+    except ExportTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    audit_pack_export_service.submit(job.id)
+
+    return await audit_pack_export_service.get_status(job, get_storage())
+
+
+def get_export_job(db: Session, job_id: UUID, user: CurrentUser) -> AuditPackExportJob:
+    """Get an export job of the user's organization or raise 404."""
+    job = db.query(AuditPackExportJob).filter(
+        AuditPackExportJob.id == job_id,
+        AuditPackExportJob.organization_id == user.organization_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Audit pack export not found")
+    return job
+
+
+@router.get("/audit-pack-exports/{job_id}", response_model=AuditPackExportStatusResponse)
+async def get_audit_pack_export(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Get the progress of a bulk audit pack export.
+
+    Reports each shipment as pending, reused, generated or failed. Signed
+    URLs are issued on each request, so they stay valid for
+    audit_pack_export_url_expiry seconds from the time of polling.
+    """
+    check_permission(current_user, Permission.AUDIT_PACK_DOWNLOAD)
+    job = get_export_job(db, job_id, current_user)
+    return await audit_pack_export_service.get_status(job, get_storage())
+
+
+@router.get("/audit-pack-exports/{job_id}/archive")
+async def download_audit_pack_export(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Stream a completed export as one ZIP of shipment packs plus manifest.json."""
+    check_permission(current_user, Permission.AUDIT_PACK_DOWNLOAD)
+    job = get_export_job(db, job_id, current_user)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Audit pack export is {job.status}")
+
+    chunks = audit_pack_export_service.stream_archive(job, get_storage())
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=audit-pack-export-{job.id}.zip"
+        }
+    )
+
+
 @router.get("/{shipment_id}/debug")
 async def get_shipment_debug(
     shipment_id: UUID,
@@ -445,8 +530,10 @@ async def delete_shipment(
     # SEC-002 FIX: Delete associated records in correct order to avoid FK constraint errors
     # Order matters: delete records that have FKs to other tables first
 
-    # 1. Get all document IDs for this shipment
-    document_ids = [d.id for d in db.query(Document.id).filter(Document.shipment_id == shipment_id).all()]
+    # 1. Get all documents for this shipment and drop their file references
+    documents = db.query(Document).filter(Document.shipment_id == shipment_id).all()
+    document_ids = [d.id for d in documents]
+    orphaned_blobs = {blob_store.release(db, d) for d in documents} - {None}
 
     if document_ids:
         # 2. Delete ReferenceRegistry entries (FK to documents and shipment)
@@ -475,6 +562,9 @@ async def delete_shipment(
     db.delete(shipment)
     db.commit()
 
+    for file_hash in orphaned_blobs:
+        await blob_store.purge(db, file_hash)
+
     return None
 
 
@@ -596,6 +686,32 @@ async def download_audit_pack(
     return await get_or_generate_audit_pack(shipment, db, storage)
 
 
+@router.get("/{shipment_id}/audit-pack/stream")
+async def stream_audit_pack_download(
+    shipment_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Stream a freshly generated audit pack ZIP in the response.
+
+    For clients that cannot follow signed storage URLs. The ZIP is
+    written while it is sent, so memory use does not depend on pack size.
+    Nothing is cached in storage.
+    """
+    shipment = get_accessible_shipment(db, shipment_id, current_user)
+    if not shipment:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+
+    chunks = stream_audit_pack(shipment, db, get_storage())
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={shipment.reference}-audit-pack.zip"
+        }
+    )
+
+
 @router.get("/{shipment_id}/audit-pack/status", response_model=AuditPackStatusResponse)
 async def audit_pack_status(
     shipment_id: UUID,
@@ -6,8 +6,11 @@ preventing bugs like accessing non-existent model attributes.
 PRD-017: Added compliance fields and API response schemas.
 """
 
-from pydantic import BaseModel
-from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, List
+
+from ..models.shipment import ProductType, ShipmentStatus
 
 
 class PortInfo(BaseModel):
@@ -58,6 +61,15 @@ class ComplianceMetadata(BaseModel):
     warnings: int = 0
 
 
+class PackEntryMetadata(BaseModel):
+    """How one file is stored in the audit pack ZIP."""
+    name: str
+    content_type: str
+    compression: str  # "stored" or "deflated"
+    compress_level: Optional[int] = None  # None = zlib default
+    sha256: Optional[str] = None  # Content hash, for incremental rebuilds
+
+
 class AuditPackMetadata(BaseModel):
     """Complete metadata.json schema for audit packs.
 
@@ -70,6 +82,7 @@ class AuditPackMetadata(BaseModel):
     exporter: PartyInfo
     compliance: Optional[ComplianceMetadata] = None
     exported_at: str
+    entries: List[PackEntryMetadata] = []
 
     class Config:
         json_schema_extra = {
@@ -110,7 +123,21 @@ class AuditPackMetadata(BaseModel):
                     "failed": 0,
                     "warnings": 0
                 },
-                "exported_at": "2026-01-17T15:00:00"
+                "exported_at": "2026-01-17T15:00:00",
+                "entries": [
+                    {
+                        "name": "01-bill_of_lading.pdf",
+                        "content_type": "application/pdf",
+                        "compression": "stored",
+                        "compress_level": None
+                    },
+                    {
+                        "name": "metadata.json",
+                        "content_type": "application/json",
+                        "compression": "deflated",
+                        "compress_level": 1
+                    }
+                ]
             }
         }
 
@@ -152,3 +179,41 @@ class AuditPackStatusResponse(BaseModel):
     compliance_decision: Optional[str] = None
     document_count: int = 0
     is_outdated: bool = False
+
+
+class AuditPackExportRequest(BaseModel):
+    """Filters and output format for a bulk audit pack export."""
+    date_from: Optional[datetime] = None  # Shipment created_at, inclusive
+    date_to: Optional[datetime] = None  # Shipment created_at, exclusive
+    status: Optional[ShipmentStatus] = None
+    product_type: Optional[ProductType] = None
+    output: Literal["urls", "archive"] = "urls"
+
+
+class AuditPackExportShipment(BaseModel):
+    """Outcome of one shipment in a bulk export."""
+    shipment_id: str
+    reference: str
+    status: str  # pending, reused, generated, failed
+    generated_at: Optional[str] = None
+    download_url: Optional[str] = None  # Signed when the status is requested (output="urls")
+    error: Optional[str] = None
+
+
+class AuditPackExportStatusResponse(BaseModel):
+    """Progress and results of a bulk audit pack export."""
+    job_id: str
+    status: str  # queued, running, completed, failed, expired
+    output: str
+    filters: dict = Field(default_factory=dict)
+    total: int
+    completed: int
+    reused: int
+    failed: int
+    shipments: List[AuditPackExportShipment] = []
+    archive_url: Optional[str] = None  # Streams every pack as one ZIP (output="archive")
+    expires_at: Optional[str] = None  # Expiry of the signed URLs
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
@@ -3,15 +3,53 @@
 PRD-017: Upgraded to use StorageBackend for document fetching and
 audit pack storage. Includes compliance status in PDF and metadata.
 Uses Pydantic schemas for type-safe metadata generation.
+
+Packs are written as a stream: everything that needs the database (the
+summary PDF, tracking log and metadata) is collected first as small
+PackEntry objects, then document files are copied into the ZIP in
+STREAM_CHUNK_SIZE pieces from open file handles. Peak memory does not
+grow with the number or size of documents, whether the ZIP goes to a
+temporary file for upload (get_or_generate_audit_pack) or straight to
+an HTTP response (stream_audit_pack).
+
+Compression is chosen per entry (_choose_compression): PDFs, images and
+archives are already compressed and are stored as-is, JSON is deflated
+at a fast level. The choice for every entry is listed in metadata.json.
+
+Rebuilds are incremental (audit_pack_incremental): metadata.json records
+each entry's SHA-256, and when a shipment's pack is regenerated, entries
+whose content is unchanged are copied from the previous ZIP as raw
+compressed bytes. Blob-store documents are content-addressed, so an
+unchanged document is neither fetched nor recompressed; only new or
+changed documents and the regenerated index files are written.
+
+Document bodies are opened concurrently - local files directly, blobs
+without a local working copy through StorageBackend.download - at most
+audit_pack_fetch_concurrency ahead of the writer, and written in
+manifest order as they arrive. Reading and compressing run in worker
+threads so the event loop keeps serving requests.
 """
 
 import asyncio
+import hashlib
 import io
+import json
 import logging
+import mimetypes
 import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
 import zipfile
+from contextlib import nullcontext
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Tuple
+from typing import (
+    AsyncIterator, BinaryIO, Callable, Deque, Iterator, List, Optional, Tuple,
+)
 
 from sqlalchemy.orm import Session
 from sqlalchemy import func
@@ -27,6 +65,7 @@ from ..schemas.audit_pack import (
     AuditPackContent,
     AuditPackStatusResponse,
     ComplianceMetadata,
+    PackEntryMetadata,
     ShipmentMetadata,
     ProductMetadata,
     PartyInfo,
@@ -34,6 +73,7 @@ from ..schemas.audit_pack import (
     TrackingLog,
     TrackingEvent,
 )
+from .blob_store import DOCUMENTS_BUCKET, blob_key, blob_store
 from .compliance import get_required_documents, check_document_completeness, DOCUMENT_NAMES
 from .compliance_aggregation import get_compliance_decision, get_compliance_summary
 from .file_utils import get_full_path
@@ -44,6 +84,96 @@ logger = logging.getLogger(__name__)
 
 AUDIT_PACK_BUCKET = "audit-packs"
 
+# Bytes copied per step when writing a document into the ZIP
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Content that is already compressed; deflating it again costs CPU for
+# almost no size gain
+PRECOMPRESSED_TYPES = {
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/heic",
+}
+PRECOMPRESSED_PREFIXES = (
+    "audio/",
+    "video/",
+    "application/vnd.openxmlformats-officedocument.",  # .docx/.xlsx are ZIPs
+)
+
+
+@dataclass
+class PackEntry:
+    """One file in an audit pack.
+
+    Content comes from exactly one of: data (generated), source_path
+    (local file), storage_key (bucket, path fetched through the storage
+    backend) or render (built from the entries written before it).
+    """
+
+    name: str
+    content_type: str
+    data: Optional[bytes] = None
+    source_path: Optional[str] = None
+    storage_key: Optional[Tuple[str, str]] = None
+    render: Optional[Callable[[List["PackEntry"]], bytes]] = None
+    compress_type: int = zipfile.ZIP_DEFLATED
+    compress_level: Optional[int] = None
+    sha256: Optional[str] = None  # Known up front, or computed while writing
+    reuse: Optional[zipfile.ZipInfo] = None  # Same content in the previous pack
+
+    async def open(self, storage: Optional[StorageBackend] = None) -> BinaryIO:
+        """Open the entry's content for reading."""
+        if self.source_path is not None:
+            return open(self.source_path, "rb")
+        if self.storage_key is not None:
+            if storage is None:
+                raise FileNotFoundError(f"No storage backend to fetch {self.name}")
+            return await storage.download(*self.storage_key)
+        return io.BytesIO(self.data or b"")
+
+    def to_metadata(self) -> PackEntryMetadata:
+        return PackEntryMetadata(
+            name=self.name,
+            content_type=self.content_type,
+            compression="stored" if self.compress_type == zipfile.ZIP_STORED else "deflated",
+            compress_level=self.compress_level,
+            sha256=self.sha256,
+        )
+
+
+def _choose_compression(content_type: str) -> Tuple[int, Optional[int]]:
+    """Pick the ZIP compression method and level for a content type."""
+    settings = get_settings()
+    if settings.audit_pack_store_precompressed and (
+        content_type in PRECOMPRESSED_TYPES or content_type.startswith(PRECOMPRESSED_PREFIXES)
+    ):
+        return zipfile.ZIP_STORED, None
+    if content_type == "application/json":
+        return zipfile.ZIP_DEFLATED, settings.audit_pack_json_compress_level
+    return zipfile.ZIP_DEFLATED, None
+
+
+def _make_entry(name: str, **content) -> PackEntry:
+    """Create an entry with compression chosen from its file name."""
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    compress_type, compress_level = _choose_compression(content_type)
+    if content.get("data") is not None:
+        content.setdefault("sha256", hashlib.sha256(content["data"]).hexdigest())
+    return PackEntry(
+        name=name,
+        content_type=content_type,
+        compress_type=compress_type,
+        compress_level=compress_level,
+        **content,
+    )
+
 
 def _get_storage_key(shipment: Shipment) -> str:
     """Build the storage path for an audit pack ZIP."""
@@ -145,49 +275,30 @@ async def get_or_generate_audit_pack(
         AuditPackStatusResponse with download URL
     """
     documents = db.query(Document).filter(Document.shipment_id == shipment.id).all()
-    is_outdated = _is_pack_outdated(shipment, documents)
-
-    storage_key = _get_storage_key(shipment)
 
     # Use cached pack if not outdated and not forced
-    if not force and not is_outdated and shipment.audit_pack_storage_path:
+    storage_key = None if force else await find_current_audit_pack(shipment, documents, storage)
+    if storage_key:
         try:
-            pack_exists = await storage.exists(AUDIT_PACK_BUCKET, storage_key)
-            if pack_exists:
-                download_url = await storage.download_url(AUDIT_PACK_BUCKET, storage_key)
-                decision = get_compliance_decision(shipment, documents, db)
-                expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
-                return AuditPackStatusResponse(
-                    shipment_id=str(shipment.id),
-                    status="ready",
-                    generated_at=shipment.audit_pack_generated_at.isoformat(),
-                    download_url=download_url,
-                    expires_at=expires_at.isoformat(),
-                    contents=_build_contents_list(documents),
-                    compliance_decision=decision,
-                    document_count=len(documents),
-                    is_outdated=False,
-                )
+            download_url = await storage.download_url(AUDIT_PACK_BUCKET, storage_key)
+            decision = get_compliance_decision(shipment, documents, db)
+            expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+            return AuditPackStatusResponse(
+                shipment_id=str(shipment.id),
+                status="ready",
+                generated_at=shipment.audit_pack_generated_at.isoformat(),
+                download_url=download_url,
+                expires_at=expires_at.isoformat(),
+                contents=_build_contents_list(documents),
+                compliance_decision=decision,
+                document_count=len(documents),
+                is_outdated=False,
+            )
         except Exception:
             logger.warning("Cached pack not found in storage, regenerating", exc_info=True)
 
-    # Generate new pack
-    zip_buffer = generate_audit_pack(shipment, db, storage)
-    zip_bytes = zip_buffer.getvalue()
-
-    # Upload to storage
-    await storage.upload(
-        AUDIT_PACK_BUCKET,
-        storage_key,
-        zip_bytes,
-        content_type="application/zip",
-    )
-
-    # Update shipment cache fields
-    now = datetime.now(timezone.utc)
-    shipment.audit_pack_generated_at = now
-    shipment.audit_pack_storage_path = f"{AUDIT_PACK_BUCKET}/{storage_key}"
-    db.commit()
+    storage_key = await build_audit_pack(shipment, db, storage)
+    now = shipment.audit_pack_generated_at
 
     # Get signed URL
     download_url = await storage.download_url(AUDIT_PACK_BUCKET, storage_key)
@@ -207,12 +318,82 @@ async def get_or_generate_audit_pack(
     )
 
 
+async def find_current_audit_pack(
+    shipment: Shipment,
+    documents: List[Document],
+    storage: StorageBackend,
+) -> Optional[str]:
+    """Storage key of the shipment's stored pack if it is still current.
+
+    Returns:
+        Key in the audit-packs bucket, or None if the pack is outdated,
+        was never generated or is missing from storage
+    """
+    if _is_pack_outdated(shipment, documents) or not shipment.audit_pack_storage_path:
+        return None
+    storage_key = _get_storage_key(shipment)
+    try:
+        if await storage.exists(AUDIT_PACK_BUCKET, storage_key):
+            return storage_key
+    except Exception:
+        logger.warning("Cached pack not found in storage, regenerating", exc_info=True)
+    return None
+
+
+async def build_audit_pack(
+    shipment: Shipment,
+    db: Session,
+    storage: StorageBackend,
+) -> str:
+    """Generate a shipment's pack, upload it and record it on the shipment.
+
+    Rebuilds incrementally from the stored pack when there is one.
+
+    Returns:
+        Key of the uploaded pack in the audit-packs bucket
+    """
+    storage_key = _get_storage_key(shipment)
+
+    # Generate new pack into a temporary file, then upload it from disk
+    entries = _collect_pack_entries(shipment, db, storage)
+    with tempfile.TemporaryDirectory(prefix="audit-pack-") as tmp_dir:
+        pack_path = os.path.join(tmp_dir, "audit-pack.zip")
+        previous = None
+        if get_settings().audit_pack_incremental and shipment.audit_pack_storage_path:
+            previous = await _open_previous_pack(
+                storage, storage_key, os.path.join(tmp_dir, "previous.zip")
+            )
+        try:
+            with open(pack_path, "wb") as out:
+                await _write_zip(entries, out, storage, previous)
+        finally:
+            if previous is not None:
+                previous.close()
+
+        with open(pack_path, "rb") as pack_file:
+            await storage.upload(
+                AUDIT_PACK_BUCKET,
+                storage_key,
+                pack_file,
+                content_type="application/zip",
+            )
+
+    # Update shipment cache fields
+    shipment.audit_pack_generated_at = datetime.now(timezone.utc)
+    shipment.audit_pack_storage_path = f"{AUDIT_PACK_BUCKET}/{storage_key}"
+    db.commit()
+    return storage_key
+
+
 def generate_audit_pack(
     shipment: Shipment,
     db: Session,
     storage: Optional[StorageBackend] = None,
 ) -> io.BytesIO:
-    """Generate audit pack ZIP for a shipment.
+    """Generate audit pack ZIP for a shipment in memory.
+
+    Prefer write_audit_pack (to a file) or stream_audit_pack for large
+    shipments; this holds the whole ZIP in memory.
 
     Args:
         shipment: The shipment to generate pack for
@@ -222,141 +403,557 @@ def generate_audit_pack(
     Returns:
         BytesIO containing the ZIP file
     """
-    # Create ZIP in memory
     zip_buffer = io.BytesIO()
+    write_audit_pack(shipment, db, zip_buffer, storage)
+    zip_buffer.seek(0)
+    return zip_buffer
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        # 1. Generate PDF summary (with compliance status)
-        pdf_buffer = generate_summary_pdf(shipment, db)
-        zip_file.writestr("00-SHIPMENT-INDEX.pdf", pdf_buffer.getvalue())
-
-        # 2. Add documents
-        documents = db.query(Document).filter(Document.shipment_id == shipment.id).all()
-        for i, doc in enumerate(documents, 1):
-            if doc.file_path:
-                doc_bytes = _fetch_document_bytes(doc, storage)
-                if doc_bytes:
-                    ext = os.path.splitext(doc.file_name or doc.file_path)[1]
-                    filename = f"{i:02d}-{doc.document_type.value}{ext}"
-                    zip_file.writestr(filename, doc_bytes)
-
-        # 3. Add tracking log JSON
-        events = (
-            db.query(ContainerEvent)
-            .filter(ContainerEvent.shipment_id == shipment.id)
-            .order_by(ContainerEvent.event_time.asc())
-            .all()
-        )
-        tracking_log = TrackingLog(
+
+def write_audit_pack(
+    shipment: Shipment,
+    db: Session,
+    out: BinaryIO,
+    storage: Optional[StorageBackend] = None,
+) -> None:
+    """Write the audit pack ZIP for a shipment to a binary file object.
+
+    For synchronous callers (no event loop running in this thread); async
+    code should use stream_audit_pack. The output does not need to be
+    seekable.
+
+    Args:
+        shipment: The shipment to generate pack for
+        db: Database session
+        out: Writable binary file object
+        storage: Optional StorageBackend for fetching documents
+    """
+    entries = _collect_pack_entries(shipment, db, storage)
+    asyncio.run(_write_zip(entries, out, storage))
+
+
+def stream_audit_pack(
+    shipment: Shipment,
+    db: Session,
+    storage: Optional[StorageBackend] = None,
+) -> AsyncIterator[bytes]:
+    """Generate the audit pack ZIP as an async iterator of chunks.
+
+    Database work happens before this returns, so the iterator can be
+    consumed after the session is closed (e.g. by a StreamingResponse).
+
+    Args:
+        shipment: The shipment to generate pack for
+        db: Database session
+        storage: Optional StorageBackend for fetching documents
+
+    Returns:
+        Async iterator over the ZIP file's bytes
+    """
+    return _iter_zip(_collect_pack_entries(shipment, db, storage), storage)
+
+
+def stream_pack_archive(
+    packs: List[Tuple[str, str]],
+    manifest: bytes,
+    storage: StorageBackend,
+) -> AsyncIterator[bytes]:
+    """Stream one ZIP holding several stored packs plus a manifest.json.
+
+    Packs are fetched one at a time, since each may be large, and stored
+    without recompression.
+
+    Args:
+        packs: (file name in the archive, key in the audit-packs bucket) pairs
+        manifest: Contents of manifest.json
+        storage: StorageBackend holding the packs
+
+    Returns:
+        Async iterator over the ZIP file's bytes
+    """
+    entries = [_make_entry(name, storage_key=(AUDIT_PACK_BUCKET, key)) for name, key in packs]
+    entries.append(_make_entry("manifest.json", data=manifest))
+    return _iter_zip(entries, storage, fetch_concurrency=1)
+
+
+def _collect_pack_entries(
+    shipment: Shipment,
+    db: Session,
+    storage: Optional[StorageBackend] = None,
+) -> List[PackEntry]:
+    """Build the pack's entries; documents are referenced, not read."""
+    entries: List[PackEntry] = []
+
+    # 1. Generate PDF summary (with compliance status)
+    pdf_buffer = generate_summary_pdf(shipment, db)
+    entries.append(_make_entry("00-SHIPMENT-INDEX.pdf", data=pdf_buffer.getvalue()))
+
+    # 2. Add documents
+    documents = db.query(Document).filter(Document.shipment_id == shipment.id).all()
+    for i, doc in enumerate(documents, 1):
+        if doc.file_path:
+            ext = os.path.splitext(doc.file_name or doc.file_path)[1]
+            filename = f"{i:02d}-{doc.document_type.value}{ext}"
+            entry = _document_entry(filename, doc, storage)
+            if entry:
+                entries.append(entry)
+
+    # 3. Add tracking log JSON
+    events = (
+        db.query(ContainerEvent)
+        .filter(ContainerEvent.shipment_id == shipment.id)
+        .order_by(ContainerEvent.event_time.asc())
+        .all()
+    )
+    tracking_log = TrackingLog(
+        container_number=shipment.container_number,
+        exported_at=datetime.utcnow().isoformat(),
+        events=[
+            TrackingEvent(
+                type=e.event_status.value,
+                timestamp=e.event_time.isoformat() if e.event_time else None,
+                location=e.location_name,
+                vessel=e.vessel_name,
+                voyage=e.voyage_number,
+            )
+            for e in events
+        ]
+    )
+    entries.append(_make_entry(
+        "container-tracking-log.json",
+        data=tracking_log.model_dump_json(indent=2).encode("utf-8"),
+    ))
+
+    # 4. Add metadata JSON with compliance info
+    products = db.query(Product).filter(Product.shipment_id == shipment.id).all()
+    compliance_summary = get_compliance_summary(shipment, documents, db)
+    decision = compliance_summary.get("decision", "HOLD")
+    summary_counts = compliance_summary.get("summary", {})
+
+    metadata = AuditPackMetadata(
+        shipment=ShipmentMetadata(
+            reference=shipment.reference,
             container_number=shipment.container_number,
-            exported_at=datetime.utcnow().isoformat(),
-            events=[
-                TrackingEvent(
-                    type=e.event_status.value,
-                    timestamp=e.event_time.isoformat() if e.event_time else None,
-                    location=e.location_name,
-                    vessel=e.vessel_name,
-                    voyage=e.voyage_number,
-                )
-                for e in events
-            ]
-        )
-        zip_file.writestr("container-tracking-log.json", tracking_log.model_dump_json(indent=2))
-
-        # 4. Add metadata JSON with compliance info
-        products = db.query(Product).filter(Product.shipment_id == shipment.id).all()
-        compliance_summary = get_compliance_summary(shipment, documents, db)
-        decision = compliance_summary.get("decision", "HOLD")
-        summary_counts = compliance_summary.get("summary", {})
-
-        metadata = AuditPackMetadata(
-            shipment=ShipmentMetadata(
-                reference=shipment.reference,
-                container_number=shipment.container_number,
-                bl_number=shipment.bl_number,
-                vessel=shipment.vessel_name,
-                voyage=shipment.voyage_number,
-                etd=shipment.etd.isoformat() if shipment.etd else None,
-                eta=shipment.eta.isoformat() if shipment.eta else None,
-                pol=PortInfo(code=shipment.pol_code, name=shipment.pol_name),
-                pod=PortInfo(code=shipment.pod_code, name=shipment.pod_name),
-                incoterms=shipment.incoterms,
-                status=shipment.status.value,
-            ),
-            products=[
-                ProductMetadata(
-                    hs_code=p.hs_code,
-                    description=p.description,
-                    quantity_net_kg=float(p.quantity_net_kg) if p.quantity_net_kg else None,
-                    quantity_gross_kg=float(p.quantity_gross_kg) if p.quantity_gross_kg else None,
-                )
-                for p in products
-            ],
-            buyer=PartyInfo(
-                name=shipment.importer_name,
-                organization_id=str(shipment.buyer_organization_id) if shipment.buyer_organization_id else None,
-            ),
-            exporter=PartyInfo(
-                name=shipment.exporter_name,
-                organization_id=str(shipment.organization_id) if shipment.organization_id else None,
-            ),
-            compliance=ComplianceMetadata(
-                decision=decision,
-                total_rules=summary_counts.get("total_rules", 0),
-                passed=summary_counts.get("passed", 0),
-                failed=summary_counts.get("failed", 0),
-                warnings=summary_counts.get("warnings", 0),
-            ),
-            exported_at=datetime.utcnow().isoformat(),
-        )
-        zip_file.writestr("metadata.json", metadata.model_dump_json(indent=2))
+            bl_number=shipment.bl_number,
+            vessel=shipment.vessel_name,
+            voyage=shipment.voyage_number,
+            etd=shipment.etd.isoformat() if shipment.etd else None,
+            eta=shipment.eta.isoformat() if shipment.eta else None,
+            pol=PortInfo(code=shipment.pol_code, name=shipment.pol_name),
+            pod=PortInfo(code=shipment.pod_code, name=shipment.pod_name),
+            incoterms=shipment.incoterms,
+            status=shipment.status.value,
+        ),
+        products=[
+            ProductMetadata(
+                hs_code=p.hs_code,
+                description=p.description,
+                quantity_net_kg=float(p.quantity_net_kg) if p.quantity_net_kg else None,
+                quantity_gross_kg=float(p.quantity_gross_kg) if p.quantity_gross_kg else None,
+            )
+            for p in products
+        ],
+        buyer=PartyInfo(
+            name=shipment.importer_name,
+            organization_id=str(shipment.buyer_organization_id) if shipment.buyer_organization_id else None,
+        ),
+        exporter=PartyInfo(
+            name=shipment.exporter_name,
+            organization_id=str(shipment.organization_id) if shipment.organization_id else None,
+        ),
+        compliance=ComplianceMetadata(
+            decision=decision,
+            total_rules=summary_counts.get("total_rules", 0),
+            passed=summary_counts.get("passed", 0),
+            failed=summary_counts.get("failed", 0),
+            warnings=summary_counts.get("warnings", 0),
+        ),
+        exported_at=datetime.utcnow().isoformat(),
+    )
 
-    zip_buffer.seek(0)
-    return zip_buffer
+    def render_metadata(written: List[PackEntry]) -> bytes:
+        # Lists what actually made it into the pack, including metadata.json
+        metadata.entries = [e.to_metadata() for e in written]
+        return metadata.model_dump_json(indent=2).encode("utf-8")
+
+    entries.append(_make_entry("metadata.json", render=render_metadata))
+    return entries
 
 
-def _fetch_document_bytes(
+def _document_entry(
+    name: str,
     doc: Document,
     storage: Optional[StorageBackend] = None,
-) -> Optional[bytes]:
-    """Fetch document file bytes from storage or local disk.
+) -> Optional[PackEntry]:
+    """Entry for a document's file, or None if it cannot be found.
 
-    Tries StorageBackend first (Supabase Storage), falls back to local disk.
+    The local working copy is used when this worker has it; otherwise a
+    blob-store document is fetched from the storage backend's mirror.
     """
-    # Try StorageBackend if available and doc has a storage path
-    if storage and doc.file_path:
-        try:
-            # Check if file_path looks like a storage path (bucket/path)
-            if "/" in doc.file_path and not doc.file_path.startswith("/"):
-                parts = doc.file_path.split("/", 1)
-                if len(parts) == 2:
-                    bucket, path = parts
-                    # Run async in sync context
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        import concurrent.futures
-                        with concurrent.futures.ThreadPoolExecutor() as pool:
-                            exists = pool.submit(
-                                asyncio.run, storage.exists(bucket, path)
-                            ).result()
-                    else:
-                        exists = asyncio.run(storage.exists(bucket, path))
-
-                    if exists:
-                        # For storage backend, read from local path as fallback
-                        # The URL-based approach is for frontend downloads
-                        pass
-        except Exception:
-            logger.debug("StorageBackend lookup failed, falling back to local", exc_info=True)
+    # Blob paths are content-addressed: the hash is known without reading
+    sha256 = doc.file_hash if blob_store.is_blob_path(doc.file_path) else None
+    full_path = get_full_path(doc.file_path)
+    if full_path and os.path.exists(full_path):
+        return _make_entry(name, source_path=full_path, sha256=sha256)
+    if storage is not None and sha256:
+        return _make_entry(name, storage_key=(DOCUMENTS_BUCKET, blob_key(sha256)), sha256=sha256)
+    return None
 
-    # Fall back to local disk (v1 compatibility)
-    if doc.file_path:
-        full_path = get_full_path(doc.file_path)
-        if full_path and os.path.exists(full_path):
-            with open(full_path, "rb") as f:
-                return f.read()
 
-    return None
+async def _open_in_order(
+    entries: List[PackEntry],
+    storage: Optional[StorageBackend] = None,
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Tuple[PackEntry, Optional[BinaryIO]]]:
+    """Open entries concurrently and yield them in order as they are ready.
+
+    At most concurrency (default audit_pack_fetch_concurrency) entries are
+    being fetched or waiting to be written, which bounds memory for remote
+    bodies. Entries that fail to open are yielded with None; rendered and
+    reused entries are left to the writer.
+    """
+    limit = max(1, concurrency or get_settings().audit_pack_fetch_concurrency)
+    pending: Deque[Tuple[PackEntry, Optional["asyncio.Task[BinaryIO]"]]] = deque()
+    remaining = iter(entries)
+
+    def start_next() -> None:
+        entry = next(remaining, None)
+        if entry is not None:
+            needs_body = entry.render is None and entry.reuse is None
+            task = asyncio.ensure_future(entry.open(storage)) if needs_body else None
+            pending.append((entry, task))
+
+    for _ in range(limit):
+        start_next()
+    try:
+        while pending:
+            entry, task = pending[0]
+            source = None
+            if task is not None:
+                try:
+                    source = await task
+                except Exception:
+                    logger.warning("Could not fetch %s for audit pack, skipping", entry.name, exc_info=True)
+            pending.popleft()
+            start_next()
+            yield entry, source
+    finally:
+        for _, task in pending:
+            if task is None:
+                continue
+            if task.done() and not task.cancelled() and task.exception() is None:
+                task.result().close()
+            else:
+                task.cancel()
+
+
+def _write_entry(zip_file: zipfile.ZipFile, entry: PackEntry, source: BinaryIO) -> Iterator[None]:
+    """Copy one entry into the ZIP, yielding after each chunk written."""
+    # ZipFile.open(name, "w") takes the method and level from the archive
+    zip_file.compression = entry.compress_type
+    zip_file.compresslevel = entry.compress_level
+    digest = hashlib.sha256() if entry.sha256 is None else None
+    with zip_file.open(entry.name, "w") as target:
+        while True:
+            chunk = source.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            target.write(chunk)
+            if digest:
+                digest.update(chunk)
+            yield
+    if digest:
+        entry.sha256 = digest.hexdigest()
+
+
+class _PreviousPack:
+    """A shipment's previous pack, whose unchanged entries can be copied raw.
+
+    Entries are matched by the SHA-256 in the previous metadata.json, so
+    a document keeps its compressed bytes even when renumbering moves it
+    to a new name. Packs written before hashes were recorded match
+    nothing.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._file = fileobj
+        self._zip = zipfile.ZipFile(fileobj)
+        manifest = json.loads(self._zip.read("metadata.json")).get("entries", [])
+        self._by_hash = {
+            e["sha256"]: (e.get("compress_level"), self._zip.getinfo(e["name"]))
+            for e in manifest
+            if e.get("sha256") and e["name"] in self._zip.NameToInfo
+        }
+
+    def find(self, entry: PackEntry) -> Optional[zipfile.ZipInfo]:
+        """The previous pack's copy of an entry's content, if compressed the same way."""
+        match = self._by_hash.get(entry.sha256) if entry.sha256 else None
+        if match is None:
+            return None
+        compress_level, info = match
+        if info.compress_type != entry.compress_type or compress_level != entry.compress_level:
+            return None
+        return info
+
+    def copy_entry(self, zip_file: zipfile.ZipFile, entry: PackEntry) -> Iterator[None]:
+        """Append the previous pack's copy of entry, yielding after each chunk.
+
+        The compressed bytes are copied as they are where
+        raw_entry_copy_available(); otherwise the entry is decompressed and
+        written normally.
+        """
+        if raw_entry_copy_available():
+            yield from _copy_raw_entry(self._file, zip_file, entry.reuse, entry.name)
+        else:
+            with self._zip.open(entry.reuse) as source:
+                yield from _write_entry(zip_file, entry, source)
+
+    def close(self) -> None:
+        self._zip.close()
+        self._file.close()
+
+
+class _RawEntryWriter:
+    """Appends entries whose compressed bytes are already known to a ZipFile.
+
+    The public ZipFile.open(info, "w") always compresses what it is given,
+    so this drives ZipFile's private writer state (_lock, _writecheck,
+    _didModify, fp, start_dir, ZipInfo.FileHeader) instead. It is the only
+    code that does; raw_entry_copy_available() checks it still produces
+    valid archives before incremental rebuilds use it.
+    """
+
+    REQUIRED = (
+        (zipfile.ZipFile, "_writecheck"),
+        (zipfile.ZipInfo, "FileHeader"),
+    )
+
+    def __init__(self, zip_file: zipfile.ZipFile) -> None:
+        self._zip = zip_file
+
+    @classmethod
+    def supported(cls) -> bool:
+        return all(hasattr(owner, attr) for owner, attr in cls.REQUIRED)
+
+    def begin(self, info: zipfile.ZipInfo) -> None:
+        """Write the local header of info, whose CRC and sizes are set."""
+        zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+        # Sizes are known, so the header is written up front, as ZipFile
+        # itself does for directory entries
+        with self._zip._lock:
+            self._zip._writecheck(info)
+            self._zip._didModify = True
+            info.header_offset = self._zip.fp.tell()
+            self._zip.filelist.append(info)
+            self._zip.NameToInfo[info.filename] = info
+            self._zip.fp.write(info.FileHeader(zip64))
+
+    def write(self, data: bytes) -> None:
+        """Write compressed bytes of the entry begun last."""
+        self._zip.fp.write(data)
+
+    def end(self) -> None:
+        """Finish the entry; the central directory starts after it."""
+        self._zip.start_dir = self._zip.fp.tell()
+
+
+def _copy_raw_entry(
+    source: BinaryIO,
+    zip_file: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    name: str,
+) -> Iterator[None]:
+    """Append the compressed bytes of source's entry info to zip_file under name."""
+    # Skip the local header: its name and extra field lengths may
+    # differ from the central directory's
+    source.seek(info.header_offset)
+    header = source.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.seek(name_length + extra_length, io.SEEK_CUR)
+
+    copied = zipfile.ZipInfo(name, date_time=info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.CRC = info.CRC
+    copied.file_size = info.file_size
+    copied.compress_size = info.compress_size
+
+    writer = _RawEntryWriter(zip_file)
+    writer.begin(copied)
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.read(min(STREAM_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Previous pack truncated in {info.filename}")
+        writer.write(chunk)
+        remaining -= len(chunk)
+        yield
+    writer.end()
+
+
+async def _open_previous_pack(
+    storage: StorageBackend,
+    storage_key: str,
+    local_path: str,
+) -> Optional[_PreviousPack]:
+    """Download the stored pack to local_path for an incremental rebuild.
+
+    The pack is read from disk, never held in memory. Returns None if
+    there is no usable previous pack.
+    """
+    try:
+        fileobj = await storage.download(AUDIT_PACK_BUCKET, storage_key)
+    except Exception:
+        logger.info("No previous audit pack at %s, building from scratch", storage_key)
+        return None
+    try:
+        with fileobj:
+            await asyncio.to_thread(_save_to_file, fileobj, local_path)
+        local_file = open(local_path, "rb")
+    except Exception:
+        logger.warning("Could not download previous audit pack %s, building from scratch", storage_key, exc_info=True)
+        return None
+    try:
+        return _PreviousPack(local_file)
+    except Exception:
+        logger.warning("Previous audit pack %s is unreadable, building from scratch", storage_key, exc_info=True)
+        local_file.close()
+        return None
+
+
+def _save_to_file(source: BinaryIO, path: str) -> None:
+    with open(path, "wb") as out:
+        shutil.copyfileobj(source, out, STREAM_CHUNK_SIZE)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Non-seekable write target that hands written bytes to a generator."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _raw_entry_copy_works() -> bool:
+    """Round-trip entries through _copy_raw_entry and check the archive.
+
+    Writes to a non-seekable sink like the pack writer, with normal
+    entries before and after the raw copies, so a Python release that
+    changes ZipFile's private writer state disables raw copies instead of
+    producing corrupt packs.
+    """
+    if not _RawEntryWriter.supported():
+        return False
+    data = b"audit pack raw entry copy check\n" * 64
+    try:
+        original = io.BytesIO()
+        with zipfile.ZipFile(original, "w") as zip_file:
+            zip_file.writestr("stored.bin", data, zipfile.ZIP_STORED)
+            zip_file.writestr("deflated.txt", data, zipfile.ZIP_DEFLATED)
+
+        sink = _ChunkSink()
+        with zipfile.ZipFile(original) as previous, \
+                zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("before.txt", data)
+            for name in ("stored.bin", "deflated.txt"):
+                for _ in _copy_raw_entry(original, zip_file, previous.getinfo(name), f"copy/{name}"):
+                    pass
+            zip_file.writestr("after.txt", data)
+
+        with zipfile.ZipFile(io.BytesIO(sink.drain())) as copy:
+            return copy.testzip() is None and all(
+                copy.read(name) == data
+                for name in ("before.txt", "copy/stored.bin", "copy/deflated.txt", "after.txt")
+            )
+    except Exception:
+        logger.debug("Raw ZIP entry copy self-check raised", exc_info=True)
+        return False
+
+
+_raw_copy_lock = threading.Lock()
+_raw_copy_available: Optional[bool] = None
+
+
+def raw_entry_copy_available() -> bool:
+    """Whether unchanged entries of incremental rebuilds are copied compressed.
+
+    The self-check runs once, on the first rebuild that reuses an entry.
+    """
+    global _raw_copy_available
+    with _raw_copy_lock:
+        if _raw_copy_available is None:
+            _raw_copy_available = _raw_entry_copy_works()
+            if not _raw_copy_available:
+                logger.warning(
+                    "Raw ZIP entry copy failed its self-check on Python %s; "
+                    "incremental audit pack rebuilds will recompress reused entries",
+                    sys.version.split()[0],
+                )
+        return _raw_copy_available
+
+
+_DONE = object()
+
+
+async def _iter_zip(
+    entries: List[PackEntry],
+    storage: Optional[StorageBackend] = None,
+    previous: Optional[_PreviousPack] = None,
+    fetch_concurrency: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """Yield the ZIP for entries piece by piece as it is written."""
+    if previous is not None:
+        for entry in entries:
+            entry.reuse = previous.find(entry)
+    sink = _ChunkSink()
+    written: List[PackEntry] = []
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        async for entry, source in _open_in_order(entries, storage, fetch_concurrency):
+            if entry.render is not None:
+                entry.data = entry.render(written + [entry])
+                source = io.BytesIO(entry.data)
+            if entry.reuse is not None:
+                steps = previous.copy_entry(zip_file, entry)
+            elif source is not None:
+                steps = _write_entry(zip_file, entry, source)
+            else:
+                continue
+            with source or nullcontext():
+                # Read and compress off the event loop
+                while await asyncio.to_thread(next, steps, _DONE) is not _DONE:
+                    data = sink.drain()
+                    if data:
+                        yield data
+            written.append(entry)
+    if previous is not None:
+        reused = sum(1 for e in written if e.reuse is not None)
+        logger.info("Audit pack rebuilt incrementally: %d of %d entries reused", reused, len(written))
+    # Local header of the last entry and the central directory
+    data = sink.drain()
+    if data:
+        yield data
+
+
+async def _write_zip(
+    entries: List[PackEntry],
+    out: BinaryIO,
+    storage: Optional[StorageBackend] = None,
+    previous: Optional[_PreviousPack] = None,
+) -> None:
+    """Write a pack ZIP to a binary file object."""
+    async for data in _iter_zip(entries, storage, previous):
+        out.write(data)
 
 
 def generate_summary_pdf(shipment: Shipment, db: Session) -> io.BytesIO:
@@ -0,0 +1,454 @@
+"""Bulk audit pack export - packs for every shipment matching a filter.
+
+Auditors ask for the packs of every shipment in a period. An export job
+snapshots the organization's shipments matching the filters (created_at
+range, status, product type) and builds their packs on a bounded worker
+pool:
+
+    reused     - the stored pack is current (_is_pack_outdated), kept as is
+    generated  - the pack was (re)built, incrementally where possible
+    failed     - the error is recorded and the export carries on
+
+Progress is committed to the AuditPackExportJob row as each shipment
+finishes. Each pack is copied to a key owned by the export
+({org_id}/exports/{job_id}/...), so a later regenerate of a shipment's
+pack never changes what a completed export delivers. A completed export
+is collected either as a manifest of signed URLs (output="urls"), signed
+when the status is requested so they cannot expire before the auditor
+fetches them, or as one streamed ZIP holding every pack (output="archive").
+
+Exports run one at a time; each fans its shipments out over
+audit_pack_export_workers threads, each with its own database session.
+A worker claims an export before running it and holds a lease on it
+(services.job_lease), so an export running on another API worker is
+never touched. Exports interrupted by a restart are picked up by
+recover_jobs() at startup: queued ones are re-submitted, running ones
+whose lease lapsed are marked failed.
+
+An export's pack copies are deleted audit_pack_export_retention_days
+after it finished, and the export is marked expired.
+
+Usage:
+    from app.services.audit_pack_export import audit_pack_export_service
+
+    job = audit_pack_export_service.create_job(db, current_user, request)
+    db.commit()
+    audit_pack_export_service.submit(job.id)
+
+    # At startup
+    audit_pack_export_service.recover_jobs()
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import AuditPackExportJob, Document, Shipment
+from ..schemas.audit_pack import (
+    AuditPackExportRequest,
+    AuditPackExportShipment,
+    AuditPackExportStatusResponse,
+)
+from ..schemas.user import CurrentUser
+from .access_control import get_accessible_shipments_filter
+from .audit_pack import (
+    AUDIT_PACK_BUCKET,
+    build_audit_pack,
+    find_current_audit_pack,
+    stream_pack_archive,
+)
+from .job_lease import JobLease
+from .storage import StorageBackend
+from .storage_factory import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+class ExportTooLargeError(ValueError):
+    """More shipments match than one export may contain."""
+
+
+def _pack_key(entry: Dict[str, Any]) -> Optional[str]:
+    """Key in the audit-packs bucket of an exported shipment's pack."""
+    path = entry.get("storage_path")
+    if entry.get("status") not in ("reused", "generated") or not path:
+        return None
+    return path.split("/", 1)[1]
+
+
+def _export_pack_key(job_id: UUID, shipment: Shipment) -> str:
+    """Key in the audit-packs bucket of an export's copy of a shipment's pack."""
+    return f"{shipment.organization_id}/exports/{job_id}/{shipment.reference}-audit-pack.zip"
+
+
+class AuditPackExportService:
+    """Runs bulk audit pack exports on a bounded background worker pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self._max_workers = max_workers
+        self._session_factory = session_factory
+        self._jobs: Optional[ThreadPoolExecutor] = None
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.lease = JobLease(
+            AuditPackExportJob,
+            session_factory,
+            expired_message="Interrupted by a server restart; start the export again",
+        )
+
+    def _get_executors(self) -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        with self._lock:
+            if self._jobs is None:
+                workers = self._max_workers or get_settings().audit_pack_export_workers
+                self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-export")
+                self._workers = ThreadPoolExecutor(
+                    max_workers=max(1, workers),
+                    thread_name_prefix="audit-export-worker",
+                )
+            return self._jobs, self._workers
+
+    @staticmethod
+    def find_shipments(
+        db: Session,
+        user: CurrentUser,
+        request: AuditPackExportRequest,
+    ) -> List[Shipment]:
+        """Shipments the user can access that match the export filters."""
+        query = db.query(Shipment).filter(get_accessible_shipments_filter(user))
+        if request.date_from:
+            query = query.filter(Shipment.created_at >= request.date_from)
+        if request.date_to:
+            query = query.filter(Shipment.created_at < request.date_to)
+        if request.status:
+            query = query.filter(Shipment.status == request.status)
+        if request.product_type:
+            query = query.filter(Shipment.product_type == request.product_type)
+        return query.order_by(Shipment.created_at.asc(), Shipment.reference.asc()).all()
+
+    def create_job(
+        self,
+        db: Session,
+        user: CurrentUser,
+        request: AuditPackExportRequest,
+    ) -> AuditPackExportJob:
+        """Create a queued export for the matching shipments (caller commits).
+
+        Raises:
+            ExportTooLargeError: If more than audit_pack_export_max_shipments match
+        """
+        shipments = self.find_shipments(db, user, request)
+        max_shipments = get_settings().audit_pack_export_max_shipments
+        if len(shipments) > max_shipments:
+            raise ExportTooLargeError(
+                f"{len(shipments)} shipments match; narrow the filters to at most {max_shipments}"
+            )
+
+        job = AuditPackExportJob(
+            organization_id=user.organization_id,
+            created_by=user.id,
+            status="queued",
+            output=request.output,
+            filters=request.model_dump(mode="json", exclude={"output"}, exclude_none=True),
+            shipments=[
+                {
+                    "shipment_id": str(shipment.id),
+                    "reference": shipment.reference,
+                    "status": "pending",
+                    "storage_path": None,
+                    "generated_at": None,
+                    "error": None,
+                }
+                for shipment in shipments
+            ],
+        )
+        db.add(job)
+        db.flush()
+        return job
+
+    def submit(self, job_id: UUID) -> Future:
+        """Queue a committed export."""
+        jobs, _ = self._get_executors()
+        return jobs.submit(self.run_job, job_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the worker pools (interrupted exports are handled by recover_jobs)."""
+        with self._lock:
+            for executor in (self._jobs, self._workers):
+                if executor is not None:
+                    executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._jobs = self._workers = None
+
+    def recover_jobs(self, db: Optional[Session] = None) -> Tuple[int, int]:
+        """Resume exports interrupted by a restart; call once at startup.
+
+        Exports still "queued" are submitted again. Exports "running" whose
+        lease lapsed had their worker stopped mid-way and are marked failed
+        so they can be started again; exports another live worker is
+        running keep their lease and are left alone. Expired exports are
+        purged on the export thread.
+
+        Returns:
+            (re-queued, failed) counts
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            failed = self.lease.expire(db)
+            queued = [
+                job_id for (job_id,) in db.query(AuditPackExportJob.id)
+                .filter(AuditPackExportJob.status == "queued")
+                .order_by(AuditPackExportJob.created_at.asc())
+            ]
+        finally:
+            if owns_session:
+                db.close()
+
+        for job_id in queued:
+            self.submit(job_id)
+        self.lease.start()
+        jobs, _ = self._get_executors()
+        jobs.submit(self.purge_expired)
+        if queued or failed:
+            logger.info(f"Recovered audit pack exports: {len(queued)} re-queued, {failed} failed")
+        return len(queued), failed
+
+    def run_job(self, job_id: UUID, db: Optional[Session] = None) -> None:
+        """Build every shipment's pack, committing progress as each finishes."""
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            self._run(db, job_id)
+        except Exception as e:
+            logger.exception(f"Audit pack export {job_id} failed: {e}")
+            db.rollback()
+            self.lease.finish(
+                db, job_id,
+                status="failed",
+                error_message=str(e),
+                completed_at=datetime.utcnow(),
+            )
+        finally:
+            if owns_session:
+                db.close()
+        self.purge_expired()
+
+    def _run(self, db: Session, job_id: UUID) -> None:
+        # Claim the job, so an export re-submitted by several API workers'
+        # recover_jobs() runs once
+        if not self.lease.claim(db, job_id):
+            logger.info(f"Audit pack export {job_id} not found or already started")
+            return
+        job = db.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+
+        _, workers = self._get_executors()
+        futures = {
+            workers.submit(self.export_shipment, UUID(entry["shipment_id"]), job_id): index
+            for index, entry in enumerate(job.shipments or [])
+        }
+        for future in as_completed(futures):
+            try:
+                changes = future.result()
+            except Exception as e:
+                logger.warning(f"Audit pack export {job_id}: shipment failed: {e}")
+                changes = {"status": "failed", "error": str(e)}
+            self._update_shipment(db, job, futures[future], **changes)
+
+        self.lease.finish(db, job_id, status="completed", completed_at=datetime.utcnow())
+
+    def purge_expired(self, db: Optional[Session] = None) -> int:
+        """Delete the pack copies of exports past their retention period.
+
+        Exports that finished more than audit_pack_export_retention_days
+        ago are marked expired; their status stays readable, but nothing
+        can be downloaded any more. An export whose copies could not all
+        be deleted is retried on the next purge.
+
+        Returns:
+            Number of exports expired
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            retention = timedelta(days=get_settings().audit_pack_export_retention_days)
+            jobs = (
+                db.query(AuditPackExportJob)
+                .filter(
+                    AuditPackExportJob.status.in_(["completed", "failed"]),
+                    AuditPackExportJob.completed_at < datetime.utcnow() - retention,
+                )
+                .all()
+            )
+            storage = get_storage()
+            expired = 0
+            for job in jobs:
+                keys = [key for key in map(_pack_key, job.shipments or []) if key]
+                try:
+                    asyncio.run(self._delete_copies(storage, keys))
+                except Exception as e:
+                    logger.warning(f"Could not purge audit pack export {job.id}: {e}")
+                    continue
+                job.status = "expired"
+                job.error_message = f"Expired after {retention.days} days; start the export again"
+                job.shipments = [
+                    {**entry, "storage_path": None} for entry in (job.shipments or [])
+                ]
+                db.commit()
+                expired += 1
+        except Exception as e:
+            logger.warning(f"Purging expired audit pack exports failed: {e}")
+            db.rollback()
+            return 0
+        finally:
+            if owns_session:
+                db.close()
+
+        if expired:
+            logger.info(f"Expired {expired} audit pack exports")
+        return expired
+
+    @staticmethod
+    async def _delete_copies(storage: StorageBackend, keys: List[str]) -> None:
+        await asyncio.gather(*(storage.delete(AUDIT_PACK_BUCKET, key) for key in keys))
+
+    def export_shipment(self, shipment_id: UUID, job_id: UUID) -> Dict[str, Any]:
+        """Reuse or build one shipment's pack and copy it into the export
+        (runs on the worker pool)."""
+        db = self._session_factory()
+        try:
+            shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+            if not shipment:
+                raise ValueError("Shipment no longer exists")
+            documents = db.query(Document).filter(Document.shipment_id == shipment.id).all()
+            export_key = _export_pack_key(job_id, shipment)
+            reused = asyncio.run(
+                self._export_pack(shipment, documents, db, get_storage(), export_key)
+            )
+            return {
+                "status": "reused" if reused else "generated",
+                "storage_path": f"{AUDIT_PACK_BUCKET}/{export_key}",
+                "generated_at": shipment.audit_pack_generated_at.isoformat(),
+            }
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _export_pack(
+        shipment: Shipment,
+        documents: List[Document],
+        db: Session,
+        storage: StorageBackend,
+        export_key: str,
+    ) -> bool:
+        """Make sure a current pack is stored and copy it to the export's key.
+
+        The copy is streamed through a file, never held in memory in full.
+
+        Returns:
+            True if the existing pack was reused
+        """
+        storage_key = await find_current_audit_pack(shipment, documents, storage)
+        reused = storage_key is not None
+        if not reused:
+            storage_key = await build_audit_pack(shipment, db, storage)
+
+        source = await storage.download(AUDIT_PACK_BUCKET, storage_key)
+        try:
+            await storage.upload(AUDIT_PACK_BUCKET, export_key, source, content_type="application/zip")
+        finally:
+            source.close()
+        return reused
+
+    @staticmethod
+    def _update_shipment(db: Session, job: AuditPackExportJob, index: int, **changes: Any) -> None:
+        """Update one shipment entry and commit so progress is visible to pollers."""
+        shipments = [dict(s) for s in (job.shipments or [])]
+        shipments[index].update(changes)
+        job.shipments = shipments
+        db.commit()
+
+    async def get_status(
+        self,
+        job: AuditPackExportJob,
+        storage: StorageBackend,
+    ) -> AuditPackExportStatusResponse:
+        """Progress of an export, with freshly signed URLs once it has completed."""
+        entries = job.shipments or []
+        shipments = [
+            AuditPackExportShipment(
+                shipment_id=e["shipment_id"],
+                reference=e["reference"],
+                status=e["status"],
+                generated_at=e.get("generated_at"),
+                error=e.get("error"),
+            )
+            for e in entries
+        ]
+
+        archive_url = expires_at = None
+        if job.status == "completed" and job.output == "urls":
+            expiry = get_settings().audit_pack_export_url_expiry
+            keys = [_pack_key(e) for e in entries]
+            urls = await asyncio.gather(*(
+                storage.download_url(AUDIT_PACK_BUCKET, key, expires_in=expiry)
+                for key in keys if key
+            ))
+            signed = iter(urls)
+            for shipment, key in zip(shipments, keys):
+                if key:
+                    shipment.download_url = next(signed)
+            expires_at = (datetime.now(timezone.utc) + timedelta(seconds=expiry)).isoformat()
+        elif job.status == "completed":
+            archive_url = f"/api/shipments/audit-pack-exports/{job.id}/archive"
+
+        statuses = [e["status"] for e in entries]
+        return AuditPackExportStatusResponse(
+            job_id=str(job.id),
+            status=job.status,
+            output=job.output,
+            filters=job.filters or {},
+            total=len(entries),
+            completed=sum(1 for s in statuses if s != "pending"),
+            reused=statuses.count("reused"),
+            failed=statuses.count("failed"),
+            shipments=shipments,
+            archive_url=archive_url,
+            expires_at=expires_at,
+            error=job.error_message,
+            created_at=job.created_at.isoformat() if job.created_at else None,
+            started_at=job.started_at.isoformat() if job.started_at else None,
+            completed_at=job.completed_at.isoformat() if job.completed_at else None,
+        )
+
+    @staticmethod
+    def stream_archive(job: AuditPackExportJob, storage: StorageBackend) -> AsyncIterator[bytes]:
+        """Stream a completed export as one ZIP of packs plus manifest.json."""
+        entries = job.shipments or []
+        packs = []
+        for e in entries:
+            key = _pack_key(e)
+            if key:
+                packs.append((f"{e['reference']}-audit-pack.zip", key))
+        manifest = {
+            "export_id": str(job.id),
+            "filters": job.filters or {},
+            "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+            "shipments": entries,
+        }
+        return stream_pack_archive(packs, json.dumps(manifest, indent=2).encode("utf-8"), storage)
+
+
+# Global instance
+audit_pack_export_service = AuditPackExportService()
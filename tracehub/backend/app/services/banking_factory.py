@@ -24,9 +24,10 @@ def _create_backend() -> BankingBackend:
     provider = settings.banking_provider
 
     if provider == "mock":
+        from .latency_sim import get_simulator
         from .banking_mock import MockBankingBackend
 
-        return MockBankingBackend()
+        return MockBankingBackend(simulator=get_simulator("banking"))
 
     # Future providers: "gtbank", "uba"
     # if provider == "gtbank":
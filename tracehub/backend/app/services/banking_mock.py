@@ -2,6 +2,9 @@
 
 Simulates bank API responses with configurable behavior.
 Same pattern as ConsoleBackend (email), MockLLMBackend (LLM).
+
+With a LatencySimulator (simulation_enabled), calls take provider-like
+time and raise SimulatedError/SimulatedRateLimit at the configured rates.
 """
 
 import logging
@@ -15,6 +18,7 @@ from .banking import (
     PaymentInfo,
     PaymentStatus,
 )
+from .latency_sim import LatencySimulator
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +39,11 @@ class MockBankingBackend:
     Tracks calls for test assertions.
     """
 
-    def __init__(self, available: bool = True) -> None:
+    def __init__(
+        self, available: bool = True, simulator: Optional[LatencySimulator] = None
+    ) -> None:
         self._available = available
+        self._simulator = simulator
         self._call_count = 0
         self._last_method: Optional[str] = None
         self._lc_overrides: Dict[str, LCVerification] = {}
@@ -46,6 +53,7 @@ class MockBankingBackend:
         """Simulate LC verification."""
         self._call_count += 1
         self._last_method = "verify_lc"
+        self._simulate()
 
         # Check for test overrides
         if lc_number in self._lc_overrides:
@@ -78,6 +86,7 @@ class MockBankingBackend:
         """Simulate payment status lookup."""
         self._call_count += 1
         self._last_method = "get_payment_status"
+        self._simulate()
 
         # Check for test overrides
         if reference in self._payment_overrides:
@@ -102,6 +111,7 @@ class MockBankingBackend:
         """Simulate forex rate lookup."""
         self._call_count += 1
         self._last_method = "get_forex_rate"
+        self._simulate()
 
         pair = f"{base_currency}-{quote_currency}"
         rates = MOCK_FOREX_RATES.get(pair)
@@ -134,6 +144,12 @@ class MockBankingBackend:
             provider=self.get_provider_name(),
         )
 
+    def _simulate(self) -> None:
+        """Wait out a simulated provider call (raises simulated faults)."""
+        if self._simulator is not None:
+            with self._simulator.call():
+                pass
+
     def is_available(self) -> bool:
         """Check availability."""
         return self._available
@@ -148,6 +164,7 @@ class MockBankingBackend:
             "provider": "mock",
             "available": self._available,
             "call_count": self._call_count,
+            "simulation": self._simulator.get_status() if self._simulator else None,
         }
 
     # --- Test helpers ---
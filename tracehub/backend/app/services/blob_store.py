@@ -0,0 +1,352 @@
+"""Content-addressed storage for uploaded document files.
+
+Uploads are stored once per distinct content under their SHA-256:
+
+    {upload_dir}/documents/blobs/{hash[:2]}/{hash}
+
+which is the LocalStorageBackend layout for bucket "documents", path
+"blobs/{hash[:2]}/{hash}". Document.file_path points at the blob, so
+uploading the same PDF to several shipments (or twice under the same
+filename) stores it once and never overwrites another document's file.
+With the Supabase backend the blob is also uploaded to the documents
+bucket the first time its content is seen; the local copy is the working
+copy that extraction and OCR read. That mirror upload streams the local
+file on a small worker pool after store_upload() returns, so the upload
+request never waits for it.
+
+Each blob has a file_blobs row counting the documents that reference it.
+An upload takes its reference in a short transaction of its own, so the
+row lock is never held across the storage upload or the caller's OCR and
+extraction; a caller that fails before committing its document gives the
+reference back with discard(). Releasing a document decrements the count;
+the blob is purged only after the caller commits and only if the count is
+still zero. The row is locked while it is checked, so an upload of the
+same content racing a delete either keeps the blob alive or re-creates it.
+
+Storage is shared across organizations, so whether an upload matched an
+existing blob is never reported to callers.
+
+Documents uploaded before this layout keep their per-shipment paths and
+are deleted directly, as before.
+
+Usage:
+    from app.services.blob_store import blob_store
+
+    stored = await blob_store.store_upload(db, file, max_bytes, "application/pdf")
+    try:
+        document.file_path, document.file_hash = stored.file_path, stored.file_hash
+        ...
+        db.commit()
+    except BaseException:
+        await blob_store.discard(db, stored.file_hash)
+        raise
+
+    orphaned = blob_store.release(db, document)
+    db.delete(document)
+    db.commit()
+    if orphaned:
+        await blob_store.purge(db, orphaned)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Dict, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import Document, FileBlob
+from .file_utils import delete_file, get_full_path
+from .storage import StorageBackend
+from .upload_writer import stream_to_temp
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS_BUCKET = "documents"
+
+# Threads uploading new blobs to the storage backend
+MIRROR_WORKERS = 2
+
+
+def blob_key(file_hash: str) -> str:
+    """Path of a blob within the documents bucket."""
+    return f"blobs/{file_hash[:2]}/{file_hash}"
+
+
+@dataclass
+class StoredBlob:
+    """Result of storing an upload."""
+    file_hash: str
+    size: int
+    file_path: str  # Local path to record on Document.file_path
+
+
+class BlobStore:
+    """Stores document files by content hash with reference counting."""
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        storage: Optional[StorageBackend] = None,
+    ):
+        self._base_dir = base_dir
+        self._storage = storage
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._mirrors: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_dir(self) -> str:
+        return self._base_dir or get_settings().upload_dir
+
+    @property
+    def storage(self) -> StorageBackend:
+        if self._storage is None:
+            from .storage_factory import get_storage
+            self._storage = get_storage()
+        return self._storage
+
+    def local_path(self, file_hash: str) -> str:
+        """Local working-copy path for a blob."""
+        return os.path.join(self.base_dir, DOCUMENTS_BUCKET, blob_key(file_hash))
+
+    def is_blob_path(self, file_path: Optional[str]) -> bool:
+        """Whether a Document.file_path points into the blob store."""
+        if not file_path:
+            return False
+        blobs_dir = get_full_path(os.path.join(self.base_dir, DOCUMENTS_BUCKET, "blobs"))
+        full_path = get_full_path(file_path)
+        return os.path.normpath(full_path).startswith(os.path.normpath(blobs_dir) + os.sep)
+
+    def _acquire(self, db: Session, file_hash: str, size: int, mime_type: Optional[str]) -> int:
+        """Add a reference to a blob row, creating it if needed.
+
+        Runs and commits in its own session so the row lock is released
+        before this returns, independently of the caller's transaction.
+
+        Returns:
+            The blob's reference count after the increment
+        """
+        with Session(bind=db.get_bind()) as session:
+            for _ in range(2):
+                blob = session.query(FileBlob).filter(
+                    FileBlob.file_hash == file_hash
+                ).with_for_update().first()
+                if blob is not None:
+                    blob.ref_count += 1
+                    blob.last_referenced_at = datetime.utcnow()
+                    session.commit()
+                    return blob.ref_count
+
+                session.add(FileBlob(
+                    file_hash=file_hash,
+                    storage_path=f"{DOCUMENTS_BUCKET}/{blob_key(file_hash)}",
+                    size=size,
+                    mime_type=mime_type,
+                    ref_count=1,
+                ))
+                try:
+                    session.commit()
+                    return 1
+                except IntegrityError:
+                    # A concurrent upload of the same content created the row first
+                    session.rollback()
+
+        raise RuntimeError(f"Could not reference blob {file_hash[:12]}")
+
+    async def store_upload(
+        self,
+        db: Session,
+        upload: UploadFile,
+        max_bytes: int,
+        mime_type: Optional[str] = None,
+    ) -> StoredBlob:
+        """Stream an upload into the blob store and take a reference to it.
+
+        The reference is committed before this returns. If the caller
+        fails before committing the document that holds it, it must give
+        the reference back with discard().
+
+        Raises:
+            UploadTooLargeError: If the upload is larger than max_bytes
+        """
+        staging_dir = os.path.join(self.base_dir, DOCUMENTS_BUCKET, "blobs", "tmp")
+        os.makedirs(staging_dir, exist_ok=True)
+        streamed = await stream_to_temp(upload, staging_dir, max_bytes)
+
+        file_hash = streamed.sha256
+        path = self.local_path(file_hash)
+        try:
+            # Once referenced the blob cannot be purged, so the file is
+            # placed after the reference is committed
+            ref_count = await asyncio.to_thread(
+                self._acquire, db, file_hash, streamed.size, mime_type
+            )
+            if os.path.exists(path):
+                os.remove(streamed.path)
+                logger.info(f"Upload {upload.filename} matches stored blob {file_hash[:12]} ({ref_count} refs)")
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(streamed.path, path)
+        except BaseException:
+            if os.path.exists(streamed.path):
+                os.remove(streamed.path)
+            raise
+
+        if ref_count == 1:
+            self._start_mirror(file_hash, path, mime_type)
+
+        return StoredBlob(file_hash=file_hash, size=streamed.size, file_path=path)
+
+    def _start_mirror(self, file_hash: str, path: str, mime_type: Optional[str]) -> None:
+        """Queue the upload of a new blob to the storage backend."""
+        storage = self.storage
+
+        def mirror() -> None:
+            asyncio.run(self._mirror(storage, file_hash, path, mime_type))
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=MIRROR_WORKERS,
+                    thread_name_prefix="blob-mirror",
+                )
+            future = self._executor.submit(mirror)
+            self._mirrors[file_hash] = future
+        future.add_done_callback(partial(self._mirror_done, file_hash))
+
+    def _mirror_done(self, file_hash: str, future: Future) -> None:
+        with self._lock:
+            if self._mirrors.get(file_hash) is future:
+                del self._mirrors[file_hash]
+
+    async def wait_for_mirror(self, file_hash: str) -> None:
+        """Wait until a queued mirror upload of a blob has finished."""
+        with self._lock:
+            future = self._mirrors.get(file_hash)
+        if future is not None:
+            await asyncio.wrap_future(future)
+
+    @staticmethod
+    async def _mirror(
+        storage: StorageBackend, file_hash: str, path: str, mime_type: Optional[str]
+    ) -> None:
+        """Make sure the storage backend holds the blob (no-op for local storage)."""
+        key = blob_key(file_hash)
+        try:
+            if await storage.exists(DOCUMENTS_BUCKET, key):
+                return
+            # Streamed from the working copy, never read into memory whole
+            with open(path, "rb") as f:
+                await storage.upload(
+                    DOCUMENTS_BUCKET, key, f, mime_type or "application/octet-stream"
+                )
+        except Exception as e:
+            # The local working copy is authoritative for processing
+            logger.warning(f"Failed to mirror blob {file_hash[:12]} to storage: {e}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the mirror pool, by default after queued uploads finish."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Outside the lock: finishing mirrors take it in _mirror_done
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def release(self, db: Session, document: Document) -> Optional[str]:
+        """Drop a document's reference to its file.
+
+        Call before deleting the document. Legacy (non-blob) files are
+        deleted immediately.
+
+        Returns:
+            The file hash to pass to purge() after commit if this was the
+            last reference, else None
+        """
+        if not document.file_hash or not self.is_blob_path(document.file_path):
+            delete_file(document.file_path)
+            return None
+
+        blob = db.query(FileBlob).filter(
+            FileBlob.file_hash == document.file_hash
+        ).with_for_update().first()
+        if blob is None:
+            logger.warning(f"No blob row for document {document.id} ({document.file_hash[:12]})")
+            return None
+
+        blob.ref_count = max(blob.ref_count - 1, 0)
+        db.flush()
+        return blob.file_hash if blob.ref_count == 0 else None
+
+    async def purge(self, db: Session, file_hash: str) -> bool:
+        """Remove an unreferenced blob from storage and commit.
+
+        Re-checks the count under a row lock, so a blob that picked up a
+        new reference since release() is kept.
+
+        Returns:
+            True if the blob was removed
+        """
+        # A mirror finishing after the delete would leave an orphan copy
+        await self.wait_for_mirror(file_hash)
+
+        blob = db.query(FileBlob).filter(
+            FileBlob.file_hash == file_hash
+        ).with_for_update().first()
+        if blob is None or blob.ref_count > 0:
+            db.commit()
+            return False
+
+        try:
+            path = self.local_path(file_hash)
+            if os.path.exists(path):
+                os.remove(path)
+            await self.storage.delete(DOCUMENTS_BUCKET, blob_key(file_hash))
+        except Exception as e:
+            logger.warning(f"Failed to remove blob {file_hash[:12]}: {e}")
+            db.rollback()
+            return False
+
+        db.delete(blob)
+        db.commit()
+        logger.info(f"Purged unreferenced blob {file_hash[:12]}")
+        return True
+
+    async def discard(self, db: Session, file_hash: str) -> None:
+        """Give back a reference taken by store_upload() that no document kept.
+
+        For callers that fail (or roll back) before committing the document
+        for an upload. Runs in its own short transaction and purges the
+        blob if that was its last reference.
+        """
+        def unref() -> bool:
+            with Session(bind=db.get_bind()) as session:
+                blob = session.query(FileBlob).filter(
+                    FileBlob.file_hash == file_hash
+                ).with_for_update().first()
+                if blob is None:
+                    return False
+                blob.ref_count = max(blob.ref_count - 1, 0)
+                orphaned = blob.ref_count == 0
+                session.commit()
+                return orphaned
+
+        try:
+            orphaned = await asyncio.to_thread(unref)
+            if orphaned:
+                with Session(bind=db.get_bind()) as session:
+                    await self.purge(session, file_hash)
+        except Exception as e:
+            logger.warning(f"Failed to discard reference to blob {file_hash[:12]}: {e}")
+
+
+# Global instance
+blob_store = BlobStore()
@@ -31,6 +31,7 @@ from .bol_shipment_sync import (
 )
 from .bol_rules import RulesEngine, STANDARD_BOL_RULES, get_compliance_decision
 from .file_utils import get_full_path
+from .pdf_processor import ExtractionArtifact
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +43,12 @@ def auto_parse_bol(
     document: Document,
     db: Session,
     auto_sync: bool = True,
+    extraction: Optional[ExtractionArtifact] = None,
 ) -> BolParsedResponse:
     """Auto-parse a Bill of Lading document.
 
     Called automatically when a BoL is uploaded. Orchestrates:
-    1. Extract text from PDF
+    1. Extract text from PDF (or reuse the upload's extraction)
     2. Parse BoL using regex parser
     3. Run compliance rules
     4. Auto-sync to shipment if confidence > threshold
@@ -55,6 +57,7 @@ def auto_parse_bol(
         document: The BoL document to parse
         db: Database session
         auto_sync: Whether to auto-sync if confidence meets threshold
+        extraction: Previously extracted text for the document's file
 
     Returns:
         BolParsedResponse with parse results
@@ -69,7 +72,10 @@ def auto_parse_bol(
         )
 
     # Get PDF text
-    text = _extract_text_from_document(document)
+    if extraction is not None and extraction.pages:
+        text = extraction.full_text
+    else:
+        text = _extract_text_from_document(document, db)
     if not text:
         logger.warning("No text extracted from BoL document %s", doc_id)
         return BolParsedResponse(
@@ -337,11 +343,28 @@ def cross_validate_weights(
     return issues
 
 
-def _extract_text_from_document(document: Document) -> Optional[str]:
-    """Extract text from a document's PDF file."""
+def _extract_text_from_document(
+    document: Document, db: Optional[Session] = None
+) -> Optional[str]:
+    """Extract text from a document's PDF file.
+
+    With a database session, text is read from (and written to) the
+    persisted page-text store so repeated parses never re-run OCR.
+    """
     if not document.file_path:
         return None
 
+    if db is not None:
+        try:
+            from .page_text_store import page_text_store
+            extraction = page_text_store.get_or_extract(db, document)
+            if extraction is None or not extraction.pages:
+                return None
+            return extraction.full_text
+        except Exception:
+            logger.debug("Stored page text lookup failed", exc_info=True)
+            return None
+
     # Resolve file path
     full_path = get_full_path(document.file_path)
     if not full_path or not os.path.exists(full_path):
@@ -19,7 +19,7 @@ Works with ALL product types:
 
 import re
 from datetime import date, datetime
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Sequence
 import logging
 
 from ..schemas.bol import (
@@ -28,6 +28,7 @@ from ..schemas.bol import (
     BolContainer,
     BolCargo
 )
+from .regex_registry import first_match, regex_registry
 
 logger = logging.getLogger(__name__)
 
@@ -170,8 +171,54 @@ class BolParser:
         r'TERMS[:\s]+(CFR|CIF|FOB|PREPAID|COLLECT)',
     ]
 
+    # Shipped on board date patterns
+    SHIPPED_DATE_PATTERNS = [
+        r'SHIPPED\s+ON\s+BOARD[:\s]+(\d{1,2}[-/\s]?[A-Z]{3}[-/\s]?\d{4})',
+        r'ON\s+BOARD\s+DATE[:\s]+(\d{4}[-/]\d{2}[-/]\d{2})',
+        r'ON\s+BOARD\s+DATE[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{4})',
+    ]
+
+    # Date of issue patterns
+    ISSUE_DATE_PATTERNS = [
+        r'Date\s+of\s+Issue[:\s]+(\d{1,2}[-/]?[A-Z]{3}[-/]?\d{4})',
+        r'ISSUED[:\s]+(\d{4}[-/]\d{2}[-/]\d{2})',
+    ]
+
     def __init__(self):
         """Initialize the parser."""
+        # Compiled once per process; repeated instances share the groups.
+        # Subclasses may override the pattern tables, so each registers
+        # under its own namespace.
+        cls = type(self)
+        namespace = "bol" if cls is BolParser else f"bol.{cls.__module__}.{cls.__qualname__}"
+        self.patterns = regex_registry.register_fields(namespace, {
+            'bol_number': self.BOL_NUMBER_PATTERNS,
+            'seal': self.SEAL_PATTERNS,
+            'vessel': self.VESSEL_PATTERNS,
+            'voyage': self.VOYAGE_PATTERNS,
+            'port_of_loading': self.POL_PATTERNS,
+            'port_of_discharge': self.POD_PATTERNS,
+            'shipper': self.SHIPPER_PATTERNS,
+            'consignee': self.CONSIGNEE_PATTERNS,
+            'notify': self.NOTIFY_PATTERNS,
+            'cargo': self.CARGO_PATTERNS,
+            'hs_code': self.HS_CODE_PATTERNS,
+            'freight': self.FREIGHT_PATTERNS,
+        }, re.IGNORECASE | re.MULTILINE)
+        self.patterns.update(regex_registry.register_fields(namespace, {
+            'container': self.CONTAINER_PATTERNS,
+            'container_type': self.CONTAINER_TYPE_PATTERNS,
+            'gross_weight': self.WEIGHT_PATTERNS,
+            'net_weight': self.NET_WEIGHT_PATTERNS,
+            'shipped_date': self.SHIPPED_DATE_PATTERNS,
+            'issue_date': self.ISSUE_DATE_PATTERNS,
+            'notify_same_as_consignee': [r'NOTIFY.*SAME\s+AS\s+CONSIGNEE'],
+            'apapa': [r'NGAPP|APAPA'],
+            'hamburg': [r'DEHAM|HAMBURG'],
+            'bremerhaven': [r'DEBRV|BREMERHAVEN'],
+        }, re.IGNORECASE))
+        self.iso_container = regex_registry.compile(r'^[A-Z]{4}\d{7}$')
+
         self.field_weights = {
             'bol_number': 0.15,
             'shipper': 0.15,
@@ -257,21 +304,20 @@ class BolParser:
         # But preserve original for raw_text
         return text.strip()
 
-    def _extract_field(self, text: str, patterns: List[str], flags: int = re.IGNORECASE | re.MULTILINE) -> Optional[str]:
-        """Try multiple patterns to extract a field."""
-        for pattern in patterns:
-            match = re.search(pattern, text, flags)
-            if match:
-                return match.group(1).strip() if match.lastindex else match.group(0).strip()
+    def _extract_field(self, text: str, patterns: Sequence[re.Pattern]) -> Optional[str]:
+        """Try multiple compiled patterns to extract a field."""
+        match = first_match(patterns, text)
+        if match:
+            return match.group(1).strip() if match.lastindex else match.group(0).strip()
         return None
 
     def _extract_bol_number(self, text: str) -> Optional[str]:
         """Extract B/L number."""
-        return self._extract_field(text, self.BOL_NUMBER_PATTERNS)
+        return self._extract_field(text, self.patterns['bol_number'])
 
     def _extract_shipper(self, text: str) -> Optional[BolParty]:
         """Extract shipper information."""
-        name = self._extract_field(text, self.SHIPPER_PATTERNS)
+        name = self._extract_field(text, self.patterns['shipper'])
         if not name:
             return None
 
@@ -289,7 +335,7 @@ class BolParser:
 
     def _extract_consignee(self, text: str) -> Optional[BolParty]:
         """Extract consignee information."""
-        name = self._extract_field(text, self.CONSIGNEE_PATTERNS)
+        name = self._extract_field(text, self.patterns['consignee'])
         if not name:
             return None
 
@@ -307,11 +353,11 @@ class BolParser:
     def _extract_notify_party(self, text: str) -> Optional[BolParty]:
         """Extract notify party information."""
         # Check for "SAME AS CONSIGNEE"
-        if re.search(r'NOTIFY.*SAME\s+AS\s+CONSIGNEE', text, re.IGNORECASE):
+        if first_match(self.patterns['notify_same_as_consignee'], text):
             consignee = self._extract_consignee(text)
             return consignee
 
-        name = self._extract_field(text, self.NOTIFY_PATTERNS)
+        name = self._extract_field(text, self.patterns['notify'])
         if not name:
             return None
 
@@ -334,19 +380,19 @@ class BolParser:
         containers = []
 
         # Find container numbers
-        for pattern in self.CONTAINER_PATTERNS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['container']:
+            matches = pattern.findall(text)
             for match in matches:
                 container_num = match.upper().replace(' ', '').replace('-', '')
                 # Validate ISO 6346 format
-                if re.match(r'^[A-Z]{4}\d{7}$', container_num):
+                if self.iso_container.match(container_num):
                     # Avoid duplicates
                     if not any(c.number == container_num for c in containers):
                         containers.append(BolContainer(number=container_num))
 
         # Try to extract seal and type for first container
         if containers:
-            seal = self._extract_field(text, self.SEAL_PATTERNS)
+            seal = self._extract_field(text, self.patterns['seal'])
             if seal:
                 containers[0].seal_number = seal
 
@@ -358,8 +404,8 @@ class BolParser:
 
     def _extract_container_type(self, text: str) -> Optional[str]:
         """Extract container type (20GP, 40HC, etc.)."""
-        for pattern in self.CONTAINER_TYPE_PATTERNS:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['container_type']:
+            match = pattern.search(text)
             if match:
                 result = match.group(1) if match.lastindex else match.group(0)
                 # Normalize
@@ -375,7 +421,7 @@ class BolParser:
 
     def _extract_vessel(self, text: str) -> Optional[str]:
         """Extract vessel name."""
-        vessel = self._extract_field(text, self.VESSEL_PATTERNS)
+        vessel = self._extract_field(text, self.patterns['vessel'])
         if vessel:
             # Clean up
             vessel = vessel.strip().rstrip('/')
@@ -385,29 +431,29 @@ class BolParser:
 
     def _extract_voyage(self, text: str) -> Optional[str]:
         """Extract voyage number."""
-        return self._extract_field(text, self.VOYAGE_PATTERNS)
+        return self._extract_field(text, self.patterns['voyage'])
 
     def _extract_port_of_loading(self, text: str) -> Optional[str]:
         """Extract port of loading."""
-        pol = self._extract_field(text, self.POL_PATTERNS)
+        pol = self._extract_field(text, self.patterns['port_of_loading'])
         if pol:
             return pol.strip()
 
         # Check for known port codes
-        if re.search(r'NGAPP|APAPA', text, re.IGNORECASE):
+        if first_match(self.patterns['apapa'], text):
             return "APAPA, NIGERIA (NGAPP)"
         return None
 
     def _extract_port_of_discharge(self, text: str) -> Optional[str]:
         """Extract port of discharge."""
-        pod = self._extract_field(text, self.POD_PATTERNS)
+        pod = self._extract_field(text, self.patterns['port_of_discharge'])
         if pod:
             return pod.strip()
 
         # Check for known port codes
-        if re.search(r'DEHAM|HAMBURG', text, re.IGNORECASE):
+        if first_match(self.patterns['hamburg'], text):
             return "HAMBURG, GERMANY (DEHAM)"
-        elif re.search(r'DEBRV|BREMERHAVEN', text, re.IGNORECASE):
+        elif first_match(self.patterns['bremerhaven'], text):
             return "BREMERHAVEN, GERMANY (DEBRV)"
         return None
 
@@ -416,7 +462,7 @@ class BolParser:
         cargo_list = []
 
         # Extract description
-        description = self._extract_field(text, self.CARGO_PATTERNS)
+        description = self._extract_field(text, self.patterns['cargo'])
         if not description:
             # Try to find common cargo terms
             cargo_terms = ['HOOVES', 'HORNS', 'CATTLE', 'ANIMAL', 'BY-PRODUCTS']
@@ -429,11 +475,11 @@ class BolParser:
             return cargo_list
 
         # Extract HS code
-        hs_code = self._extract_field(text, self.HS_CODE_PATTERNS)
+        hs_code = self._extract_field(text, self.patterns['hs_code'])
 
         # Extract weights
-        gross_weight = self._extract_weight(text, self.WEIGHT_PATTERNS)
-        net_weight = self._extract_weight(text, self.NET_WEIGHT_PATTERNS)
+        gross_weight = self._extract_weight(text, self.patterns['gross_weight'])
+        net_weight = self._extract_weight(text, self.patterns['net_weight'])
 
         cargo_list.append(BolCargo(
             description=description,
@@ -444,10 +490,10 @@ class BolParser:
 
         return cargo_list
 
-    def _extract_weight(self, text: str, patterns: List[str]) -> Optional[float]:
+    def _extract_weight(self, text: str, patterns: Sequence[re.Pattern]) -> Optional[float]:
         """Extract weight value from text."""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 weight_str = match.group(1).replace(',', '').replace(' ', '')
                 try:
@@ -458,26 +504,16 @@ class BolParser:
 
     def _extract_shipped_date(self, text: str) -> Optional[date]:
         """Extract shipped on board date."""
-        # Look for specific shipped date patterns
-        patterns = [
-            r'SHIPPED\s+ON\s+BOARD[:\s]+(\d{1,2}[-/\s]?[A-Z]{3}[-/\s]?\d{4})',
-            r'ON\s+BOARD\s+DATE[:\s]+(\d{4}[-/]\d{2}[-/]\d{2})',
-            r'ON\s+BOARD\s+DATE[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{4})',
-        ]
-        return self._extract_date(text, patterns)
+        return self._extract_date(text, self.patterns['shipped_date'])
 
     def _extract_issue_date(self, text: str) -> Optional[date]:
         """Extract date of issue."""
-        patterns = [
-            r'Date\s+of\s+Issue[:\s]+(\d{1,2}[-/]?[A-Z]{3}[-/]?\d{4})',
-            r'ISSUED[:\s]+(\d{4}[-/]\d{2}[-/]\d{2})',
-        ]
-        return self._extract_date(text, patterns)
+        return self._extract_date(text, self.patterns['issue_date'])
 
-    def _extract_date(self, text: str, patterns: List[str]) -> Optional[date]:
+    def _extract_date(self, text: str, patterns: Sequence[re.Pattern]) -> Optional[date]:
         """Extract date from text using patterns."""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 date_str = match.group(1)
                 parsed = self._parse_date_string(date_str)
@@ -511,7 +547,7 @@ class BolParser:
 
     def _extract_freight_terms(self, text: str) -> Optional[str]:
         """Extract freight terms."""
-        return self._extract_field(text, self.FREIGHT_PATTERNS)
+        return self._extract_field(text, self.patterns['freight'])
 
     def _calculate_confidence(
         self,
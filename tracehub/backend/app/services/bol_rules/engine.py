@@ -21,14 +21,32 @@ import re
 import logging
 from enum import Enum
 from datetime import date
-from typing import Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field
 
 from ...schemas.bol import CanonicalBoL
+from ..regex_registry import regex_registry
 
 logger = logging.getLogger(__name__)
 
+ARRAY_SEGMENT_RE = regex_registry.compile(r"(\w+)\[(\d+)\]")
+
+
+@lru_cache(maxsize=256)
+def _split_field_path(path: str) -> Tuple[Union[str, tuple], ...]:
+    """Parse a field path once; rule sets reuse a small number of paths."""
+    parts = []
+    for segment in path.split("."):
+        # Check for array access
+        match = ARRAY_SEGMENT_RE.match(segment)
+        if match:
+            parts.append((match.group(1), int(match.group(2))))
+        else:
+            parts.append(segment)
+    return tuple(parts)
+
 
 class ConditionType(str, Enum):
     """Types of conditions that can be evaluated."""
@@ -275,21 +293,7 @@ class RulesEngine:
         Returns:
             List of parts, with array access as tuples
         """
-        parts = []
-        # Split by dots
-        segments = path.split(".")
-
-        for segment in segments:
-            # Check for array access
-            match = re.match(r"(\w+)\[(\d+)\]", segment)
-            if match:
-                field_name = match.group(1)
-                index = int(match.group(2))
-                parts.append((field_name, index))
-            else:
-                parts.append(segment)
-
-        return parts
+        return list(_split_field_path(path))
 
     def _eval_not_null(
         self, value: Any, rule_value: Any, bol: CanonicalBoL
@@ -359,7 +363,7 @@ class RulesEngine:
             value = str(value)
 
         try:
-            if re.match(pattern, value):
+            if regex_registry.compile(pattern).match(value):
                 return True, "Pattern matches"
             return False, f"Value '{value}' does not match pattern '{pattern}'"
         except re.error as e:
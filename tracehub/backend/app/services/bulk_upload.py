@@ -0,0 +1,146 @@
+"""Bulk document upload - many files and ZIP archives in one request.
+
+Suppliers send a shipment's full document set (15-30 PDFs) at once. The
+bulk endpoint accepts any mix of files and ZIP archives; this module
+expands them into individual upload items.
+
+Archives are indexed from their central directory only. Members are then
+opened one at a time and streamed through the blob store like any other
+upload (decompression runs on a worker thread), so no archive member is
+ever held in memory in full and the per-file size limit applies to each
+member's actual decompressed bytes.
+
+Usage:
+    from app.services.bulk_upload import BulkUploadReader
+
+    reader = BulkUploadReader(max_files=50, max_archive_bytes=500 * 1024 * 1024)
+    try:
+        await reader.index(files)
+        for item in reader.items:
+            stored = await blob_store.store_upload(db, reader.open(item), ...)
+    finally:
+        reader.close()
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+class BulkUploadError(Exception):
+    """Raised when a bulk upload request cannot be processed at all."""
+
+
+def is_zip_upload(filename: Optional[str], content_type: Optional[str]) -> bool:
+    """Whether an upload is a ZIP archive to expand."""
+    return content_type in ZIP_CONTENT_TYPES or bool(filename and filename.lower().endswith(".zip"))
+
+
+def _is_ignored_member(info: zipfile.ZipInfo) -> bool:
+    """Directories and OS metadata files (__MACOSX/, .DS_Store, ...)."""
+    if info.is_dir() or info.filename.startswith("__MACOSX/"):
+        return True
+    return os.path.basename(info.filename).startswith(".")
+
+
+@dataclass
+class BulkUploadItem:
+    """One file of a bulk upload: a request part or a ZIP archive member."""
+    filename: str
+    content_type: Optional[str]
+    upload: Optional[UploadFile] = None
+    archive: Optional[zipfile.ZipFile] = None
+    member: Optional[zipfile.ZipInfo] = None
+    source: Optional[str] = None  # Archive filename for ZIP members
+
+
+class BulkUploadReader:
+    """Expands request files and ZIP archives into individual upload items."""
+
+    def __init__(self, max_files: int, max_archive_bytes: int):
+        self.max_files = max_files
+        self.max_archive_bytes = max_archive_bytes
+        self.items: List[BulkUploadItem] = []
+        self.rejected: List[Dict[str, Any]] = []
+        self._archives: List[zipfile.ZipFile] = []
+
+    async def index(self, files: List[UploadFile]) -> None:
+        """List every file in the request, reading only ZIP central directories.
+
+        Raises:
+            BulkUploadError: If the request holds more than max_files files
+        """
+        for upload in files:
+            if not is_zip_upload(upload.filename, upload.content_type):
+                self.items.append(BulkUploadItem(
+                    filename=upload.filename,
+                    content_type=upload.content_type,
+                    upload=upload,
+                ))
+                continue
+
+            if upload.size is not None and upload.size > self.max_archive_bytes:
+                self._reject(upload.filename, f"Archive exceeds maximum size of {self.max_archive_bytes // (1024 * 1024)} MB")
+                continue
+
+            try:
+                archive = await asyncio.to_thread(zipfile.ZipFile, upload.file)
+            except zipfile.BadZipFile:
+                self._reject(upload.filename, "Not a valid ZIP archive")
+                continue
+            self._archives.append(archive)
+
+            for info in archive.infolist():
+                if _is_ignored_member(info):
+                    continue
+                name = os.path.basename(info.filename)
+                if is_zip_upload(name, None):
+                    self._reject(name, "Nested archives are not supported", source=upload.filename)
+                    continue
+                self.items.append(BulkUploadItem(
+                    filename=name,
+                    content_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                    archive=archive,
+                    member=info,
+                    source=upload.filename,
+                ))
+
+        if len(self.items) > self.max_files:
+            raise BulkUploadError(
+                f"Bulk upload contains {len(self.items)} files; the maximum is {self.max_files}"
+            )
+
+    def open(self, item: BulkUploadItem) -> UploadFile:
+        """Return the item as an UploadFile; ZIP members decompress as they are read."""
+        if item.upload is not None:
+            return item.upload
+        return UploadFile(
+            file=item.archive.open(item.member),
+            filename=item.filename,
+            size=item.member.file_size,
+            headers=Headers({"content-type": item.content_type}),
+        )
+
+    def _reject(self, filename: Optional[str], error: str, source: Optional[str] = None) -> None:
+        logger.warning(f"Bulk upload skipped {filename}: {error}")
+        self.rejected.append({"file_name": filename, "source": source, "error": error})
+
+    def reject(self, item: BulkUploadItem, error: str) -> None:
+        """Record an item that could not be stored."""
+        self._reject(item.filename, error, source=item.source)
+
+    def close(self) -> None:
+        for archive in self._archives:
+            archive.close()
+        self._archives = []
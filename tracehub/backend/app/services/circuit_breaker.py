@@ -0,0 +1,131 @@
+"""Circuit breaker for calls to external providers.
+
+While a provider is failing (timeouts, 429s, 5xx), sending every request
+to it makes each caller wait for its full deadline before falling back.
+The breaker counts consecutive failures and, once failure_threshold is
+reached, opens: calls are refused immediately so callers take their
+fallback path (e.g. keyword classification) without waiting.
+
+After reset_timeout the breaker lets a single probe call through
+(half-open). Success closes it again; failure re-opens it.
+
+Usage:
+    breaker = CircuitBreaker("anthropic", failure_threshold=5, reset_timeout=30)
+
+    if not breaker.allow_request():
+        return fallback()
+    try:
+        result = call_provider()
+    except ProviderError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (thread-safe)."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._opened_wall: Optional[datetime] = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go to the provider now."""
+        with self._lock:
+            if self._state == BreakerState.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    self.rejected_calls += 1
+                    return False
+                self._state = BreakerState.HALF_OPEN
+
+            if self._state == BreakerState.HALF_OPEN:
+                # One probe at a time decides whether the provider recovered
+                if self._probe_in_flight:
+                    self.rejected_calls += 1
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record_success(self) -> None:
+        """The provider answered; close the breaker."""
+        with self._lock:
+            self._state = BreakerState.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._opened_wall = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """The provider failed (after retries); open once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != BreakerState.OPEN:
+                    self.times_opened += 1
+                self._state = BreakerState.OPEN
+                self._opened_at = self._clock()
+                self._opened_wall = datetime.utcnow()
+
+    def reset(self) -> None:
+        """Close the breaker and clear counters."""
+        self.record_success()
+        with self._lock:
+            self.times_opened = 0
+            self.rejected_calls = 0
+
+    def get_state(self) -> Dict[str, Any]:
+        """Current state for status endpoints."""
+        with self._lock:
+            retry_in = None
+            reopens_at = None
+            if self._state == BreakerState.OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (self._clock() - self._opened_at), 1))
+                reopens_at = (self._opened_wall + timedelta(seconds=self.reset_timeout)).isoformat()
+            return {
+                "name": self.name,
+                "state": self._state.value,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "retry_in_seconds": retry_in,
+                "half_open_at": reopens_at,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+            }
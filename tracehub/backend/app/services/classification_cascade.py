@@ -0,0 +1,139 @@
+"""Keyword-first classification cascade.
+
+Keyword scoring (pdf_processor.detect_document_type_by_keywords) runs in
+microseconds; an LLM call costs a network round trip and API credits.
+Most Bills of Lading and invoices score one type near 1.0 and everything
+else near zero, so the model adds nothing for them.
+
+The cascade escalates to the LLM only when the keyword result is not
+decisive:
+- the top score is below classification_cascade_min_confidence, or
+- the gap to the runner-up type is below classification_cascade_min_margin.
+
+Every decision is counted so the escalation rate can be watched (see
+get_stats(), reported by /api/documents/ai/status).
+
+Usage:
+    from app.services.classification_cascade import classification_cascade
+
+    decision = classification_cascade.decide_section(section)
+    if decision.escalate:
+        ...  # call the LLM
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+from .pdf_processor import DocumentSection
+
+
+@dataclass
+class CascadeDecision:
+    """Whether a keyword result needs the LLM, and why."""
+
+    escalate: bool
+    reason: str  # "decisive", "low_confidence", "low_margin", "disabled"
+    confidence: float
+    margin: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ClassificationCascade:
+    """Decides per keyword result whether to call the LLM; counts decisions."""
+
+    REASONS = ("decisive", "low_confidence", "low_margin", "disabled")
+
+    def __init__(
+        self,
+        min_confidence: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        # None = read from settings at decision time
+        self._min_confidence = min_confidence
+        self._min_margin = min_margin
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._counts = {reason: 0 for reason in self.REASONS}
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return get_settings().classification_cascade_enabled
+
+    @property
+    def min_confidence(self) -> float:
+        if self._min_confidence is not None:
+            return self._min_confidence
+        return get_settings().classification_cascade_min_confidence
+
+    @property
+    def min_margin(self) -> float:
+        if self._min_margin is not None:
+            return self._min_margin
+        return get_settings().classification_cascade_min_margin
+
+    def decide(self, confidence: float, runner_up: float = 0.0) -> CascadeDecision:
+        """Decide from the top two keyword scores.
+
+        Args:
+            confidence: Score of the best keyword match
+            runner_up: Score of the second-best type (0.0 if none)
+        """
+        margin = round(confidence - runner_up, 4)
+        if not self.enabled:
+            reason = "disabled"
+        elif confidence < self.min_confidence:
+            reason = "low_confidence"
+        elif margin < self.min_margin:
+            reason = "low_margin"
+        else:
+            reason = "decisive"
+
+        with self._lock:
+            self._counts[reason] += 1
+        return CascadeDecision(
+            escalate=reason != "decisive",
+            reason=reason,
+            confidence=confidence,
+            margin=margin,
+        )
+
+    def decide_section(self, section: DocumentSection) -> CascadeDecision:
+        """Decide for a keyword-classified section and record it in detected_fields."""
+        alternatives: List[Dict[str, Any]] = section.detected_fields.get("alternative_types") or []
+        runner_up = float(alternatives[0].get("confidence", 0.0)) if alternatives else 0.0
+
+        decision = self.decide(section.confidence, runner_up)
+        section.detected_fields["cascade"] = decision.to_dict()
+        return decision
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Decision counts and the share escalated to the LLM."""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        escalated = total - counts["decisive"]
+        return {
+            "enabled": self.enabled,
+            "min_confidence": self.min_confidence,
+            "min_margin": self.min_margin,
+            "decisions": total,
+            "escalated": escalated,
+            "keyword_only": counts["decisive"],
+            "escalation_rate": round(escalated / total, 3) if total else 0.0,
+            "by_reason": counts,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts = {reason: 0 for reason in self.REASONS}
+
+
+# Global instance
+classification_cascade = ClassificationCascade()
@@ -24,9 +24,10 @@ def _create_backend() -> CustomsBackend:
     provider = settings.customs_provider
 
     if provider == "mock":
+        from .latency_sim import get_simulator
         from .customs_mock import MockCustomsBackend
 
-        return MockCustomsBackend()
+        return MockCustomsBackend(simulator=get_simulator("customs"))
 
     # Future providers: "ncs", "son"
     # if provider == "ncs":
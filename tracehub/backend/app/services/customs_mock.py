@@ -2,6 +2,9 @@
 
 Simulates NCS/SON responses with configurable behavior.
 Same pattern as ConsoleBackend (email), MockLLMBackend (LLM).
+
+With a LatencySimulator (simulation_enabled), calls take provider-like
+time and raise SimulatedError/SimulatedRateLimit at the configured rates.
 """
 
 import logging
@@ -16,6 +19,7 @@ from .customs import (
     DutyCalculation,
     PreClearanceResult,
 )
+from .latency_sim import LatencySimulator
 
 logger = logging.getLogger(__name__)
 
@@ -68,8 +72,11 @@ class MockCustomsBackend:
     Tracks calls for test assertions.
     """
 
-    def __init__(self, available: bool = True) -> None:
+    def __init__(
+        self, available: bool = True, simulator: Optional[LatencySimulator] = None
+    ) -> None:
         self._available = available
+        self._simulator = simulator
         self._declarations: Dict[str, DeclarationResult] = {}
         self._call_count = 0
         self._last_method: Optional[str] = None
@@ -80,6 +87,7 @@ class MockCustomsBackend:
         """Simulate pre-clearance check."""
         self._call_count += 1
         self._last_method = "check_pre_clearance"
+        self._simulate()
 
         chapter = hs_code[:2] if len(hs_code) >= 2 else hs_code
 
@@ -126,6 +134,7 @@ class MockCustomsBackend:
         """Simulate duty calculation."""
         self._call_count += 1
         self._last_method = "calculate_duty"
+        self._simulate()
 
         chapter = hs_code[:2] if len(hs_code) >= 2 else "00"
         duty_rate = DUTY_RATES.get(chapter, 5.0)  # Default 5% for unknown
@@ -181,6 +190,7 @@ class MockCustomsBackend:
         """Simulate export declaration submission."""
         self._call_count += 1
         self._last_method = "submit_declaration"
+        self._simulate()
 
         ref = f"NCS-{uuid.uuid4().hex[:8].upper()}"
         now = datetime.now(timezone.utc).isoformat()
@@ -207,6 +217,7 @@ class MockCustomsBackend:
         """Simulate declaration status check."""
         self._call_count += 1
         self._last_method = "get_declaration_status"
+        self._simulate()
 
         if reference_number in self._declarations:
             return self._declarations[reference_number]
@@ -218,6 +229,12 @@ class MockCustomsBackend:
             error="Declaration not found",
         )
 
+    def _simulate(self) -> None:
+        """Wait out a simulated provider call (raises simulated faults)."""
+        if self._simulator is not None:
+            with self._simulator.call():
+                pass
+
     def is_available(self) -> bool:
         """Check availability."""
         return self._available
@@ -232,6 +249,7 @@ class MockCustomsBackend:
             "provider": "mock",
             "available": self._available,
             "call_count": self._call_count,
+            "simulation": self._simulator.get_status() if self._simulator else None,
             "declarations_tracked": len(self._declarations),
         }
 
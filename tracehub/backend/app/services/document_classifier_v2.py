@@ -3,19 +3,26 @@
 Provider-agnostic classifier that routes AI calls through
 the LLMBackend Protocol. Keyword fallback always available.
 Replaces direct Anthropic usage from v1 document_classifier.py.
+
+Keyword scoring runs first; the LLM is only called when it is not
+decisive (see classification_cascade). Sections of a combined PDF are
+enhanced through section_classification, shared with v1.
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Optional
 
 from ..models.document import DocumentType
+from .classification_cascade import classification_cascade
 from .llm import ClassificationResult, LLMBackend
+from .llm_async import as_async_backend
 from .llm_factory import get_llm
-from .pdf_processor import DocumentSection, pdf_processor
+from .pdf_processor import DocumentSection, ExtractionArtifact, pdf_processor
+from .section_classification import SectionClassifier
 
 logger = logging.getLogger(__name__)
 
-
 class DocumentClassifierV2:
     """Document classifier using LLMBackend for AI and keywords for fallback.
 
@@ -39,14 +46,17 @@ class DocumentClassifierV2:
 
     def get_ai_status(self) -> Dict[str, object]:
         """Get detailed AI availability status."""
-        return self.llm.get_status()
+        status = dict(self.llm.get_status())
+        status["cascade"] = classification_cascade.get_stats()
+        return status
 
     def classify(self, text: str, prefer_ai: bool = True) -> ClassificationResult:
         """Classify document with automatic AI/keyword fallback.
 
-        1. Tries AI classification via LLMBackend if available
-        2. Falls back to keyword matching on failure
-        3. Always returns a result
+        1. Scores keywords; returns that result if it is decisive
+        2. Otherwise tries AI classification via LLMBackend if available
+        3. Falls back to keyword matching on failure
+        4. Always returns a result
 
         Args:
             text: Text content from the document.
@@ -55,15 +65,36 @@ class DocumentClassifierV2:
         Returns:
             ClassificationResult (always returns, never None).
         """
-        result = None
+        keyword_result = self.classify_with_keywords(text)
 
-        if prefer_ai and self.llm.is_available():
+        if prefer_ai and self.llm.is_available() and self._needs_llm(keyword_result):
             result = self.llm.classify_document(text)
+            if result is not None:
+                return result
+
+        return keyword_result
+
+    async def classify_async(self, text: str, prefer_ai: bool = True) -> ClassificationResult:
+        """Async variant of classify() for request handlers.
+
+        The model call is awaited, so a slow provider does not stall the
+        event loop.
+        """
+        keyword_result = self.classify_with_keywords(text)
 
-        if result is None:
-            result = self.classify_with_keywords(text)
+        if prefer_ai and self.llm.is_available() and self._needs_llm(keyword_result):
+            result = await as_async_backend(self.llm).classify_document(text)
+            if result is not None:
+                return result
 
-        return result
+        return keyword_result
+
+    @staticmethod
+    def _needs_llm(keyword_result: ClassificationResult) -> bool:
+        """Ask the cascade whether the keyword result is too weak to stand alone."""
+        alternatives = keyword_result.alternatives
+        runner_up = float(alternatives[0]["confidence"]) if alternatives else 0.0
+        return classification_cascade.decide(keyword_result.confidence, runner_up).escalate
 
     def classify_with_keywords(self, text: str) -> ClassificationResult:
         """Classify document using keyword matching (always available).
@@ -104,50 +135,88 @@ class DocumentClassifierV2:
             alternatives=alternatives,
         )
 
+    @property
+    def section_classifier(self) -> SectionClassifier:
+        """Section enhancement through this classifier's LLM backend."""
+        return SectionClassifier(self.llm)
+
     def classify_section(self, section: DocumentSection) -> DocumentSection:
         """Enhance a document section with AI classification.
 
-        Falls back to keyword-based results if AI is unavailable.
+        Keeps keyword-based results if they are decisive or AI is unavailable.
         """
         if not self.llm.is_available():
             return section
 
-        result = self.llm.classify_document(section.text_preview)
-        if result:
-            if result.confidence > section.confidence:
-                section.document_type = result.document_type
-                section.confidence = result.confidence
-                section.detection_method = "ai"
+        return self.section_classifier.classify_section(section)
+
+    async def classify_sections_async(
+        self,
+        sections: List[DocumentSection],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[DocumentSection]:
+        """Enhance all sections with AI classification concurrently.
 
-            if result.reference_number and not section.reference_number:
-                section.reference_number = result.reference_number
+        See SectionClassifier.classify_sections_async.
+        """
+        return await self.section_classifier.classify_sections_async(sections, max_concurrency, timeout)
 
-            section.detected_fields.update({
-                "ai_reasoning": result.reasoning,
-                "ai_fields": result.key_fields,
-            })
+    async def classify_sections_batched_async(
+        self,
+        sections: List[DocumentSection],
+        token_budget: Optional[int] = None,
+        max_sections: Optional[int] = None,
+    ) -> List[DocumentSection]:
+        """Enhance all sections using batched prompts.
 
-        return section
+        See SectionClassifier.classify_sections_batched_async.
+        """
+        return await self.section_classifier.classify_sections_batched_async(sections, token_budget, max_sections)
 
     def analyze_pdf(
-        self, file_path: str, use_ai: bool = True
+        self,
+        file_path: str,
+        use_ai: bool = True,
+        extraction: Optional[ExtractionArtifact] = None,
     ) -> List[DocumentSection]:
         """Analyze a PDF and classify all documents within it.
 
+        Blocks until every model call has finished; async callers should
+        use analyze_pdf_async.
+
         Args:
             file_path: Path to the PDF file.
             use_ai: Whether to use AI classification.
+            extraction: Previously extracted text for this file (optional).
 
         Returns:
             List of DocumentSection with classification results.
         """
-        sections = pdf_processor.analyze_pdf(file_path)
+        sections = pdf_processor.analyze_pdf(file_path, extraction=extraction)
 
         if use_ai and self.llm.is_available():
-            sections = [self.classify_section(s) for s in sections]
+            self.section_classifier.enhance(sections)
 
         return sections
 
+    async def analyze_pdf_async(
+        self,
+        file_path: str,
+        use_ai: bool = True,
+        extraction: Optional[ExtractionArtifact] = None,
+    ) -> List[DocumentSection]:
+        """Awaitable analyze_pdf() for async route handlers.
+
+        Keyword analysis runs on a worker thread and model calls are
+        awaited, so the event loop keeps serving other requests meanwhile.
+        """
+        sections = await asyncio.to_thread(pdf_processor.analyze_pdf, file_path, extraction=extraction)
+
+        if use_ai and self.llm.is_available():
+            await self.section_classifier.enhance_async(sections)
+
+        return sections
 
 # Global instance — uses get_llm() lazily
 document_classifier_v2 = DocumentClassifierV2()
@@ -0,0 +1,748 @@
+"""Document ingest pipeline - the stages that run after a file is uploaded.
+
+Shared by the synchronous upload endpoint and the asynchronous ingest mode.
+In async mode the upload persists the file and Document row, returns 202
+with an IngestJob id, and the stages below run on a bounded worker pool:
+
+    extract    - page count + text extraction (stored in document_page_texts)
+    detect     - keyword/AI section detection, classification, DocumentContent rows
+    enrich     - shipment enrichment from extracted fields
+    container  - container number extraction (Bills of Lading)
+    bol_parse  - BoL auto-parse, compliance and auto-sync (Bills of Lading)
+
+Each stage records its status and result on the IngestJob row, so the
+status endpoint can report progress from any API worker. A worker claims
+a job before running it and holds a lease on it (services.job_lease), so
+no two workers run the same job. Jobs interrupted by a worker crash,
+restart or redeploy are picked up by recover_jobs() at startup: queued
+ones are re-submitted, running ones whose lease lapsed are marked failed.
+
+Usage:
+    from app.services.document_ingest import document_ingest_service
+
+    job = document_ingest_service.create_job(db, document, shipment, ...)
+    db.commit()
+    document_ingest_service.submit(job.id)
+
+    # At startup
+    document_ingest_service.recover_jobs()
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import (
+    Document,
+    DocumentContent,
+    DocumentStatus,
+    DocumentType,
+    IngestJob,
+    ReferenceRegistry,
+    Shipment,
+)
+from ..schemas.classification import ClassificationInUpload
+from .bol_auto_parse import auto_parse_bol
+from .document_classifier import document_classifier
+from .job_lease import JobLease
+from .page_text_store import page_text_store
+from .pdf_processor import DocumentSection, ExtractionArtifact, pdf_processor
+from .shipment_data_extractor import ShipmentDataExtractor
+from .shipment_enrichment import shipment_enrichment_service
+
+logger = logging.getLogger(__name__)
+
+INGEST_STAGES = ["extract", "detect", "enrich", "container", "bol_parse"]
+
+# Combined PDFs above this page count are always section-analyzed
+AUTO_DETECT_MIN_PAGES = 3
+
+
+@dataclass
+class IngestOutcome:
+    """Accumulated results of the ingest stages for one document."""
+    requested_type: DocumentType
+    final_document_type: DocumentType
+    is_pdf: bool
+    page_count: int = 1
+    should_auto_detect: bool = False
+    extraction: Optional[ExtractionArtifact] = None
+    detected_contents: List[Dict[str, Any]] = field(default_factory=list)
+    duplicates_found: List[Dict[str, Any]] = field(default_factory=list)
+    classification_info: Optional[ClassificationInUpload] = None
+    enrichment_result: Any = None
+    extracted_container: Optional[Dict[str, Any]] = None
+    bol_parse_result: Any = None
+
+    def to_response(self, document: Document) -> Dict[str, Any]:
+        """Build the upload response payload."""
+        content_count = len(self.detected_contents) if self.detected_contents else 1
+
+        response = {
+            "id": str(document.id),
+            "name": document.name,
+            "type": document.document_type.value,
+            "status": document.status.value,
+            "message": "Document uploaded successfully",
+            "page_count": self.page_count,
+            "is_combined": len(self.detected_contents) > 1,
+            "content_count": content_count
+        }
+
+        # Include detection results if auto-detect was used
+        reclassified = self.final_document_type != self.requested_type
+        if self.should_auto_detect and self.detected_contents:
+            response["detection"] = {
+                "detected_contents": self.detected_contents,
+                "duplicates_found": self.duplicates_found,
+                "ai_available": document_classifier.is_ai_available(),
+                "ai_reclassified": reclassified,
+                "original_type": self.requested_type.value if reclassified else None,
+                "detected_type": self.final_document_type.value if reclassified else None
+            }
+
+        # Include enrichment results if extraction was performed
+        if self.enrichment_result:
+            response["enrichment"] = {
+                "success": self.enrichment_result.success,
+                "updates_applied": self.enrichment_result.updates_applied,
+                "products_created": self.enrichment_result.products_created,
+                "warnings": self.enrichment_result.warnings,
+                "extracted_data": self.enrichment_result.extracted_data
+            }
+
+        # PRD-019: Include classification info
+        if self.classification_info:
+            response["classification"] = self.classification_info.model_dump()
+
+        # Include extracted container from BOL (for suggesting container update)
+        if self.extracted_container:
+            response["extracted_container"] = self.extracted_container
+
+        # PRD-018: Include BoL auto-parse results
+        if self.bol_parse_result:
+            response["bol_parse"] = {
+                "parse_status": self.bol_parse_result.parse_status,
+                "confidence_score": self.bol_parse_result.confidence_score,
+                "auto_synced": self.bol_parse_result.auto_synced,
+                "compliance_decision": (
+                    self.bol_parse_result.compliance.decision
+                    if self.bol_parse_result.compliance
+                    else None
+                ),
+            }
+
+        return response
+
+
+def is_pdf_upload(filename: Optional[str], content_type: Optional[str]) -> bool:
+    """Whether an upload should go through the PDF pipeline."""
+    return content_type == "application/pdf" or bool(filename and filename.lower().endswith(".pdf"))
+
+
+def run_extract_stage(
+    outcome: IngestOutcome,
+    file_path: str,
+    auto_detect: bool,
+    file_hash: Optional[str] = None,
+    db: Optional[Session] = None,
+    organization_id: Optional[UUID] = None,
+) -> None:
+    """Count pages and extract text once for all later stages.
+
+    file_hash is the SHA-256 recorded at upload time; passing it avoids
+    re-reading the file just to key the extraction cache. With a db
+    session and organization_id, page text the organization already
+    stored for identical content is reused.
+    """
+    if not (outcome.is_pdf and pdf_processor.is_available()):
+        return
+
+    if db is not None and file_hash and organization_id is not None:
+        outcome.extraction = page_text_store.load_by_hash(db, file_hash, organization_id)
+        if outcome.extraction is not None:
+            logger.info(f"Reusing stored page text for {file_hash[:12]}")
+            outcome.page_count = len(outcome.extraction.pages)
+            outcome.should_auto_detect = auto_detect or outcome.page_count > AUTO_DETECT_MIN_PAGES
+            return
+
+    outcome.page_count = pdf_processor.get_page_count(file_path)
+    outcome.should_auto_detect = auto_detect or outcome.page_count > AUTO_DETECT_MIN_PAGES
+
+    # Extract text once; every downstream stage reads this artifact
+    try:
+        outcome.extraction = pdf_processor.extract_artifact(file_path, file_hash=file_hash)
+    except Exception as e:
+        logger.warning(f"Text extraction failed for {file_path}: {e}")
+
+
+async def run_extract_stage_async(
+    outcome: IngestOutcome,
+    file_path: str,
+    auto_detect: bool,
+    file_hash: Optional[str] = None,
+    db: Optional[Session] = None,
+    organization_id: Optional[UUID] = None,
+) -> None:
+    """Awaitable run_extract_stage() for async route handlers.
+
+    PDF parsing, OCR and the stored page-text lookup run on a worker
+    thread, so the event loop keeps serving other requests meanwhile. The
+    caller must not use db until this returns.
+    """
+    await asyncio.to_thread(
+        run_extract_stage, outcome, file_path, auto_detect,
+        file_hash=file_hash, db=db, organization_id=organization_id,
+    )
+
+
+def detect_sections(
+    db: Session,
+    shipment_id: UUID,
+    file_path: str,
+    extraction: Optional[ExtractionArtifact],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Analyze a PDF for document sections and flag duplicate references.
+
+    Blocks on the classifier's model calls; async route handlers use
+    detect_sections_async.
+
+    Returns:
+        (detected_contents, duplicates_found)
+    """
+    sections = document_classifier.analyze_pdf(
+        file_path, use_ai=True, extraction=extraction
+    )
+    return _section_contents(db, shipment_id, sections)
+
+
+async def detect_sections_async(
+    db: Session,
+    shipment_id: UUID,
+    file_path: str,
+    extraction: Optional[ExtractionArtifact],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Awaitable detect_sections() that does not block the event loop on the LLM."""
+    sections = await document_classifier.analyze_pdf_async(
+        file_path, use_ai=True, extraction=extraction
+    )
+    return _section_contents(db, shipment_id, sections)
+
+
+def _section_contents(
+    db: Session,
+    shipment_id: UUID,
+    sections: List[DocumentSection],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Turn classified sections into detected contents and duplicate references."""
+    detected_contents = []
+    duplicates_found = []
+
+    for section in sections:
+        detected_contents.append({
+            "document_type": section.document_type.value if section.document_type else "other",
+            "page_start": section.page_start,
+            "page_end": section.page_end,
+            "reference_number": section.reference_number,
+            "confidence": section.confidence,
+            "detection_method": section.detection_method,
+            "detected_fields": section.detected_fields
+        })
+
+        # Check for duplicates
+        if section.reference_number and section.document_type:
+            existing = db.query(ReferenceRegistry).filter(
+                ReferenceRegistry.shipment_id == shipment_id,
+                ReferenceRegistry.reference_number == section.reference_number,
+                ReferenceRegistry.document_type == section.document_type
+            ).first()
+
+            if existing:
+                duplicates_found.append({
+                    "reference_number": section.reference_number,
+                    "document_type": section.document_type.value,
+                    "existing_document_id": str(existing.document_id),
+                    "first_seen_at": existing.first_seen_at.isoformat() if existing.first_seen_at else None
+                })
+
+    return detected_contents, duplicates_found
+
+
+def select_document_type(
+    document_type: DocumentType,
+    detected_contents: List[Dict[str, Any]],
+    confidence_threshold: float,
+) -> Tuple[DocumentType, Optional[ClassificationInUpload]]:
+    """PRD-019: Auto-apply the best confident detection to an "other" upload.
+
+    Returns:
+        (final_document_type, classification_info or None if not auto-applied)
+    """
+    if document_type != DocumentType.OTHER or not detected_contents:
+        return document_type, None
+
+    # Find the highest confidence detection that's not "other"
+    best_detection = None
+    for dc in detected_contents:
+        if dc["document_type"] != "other" and dc["confidence"] >= confidence_threshold:
+            if best_detection is None or dc["confidence"] > best_detection["confidence"]:
+                best_detection = dc
+
+    if not best_detection:
+        return document_type, None
+
+    try:
+        final_document_type = DocumentType(best_detection["document_type"])
+    except ValueError:
+        return document_type, None  # Keep user's selection if AI type is invalid
+
+    logger.info(
+        "Auto-classified document as %s (confidence: %.2f)",
+        final_document_type.value,
+        best_detection["confidence"],
+    )
+    return final_document_type, ClassificationInUpload(
+        suggested_type=final_document_type.value,
+        confidence=best_detection["confidence"],
+        method=best_detection.get("detection_method", "keyword"),
+        auto_applied=True,
+    )
+
+
+def save_detected_contents(
+    db: Session,
+    document: Document,
+    shipment_id: UUID,
+    detected_contents: List[Dict[str, Any]],
+    duplicates_found: List[Dict[str, Any]],
+) -> None:
+    """Create DocumentContent rows and register new reference numbers.
+
+    All sections are inserted in one flush, then the registry rows in another.
+    """
+    contents = []
+    for dc in detected_contents:
+        doc_type_enum = DocumentType(dc["document_type"]) if dc["document_type"] != "other" else DocumentType.OTHER
+        contents.append(DocumentContent(
+            document_id=document.id,
+            document_type=doc_type_enum,
+            status=DocumentStatus.UPLOADED,
+            page_start=dc["page_start"],
+            page_end=dc["page_end"],
+            reference_number=dc.get("reference_number"),
+            confidence_score=dc["confidence"],
+            detection_method=dc["detection_method"],
+            detected_fields=dc.get("detected_fields", {})
+        ))
+    if not contents:
+        return
+    db.add_all(contents)
+    db.flush()  # Assign content ids for the registry
+
+    duplicate_refs = {d["reference_number"] for d in duplicates_found}
+    registered = set()
+    registries = []
+    for dc, content in zip(detected_contents, contents):
+        # Register reference numbers for duplicate detection (if not a duplicate)
+        ref = dc.get("reference_number")
+        if not ref or ref in duplicate_refs:
+            continue
+        key = (ref, content.document_type)
+        if key in registered:
+            continue  # Same reference detected twice in this document
+
+        # Check if reference already exists (to avoid IntegrityError on commit)
+        existing_registry = db.query(ReferenceRegistry).filter(
+            ReferenceRegistry.shipment_id == shipment_id,
+            ReferenceRegistry.reference_number == ref,
+            ReferenceRegistry.document_type == content.document_type
+        ).first()
+
+        if not existing_registry:
+            registered.add(key)
+            registries.append(ReferenceRegistry(
+                shipment_id=shipment_id,
+                reference_number=ref,
+                document_type=content.document_type,
+                document_content_id=content.id,
+                document_id=document.id,
+                first_seen_at=datetime.utcnow()
+            ))
+        else:
+            logger.info(
+                f"Reference {ref} already registered for shipment "
+                f"{shipment_id}, document type {content.document_type.value} - skipping duplicate registry"
+            )
+
+    if registries:
+        db.add_all(registries)
+        db.flush()
+
+
+def extract_bol_container(
+    document: Document,
+    shipment: Shipment,
+    file_path: str,
+    extraction: Optional[ExtractionArtifact],
+) -> Optional[Dict[str, Any]]:
+    """Extract a container number from a BoL and store it on the document.
+
+    Returns:
+        {"container_number", "confidence"} or None if nothing was found
+    """
+    extractor = ShipmentDataExtractor()
+    # Reuse the upload's extraction; fall back to reading the PDF
+    if extraction is not None:
+        pages = extraction.pages
+    else:
+        pages = pdf_processor.extract_text(file_path)
+    if not pages:
+        return None
+
+    full_text = "\n".join(page.text for page in pages)
+    result = extractor.extract_container_with_confidence(full_text)
+    if not result:
+        return None
+
+    container_number, confidence = result
+    # Store extraction metadata in document extra_data for later use
+    document.extra_data = document.extra_data or {}
+    document.extra_data["extracted_container"] = {
+        "container_number": container_number,
+        "confidence": confidence,
+        "extraction_method": "keyword"
+    }
+    flag_modified(document, "extra_data")
+    logger.info(
+        f"Extracted container {container_number} from BOL "
+        f"(confidence: {confidence:.2f}) for shipment {shipment.reference}"
+    )
+    return {
+        "container_number": container_number,
+        "confidence": confidence
+    }
+
+
+class DocumentIngestService:
+    """Runs ingest jobs on a bounded background worker pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self._max_workers = max_workers
+        self._session_factory = session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.lease = JobLease(
+            IngestJob,
+            session_factory,
+            expired_message="Interrupted by a server restart; upload the document again",
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                workers = self._max_workers or get_settings().ingest_max_workers
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, workers),
+                    thread_name_prefix="ingest",
+                )
+            return self._executor
+
+    def _new_job(
+        self,
+        document: Document,
+        shipment: Shipment,
+        requested_type: DocumentType,
+        auto_detect: bool,
+        created_by: Optional[UUID],
+    ) -> IngestJob:
+        return IngestJob(
+            document_id=document.id,
+            shipment_id=shipment.id,
+            organization_id=document.organization_id,
+            created_by=created_by,
+            status="queued",
+            options={
+                "requested_type": requested_type.value,
+                "auto_detect": auto_detect,
+            },
+            stages=[
+                {
+                    "name": name,
+                    "status": "pending",
+                    "started_at": None,
+                    "completed_at": None,
+                    "result": None,
+                    "error": None,
+                }
+                for name in INGEST_STAGES
+            ],
+        )
+
+    def create_job(
+        self,
+        db: Session,
+        document: Document,
+        shipment: Shipment,
+        requested_type: DocumentType,
+        auto_detect: bool,
+        created_by: Optional[UUID] = None,
+    ) -> IngestJob:
+        """Create a queued IngestJob for an uploaded document (caller commits)."""
+        job = self._new_job(document, shipment, requested_type, auto_detect, created_by)
+        db.add(job)
+        db.flush()
+        return job
+
+    def create_jobs(
+        self,
+        db: Session,
+        documents: List[Document],
+        shipment: Shipment,
+        requested_type: DocumentType,
+        auto_detect: bool,
+        created_by: Optional[UUID] = None,
+    ) -> List[IngestJob]:
+        """Create queued IngestJobs for a batch of documents in one flush (caller commits)."""
+        jobs = [
+            self._new_job(document, shipment, requested_type, auto_detect, created_by)
+            for document in documents
+        ]
+        db.add_all(jobs)
+        db.flush()
+        return jobs
+
+    def submit(self, job_id: UUID) -> Future:
+        """Queue a committed job on the worker pool."""
+        return self._get_executor().submit(self.run_job, job_id)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the worker pool (interrupted jobs are handled by recover_jobs)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+    def recover_jobs(self, db: Optional[Session] = None) -> Tuple[int, int]:
+        """Resume jobs interrupted by a worker stopping; call once at startup.
+
+        Jobs still "queued" are submitted again; if another worker also
+        submits them, only the first to claim a job runs it. Jobs
+        "running" whose lease lapsed lost their worker mid-way and are
+        marked failed, so pollers stop waiting. Jobs whose worker stops
+        later are failed by the lease's periodic sweep.
+
+        Returns:
+            (re-queued, failed) counts
+        """
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            failed = self.lease.expire(db)
+            queued = [
+                job_id for (job_id,) in db.query(IngestJob.id)
+                .filter(IngestJob.status == "queued")
+                .order_by(IngestJob.created_at.asc())
+            ]
+        finally:
+            if owns_session:
+                db.close()
+
+        for job_id in queued:
+            self.submit(job_id)
+        self.lease.start()
+        if queued or failed:
+            logger.info(f"Recovered ingest jobs: {len(queued)} re-queued, {failed} failed")
+        return len(queued), failed
+
+    def run_job(self, job_id: UUID, db: Optional[Session] = None) -> None:
+        """Run all stages of a job, committing progress after each stage."""
+        owns_session = db is None
+        db = db or self._session_factory()
+        try:
+            self._run(db, job_id)
+        except Exception as e:
+            logger.exception(f"Ingest job {job_id} failed: {e}")
+            db.rollback()
+            self.lease.finish(
+                db, job_id,
+                status="failed",
+                error_message=str(e),
+                completed_at=datetime.utcnow(),
+            )
+        finally:
+            if owns_session:
+                db.close()
+
+    def _run(self, db: Session, job_id: UUID) -> None:
+        # Claim the job, so a job re-submitted by several API workers'
+        # recover_jobs() runs once
+        if not self.lease.claim(db, job_id):
+            logger.info(f"Ingest job {job_id} not found or already started")
+            return
+        job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+
+        document = db.query(Document).filter(Document.id == job.document_id).first()
+        shipment = db.query(Shipment).filter(Shipment.id == job.shipment_id).first()
+        if not document or not shipment:
+            raise ValueError("Document or shipment no longer exists")
+
+        options = job.options or {}
+        requested_type = DocumentType(options.get("requested_type", document.document_type.value))
+        auto_detect = bool(options.get("auto_detect", False))
+        file_path = document.file_path
+        outcome = IngestOutcome(
+            requested_type=requested_type,
+            final_document_type=requested_type,
+            is_pdf=is_pdf_upload(document.file_name, document.mime_type),
+        )
+
+        def is_bol() -> bool:
+            return outcome.final_document_type == DocumentType.BILL_OF_LADING
+
+        def extract() -> Optional[Dict[str, Any]]:
+            run_extract_stage(
+                outcome, file_path, auto_detect, file_hash=document.file_hash,
+                db=db, organization_id=document.organization_id,
+            )
+            if outcome.extraction is not None:
+                page_text_store.save(db, document, outcome.extraction)
+            return {
+                "page_count": outcome.page_count,
+                "extraction_method": outcome.extraction.extraction_method if outcome.extraction else None,
+                "ocr_pages": outcome.extraction.ocr_pages if outcome.extraction else [],
+            }
+
+        def detect() -> Optional[Dict[str, Any]]:
+            outcome.detected_contents, outcome.duplicates_found = detect_sections(
+                db, shipment.id, file_path, outcome.extraction
+            )
+            outcome.final_document_type, outcome.classification_info = select_document_type(
+                requested_type,
+                outcome.detected_contents,
+                get_settings().classification_confidence_threshold,
+            )
+            if outcome.classification_info:
+                document.document_type = outcome.final_document_type
+                document.classification_confidence = outcome.classification_info.confidence
+                document.classification_method = outcome.classification_info.method
+            save_detected_contents(
+                db, document, shipment.id, outcome.detected_contents, outcome.duplicates_found
+            )
+            return {
+                "detected_contents": outcome.detected_contents,
+                "duplicates_found": outcome.duplicates_found,
+                "document_type": outcome.final_document_type.value,
+            }
+
+        def enrich() -> Optional[Dict[str, Any]]:
+            outcome.enrichment_result = shipment_enrichment_service.enrich_from_document(
+                shipment=shipment,
+                document=document,
+                db=db,
+                auto_create_products=True,
+                overwrite_existing=False,
+                extraction=outcome.extraction,
+            )
+            return {
+                "success": outcome.enrichment_result.success,
+                "updates_applied": outcome.enrichment_result.updates_applied,
+            }
+
+        def container() -> Optional[Dict[str, Any]]:
+            outcome.extracted_container = extract_bol_container(
+                document, shipment, file_path, outcome.extraction
+            )
+            return outcome.extracted_container
+
+        def bol_parse() -> Optional[Dict[str, Any]]:
+            outcome.bol_parse_result = auto_parse_bol(
+                document, db, auto_sync=True, extraction=outcome.extraction
+            )
+            return {
+                "parse_status": outcome.bol_parse_result.parse_status,
+                "confidence_score": outcome.bol_parse_result.confidence_score,
+                "auto_synced": outcome.bol_parse_result.auto_synced,
+            }
+
+        def pdf_ready() -> bool:
+            return outcome.is_pdf and pdf_processor.is_available()
+
+        plan: List[Tuple[str, Callable[[], Optional[Dict[str, Any]]], Callable[[], bool]]] = [
+            ("extract", extract, lambda: outcome.is_pdf),
+            ("detect", detect, lambda: pdf_ready() and outcome.should_auto_detect),
+            ("enrich", enrich, pdf_ready),
+            ("container", container, lambda: pdf_ready() and is_bol()),
+            ("bol_parse", bol_parse, lambda: outcome.is_pdf and is_bol()),
+        ]
+
+        for name, run_stage, should_run in plan:
+            if should_run():
+                self._run_stage(db, job, name, run_stage)
+            else:
+                self._update_stage(db, job, name, status="skipped")
+
+        db.refresh(document)
+        self.lease.finish(
+            db, job.id,
+            status="completed",
+            result=jsonable_encoder(outcome.to_response(document)),
+            completed_at=datetime.utcnow(),
+        )
+
+    def _run_stage(
+        self,
+        db: Session,
+        job: IngestJob,
+        name: str,
+        run_stage: Callable[[], Optional[Dict[str, Any]]],
+    ) -> None:
+        """Run one stage; failures are recorded but never stop the pipeline."""
+        self._update_stage(db, job, name, status="running", started_at=datetime.utcnow().isoformat())
+        try:
+            result = run_stage()
+        except Exception as e:
+            logger.warning(f"Ingest stage {name} failed for job {job.id} (non-blocking): {e}")
+            db.rollback()
+            self._update_stage(
+                db, job, name,
+                status="failed",
+                error=str(e),
+                completed_at=datetime.utcnow().isoformat(),
+            )
+            return
+
+        self._update_stage(
+            db, job, name,
+            status="completed",
+            result=jsonable_encoder(result),
+            completed_at=datetime.utcnow().isoformat(),
+        )
+
+    @staticmethod
+    def _update_stage(db: Session, job: IngestJob, name: str, **changes: Any) -> None:
+        """Update one stage entry and commit so progress is visible to pollers."""
+        stages = [dict(s) for s in (job.stages or [])]
+        for stage in stages:
+            if stage["name"] == name:
+                stage.update(changes)
+        job.stages = stages
+        db.commit()
+
+
+# Global instance
+document_ingest_service = DocumentIngestService()
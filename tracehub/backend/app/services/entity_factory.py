@@ -111,6 +111,7 @@ def create_document(
     file_name: Optional[str] = None,
     file_size: Optional[int] = None,
     mime_type: Optional[str] = None,
+    file_hash: Optional[str] = None,
     document_date: Optional[datetime] = None,
     expiry_date: Optional[datetime] = None,
     issuer: Optional[str] = None,
@@ -133,6 +134,7 @@ def create_document(
         file_name: Original filename
         file_size: File size in bytes
         mime_type: MIME type (e.g., "application/pdf")
+        file_hash: SHA-256 hex digest of the file content
         document_date: Date on the document
         expiry_date: Document expiry date
         issuer: Issuing authority/organization
@@ -162,6 +164,7 @@ def create_document(
         file_name=file_name,
         file_size=file_size,
         mime_type=mime_type,
+        file_hash=file_hash,
         document_date=document_date,
         expiry_date=expiry_date,
         issuer=issuer,
@@ -5,6 +5,7 @@ the application, ensuring consistency between upload, download, deletion,
 and audit pack generation.
 """
 
+import hashlib
 import os
 from typing import Optional
 
@@ -73,6 +74,23 @@ def get_file_size(file_path: Optional[str]) -> Optional[int]:
     return os.path.getsize(full_path)
 
 
+def compute_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in chunks.
+
+    Args:
+        file_path: Absolute or backend-relative path to the file.
+        chunk_size: Bytes read per iteration (default 1 MiB).
+
+    Returns:
+        Lowercase hex SHA-256 digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(get_full_path(file_path), "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def delete_file(file_path: Optional[str]) -> bool:
     """Delete a document file from disk.
 
@@ -0,0 +1,182 @@
+"""Leases for background jobs run by several API processes.
+
+Production runs more than one API worker process, and any of them may pick
+up a queued job row. A worker claims a job by moving it from "queued" to
+"running" in one conditional UPDATE, so two workers never run the same
+job. While it runs the job it keeps the row's heartbeat_at fresh; a
+"running" job whose heartbeat is older than the lease belonged to a worker
+that crashed, restarted or was redeployed, and is marked failed so its
+pollers get an answer.
+
+One daemon thread per JobLease refreshes the heartbeats of the jobs this
+process holds and sweeps for expired ones, so a job is never failed while
+its worker is alive, however long a single stage takes.
+
+The job model needs status, started_at, heartbeat_at, completed_at and
+error_message columns.
+
+Usage:
+    lease = JobLease(IngestJob, SessionLocal, expired_message="...")
+
+    if not lease.claim(db, job_id):
+        return  # Another worker has it
+    try:
+        ...
+    finally:
+        lease.finish(db, job_id, status="completed", completed_at=datetime.utcnow())
+
+    # At startup
+    lease.expire(db)
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobLease:
+    """Claims, heartbeats and expires rows of one background job model."""
+
+    def __init__(
+        self,
+        model: Any,
+        session_factory: Callable[[], Session],
+        expired_message: str,
+        lease_seconds: Optional[float] = None,
+    ):
+        self.model = model
+        self._session_factory = session_factory
+        self.expired_message = expired_message
+        self._lease_seconds = lease_seconds
+        self._held: Set[UUID] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def lease_seconds(self) -> float:
+        return self._lease_seconds or get_settings().background_job_lease_seconds
+
+    def claim(self, db: Session, job_id: UUID) -> bool:
+        """Move a queued job to running for this process (commits).
+
+        Returns:
+            False if the job does not exist or another worker claimed it
+        """
+        now = datetime.utcnow()
+        claimed = (
+            db.query(self.model)
+            .filter(self.model.id == job_id, self.model.status == "queued")
+            .update(
+                {"status": "running", "started_at": now, "heartbeat_at": now},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            with self._lock:
+                self._held.add(job_id)
+            self.start()
+        return bool(claimed)
+
+    def finish(self, db: Session, job_id: UUID, **values: Any) -> bool:
+        """Write a claimed job's final state and stop heartbeating it (commits).
+
+        Nothing is written if the job is no longer running, e.g. because
+        its lease expired, so a failure recorded by expire() is never
+        overwritten.
+
+        Returns:
+            True if the job was still running and has been updated
+        """
+        with self._lock:
+            self._held.discard(job_id)
+        finished = (
+            db.query(self.model)
+            .filter(self.model.id == job_id, self.model.status == "running")
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        if not finished:
+            logger.warning(f"{self.model.__name__} {job_id} was no longer running; final state dropped")
+        return bool(finished)
+
+    def expire(self, db: Session) -> int:
+        """Mark running jobs whose lease lapsed as failed (commits).
+
+        Returns:
+            Number of jobs failed
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        expired = (
+            db.query(self.model)
+            .filter(
+                self.model.status == "running",
+                func.coalesce(self.model.heartbeat_at, self.model.started_at) < cutoff,
+            )
+            .update(
+                {
+                    "status": "failed",
+                    "error_message": self.expired_message,
+                    "completed_at": datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return expired
+
+    def heartbeat(self, db: Session) -> None:
+        """Refresh the leases of every job this process holds (commits)."""
+        with self._lock:
+            held = list(self._held)
+        if not held:
+            return
+        db.query(self.model).filter(
+            self.model.id.in_(held), self.model.status == "running"
+        ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+    def start(self) -> None:
+        """Start the heartbeat and expiry thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"lease-{self.model.__tablename__}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat thread; held jobs expire unless finished elsewhere."""
+        self._stop.set()
+        with self._lock:
+            self._held.clear()
+            self._thread = None
+
+    def _run(self) -> None:
+        # Beat several times per lease so one slow round trip never lets it lapse
+        while not self._stop.wait(self.lease_seconds / 4):
+            db = self._session_factory()
+            try:
+                self.heartbeat(db)
+                expired = self.expire(db)
+                if expired:
+                    logger.info(f"Failed {expired} {self.model.__tablename__} whose worker stopped")
+            except Exception as e:
+                logger.warning(f"Lease refresh for {self.model.__tablename__} failed: {e}")
+                db.rollback()
+            finally:
+                db.close()
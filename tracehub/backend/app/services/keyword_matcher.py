@@ -0,0 +1,196 @@
+"""Single-pass multi-pattern matcher for document type detection.
+
+Document type scoring, boundary detection and reference extraction used
+to scan the same text once per keyword, per boundary pattern and per
+reference pattern. This module builds one Aho-Corasick automaton over all
+keywords and boundary anchors, once at import, and reports every hit
+with its offsets in a single pass over the lower-cased text:
+
+- Overlapping hits are all reported ("sanitary and phytosanitary" also
+  yields "phytosanitary", "customs declaration" also yields "customs").
+- Boundary patterns that are not plain literals (e.g.
+  "certificate of quality.*fumigation") are indexed by their literal
+  prefix and verified with the full pattern only at anchor hits.
+- Reference patterns are compiled per document type into one ordered
+  alternation that preserves pattern priority (the first pattern that
+  matches anywhere wins, at its leftmost match). They are resolved only
+  for the type a section is classified as: these patterns start with
+  short, common prefixes ("CI", "PC", "SC"), so folding every type's
+  patterns into the shared scan would cost more than it saves.
+
+Matching is equivalent to the previous `keyword in text.lower()` checks
+(except next to the rare characters whose lower case is two characters
+long, which are left as-is so that offsets index the original text).
+pyahocorasick is optional; without it each term is located with
+str.find, which returns the same hits in one pass per term.
+
+Usage:
+    from app.services.keyword_matcher import DocumentPatternMatcher
+
+    matcher = DocumentPatternMatcher(DOCUMENT_KEYWORDS, BOUNDARY_PATTERNS, REFERENCE_PATTERNS)
+    hits = matcher.scan(text)
+    matched = matcher.matched_keywords(hits)  # {doc_type: {keyword, ...}}
+    ref = matcher.extract_reference(text, DocumentType.BILL_OF_LADING)
+"""
+
+import re
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from .regex_registry import regex_registry
+
+# Characters that end the literal prefix of a boundary pattern
+_REGEX_METACHARS = set(".^$*+?{}[]\\|()")
+
+
+class PatternHit(NamedTuple):
+    """One occurrence of a keyword or boundary anchor in the scanned text."""
+    term: str  # Lower-case keyword / anchor literal
+    start: int
+    end: int
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading literal characters of a regex pattern."""
+    prefix = []
+    for ch in pattern:
+        if ch in _REGEX_METACHARS:
+            break
+        prefix.append(ch)
+    return "".join(prefix)
+
+
+class DocumentPatternMatcher:
+    """Compiled keyword, boundary and reference patterns for document detection."""
+
+    def __init__(
+        self,
+        keywords: Dict[Hashable, List[str]],
+        boundary_patterns: List[str],
+        reference_patterns: Dict[Hashable, List[str]],
+    ):
+        self.keywords = {key: [kw.lower() for kw in kws] for key, kws in keywords.items()}
+
+        # term -> keys whose keyword list contains it
+        self._term_keys: Dict[str, List[Hashable]] = {}
+        for key, kws in self.keywords.items():
+            for kw in kws:
+                self._term_keys.setdefault(kw, [])
+                if key not in self._term_keys[kw]:
+                    self._term_keys[kw].append(key)
+
+        # anchor literal -> full patterns to verify (None for plain literals)
+        self._boundary_anchors: Dict[str, List[Optional[re.Pattern]]] = {}
+        for pattern in boundary_patterns:
+            pattern = pattern.lower()
+            anchor = _literal_prefix(pattern)
+            if not anchor:
+                raise ValueError(f"Boundary pattern needs a literal prefix: {pattern!r}")
+            verify = None if anchor == pattern else regex_registry.compile(pattern, re.IGNORECASE)
+            self._boundary_anchors.setdefault(anchor, []).append(verify)
+
+        self._terms = sorted(set(self._term_keys) | set(self._boundary_anchors))
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for term in self._terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+
+        self._reference_res: Dict[Hashable, Tuple[re.Pattern, List[Tuple[int, int]]]] = {
+            key: self._compile_references(patterns)
+            for key, patterns in reference_patterns.items()
+        }
+
+    @staticmethod
+    def _compile_references(patterns: List[str]) -> Tuple[re.Pattern, List[Tuple[int, int]]]:
+        """One lookahead alternation of patterns in priority order.
+
+        Returns the compiled regex and, per pattern, (wrapper group index,
+        number of the pattern's own capture groups).
+        """
+        groups = []
+        index = 1
+        for pattern in patterns:
+            inner = regex_registry.compile(pattern, re.IGNORECASE).groups
+            groups.append((index, inner))
+            index += 1 + inner
+        combined = "|".join(f"({p})" for p in patterns)
+        return regex_registry.compile(f"(?=(?:{combined}))", re.IGNORECASE), groups
+
+    def scan(self, text: str, start: int = 0, end: Optional[int] = None) -> List[PatternHit]:
+        """Find every keyword and boundary anchor in text[start:end], with offsets."""
+        segment = text[start:end]
+        low = segment.lower()
+        if len(low) != len(segment):
+            # A few characters lower-case to two ("İ"); keep offsets aligned
+            low = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in segment)
+        hits = []
+        if self._automaton is not None:
+            for last, term in self._automaton.iter(low):
+                pos = start + last - len(term) + 1
+                hits.append(PatternHit(term, pos, pos + len(term)))
+            return hits
+
+        for term in self._terms:
+            pos = low.find(term)
+            while pos != -1:
+                hits.append(PatternHit(term, start + pos, start + pos + len(term)))
+                pos = low.find(term, pos + 1)
+        return hits
+
+    def matched_keywords(self, hits: Iterable[PatternHit]) -> Dict[Hashable, Set[str]]:
+        """Distinct keywords found per key, in keyword-table order."""
+        found: Dict[Hashable, Set[str]] = {}
+        for term in {hit.term for hit in hits}:
+            for key in self._term_keys.get(term, ()):
+                found.setdefault(key, set()).add(term)
+        return {key: found[key] for key in self.keywords if key in found}
+
+    def has_boundary(self, text: str, hits: Iterable[PatternHit], start: int, limit: int) -> bool:
+        """Whether a boundary pattern matches entirely within text[start:start + limit]."""
+        window_end = start + limit
+        for hit in hits:
+            if hit.start < start or hit.end > window_end:
+                continue
+            for verify in self._boundary_anchors.get(hit.term, ()):
+                if verify is None or verify.match(text, hit.start, window_end):
+                    return True
+        return False
+
+    def extract_reference(
+        self,
+        text: str,
+        key: Hashable,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Optional[str]:
+        """Reference number for key from text[start:end], honouring pattern order."""
+        compiled = self._reference_res.get(key)
+        if compiled is None:
+            return None
+        regex, groups = compiled
+        end = len(text) if end is None else end
+
+        best = None  # (pattern index, match)
+        for m in regex.finditer(text, start, end):
+            for i, (group, inner) in enumerate(groups):
+                if m.group(group) is not None:
+                    break
+            if best is None or i < best[0]:
+                best = (i, m)
+                if i == 0:
+                    break  # Highest-priority pattern at its leftmost match
+
+        if best is None:
+            return None
+        i, m = best
+        group, inner = groups[i]
+        if inner and any(m.group(g) is not None for g in range(group + 1, group + inner + 1)):
+            return m.group(group + 1)
+        return m.group(group)
@@ -0,0 +1,198 @@
+"""Latency and fault simulation for the mock/local backends.
+
+The mock LLM, local storage and mock customs/banking backends answer
+instantly, so load tests against them say nothing about production,
+where provider latency, rate limits and errors dominate. With
+simulation_enabled, the backend factories give each of these backends
+a LatencySimulator that, per call:
+
+1. refuses the call with SimulatedRateLimit when max_in_flight calls
+   are already running (provider back-pressure), or at random
+   with probability rate_limit_rate
+2. waits for a delay drawn from a log-normal distribution with the
+   configured median and p95
+3. fails with SimulatedError with probability error_rate, before the
+   backend does any work (nothing is written for a failed upload)
+
+Profiles are read from settings per component ("llm", "storage",
+"customs", "banking"): sim_<component>_latency_ms,
+sim_<component>_latency_p95_ms, sim_<component>_error_rate,
+sim_<component>_rate_limit_rate and sim_<component>_max_in_flight.
+
+Usage:
+    from app.services.latency_sim import get_simulator
+
+    simulator = get_simulator("storage")  # None unless simulation_enabled
+
+    with simulator.call():            # sync backends
+        ...
+    async with simulator.acall():     # async backends
+        ...
+"""
+
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ("llm", "storage", "customs", "banking")
+
+# z-score of the 95th percentile of a standard normal distribution
+_Z95 = 1.6449
+
+
+class SimulatedError(Exception):
+    """A simulated provider failure (HTTP 503)."""
+
+    status_code = 503
+
+
+class SimulatedRateLimit(SimulatedError):
+    """A simulated rate-limit response (HTTP 429)."""
+
+    status_code = 429
+
+
+@dataclass
+class SimulationProfile:
+    """Latency distribution and fault rates for one component."""
+
+    latency_ms: float = 0.0  # Median delay
+    latency_p95_ms: float = 0.0  # 95th percentile delay (<= median: fixed delay)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    max_in_flight: int = 0  # Concurrent calls before rate limiting (0 = unlimited)
+
+    @classmethod
+    def from_settings(cls, component: str) -> "SimulationProfile":
+        settings = get_settings()
+        return cls(
+            latency_ms=getattr(settings, f"sim_{component}_latency_ms"),
+            latency_p95_ms=getattr(settings, f"sim_{component}_latency_p95_ms"),
+            error_rate=getattr(settings, f"sim_{component}_error_rate"),
+            rate_limit_rate=getattr(settings, f"sim_{component}_rate_limit_rate"),
+            max_in_flight=getattr(settings, f"sim_{component}_max_in_flight"),
+        )
+
+
+class LatencySimulator:
+    """Injects delays, errors and rate limits into a backend's calls (thread-safe)."""
+
+    def __init__(
+        self,
+        name: str,
+        profile: SimulationProfile,
+        rng: Optional[random.Random] = None,
+    ):
+        self.name = name
+        self.profile = profile
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._calls = 0
+        self._errors = 0
+        self._rate_limited = 0
+        self._delay_ms_total = 0.0
+
+        # Log-normal parameters from median and p95
+        self._mu = math.log(profile.latency_ms) if profile.latency_ms > 0 else None
+        if self._mu is not None and profile.latency_p95_ms > profile.latency_ms:
+            self._sigma = (math.log(profile.latency_p95_ms) - self._mu) / _Z95
+        else:
+            self._sigma = 0.0
+
+    def sample_delay(self) -> float:
+        """Draw one delay in seconds."""
+        if self._mu is None:
+            return 0.0
+        with self._lock:
+            delay_ms = self._rng.lognormvariate(self._mu, self._sigma)
+        return delay_ms / 1000
+
+    def _admit(self) -> Tuple[float, bool]:
+        """Start a call: apply back-pressure, return its delay and whether it fails."""
+        with self._lock:
+            self._calls += 1
+            over_capacity = 0 < self.profile.max_in_flight <= self._in_flight
+            if over_capacity or self._rng.random() < self.profile.rate_limit_rate:
+                self._rate_limited += 1
+                raise SimulatedRateLimit(
+                    f"Error code: 429 - {self.name} rate limit exceeded (simulated)"
+                )
+            self._in_flight += 1
+            fails = self._rng.random() < self.profile.error_rate
+            if fails:
+                self._errors += 1
+        delay = self.sample_delay()
+        with self._lock:
+            self._delay_ms_total += delay * 1000
+        return delay, fails
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _error(self) -> SimulatedError:
+        return SimulatedError(f"Error code: 503 - {self.name} unavailable (simulated)")
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """Simulate one blocking call; the block runs only if the call succeeds."""
+        delay, fails = self._admit()
+        try:
+            time.sleep(delay)
+            if fails:
+                raise self._error()
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def acall(self) -> AsyncIterator[None]:
+        """Simulate one call without blocking the event loop."""
+        delay, fails = self._admit()
+        try:
+            await asyncio.sleep(delay)
+            if fails:
+                raise self._error()
+            yield
+        finally:
+            self._release()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Profile and counters for status endpoints."""
+        with self._lock:
+            completed = self._calls - self._rate_limited
+            return {
+                "profile": asdict(self.profile),
+                "calls": self._calls,
+                "in_flight": self._in_flight,
+                "errors": self._errors,
+                "rate_limited": self._rate_limited,
+                "mean_delay_ms": round(self._delay_ms_total / completed, 1) if completed else 0.0,
+            }
+
+
+def get_simulator(component: str) -> Optional[LatencySimulator]:
+    """Simulator for a component from settings, or None when simulation is off."""
+    if component not in COMPONENTS:
+        raise ValueError(f"Unknown simulated component: {component}")
+
+    settings = get_settings()
+    if not settings.simulation_enabled:
+        return None
+
+    rng = random.Random(settings.simulation_seed + COMPONENTS.index(component)) \
+        if settings.simulation_seed else None
+    simulator = LatencySimulator(component, SimulationProfile.from_settings(component), rng)
+    logger.warning("Simulating %s latency and faults: %s", component, simulator.profile)
+    return simulator
@@ -7,6 +7,8 @@ Implementations:
 - AnthropicBackend: Claude (default)
 - MockLLMBackend: Tests
 - Future: OpenAIBackend, etc.
+
+AsyncLLMBackend is the same interface with awaitable model calls.
 """
 
 from dataclasses import dataclass, field
@@ -48,6 +50,17 @@ class LLMBackend(Protocol):
         """
         ...
 
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Classify several short documents in one request.
+
+        Args:
+            texts: Extracted texts, each classified independently.
+
+        Returns:
+            One result per text, in order (None where classification failed).
+        """
+        ...
+
     def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
         """General-purpose text completion.
 
@@ -71,3 +84,36 @@ class LLMBackend(Protocol):
     def get_status(self) -> Dict[str, object]:
         """Return detailed status information."""
         ...
+
+
+class AsyncLLMBackend(Protocol):
+    """Async variant of LLMBackend.
+
+    Used where several model calls are made concurrently (e.g. one per
+    section of a combined PDF). Any LLMBackend can be adapted with
+    llm_async.as_async_backend().
+    """
+
+    async def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        """Classify a document from its text content (see LLMBackend)."""
+        ...
+
+    async def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Classify several short documents in one request (see LLMBackend)."""
+        ...
+
+    async def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        """General-purpose text completion (see LLMBackend)."""
+        ...
+
+    def is_available(self) -> bool:
+        """Check if the LLM backend is operational."""
+        ...
+
+    def get_provider_name(self) -> str:
+        """Return the provider identifier (e.g. 'anthropic', 'openai')."""
+        ...
+
+    def get_status(self) -> Dict[str, object]:
+        """Return detailed status information."""
+        ...
@@ -1,16 +1,29 @@
 """Anthropic (Claude) LLM backend implementation (PRD-019).
 
 Uses the Anthropic Python SDK for document classification
-and general text completion. Reads config from pydantic-settings.
+(one extract or a batch per request) and general text completion.
+
+- AnthropicBackend: synchronous client (LLMBackend)
+- AsyncAnthropicBackend: pooled async client with deadlines, retries and
+  a circuit breaker (AsyncLLMBackend; the default, see llm_factory)
+
+Reads config from pydantic-settings.
 """
 
+import asyncio
 import json
 import logging
+import random
 from typing import Dict, List, Optional
 
+import httpx
+
 from ..config import get_settings
 from ..models.document import DocumentType
+from .circuit_breaker import CircuitBreaker
 from .llm import ClassificationResult
+from .llm_async import on_llm_loop
+from .llm_metrics import mark_outcome, record_usage
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +37,7 @@ except ImportError:
     anthropic = None  # type: ignore[assignment]
 
 
-CLASSIFICATION_PROMPT = """You are analyzing a document extract from a shipping/export PDF.
-Identify what type of document this is based on the content.
-
-Document types to choose from:
+DOCUMENT_TYPE_CHOICES = """Document types to choose from:
 - bill_of_lading: Ocean bill of lading, transport document
 - commercial_invoice: Commercial invoice, sales invoice
 - packing_list: Packing list, cargo details
@@ -44,7 +54,12 @@ Document types to choose from:
 - veterinary_health_certificate: Veterinary health certificate from origin country
 - export_declaration: Export declaration / NXP form
 - other: Unknown or cannot determine
+"""
 
+CLASSIFICATION_PROMPT = """You are analyzing a document extract from a shipping/export PDF.
+Identify what type of document this is based on the content.
+
+""" + DOCUMENT_TYPE_CHOICES + """
 Extract from document:
 ---
 {text}
@@ -66,21 +81,62 @@ Respond in JSON format:
 }}
 """
 
+BATCH_CLASSIFICATION_PROMPT = """You are analyzing {count} document extracts from shipping/export PDFs.
+Each extract is a separate document. Identify the type of each one independently,
+based only on its own content.
+
+""" + DOCUMENT_TYPE_CHOICES + """
+{extracts}
+
+Respond with a JSON array of exactly {count} objects, one per extract, in order:
+[
+  {{
+    "extract": 1,
+    "document_type": "type_name",
+    "confidence": 0.0 to 1.0,
+    "reference_number": "extracted reference number or null",
+    "key_fields": {{
+      "issuer": "issuing authority/company",
+      "date": "document date if found"
+    }},
+    "reasoning": "Brief explanation of why this type was chosen",
+    "alternatives": [
+      {{"document_type": "other_possible_type", "confidence": 0.0 to 1.0}}
+    ]
+  }}
+]
+"""
+
+BATCH_EXTRACT_TEMPLATE = """Extract {number}:
+---
+{text}
+---
+"""
+
+# Bump when CLASSIFICATION_PROMPT changes; cached classifications are keyed by it
+CLASSIFICATION_PROMPT_VERSION = "1"
+
 # Maximum text to send to the model
 MAX_TEXT_LENGTH = 4000
 
+# Response tokens allowed per extract in a batched prompt
+BATCH_TOKENS_PER_EXTRACT = 500
+BATCH_MAX_RESPONSE_TOKENS = 8192
+
 
-class AnthropicBackend:
-    """Claude LLM backend via Anthropic API.
+class _AnthropicBase:
+    """Settings, status and response parsing shared by the Anthropic backends.
 
     Reads API key and model name from pydantic-settings config.
     Falls back gracefully if the library or API key is missing.
     """
 
+    prompt_version = CLASSIFICATION_PROMPT_VERSION
+
     def __init__(self) -> None:
-        self._client: Optional[object] = None
         self._available = False
         self._last_error: Optional[str] = None
+        self._api_key = ""
 
         settings = get_settings()
         api_key = settings.anthropic_api_key
@@ -99,62 +155,7 @@ class AnthropicBackend:
             logger.warning("ANTHROPIC_API_KEY not set — LLM unavailable")
             return
 
-        try:
-            self._client = anthropic.Anthropic(api_key=raw_key)
-            self._available = True
-            logger.info(
-                "AnthropicBackend initialized (model=%s)", self._model
-            )
-        except Exception as exc:
-            self._last_error = str(exc)
-            logger.error("Failed to initialize Anthropic client: %s", exc)
-
-    # --- LLMBackend Protocol ---
-
-    def classify_document(self, text: str) -> Optional[ClassificationResult]:
-        """Classify a document using Claude."""
-        if not self._client:
-            return None
-
-        text_preview = text[:MAX_TEXT_LENGTH]
-        prompt = CLASSIFICATION_PROMPT.format(text=text_preview)
-
-        try:
-            message = self._client.messages.create(  # type: ignore[union-attr]
-                model=self._model,
-                max_tokens=600,
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            response_text = self._extract_text(message)
-            if not response_text:
-                return None
-
-            data = self._parse_json(response_text)
-            if not data:
-                return None
-
-            return self._build_result(data)
-
-        except Exception as exc:
-            self._handle_error(exc)
-            return None
-
-    def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
-        """General text completion via Claude."""
-        if not self._client:
-            return None
-
-        try:
-            message = self._client.messages.create(  # type: ignore[union-attr]
-                model=self._model,
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            return self._extract_text(message)
-        except Exception as exc:
-            self._handle_error(exc)
-            return None
+        self._api_key = raw_key
 
     def is_available(self) -> bool:
         """Check if the Anthropic backend is operational."""
@@ -227,6 +228,60 @@ class AnthropicBackend:
             logger.warning("Failed to parse JSON from LLM response")
             return None
 
+    @staticmethod
+    def _batch_prompt(texts: List[str]) -> str:
+        """Build the batched classification prompt for several extracts."""
+        extracts = "\n".join(
+            BATCH_EXTRACT_TEMPLATE.format(number=i, text=text[:MAX_TEXT_LENGTH])
+            for i, text in enumerate(texts, 1)
+        )
+        return BATCH_CLASSIFICATION_PROMPT.format(count=len(texts), extracts=extracts)
+
+    @staticmethod
+    def _batch_max_tokens(count: int) -> int:
+        return min(BATCH_TOKENS_PER_EXTRACT * count, BATCH_MAX_RESPONSE_TOKENS)
+
+    @staticmethod
+    def _parse_json_array(text: str) -> Optional[List]:
+        """Extract a JSON array from model response text."""
+        json_text = text
+        if "```" in text:
+            parts = text.split("```")
+            if len(parts) >= 2:
+                json_text = parts[1].removeprefix("json")
+
+        start = json_text.find("[")
+        end = json_text.rfind("]")
+        if start != -1 and end > start:
+            json_text = json_text[start : end + 1]
+
+        try:
+            data = json.loads(json_text.strip())
+        except (json.JSONDecodeError, ValueError):
+            logger.warning("Failed to parse JSON array from LLM response")
+            return None
+        return data if isinstance(data, list) else None
+
+    def _assign_batch_results(
+        self, items: List, count: int
+    ) -> List[Optional[ClassificationResult]]:
+        """Map batch answers to extracts by their "extract" number (or position)."""
+        results: List[Optional[ClassificationResult]] = [None] * count
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            try:
+                index = int(item.get("extract", position + 1)) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < count and results[index] is None:
+                results[index] = self._build_result(item)
+
+        missing = results.count(None)
+        if missing:
+            logger.warning("Batch classification omitted %d of %d extracts", missing, count)
+        return results
+
     def _build_result(self, data: Dict) -> ClassificationResult:
         """Build a ClassificationResult from parsed JSON."""
         type_str = data.get("document_type", "other")
@@ -260,13 +315,295 @@ class AnthropicBackend:
     def _handle_error(self, exc: Exception) -> None:
         """Categorize and log API errors."""
         error_str = str(exc).lower()
-        if "credit" in error_str or "insufficient" in error_str:
+        outcome = "error"
+        if isinstance(exc, TimeoutError) or "timed out" in error_str:
+            self._last_error = "Timed out"
+            outcome = "timeout"
+        elif "credit" in error_str or "insufficient" in error_str:
             self._last_error = "API credits exhausted"
         elif "rate limit" in error_str or "429" in error_str:
             self._last_error = "Rate limited"
+            outcome = "rate_limited"
         elif "authentication" in error_str or "401" in error_str:
             self._available = False
             self._last_error = "Invalid API key"
         else:
             self._last_error = str(exc)
-        logger.error("Anthropic API error: %s", exc)
+        mark_outcome(outcome)
+        logger.error("Anthropic API error: %s", exc or type(exc).__name__)
+
+
+class AnthropicBackend(_AnthropicBase):
+    """Claude LLM backend via the synchronous Anthropic client."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._client: Optional[object] = None
+        if not self._api_key:
+            return
+
+        try:
+            self._client = anthropic.Anthropic(api_key=self._api_key)
+            self._available = True
+            logger.info(
+                "AnthropicBackend initialized (model=%s)", self._model
+            )
+        except Exception as exc:
+            self._last_error = str(exc)
+            logger.error("Failed to initialize Anthropic client: %s", exc)
+
+    # --- LLMBackend Protocol ---
+
+    def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        """Classify a document using Claude."""
+        if not self._client:
+            return None
+
+        text_preview = text[:MAX_TEXT_LENGTH]
+        prompt = CLASSIFICATION_PROMPT.format(text=text_preview)
+
+        try:
+            message = self._client.messages.create(  # type: ignore[union-attr]
+                model=self._model,
+                max_tokens=600,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            record_usage(message)
+
+            response_text = self._extract_text(message)
+            if not response_text:
+                return None
+
+            data = self._parse_json(response_text)
+            if not data:
+                return None
+
+            return self._build_result(data)
+
+        except Exception as exc:
+            self._handle_error(exc)
+            return None
+
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Classify several document extracts with one Claude request.
+
+        Extracts the model leaves out of its answer come back as None.
+        """
+        if not self._client or not texts:
+            return [None] * len(texts)
+        if len(texts) == 1:
+            return [self.classify_document(texts[0])]
+
+        prompt = self._batch_prompt(texts)
+
+        try:
+            message = self._client.messages.create(  # type: ignore[union-attr]
+                model=self._model,
+                max_tokens=self._batch_max_tokens(len(texts)),
+                messages=[{"role": "user", "content": prompt}],
+            )
+            record_usage(message)
+
+            response_text = self._extract_text(message)
+            items = self._parse_json_array(response_text) if response_text else None
+            if items is None:
+                return [None] * len(texts)
+
+            return self._assign_batch_results(items, len(texts))
+
+        except Exception as exc:
+            self._handle_error(exc)
+            return [None] * len(texts)
+
+    def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        """General text completion via Claude."""
+        if not self._client:
+            return None
+
+        try:
+            message = self._client.messages.create(  # type: ignore[union-attr]
+                model=self._model,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            record_usage(message)
+            return self._extract_text(message)
+        except Exception as exc:
+            self._handle_error(exc)
+            return None
+
+
+class AsyncAnthropicBackend(_AnthropicBase):
+    """Claude LLM backend via the async Anthropic client (AsyncLLMBackend).
+
+    - One pooled AsyncAnthropic client per process, living on the LLM
+      event loop (see llm_async); its connections are reused across calls.
+    - Each call has a deadline (llm_call_timeout_seconds) covering all
+      attempts.
+    - 429, 5xx, timeouts and connection errors are retried up to
+      llm_max_retries times with jittered exponential backoff, honouring
+      retry-after when it fits the deadline.
+    - A circuit breaker opens after llm_breaker_failure_threshold failed
+      calls in a row. While open, calls return None at once so the
+      classifier falls back to keywords without waiting on the provider.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        settings = get_settings()
+        self._client: Optional[object] = None
+        self._timeout = settings.llm_call_timeout_seconds
+        self._max_retries = max(0, settings.llm_max_retries)
+        self._retry_base_delay = settings.llm_retry_base_delay_seconds
+        self._retry_max_delay = settings.llm_retry_max_delay_seconds
+        self._max_connections = settings.llm_max_connections
+        self.breaker = CircuitBreaker(
+            "anthropic",
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_seconds,
+        )
+        if self._api_key:
+            self._available = True
+            logger.info("AsyncAnthropicBackend initialized (model=%s)", self._model)
+
+    # --- AsyncLLMBackend Protocol ---
+
+    async def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        """Classify a document using Claude."""
+        return await on_llm_loop(self._classify_document(text))
+
+    async def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Classify several document extracts with one Claude request."""
+        return await on_llm_loop(self._classify_batch(texts))
+
+    async def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        """General text completion via Claude."""
+        message = await on_llm_loop(self._create(prompt, max_tokens))
+        return self._extract_text(message) if message is not None else None
+
+    def get_status(self) -> Dict[str, object]:
+        """Return detailed status, including the circuit breaker."""
+        status = super().get_status()
+        status["client"] = "async"
+        status["circuit_breaker"] = self.breaker.get_state()
+        return status
+
+    # --- Internal helpers ---
+
+    async def _classify_document(self, text: str) -> Optional[ClassificationResult]:
+        prompt = CLASSIFICATION_PROMPT.format(text=text[:MAX_TEXT_LENGTH])
+        message = await self._create(prompt, 600)
+        response_text = self._extract_text(message) if message is not None else None
+        if not response_text:
+            return None
+
+        data = self._parse_json(response_text)
+        return self._build_result(data) if data else None
+
+    async def _classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [await self._classify_document(texts[0])]
+
+        message = await self._create(self._batch_prompt(texts), self._batch_max_tokens(len(texts)))
+        response_text = self._extract_text(message) if message is not None else None
+        items = self._parse_json_array(response_text) if response_text else None
+        if items is None:
+            return [None] * len(texts)
+        return self._assign_batch_results(items, len(texts))
+
+    def _get_client(self) -> Optional[object]:
+        """Create the pooled client on first use (on the LLM event loop)."""
+        if self._client is None and self._api_key:
+            self._client = anthropic.AsyncAnthropic(
+                api_key=self._api_key,
+                max_retries=0,  # Retries are handled here, within the call deadline
+                timeout=self._timeout,
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self._max_connections,
+                        max_keepalive_connections=self._max_connections,
+                    ),
+                ),
+            )
+        return self._client
+
+    async def _create(self, prompt: str, max_tokens: int) -> Optional[object]:
+        """Send one request with deadline, retries and the circuit breaker.
+
+        Returns:
+            The API message, or None if the call was refused or failed
+        """
+        if not self._available:
+            return None
+        if not self.breaker.allow_request():
+            self._last_error = "Circuit open: provider unhealthy, using keyword fallback"
+            mark_outcome("circuit_open")
+            return None
+
+        client = self._get_client()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout
+        last_exc: Optional[BaseException] = None
+
+        for attempt in range(self._max_retries + 1):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(
+                    client.messages.create(  # type: ignore[union-attr]
+                        model=self._model,
+                        max_tokens=max_tokens,
+                        messages=[{"role": "user", "content": prompt}],
+                    ),
+                    remaining,
+                )
+                self.breaker.record_success()
+                record_usage(message)
+                return message
+            except Exception as exc:
+                if not self._is_retryable(exc):
+                    # The provider answered; the request itself was rejected
+                    self.breaker.record_success()
+                    self._handle_error(exc)
+                    return None
+
+                last_exc = exc
+                if attempt == self._max_retries:
+                    break
+                delay = self._retry_delay(attempt, exc)
+                if loop.time() + delay >= deadline:
+                    break
+                logger.info(
+                    "Anthropic call failed (%s); retry %d/%d in %.2fs",
+                    exc or type(exc).__name__, attempt + 1, self._max_retries, delay,
+                )
+                await asyncio.sleep(delay)
+
+        self.breaker.record_failure()
+        self._handle_error(last_exc or TimeoutError(f"deadline of {self._timeout}s exceeded"))
+        return None
+
+    @staticmethod
+    def _is_retryable(exc: BaseException) -> bool:
+        """Timeouts, connection errors, 429 and 5xx are worth retrying."""
+        if isinstance(exc, asyncio.TimeoutError):
+            return True
+        status_code = getattr(exc, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code == 429 or status_code >= 500
+        return _ANTHROPIC_AVAILABLE and isinstance(exc, anthropic.APIConnectionError)
+
+    def _retry_delay(self, attempt: int, exc: BaseException) -> float:
+        """Full-jitter exponential backoff, at least the server's retry-after."""
+        delay = random.uniform(0, min(self._retry_max_delay, self._retry_base_delay * 2 ** attempt))
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        try:
+            retry_after = float(headers.get("retry-after")) if headers else None
+        except (TypeError, ValueError):
+            retry_after = None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self._retry_max_delay))
+        return delay
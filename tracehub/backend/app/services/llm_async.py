@@ -0,0 +1,221 @@
+"""Async LLM access and bounded concurrent calls.
+
+Combined PDFs hold several documents, and each section is classified by
+its own model call. Issuing those calls one after another costs one
+model round trip per section; gather_bounded() runs them concurrently
+with a concurrency limit and a per-call timeout, returning results in
+input order.
+
+Blocking backends are run on a shared worker pool via run_blocking().
+A timed-out call is abandoned, not interrupted: its worker finishes in
+the background and the result is discarded.
+
+Native async backends keep one pooled HTTP client per process. Such a
+client is bound to the event loop it is used on, so all LLM coroutines
+run on one long-lived loop in a background thread: run_sync() submits
+to it from synchronous code, and on_llm_loop() hands work over from
+other loops (e.g. FastAPI's).
+
+Every hop (worker pool, LLM loop) carries the caller's context
+variables, so per-call state such as llm_metrics.current_call() follows
+the call.
+
+Usage:
+    from app.services.llm_async import as_async_backend, gather_bounded, run_sync
+
+    llm = as_async_backend(get_llm())
+    results = run_sync(gather_bounded(llm.classify_document, texts, 4, 30.0))
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Sequence, TypeVar
+
+from ..config import get_settings
+from .llm import AsyncLLMBackend, ClassificationResult, LLMBackend
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Blocking model calls in flight across all analyses, per llm_max_concurrency
+POOL_SIZE_FACTOR = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+_llm_loop: Optional[asyncio.AbstractEventLoop] = None
+_llm_loop_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, get_settings().llm_max_concurrency) * POOL_SIZE_FACTOR
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm")
+        return _executor
+
+
+def get_llm_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide LLM event loop, starting its thread on first use."""
+    global _llm_loop
+
+    with _llm_loop_lock:
+        if _llm_loop is None or _llm_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+            _llm_loop = loop
+        return _llm_loop
+
+
+async def _in_context(coro: Coroutine[Any, Any, R], ctx: contextvars.Context) -> R:
+    """Run coro with the context variables of another thread's context."""
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+def _submit(coro: Coroutine[Any, Any, R], loop: asyncio.AbstractEventLoop):
+    return asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), loop)
+
+
+async def on_llm_loop(coro: Coroutine[Any, Any, R]) -> R:
+    """Await a coroutine on the LLM event loop from any event loop."""
+    loop = get_llm_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(_submit(coro, loop))
+
+
+async def run_blocking(func: Callable[..., R], *args: Any) -> R:
+    """Run a blocking call on the shared LLM worker pool."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(ctx.run, func, *args))
+
+
+class ThreadedAsyncBackend:
+    """AsyncLLMBackend over a blocking LLMBackend.
+
+    Model calls run on the shared worker pool; status calls are
+    delegated directly.
+    """
+
+    def __init__(self, backend: LLMBackend) -> None:
+        self.backend = backend
+
+    # --- AsyncLLMBackend Protocol ---
+
+    async def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        return await run_blocking(self.backend.classify_document, text)
+
+    async def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        return await run_blocking(self.backend.classify_batch, texts)
+
+    async def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        return await run_blocking(self.backend.complete, prompt, max_tokens)
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def get_provider_name(self) -> str:
+        return self.backend.get_provider_name()
+
+    def get_status(self) -> Dict[str, object]:
+        return self.backend.get_status()
+
+
+class BlockingLLMBackend:
+    """LLMBackend over an AsyncLLMBackend, for synchronous callers.
+
+    Each call runs on the LLM event loop and blocks until it finishes.
+    """
+
+    def __init__(self, backend: AsyncLLMBackend) -> None:
+        self.async_backend = backend
+        self.prompt_version = getattr(backend, "prompt_version", "1")
+
+    # --- LLMBackend Protocol ---
+
+    def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        return run_sync(self.async_backend.classify_document(text))
+
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        return run_sync(self.async_backend.classify_batch(texts))
+
+    def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        return run_sync(self.async_backend.complete(prompt, max_tokens))
+
+    def is_available(self) -> bool:
+        return self.async_backend.is_available()
+
+    def get_provider_name(self) -> str:
+        return self.async_backend.get_provider_name()
+
+    def get_status(self) -> Dict[str, object]:
+        return self.async_backend.get_status()
+
+
+def as_async_backend(backend: LLMBackend | AsyncLLMBackend) -> AsyncLLMBackend:
+    """Return backend itself if it is already async, else an async adapter."""
+    if inspect.iscoroutinefunction(getattr(backend, "classify_document", None)):
+        return backend  # type: ignore[return-value]
+    if isinstance(backend, BlockingLLMBackend):
+        return backend.async_backend
+    return ThreadedAsyncBackend(backend)  # type: ignore[arg-type]
+
+
+async def gather_bounded(
+    func: Callable[[T], Awaitable[Optional[R]]],
+    items: Sequence[T],
+    max_concurrency: int,
+    timeout: Optional[float] = None,
+) -> List[Optional[R]]:
+    """Await func(item) for every item with at most max_concurrency in flight.
+
+    The timeout applies to each call once it has started. Calls that time
+    out or raise yield None in their slot, so one slow or failing section
+    never fails the batch.
+
+    Returns:
+        Results in the order of items
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_one(index: int, item: T) -> Optional[R]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(func(item), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"LLM call {index + 1}/{len(items)} timed out after {timeout}s")
+            except Exception as e:
+                logger.warning(f"LLM call {index + 1}/{len(items)} failed: {e}")
+            return None
+
+    return await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+
+
+def run_sync(coro: Coroutine[Any, Any, R]) -> R:
+    """Run a coroutine on the LLM event loop and wait for its result.
+
+    Works both from plain threads (ingest workers) and from sync helpers
+    called inside another running event loop (async route handlers).
+    """
+    loop = get_llm_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() would deadlock on the LLM event loop; await instead")
+
+    return _submit(coro, loop).result()
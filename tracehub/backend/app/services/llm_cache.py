@@ -0,0 +1,357 @@
+"""Cache for LLM document classifications.
+
+Re-uploads, re-analysis and reclassification of the same document send
+identical text to the model again. Results are cached under the SHA-256
+of the normalized text (whitespace collapsed) plus the model name and the
+prompt version, so changing either one starts a fresh set of entries.
+Only the first MAX_TEXT_LENGTH characters reach the model, so only those
+are hashed: texts that differ after that get the same answer and share
+one entry.
+
+Two tiers:
+- An in-process LRU (llm_cache_max_entries) answers repeats with no I/O.
+- The llm_cache_entries table is shared by all API workers; a hit there
+  is copied into the local LRU.
+
+Entries expire after llm_cache_ttl_hours. Expired rows are removed
+periodically on write. Database errors never fail a classification; the
+persistent tier is then just skipped.
+
+Usage:
+    from app.services.llm_cache import get_classification_cache
+
+    cache = get_classification_cache()  # None when disabled
+    key = cache.make_key(text, model, prompt_version)
+    data = cache.get(key)
+    if data is None:
+        data = call_model(text)
+        cache.put(key, data, model, prompt_version)
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import LLMCacheEntry
+from ..models.document import DocumentType
+from .llm import ClassificationResult, LLMBackend
+from .llm_anthropic import MAX_TEXT_LENGTH
+from .llm_metrics import mark_cache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-extractions of the same page hash equally."""
+    return " ".join(text.split())
+
+
+def result_to_dict(result: ClassificationResult) -> Dict[str, Any]:
+    """JSON-serializable form of a ClassificationResult."""
+    return {
+        "document_type": result.document_type.value,
+        "confidence": result.confidence,
+        "method": result.method,
+        "provider": result.provider,
+        "reference_number": result.reference_number,
+        "key_fields": dict(result.key_fields),
+        "reasoning": result.reasoning,
+        "alternatives": list(result.alternatives),
+    }
+
+
+def result_from_dict(data: Dict[str, Any]) -> ClassificationResult:
+    """Inverse of result_to_dict."""
+    try:
+        doc_type = DocumentType(data.get("document_type", "other"))
+    except ValueError:
+        doc_type = DocumentType.OTHER
+    return ClassificationResult(
+        document_type=doc_type,
+        confidence=float(data.get("confidence", 0)),
+        method=data.get("method", "ai"),
+        provider=data.get("provider", "unknown"),
+        reference_number=data.get("reference_number"),
+        key_fields=dict(data.get("key_fields") or {}),
+        reasoning=data.get("reasoning", ""),
+        alternatives=list(data.get("alternatives") or []),
+    )
+
+
+class ClassificationCache:
+    """Two-tier (in-process LRU + database) cache of classification results."""
+
+    # Delete expired rows after this many writes (per process)
+    PURGE_EVERY = 100
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: timedelta = timedelta(days=30),
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._session_factory = session_factory
+        self._entries: "OrderedDict[str, Tuple[datetime, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """Hash the text the model sees, normalized, with the model and prompt version."""
+        digest = hashlib.sha256()
+        digest.update(f"{model}|{prompt_version}|".encode("utf-8"))
+        digest.update(normalize_text(text[:MAX_TEXT_LENGTH]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss."""
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._entries[key]
+
+        row = self._db_get(key, now)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.db_hits += 1
+        expires_at, value = row
+        self._remember(key, value, expires_at)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], model: str, prompt_version: str) -> None:
+        """Store a value in both tiers."""
+        expires_at = datetime.utcnow() + self.ttl
+        self._remember(key, value, expires_at)
+        self._db_put(key, value, model, prompt_version, expires_at)
+
+        with self._lock:
+            self._writes += 1
+            should_purge = self._writes % self.PURGE_EVERY == 0
+        if should_purge:
+            self.purge_expired()
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the database tier is left as is)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: datetime) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # --- Database tier ---
+
+    def _session(self) -> Optional[Session]:
+        if self._session_factory is None:
+            return None
+        return self._session_factory()
+
+    def _db_get(self, key: str, now: datetime) -> Optional[Tuple[datetime, Dict[str, Any]]]:
+        db = self._session()
+        if db is None:
+            return None
+        try:
+            entry = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.cache_key == key,
+                LLMCacheEntry.expires_at > now,
+            ).first()
+            if entry is None:
+                return None
+            entry.hit_count += 1
+            expires_at = entry.expires_at
+            if expires_at.tzinfo is not None:
+                expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+            result = (expires_at, entry.result)
+            db.commit()
+            return result
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"LLM cache lookup failed for {key[:12]}: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_put(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        model: str,
+        prompt_version: str,
+        expires_at: datetime,
+    ) -> None:
+        db = self._session()
+        if db is None:
+            return
+        try:
+            db.merge(LLMCacheEntry(
+                cache_key=key,
+                model=model,
+                prompt_version=prompt_version,
+                result=value,
+                hit_count=0,
+                created_at=datetime.utcnow(),
+                expires_at=expires_at,
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to write LLM cache entry {key[:12]}: {e}")
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the database tier.
+
+        Returns:
+            Number of rows removed
+        """
+        db = self._session()
+        if db is None:
+            return 0
+        try:
+            removed = db.query(LLMCacheEntry).filter(
+                LLMCacheEntry.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to purge expired LLM cache entries: {e}")
+            return 0
+        finally:
+            db.close()
+
+        if removed:
+            logger.info(f"LLM cache purged {removed} expired entries")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count and this process's hit/miss counters."""
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_hours": self.ttl.total_seconds() / 3600,
+                "persistent": self._session_factory is not None,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "hits": self.memory_hits + self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+class CachedLLMBackend:
+    """LLMBackend wrapper that answers repeated classifications from the cache.
+
+    classify_document() and classify_batch() share entries: each text is
+    cached on its own, and only uncached texts of a batch are sent to the
+    backend. complete() prompts are free-form and go straight through.
+    """
+
+    def __init__(self, backend: LLMBackend, cache: ClassificationCache) -> None:
+        self.backend = backend
+        self.cache = cache
+        self._model = str(backend.get_status().get("model", "unknown"))
+        self._prompt_version = str(getattr(backend, "prompt_version", "1"))
+
+    # --- LLMBackend Protocol ---
+
+    def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        """Return the cached classification for text, calling the backend on a miss."""
+        key = self.cache.make_key(text, self._model, self._prompt_version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            mark_cache("hit")
+            return result_from_dict(cached)
+
+        mark_cache("miss")
+        result = self.backend.classify_document(text)
+        if result is not None:
+            self.cache.put(key, result_to_dict(result), self._model, self._prompt_version)
+        return result
+
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Answer cached texts directly and send the rest as one smaller batch."""
+        keys = [self.cache.make_key(t, self._model, self._prompt_version) for t in texts]
+        results: List[Optional[ClassificationResult]] = []
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            results.append(result_from_dict(cached) if cached is not None else None)
+            if cached is None:
+                missing.append(i)
+
+        mark_cache("miss" if len(missing) == len(texts) else "partial" if missing else "hit")
+        if missing:
+            fresh = self.backend.classify_batch([texts[i] for i in missing])
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                if result is not None:
+                    self.cache.put(keys[i], result_to_dict(result), self._model, self._prompt_version)
+        return results
+
+    def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        return self.backend.complete(prompt, max_tokens)
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def get_provider_name(self) -> str:
+        return self.backend.get_provider_name()
+
+    def get_status(self) -> Dict[str, object]:
+        """Wrapped backend status plus cache statistics."""
+        status = dict(self.backend.get_status())
+        status["cache"] = self.cache.get_stats()
+        return status
+
+
+_cache: Optional[ClassificationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """Return the process-wide classification cache, or None if disabled in settings."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            from ..config import get_settings
+
+            settings = get_settings()
+            if not settings.llm_cache_enabled:
+                return None
+
+            session_factory = None
+            if settings.llm_cache_persistent:
+                from ..database import SessionLocal
+                session_factory = SessionLocal
+
+            _cache = ClassificationCache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl=timedelta(hours=settings.llm_cache_ttl_hours),
+                session_factory=session_factory,
+            )
+        return _cache
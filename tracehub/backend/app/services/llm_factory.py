@@ -24,14 +24,21 @@ def _create_backend() -> LLMBackend:
     provider = settings.llm_provider
 
     if provider == "anthropic":
+        if settings.llm_async_client:
+            from .llm_anthropic import AsyncAnthropicBackend
+            from .llm_async import BlockingLLMBackend
+
+            return BlockingLLMBackend(AsyncAnthropicBackend())
+
         from .llm_anthropic import AnthropicBackend
 
         return AnthropicBackend()
 
     if provider == "mock":
+        from .latency_sim import get_simulator
         from .llm_mock import MockLLMBackend
 
-        return MockLLMBackend()
+        return MockLLMBackend(simulator=get_simulator("llm"))
 
     # Unknown provider — fall back to mock with warning
     logger.warning(
@@ -45,11 +52,21 @@ def _create_backend() -> LLMBackend:
 def get_llm() -> LLMBackend:
     """FastAPI dependency — returns the configured LLM backend.
 
-    The backend is created once and reused across requests.
+    The backend is created once and reused across requests. Unless the
+    classification cache is disabled, it is wrapped so that repeated
+    classifications of the same text are answered from the cache. Every
+    call is recorded in llm_metrics.
     """
     global _backend
     if _backend is None:
-        _backend = _create_backend()
+        from .llm_cache import CachedLLMBackend, get_classification_cache
+        from .llm_metrics import InstrumentedLLMBackend
+
+        backend = _create_backend()
+        cache = get_classification_cache()
+        if cache is not None:
+            backend = CachedLLMBackend(backend, cache)
+        _backend = InstrumentedLLMBackend(backend)
     return _backend
 
 
@@ -0,0 +1,254 @@
+"""Instrumentation for LLM calls.
+
+Every classification or completion made through get_llm() (and the v1
+classifier's Claude calls) is recorded with provider, model, prompt
+kind, input/output tokens, latency, cache status and outcome. Records
+are kept for a rolling window (llm_metrics_window_minutes) and
+summarised on demand: call counts, p50/p95/p99 latency, tokens and
+estimated cost per hour, overall and per prompt kind.
+
+The record for a call is held in a context variable while the call runs,
+so the layers underneath can fill in what only they know:
+- CachedLLMBackend marks cache hits/misses (mark_cache)
+- provider backends add token usage per API request (record_usage)
+  and failure reasons (mark_outcome)
+
+llm_async carries context variables across its thread and event-loop
+hops, so this also works for concurrent and async calls.
+
+Usage:
+    from app.services.llm_metrics import llm_metrics
+
+    with llm_metrics.track("anthropic", model, "classify") as call:
+        result = backend.classify_document(text)
+        call.succeeded = result is not None
+
+    llm_metrics.get_summary()
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .llm import ClassificationResult, LLMBackend
+
+
+@dataclass
+class LLMCall:
+    """One call through the LLM layer (possibly several API requests, or none)."""
+
+    provider: str
+    model: str
+    kind: str  # "classify", "classify_batch", "complete"
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    latency_ms: float = 0.0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache: str = "bypass"  # "hit", "miss", "partial", "bypass"
+    outcome: Optional[str] = None  # "ok", "no_result", "error", "rate_limited", "timeout", "circuit_open"
+    succeeded: bool = False
+
+
+_current_call: ContextVar[Optional[LLMCall]] = ContextVar("llm_current_call", default=None)
+
+
+def current_call() -> Optional[LLMCall]:
+    """The call being tracked in this context, if any."""
+    return _current_call.get()
+
+
+def record_usage(message: object) -> None:
+    """Add an API response's token usage to the current call."""
+    call = _current_call.get()
+    if call is None:
+        return
+    usage = getattr(message, "usage", None)
+    call.requests += 1
+    call.input_tokens += int(getattr(usage, "input_tokens", 0) or 0)
+    call.output_tokens += int(getattr(usage, "output_tokens", 0) or 0)
+
+
+def mark_cache(status: str) -> None:
+    """Record how the cache answered the current call."""
+    call = _current_call.get()
+    if call is not None:
+        call.cache = status
+
+
+def mark_outcome(outcome: str) -> None:
+    """Record why the current call failed (first reason wins)."""
+    call = _current_call.get()
+    if call is not None and call.outcome is None:
+        call.outcome = outcome
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _latency_summary(calls: List[LLMCall]) -> Dict[str, float]:
+    latencies = sorted(c.latency_ms for c in calls)
+    return {
+        "p50": round(percentile(latencies, 50), 1),
+        "p95": round(percentile(latencies, 95), 1),
+        "p99": round(percentile(latencies, 99), 1),
+        "max": round(latencies[-1], 1) if latencies else 0.0,
+    }
+
+
+class LLMMetrics:
+    """Rolling window of LLM call records."""
+
+    def __init__(self, window: Optional[timedelta] = None, max_records: int = 50_000):
+        self._window = window
+        self._records: Deque[LLMCall] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    @property
+    def window(self) -> timedelta:
+        if self._window is not None:
+            return self._window
+        from ..config import get_settings
+        return timedelta(minutes=get_settings().llm_metrics_window_minutes)
+
+    @contextmanager
+    def track(self, provider: str, model: str, kind: str) -> Iterator[LLMCall]:
+        """Time a call and record it when the block exits."""
+        call = LLMCall(provider=provider, model=model, kind=kind)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            mark_outcome("error")
+            raise
+        finally:
+            call.latency_ms = (time.perf_counter() - start) * 1000
+            if call.outcome is None:
+                call.outcome = "ok" if call.succeeded else "no_result"
+            _current_call.reset(token)
+            self.record(call)
+
+    def record(self, call: LLMCall) -> None:
+        with self._lock:
+            self._records.append(call)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def _recent(self) -> List[LLMCall]:
+        cutoff = datetime.utcnow() - self.window
+        with self._lock:
+            while self._records and self._records[0].started_at < cutoff:
+                self._records.popleft()
+            return list(self._records)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Aggregates over the rolling window."""
+        from ..config import get_settings
+
+        settings = get_settings()
+        calls = self._recent()
+        window_hours = self.window.total_seconds() / 3600
+
+        input_tokens = sum(c.input_tokens for c in calls)
+        output_tokens = sum(c.output_tokens for c in calls)
+        cost = (
+            input_tokens * settings.llm_input_cost_per_mtok
+            + output_tokens * settings.llm_output_cost_per_mtok
+        ) / 1_000_000
+
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        for kind in sorted({c.kind for c in calls}):
+            kind_calls = [c for c in calls if c.kind == kind]
+            by_kind[kind] = {
+                "calls": len(kind_calls),
+                "latency_ms": _latency_summary(kind_calls),
+                "input_tokens": sum(c.input_tokens for c in kind_calls),
+                "output_tokens": sum(c.output_tokens for c in kind_calls),
+            }
+
+        def count(attr: str) -> Dict[str, int]:
+            counts: Dict[str, int] = {}
+            for c in calls:
+                value = getattr(c, attr)
+                counts[value] = counts.get(value, 0) + 1
+            return counts
+
+        return {
+            "window_minutes": round(self.window.total_seconds() / 60),
+            "calls": len(calls),
+            "api_requests": sum(c.requests for c in calls),
+            "calls_per_hour": round(len(calls) / window_hours, 1) if window_hours else 0.0,
+            "latency_ms": _latency_summary(calls),
+            "tokens": {
+                "input": input_tokens,
+                "output": output_tokens,
+                "per_hour": round((input_tokens + output_tokens) / window_hours) if window_hours else 0,
+            },
+            "estimated_cost_usd": round(cost, 4),
+            "estimated_cost_usd_per_hour": round(cost / window_hours, 4) if window_hours else 0.0,
+            "by_outcome": count("outcome"),
+            "by_cache": count("cache"),
+            "by_provider": count("provider"),
+            "by_kind": by_kind,
+        }
+
+
+class InstrumentedLLMBackend:
+    """LLMBackend wrapper that records every call in llm_metrics."""
+
+    def __init__(self, backend: LLMBackend, metrics: Optional[LLMMetrics] = None) -> None:
+        self.backend = backend
+        self.metrics = metrics or llm_metrics
+        self.prompt_version = getattr(backend, "prompt_version", "1")
+        self._provider = backend.get_provider_name()
+        self._model = str(backend.get_status().get("model", "unknown"))
+
+    # --- LLMBackend Protocol ---
+
+    def classify_document(self, text: str) -> Optional[ClassificationResult]:
+        with self.metrics.track(self._provider, self._model, "classify") as call:
+            result = self.backend.classify_document(text)
+            call.succeeded = result is not None
+        return result
+
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        with self.metrics.track(self._provider, self._model, "classify_batch") as call:
+            results = self.backend.classify_batch(texts)
+            call.succeeded = any(r is not None for r in results)
+        return results
+
+    def complete(self, prompt: str, max_tokens: int = 1024) -> Optional[str]:
+        with self.metrics.track(self._provider, self._model, "complete") as call:
+            response = self.backend.complete(prompt, max_tokens)
+            call.succeeded = response is not None
+        return response
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def get_provider_name(self) -> str:
+        return self.backend.get_provider_name()
+
+    def get_status(self) -> Dict[str, object]:
+        """Wrapped backend status plus call metrics."""
+        status = dict(self.backend.get_status())
+        status["metrics"] = self.metrics.get_summary()
+        return status
+
+
+# Global instance
+llm_metrics = LLMMetrics()
@@ -2,12 +2,19 @@
 
 Returns deterministic results for unit tests without
 requiring an API key or network access.
+
+For load testing, give it a LatencySimulator (the factory does when
+simulation_enabled is set): calls then take provider-like time and
+fail or get rate limited at the configured rates, returning None as
+the real backends do.
 """
 
 from typing import Dict, List, Optional
 
 from ..models.document import DocumentType
+from .latency_sim import LatencySimulator, SimulatedError, SimulatedRateLimit
 from .llm import ClassificationResult
+from .llm_metrics import mark_outcome
 
 
 class MockLLMBackend:
@@ -17,17 +24,22 @@ class MockLLMBackend:
     hitting any external API.
     """
 
+    prompt_version = "mock-1"
+
     def __init__(
         self,
         default_type: DocumentType = DocumentType.BILL_OF_LADING,
         default_confidence: float = 0.85,
         available: bool = True,
+        simulator: Optional[LatencySimulator] = None,
     ) -> None:
         self._default_type = default_type
         self._default_confidence = default_confidence
         self._available = available
         self._last_prompt: Optional[str] = None
         self._call_count = 0
+        self._batch_sizes: List[int] = []
+        self._simulator = simulator
 
     # --- LLMBackend Protocol ---
 
@@ -38,7 +50,36 @@ class MockLLMBackend:
 
         self._last_prompt = text
         self._call_count += 1
+        if not self._simulate():
+            return None
+        return self._result()
+
+    def classify_batch(self, texts: List[str]) -> List[Optional[ClassificationResult]]:
+        """Return one deterministic result per text (counted as one call)."""
+        if not self._available:
+            return [None] * len(texts)
 
+        self._last_prompt = texts[-1] if texts else None
+        self._call_count += 1
+        self._batch_sizes.append(len(texts))
+        if not self._simulate():
+            return [None] * len(texts)
+        return [self._result() for _ in texts]
+
+    def _simulate(self) -> bool:
+        """Wait out the simulated provider call; False if it failed."""
+        if self._simulator is None:
+            return True
+        try:
+            with self._simulator.call():
+                return True
+        except SimulatedRateLimit:
+            mark_outcome("rate_limited")
+        except SimulatedError:
+            mark_outcome("error")
+        return False
+
+    def _result(self) -> ClassificationResult:
         return ClassificationResult(
             document_type=self._default_type,
             confidence=self._default_confidence,
@@ -59,6 +100,8 @@ class MockLLMBackend:
 
         self._last_prompt = prompt
         self._call_count += 1
+        if not self._simulate():
+            return None
         return "Mock LLM response"
 
     def is_available(self) -> bool:
@@ -76,6 +119,7 @@ class MockLLMBackend:
             "available": self._available,
             "model": "mock-v1",
             "call_count": self._call_count,
+            "simulation": self._simulator.get_status() if self._simulator else None,
         }
 
     # --- Test helpers ---
@@ -90,6 +134,11 @@ class MockLLMBackend:
         """Get the total number of calls."""
         return self._call_count
 
+    @property
+    def batch_sizes(self) -> List[int]:
+        """Number of texts in each classify_batch call."""
+        return self._batch_sizes
+
     def set_available(self, available: bool) -> None:
         """Toggle availability for testing fallback paths."""
         self._available = available
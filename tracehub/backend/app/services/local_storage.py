@@ -4,16 +4,34 @@ Stores files on disk under a configurable base directory,
 mirroring the bucket/org_id/doc_id/filename path convention
 used by Supabase Storage.
 
+With a LatencySimulator (simulation_enabled), each operation takes
+object-store-like time and can fail, for load testing without network
+access.
+
 PRD-005: Supabase Storage for Documents
 """
 
+import asyncio
 import logging
 import os
+import shutil
+from contextlib import nullcontext
 from pathlib import Path
+from typing import AsyncContextManager, BinaryIO, Optional, Union
 from urllib.parse import quote
 
+from .latency_sim import LatencySimulator
+
 logger = logging.getLogger(__name__)
 
+# Bytes per read when saving a file object
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _save_fileobj(file: BinaryIO, path: Path) -> None:
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file, out, COPY_CHUNK_SIZE)
+
 
 class LocalStorageBackend:
     """Storage backend using the local filesystem.
@@ -22,21 +40,39 @@ class LocalStorageBackend:
     {base_path}/{bucket}/{org_id}/{document_id}/{filename}
     """
 
-    def __init__(self, base_path: str = "./uploads") -> None:
+    def __init__(
+        self, base_path: str = "./uploads", simulator: Optional[LatencySimulator] = None
+    ) -> None:
         self.base_path = Path(base_path).resolve()
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.simulator = simulator
         logger.info("LocalStorageBackend initialized (base=%s)", self.base_path)
 
+    def _simulated(self) -> AsyncContextManager[None]:
+        """Simulated remote call around an operation (no-op by default)."""
+        return self.simulator.acall() if self.simulator else nullcontext()
+
     async def upload(
-        self, bucket: str, path: str, file: bytes, content_type: str
+        self, bucket: str, path: str, file: Union[bytes, BinaryIO], content_type: str
     ) -> str:
         """Write file to local filesystem."""
-        full_path = self.base_path / bucket / path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_bytes(file)
-        logger.info("Saved %s/%s (%d bytes)", bucket, path, len(file))
+        async with self._simulated():
+            full_path = self.base_path / bucket / path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            # Disk writes run in a worker thread so large files do not
+            # block the event loop
+            if isinstance(file, bytes):
+                await asyncio.to_thread(full_path.write_bytes, file)
+            else:
+                await asyncio.to_thread(_save_fileobj, file, full_path)
+        logger.info("Saved %s/%s (%d bytes)", bucket, path, full_path.stat().st_size)
         return f"{bucket}/{path}"
 
+    async def download(self, bucket: str, path: str) -> BinaryIO:
+        """Open a file on the local filesystem for reading."""
+        async with self._simulated():
+            return open(self.base_path / bucket / path, "rb")
+
     async def download_url(
         self, bucket: str, path: str, expires_in: int = 3600
     ) -> str:
@@ -46,21 +82,24 @@ class LocalStorageBackend:
         that serves files directly. The expires_in parameter is
         ignored for local storage.
         """
-        full_path = self.base_path / bucket / path
-        if not full_path.exists():
-            raise FileNotFoundError(f"File not found: {bucket}/{path}")
+        async with self._simulated():
+            full_path = self.base_path / bucket / path
+            if not full_path.exists():
+                raise FileNotFoundError(f"File not found: {bucket}/{path}")
         # Return a relative API path that the dev server can serve
         return f"/api/storage/{bucket}/{quote(path)}"
 
     async def delete(self, bucket: str, path: str) -> bool:
         """Delete a file from local filesystem."""
-        full_path = self.base_path / bucket / path
-        if full_path.exists():
+        async with self._simulated():
+            full_path = self.base_path / bucket / path
+            if not full_path.exists():
+                return False
             os.remove(full_path)
-            logger.info("Deleted %s/%s", bucket, path)
-            return True
-        return False
+        logger.info("Deleted %s/%s", bucket, path)
+        return True
 
     async def exists(self, bucket: str, path: str) -> bool:
         """Check if a file exists on the local filesystem."""
-        return (self.base_path / bucket / path).exists()
+        async with self._simulated():
+            return (self.base_path / bucket / path).exists()
@@ -200,6 +200,43 @@ def notify_document_uploaded(
     return notifications
 
 
+def notify_documents_uploaded(
+    db: Session,
+    documents: List[Document],
+    uploader: str,
+    notify_users: List[str]
+) -> List[Notification]:
+    """
+    Create one notification per user for a batch of uploaded documents.
+    Used by bulk upload instead of one notification per document.
+    """
+    if len(documents) == 1:
+        return notify_document_uploaded(db, documents[0], uploader, notify_users)
+
+    service = NotificationService(db)
+    notifications = []
+
+    shipment_id = str(documents[0].shipment_id) if documents else None
+
+    for user_id in notify_users:
+        if user_id != uploader:  # Don't notify the uploader
+            notification = service.create_notification(
+                user_id=user_id,
+                notification_type=NotificationType.DOCUMENT_UPLOADED.value,
+                title=f"{len(documents)} Documents Uploaded",
+                message=f"{len(documents)} documents have been uploaded for review. Uploaded by {uploader}.",
+                data={
+                    "document_ids": [str(d.id) for d in documents],
+                    "document_count": len(documents),
+                    "shipment_id": shipment_id,
+                    "uploaded_by": uploader
+                }
+            )
+            notifications.append(notification)
+
+    return notifications
+
+
 def notify_document_validated(
     db: Session,
     document: Document,
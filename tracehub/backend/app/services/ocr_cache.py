@@ -0,0 +1,172 @@
+"""On-disk OCR result cache keyed by rendered page bitmap.
+
+The same scanned certificates (fumigation, phytosanitary, ...) are uploaded
+again and again across shipments, and the historic-documents script
+re-processes the same files on every run. Rendering a page is cheap;
+Tesseract is not. This cache stores OCR output under the SHA-256 of the
+rendered bitmap plus the Tesseract settings that affect the result, so an
+identical page image skips Tesseract entirely.
+
+Entries are small JSON files, sharded by the first two hex digits of the
+key. Writes are atomic (temp file + rename), so OCR worker processes can
+share one directory. Reads refresh the file's mtime, and eviction removes
+least-recently-used files until the directory is under its size budget.
+
+Usage:
+    from app.services.ocr_cache import get_ocr_cache
+
+    cache = get_ocr_cache()  # None when disabled
+    key = cache.make_key(image, "eng|psm1|data")
+    hit = cache.get(key)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """Size-bounded LRU cache of OCR results on local disk."""
+
+    # Run an eviction scan after this many writes (per process)
+    EVICT_EVERY = 32
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(image, settings_key: str) -> str:
+        """Hash a rendered page image together with the OCR settings."""
+        digest = hashlib.sha256()
+        digest.update(settings_key.encode("utf-8"))
+        digest.update(f"|{image.mode}|{image.size[0]}x{image.size[1]}|".encode("utf-8"))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable OCR cache entry {key[:12]}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result; failures are logged and otherwise ignored."""
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write OCR cache entry {key[:12]}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY == 1
+        if should_evict:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) for every entry in the cache directory."""
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Removed by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until under max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        logger.info(f"OCR cache evicted {removed} entries ({total} bytes remain)")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size on disk plus this process's hit/miss counters."""
+        entries = self._entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache: Optional[OCRCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """Return the process-wide OCR cache, or None if disabled in settings."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            from ..config import get_settings
+
+            settings = get_settings()
+            if not settings.ocr_cache_enabled:
+                return None
+            directory = settings.ocr_cache_dir or os.path.join(settings.upload_dir, ".ocr-cache")
+            try:
+                _cache = OCRCache(directory, settings.ocr_cache_max_mb * 1024 * 1024)
+            except OSError as e:
+                logger.warning(f"OCR cache disabled, cannot create {directory}: {e}")
+                return None
+        return _cache
@@ -0,0 +1,308 @@
+"""Page-parallel OCR engine.
+
+Renders and OCRs PDF pages one at a time, fanning pages out to a process
+pool. Each worker opens the PDF itself, rasterises a single page (PyMuPDF
+pixmap, or pdf2image with first_page/last_page), runs Tesseract and drops
+the bitmap before taking the next page, so peak memory is one page per
+worker instead of one bitmap per page of the document.
+
+Results are always returned in page order.
+
+Adaptive resolution: when OCROptions.initial_dpi is set, each page is
+first OCR'd at that (lower) DPI. If Tesseract's mean word confidence is
+below min_confidence, the page is re-rendered and OCR'd at the full dpi.
+The DPI actually used is reported per page.
+
+OCR results are cached on disk by rendered-bitmap hash (see ocr_cache),
+so a page image that has been OCR'd before never reaches Tesseract again.
+
+Usage:
+    from app.services.ocr_engine import ocr_engine, OCROptions
+
+    options = OCROptions(dpi=300, language="eng", timeout=30)
+    results = ocr_engine.ocr_pages("/path/to/scan.pdf", [1, 2, 3], options)
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+    Image = None
+
+try:
+    from pdf2image import convert_from_path
+except ImportError:
+    convert_from_path = None
+
+from .ocr_cache import get_ocr_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OCROptions:
+    """Tesseract settings for one OCR run (picklable for worker processes)."""
+    dpi: int = 300  # Full resolution (the only pass unless adaptive)
+    language: str = "eng"
+    timeout: int = 30  # Seconds per page
+    psm: int = 1  # Automatic page segmentation with OSD
+    initial_dpi: Optional[int] = None  # First-pass DPI for adaptive mode
+    min_confidence: float = 70.0  # Mean word confidence (0-100) to accept the first pass
+
+    @property
+    def tesseract_config(self) -> str:
+        return f"--psm {self.psm}"
+
+    def cache_key(self, with_confidence: bool) -> str:
+        """Settings that change Tesseract's output for a given bitmap."""
+        mode = "data" if with_confidence else "string"
+        return f"{self.language}|psm{self.psm}|{mode}"
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether pages start at initial_dpi and escalate to dpi."""
+        return self.initial_dpi is not None and self.initial_dpi < self.dpi
+
+
+@dataclass
+class PageOCRResult:
+    """OCR output for one page."""
+    page_number: int  # 1-indexed
+    text: str
+    dpi: int  # Resolution the returned text was read at
+    confidence: Optional[float] = None  # Mean word confidence (adaptive mode only)
+
+
+def render_page(file_path: str, page_number: int, dpi: int):
+    """Rasterise a single PDF page to a grayscale PIL image.
+
+    Uses a PyMuPDF pixmap when available, otherwise pdf2image restricted
+    to the one page, so only that page's bitmap is ever in memory.
+    """
+    if fitz is not None:
+        with fitz.open(file_path) as doc:
+            pix = doc[page_number - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+    images = convert_from_path(
+        file_path,
+        dpi=dpi,
+        first_page=page_number,
+        last_page=page_number,
+        fmt="png",
+        grayscale=True,
+    )
+    return images[0]
+
+
+def ocr_image(image, options: OCROptions) -> str:
+    """Run Tesseract on one page image."""
+    text = pytesseract.image_to_string(
+        image,
+        lang=options.language,
+        timeout=options.timeout,
+        config=options.tesseract_config,
+    )
+    return text.strip()
+
+
+def ocr_image_with_confidence(image, options: OCROptions) -> Tuple[str, float]:
+    """Run Tesseract once and return (text, mean word confidence 0-100).
+
+    Uses image_to_data so text and confidences come from the same pass;
+    words are re-joined into lines and paragraphs in reading order.
+    """
+    data = pytesseract.image_to_data(
+        image,
+        lang=options.language,
+        timeout=options.timeout,
+        config=options.tesseract_config,
+        output_type=pytesseract.Output.DICT,
+    )
+
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        conf = float(data["conf"][i])
+        if not word or conf < 0:
+            continue
+        confidences.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+
+    paragraphs = {}
+    for (block, par, _line), words in lines.items():
+        paragraphs.setdefault((block, par), []).append(" ".join(words))
+
+    text = "\n\n".join("\n".join(par_lines) for par_lines in paragraphs.values())
+    confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, confidence
+
+
+def ocr_image_cached(
+    image,
+    options: OCROptions,
+    with_confidence: bool = False,
+) -> Tuple[str, Optional[float]]:
+    """OCR an image through the on-disk cache.
+
+    Returns:
+        (text, confidence) - confidence is None unless with_confidence
+    """
+    cache = get_ocr_cache()
+    key = None
+    if cache is not None:
+        key = cache.make_key(image, options.cache_key(with_confidence))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["text"], cached.get("confidence")
+
+    try:
+        if with_confidence:
+            text, confidence = ocr_image_with_confidence(image, options)
+        else:
+            text, confidence = ocr_image(image, options), None
+    except Exception as e:
+        # Not cached, so a timeout or crash is retried next time
+        logger.error(f"OCR extraction failed for page: {e}")
+        return "", (0.0 if with_confidence else None)
+
+    if cache is not None:
+        cache.put(key, {"text": text, "confidence": confidence})
+    return text, confidence
+
+
+def _ocr_at(file_path: str, page_number: int, dpi: int, options: OCROptions) -> Tuple[str, Optional[float]]:
+    """Render one page at dpi and OCR it; the bitmap is freed before returning."""
+    image = render_page(file_path, page_number, dpi)
+    try:
+        return ocr_image_cached(image, options, with_confidence=options.adaptive)
+    finally:
+        image.close()
+
+
+def ocr_page(file_path: str, page_number: int, options: OCROptions) -> PageOCRResult:
+    """Render and OCR one page. Runs inside pool workers."""
+    if pytesseract is None:
+        return PageOCRResult(page_number=page_number, text="", dpi=options.dpi)
+
+    dpi = options.initial_dpi if options.adaptive else options.dpi
+    try:
+        text, confidence = _ocr_at(file_path, page_number, dpi, options)
+        if options.adaptive and confidence < options.min_confidence:
+            logger.debug(
+                f"Page {page_number} confidence {confidence:.0f} at {dpi} DPI "
+                f"below {options.min_confidence:.0f}; re-rendering at {options.dpi} DPI"
+            )
+            dpi = options.dpi
+            text, confidence = _ocr_at(file_path, page_number, dpi, options)
+    except Exception as e:
+        logger.error(f"Failed to render page {page_number} of {file_path}: {e}")
+        return PageOCRResult(page_number=page_number, text="", dpi=dpi)
+
+    logger.debug(f"Page {page_number} OCR extracted {len(text)} characters at {dpi} DPI")
+    return PageOCRResult(page_number=page_number, text=text, dpi=dpi, confidence=confidence)
+
+
+def _init_worker(tesseract_cmd: str) -> None:
+    """Pool initializer - apply the configured tesseract path in the child."""
+    if tesseract_cmd and pytesseract is not None:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+class OCREngine:
+    """Runs page OCR serially or on a process pool, preserving page order."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        """Configured worker count (settings.ocr_workers; 0 means one per CPU)."""
+        workers = self._workers
+        if workers is None:
+            try:
+                from ..config import get_settings
+                workers = get_settings().ocr_workers
+            except Exception:
+                workers = 0
+        return workers if workers > 0 else (os.cpu_count() or 1)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                tesseract_cmd = ""
+                if pytesseract is not None:
+                    tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+                # spawn, not fork: the API process runs threads (ingest pool,
+                # DB pool) whose locks must not be copied into the children
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(tesseract_cmd,),
+                )
+            return self._executor
+
+    def ocr_pages(
+        self,
+        file_path: str,
+        page_numbers: List[int],
+        options: OCROptions,
+    ) -> List[PageOCRResult]:
+        """OCR the given pages of a PDF.
+
+        Args:
+            file_path: Path to the PDF file
+            page_numbers: 1-indexed pages to OCR
+            options: Tesseract settings
+
+        Returns:
+            One PageOCRResult per requested page, in the order requested
+        """
+        if not page_numbers:
+            return []
+
+        task = partial(ocr_page, file_path, options=options)
+
+        if self.workers <= 1 or len(page_numbers) == 1:
+            return [task(n) for n in page_numbers]
+
+        try:
+            # Executor.map yields results in submission order
+            return list(self._get_executor().map(task, page_numbers))
+        except BrokenProcessPool as e:
+            logger.error(f"OCR worker pool failed ({e}); falling back to serial OCR")
+            with self._lock:
+                self._executor = None
+            return [task(n) for n in page_numbers]
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (a new pool is created on next use)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global instance
+ocr_engine = OCREngine()
@@ -0,0 +1,239 @@
+"""Persistent page-text store for uploaded documents.
+
+Saves the result of PDF text extraction (PyMuPDF or OCR) in the
+document_page_texts table so re-analysis endpoints and batch scripts
+load page text from the database instead of re-running extraction.
+
+Rows are keyed to the SHA-256 of the file they were extracted from.
+When the file on disk changes, the stored row no longer matches and
+the next read re-extracts and replaces it.
+
+Usage:
+    from app.services.page_text_store import page_text_store
+
+    extraction = page_text_store.get_or_extract(db, document)
+    if extraction:
+        text = extraction.full_text
+
+Page text is stored at upload and ingest time. Read-only endpoints pass
+store=False so a legacy document without stored text is extracted for
+the response but nothing is written.
+"""
+
+import json
+import logging
+import os
+import zlib
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..models import Document, DocumentPageText
+from .file_utils import compute_file_hash, get_full_path
+from .pdf_processor import ExtractionArtifact, PageContent, pdf_processor
+
+logger = logging.getLogger(__name__)
+
+
+def compress_pages(pages: List[PageContent]) -> bytes:
+    """Serialize page texts and per-page extraction details to zlib-compressed JSON."""
+    entries = []
+    for p in pages:
+        entry = {"text": p.text, "method": p.extraction_method}
+        if p.ocr_dpi is not None:
+            entry["dpi"] = p.ocr_dpi
+            entry["confidence"] = p.ocr_confidence
+        entries.append(entry)
+    payload = json.dumps(entries, ensure_ascii=False)
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def decompress_pages(blob: bytes) -> List[PageContent]:
+    """Inverse of compress_pages - rebuild PageContent objects in page order."""
+    entries = json.loads(zlib.decompress(blob).decode("utf-8"))
+    pages = []
+    for i, entry in enumerate(entries, start=1):
+        # Rows written before per-page methods were recorded hold plain strings
+        if isinstance(entry, str):
+            entry = {"text": entry, "method": "pymupdf"}
+        pages.append(PageContent(
+            page_number=i,
+            text=entry["text"],
+            char_count=len(entry["text"]),
+            extraction_method=entry.get("method", "pymupdf"),
+            ocr_dpi=entry.get("dpi"),
+            ocr_confidence=entry.get("confidence"),
+        ))
+    return pages
+
+
+def resolve_document_path(document: Document) -> Optional[str]:
+    """Resolve a document's stored file path to an existing path on disk."""
+    if not document.file_path:
+        return None
+
+    full_path = get_full_path(document.file_path)
+    if full_path and os.path.exists(full_path):
+        return full_path
+    if os.path.exists(document.file_path):
+        return document.file_path
+    return None
+
+
+class PageTextStore:
+    """Read/write persisted page text for documents."""
+
+    def load(
+        self,
+        db: Session,
+        document: Document,
+        file_hash: Optional[str] = None,
+    ) -> Optional[ExtractionArtifact]:
+        """Load stored page text if it matches the document's current file.
+
+        Args:
+            db: Database session
+            document: Document whose text to load
+            file_hash: SHA-256 of the current file (defaults to the hash
+                recorded at upload, computed from the file if neither is known)
+
+        Returns:
+            ExtractionArtifact, or None if nothing is stored or the file changed
+        """
+        row = db.query(DocumentPageText).filter(
+            DocumentPageText.document_id == document.id
+        ).first()
+        if not row:
+            return None
+
+        if file_hash is None:
+            file_hash = document.file_hash
+        if file_hash is None:
+            path = resolve_document_path(document)
+            if not path:
+                return None
+            file_hash = compute_file_hash(path)
+
+        if row.file_hash != file_hash:
+            logger.info(
+                "Stored page text for document %s is stale (file changed)", document.id
+            )
+            return None
+
+        try:
+            pages = decompress_pages(row.compressed_pages)
+        except (zlib.error, ValueError):
+            logger.warning("Corrupt page text for document %s, ignoring", document.id)
+            return None
+
+        return ExtractionArtifact(
+            file_hash=row.file_hash,
+            pages=pages,
+            extraction_method=row.extraction_method,
+        )
+
+    def load_by_hash(
+        self,
+        db: Session,
+        file_hash: str,
+        organization_id: UUID,
+    ) -> Optional[ExtractionArtifact]:
+        """Load page text stored for another of the organization's documents
+        with identical file content.
+
+        Lets a re-upload of a known file skip extraction and OCR entirely.
+        Rows belonging to other organizations are never reused.
+        """
+        row = db.query(DocumentPageText).filter(
+            DocumentPageText.file_hash == file_hash,
+            DocumentPageText.organization_id == organization_id,
+        ).first()
+        if not row:
+            return None
+
+        try:
+            pages = decompress_pages(row.compressed_pages)
+        except (zlib.error, ValueError):
+            logger.warning("Corrupt page text for document %s, ignoring", row.document_id)
+            return None
+
+        return ExtractionArtifact(
+            file_hash=row.file_hash,
+            pages=pages,
+            extraction_method=row.extraction_method,
+        )
+
+    def save(
+        self,
+        db: Session,
+        document: Document,
+        extraction: ExtractionArtifact,
+    ) -> Optional[DocumentPageText]:
+        """Persist an extraction for a document, replacing any stale row.
+
+        Uses a savepoint so a failed write never poisons the caller's
+        transaction. The caller is responsible for committing.
+        """
+        if not extraction.pages:
+            return None
+
+        try:
+            with db.begin_nested():
+                row = db.query(DocumentPageText).filter(
+                    DocumentPageText.document_id == document.id
+                ).first()
+                if row is None:
+                    row = DocumentPageText(
+                        document_id=document.id,
+                        organization_id=document.organization_id,
+                    )
+                    db.add(row)
+
+                row.file_hash = extraction.file_hash
+                row.extraction_method = extraction.extraction_method
+                row.page_count = len(extraction.pages)
+                row.page_char_counts = extraction.page_char_counts
+                row.compressed_pages = compress_pages(extraction.pages)
+            return row
+        except Exception as e:
+            logger.warning("Failed to store page text for document %s: %s", document.id, e)
+            return None
+
+    def get_or_extract(
+        self,
+        db: Session,
+        document: Document,
+        store: bool = True,
+    ) -> Optional[ExtractionArtifact]:
+        """Return stored page text, extracting and storing it on first use.
+
+        Args:
+            db: Database session
+            document: Document to read
+            store: Save a fresh extraction; False leaves the session untouched
+
+        Returns:
+            ExtractionArtifact, or None if the file is missing or unreadable
+        """
+        path = resolve_document_path(document)
+        if not path:
+            return None
+
+        # Hash recorded at upload time, if the file was streamed in
+        file_hash = document.file_hash or compute_file_hash(path)
+        extraction = self.load(db, document, file_hash=file_hash)
+        if extraction is not None:
+            return extraction
+
+        if not pdf_processor.is_available():
+            return None
+
+        extraction = pdf_processor.extract_artifact(path, file_hash=file_hash)
+        if store:
+            self.save(db, document, extraction)
+        return extraction
+
+
+# Global instance
+page_text_store = PageTextStore()
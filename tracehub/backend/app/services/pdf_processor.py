@@ -1,9 +1,11 @@
 """PDF processing service for document extraction and analysis."""
 
-import re
 import logging
 import tempfile
 import os
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -59,7 +61,8 @@ def _initialize_ocr():
 
     try:
         TESSERACT_VERSION = pytesseract.get_tesseract_version()
-        OCR_AVAILABLE = PDF2IMAGE_AVAILABLE  # Both pytesseract and pdf2image needed
+        # Pages are rendered with PyMuPDF, or pdf2image if PyMuPDF is missing
+        OCR_AVAILABLE = PDF_PROCESSING_AVAILABLE or PDF2IMAGE_AVAILABLE
     except Exception:
         # Tesseract not installed or not in PATH
         pass
@@ -69,6 +72,9 @@ def _initialize_ocr():
 _initialize_ocr()
 
 from ..models.document import DocumentType
+from .file_utils import compute_file_hash
+from .keyword_matcher import DocumentPatternMatcher, PatternHit
+from .ocr_engine import OCROptions, ocr_engine
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +85,9 @@ class PageContent:
     page_number: int
     text: str
     char_count: int
+    extraction_method: str = "pymupdf"  # "pymupdf" or "ocr"
+    ocr_dpi: Optional[int] = None  # Resolution the page was OCR'd at
+    ocr_confidence: Optional[float] = None  # Mean Tesseract word confidence (adaptive OCR)
 
 
 @dataclass
@@ -94,6 +103,68 @@ class DocumentSection:
     detected_fields: Dict[str, Any]
 
 
+@dataclass
+class PageTextBuffer:
+    """All page texts joined once, with each page's start offset.
+
+    Every page is followed by a newline, so the span of pages a..b is the
+    same text the pages concatenated as page.text + "\n" would give;
+    sections are (start, end) views into the buffer instead of copies.
+    """
+    text: str
+    page_numbers: List[int]
+    offsets: List[int]  # Start of each page, plus len(text) at the end
+
+    @classmethod
+    def from_pages(cls, pages: List[PageContent]) -> "PageTextBuffer":
+        offsets = [0]
+        for page in pages:
+            offsets.append(offsets[-1] + len(page.text) + 1)
+        text = "\n".join(page.text for page in pages) + "\n" if pages else ""
+        return cls(text=text, page_numbers=[p.page_number for p in pages], offsets=offsets)
+
+    def page_range(self, start_page: int, end_page: int) -> Tuple[int, int]:
+        """Indexes [first, last) of the pages numbered start_page..end_page."""
+        return bisect_left(self.page_numbers, start_page), bisect_right(self.page_numbers, end_page)
+
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """Buffer offsets of pages [first, last)."""
+        return self.offsets[first], self.offsets[last]
+
+
+@dataclass
+class ExtractionArtifact:
+    """Text extracted once from a file and shared across the ingest pipeline.
+
+    Keyed by the SHA-256 of the file contents, so every stage that needs
+    the text (classification, enrichment, container extraction, BoL
+    parsing) reads this object instead of re-opening the PDF.
+    """
+    file_hash: str
+    pages: List[PageContent]
+    extraction_method: str  # "pymupdf", "ocr", "hybrid", "none"
+
+    @property
+    def ocr_pages(self) -> List[int]:
+        """Page numbers whose text came from OCR."""
+        return [p.page_number for p in self.pages if p.extraction_method == "ocr"]
+
+    @property
+    def page_char_counts(self) -> List[int]:
+        """Character count of each page, in page order."""
+        return [p.char_count for p in self.pages]
+
+    @property
+    def total_chars(self) -> int:
+        """Total characters extracted across all pages."""
+        return sum(self.page_char_counts)
+
+    @property
+    def full_text(self) -> str:
+        """All page texts joined with newlines."""
+        return "\n".join(p.text for p in self.pages)
+
+
 # Reference number patterns for common document types
 REFERENCE_PATTERNS = {
     DocumentType.BILL_OF_LADING: [
@@ -227,20 +298,56 @@ DOCUMENT_KEYWORDS = {
     ],
 }
 
+# Strong document start indicators (titles/headers that indicate a new document)
+BOUNDARY_PATTERNS = [
+    r'bill of lading',
+    r'certificate of origin',
+    r'phytosanitary certificate',
+    r'veterinary certificate',
+    r'health certificate',
+    r'commercial invoice',
+    r'fumigation certificate',
+    r'certificate of quality.*fumigation',
+    r'federal ministry of industry',
+    r'federal produce inspection',
+    r'nigerian association of chambers',
+    r'quality certificate',
+    r'insurance certificate',
+    r'packing list',
+    r'export declaration',
+    r'customs declaration',
+]
+
+# A boundary pattern must match within this many characters of the page start
+BOUNDARY_WINDOW = 300
+
+# All of the above compiled once; one scan feeds boundaries, scoring and references
+keyword_matcher = DocumentPatternMatcher(DOCUMENT_KEYWORDS, BOUNDARY_PATTERNS, REFERENCE_PATTERNS)
+
 
 class PDFProcessor:
     """Service for processing PDF documents and extracting content."""
 
-    # Minimum characters to consider text extraction successful (skip OCR if above this)
-    MIN_TEXT_THRESHOLD = 100
+    # Minimum characters for a page's text layer to be kept (OCR the page
+    # if below and the page has images or drawings to read text from)
+    MIN_PAGE_TEXT_THRESHOLD = 50
 
     # Default OCR configuration (can be overridden by settings)
     OCR_DPI = 300  # DPI for PDF to image conversion
     OCR_TIMEOUT = 30  # Timeout per page in seconds
     OCR_LANGUAGE = "eng"  # Tesseract language
     OCR_ENABLED = True  # Whether OCR fallback is enabled
+    OCR_ADAPTIVE_DPI = True  # Start at OCR_INITIAL_DPI, escalate to OCR_DPI on low confidence
+    OCR_INITIAL_DPI = 150  # First-pass DPI in adaptive mode
+    OCR_MIN_CONFIDENCE = 70.0  # Mean word confidence (0-100) to accept the first pass
+
+    # Number of per-file extraction artifacts kept in memory
+    ARTIFACT_CACHE_SIZE = 32
 
     def __init__(self):
+        self._artifact_cache: "OrderedDict[str, ExtractionArtifact]" = OrderedDict()
+        self._artifact_lock = threading.Lock()
+
         if not PDF_PROCESSING_AVAILABLE:
             logger.warning("PyMuPDF not installed. PDF processing will be limited.")
 
@@ -252,6 +359,9 @@ class PDFProcessor:
             self.OCR_TIMEOUT = settings.ocr_timeout
             self.OCR_LANGUAGE = settings.ocr_language
             self.OCR_ENABLED = settings.ocr_enabled
+            self.OCR_ADAPTIVE_DPI = settings.ocr_adaptive_dpi
+            self.OCR_INITIAL_DPI = settings.ocr_initial_dpi
+            self.OCR_MIN_CONFIDENCE = settings.ocr_min_confidence
         except Exception:
             pass  # Use defaults if config not available
 
@@ -262,8 +372,8 @@ class PDFProcessor:
         else:
             if not PYTESSERACT_AVAILABLE:
                 logger.warning("pytesseract not installed. OCR will not be available.")
-            elif not PDF2IMAGE_AVAILABLE:
-                logger.warning("pdf2image not installed. OCR will not be available.")
+            elif not (PDF_PROCESSING_AVAILABLE or PDF2IMAGE_AVAILABLE):
+                logger.warning("Neither PyMuPDF nor pdf2image installed. OCR will not be available.")
             else:
                 logger.warning("Tesseract not installed or not in PATH. OCR will not be available.")
 
@@ -283,6 +393,9 @@ class PDFProcessor:
             "pdf2image_installed": PDF2IMAGE_AVAILABLE,
             "tesseract_version": str(TESSERACT_VERSION) if TESSERACT_VERSION else None,
             "ocr_language": self.OCR_LANGUAGE if OCR_AVAILABLE else None,
+            "ocr_workers": ocr_engine.workers,
+            "ocr_dpi": self.OCR_DPI,
+            "ocr_initial_dpi": self.OCR_INITIAL_DPI if self.OCR_ADAPTIVE_DPI else None,
         }
 
     def get_page_count(self, file_path: str) -> int:
@@ -299,43 +412,33 @@ class PDFProcessor:
             logger.error(f"Error getting page count: {e}")
             return 0
 
-    def _extract_text_with_ocr_single_page(self, image) -> str:
-        """Extract text from a single page image using OCR.
-
-        Args:
-            image: PIL Image object
-
-        Returns:
-            Extracted text string
-        """
-        if not OCR_AVAILABLE:
-            return ""
-
-        try:
-            # Use pytesseract to extract text
-            text = pytesseract.image_to_string(
-                image,
-                lang=self.OCR_LANGUAGE,
-                timeout=self.OCR_TIMEOUT,
-                config='--psm 1'  # Automatic page segmentation with OSD
-            )
-            return text.strip()
-        except Exception as e:
-            logger.error(f"OCR extraction failed for page: {e}")
-            return ""
-
-    def extract_text_with_ocr(self, file_path: str) -> List[PageContent]:
+    def _ocr_options(self) -> OCROptions:
+        """Tesseract settings for this processor."""
+        return OCROptions(
+            dpi=self.OCR_DPI,
+            language=self.OCR_LANGUAGE,
+            timeout=self.OCR_TIMEOUT,
+            initial_dpi=self.OCR_INITIAL_DPI if self.OCR_ADAPTIVE_DPI else None,
+            min_confidence=self.OCR_MIN_CONFIDENCE,
+        )
+
+    def extract_text_with_ocr(
+        self,
+        file_path: str,
+        page_numbers: Optional[List[int]] = None,
+    ) -> List[PageContent]:
         """Extract text from PDF using OCR.
 
-        Converts each PDF page to an image and uses Tesseract OCR
-        to extract text. This is useful for scanned PDFs that have
+        Renders and OCRs pages one at a time on the OCR worker pool
+        (see ocr_engine). This is useful for scanned PDFs that have
         no embedded text.
 
         Args:
             file_path: Path to the PDF file
+            page_numbers: 1-indexed pages to OCR (default: all pages)
 
         Returns:
-            List of PageContent objects with OCR-extracted text
+            List of PageContent objects with OCR-extracted text, in page order
         """
         if not OCR_AVAILABLE:
             logger.warning("OCR not available. Cannot extract text from scanned PDF.")
@@ -343,30 +446,26 @@ class PDFProcessor:
 
         pages = []
         try:
-            logger.info(f"Starting OCR extraction for: {file_path}")
+            if page_numbers is None:
+                page_numbers = list(range(1, self.get_page_count(file_path) + 1))
 
-            # Convert PDF pages to images
-            images = convert_from_path(
-                file_path,
-                dpi=self.OCR_DPI,
-                fmt='png'
+            logger.info(
+                f"Starting OCR extraction for: {file_path} "
+                f"({len(page_numbers)} pages, {ocr_engine.workers} workers)"
             )
 
-            logger.info(f"Converted PDF to {len(images)} images for OCR")
-
-            for page_num, image in enumerate(images, start=1):
-                logger.debug(f"Processing OCR for page {page_num}")
-
-                # Extract text using OCR
-                text = self._extract_text_with_ocr_single_page(image)
-
-                pages.append(PageContent(
-                    page_number=page_num,
-                    text=text,
-                    char_count=len(text)
-                ))
-
-                logger.debug(f"Page {page_num} OCR extracted {len(text)} characters")
+            results = ocr_engine.ocr_pages(file_path, page_numbers, self._ocr_options())
+            pages = [
+                PageContent(
+                    page_number=result.page_number,
+                    text=result.text,
+                    char_count=len(result.text),
+                    extraction_method="ocr",
+                    ocr_dpi=result.dpi,
+                    ocr_confidence=result.confidence
+                )
+                for result in results
+            ]
 
             total_chars = sum(p.char_count for p in pages)
             logger.info(f"OCR extraction complete. Total characters: {total_chars}")
@@ -376,27 +475,24 @@ class PDFProcessor:
 
         return pages
 
-    def _is_scanned_pdf(self, pages: List[PageContent]) -> bool:
-        """Determine if a PDF is likely scanned (image-only).
-
-        Args:
-            pages: List of PageContent from normal text extraction
+    def _needs_ocr(self, page, text: str) -> bool:
+        """Whether a page's text layer is too thin to trust and OCR could help.
 
-        Returns:
-            True if the PDF appears to be scanned/image-only
+        Combined PDFs often mix digitally generated pages with scanned ones,
+        so the decision is made per page rather than for the whole document.
+        A thin page with no images or drawings (blank, or a short digital
+        page such as a signature sheet) has nothing for OCR to read.
         """
-        if not pages:
-            return True
-
-        total_chars = sum(p.char_count for p in pages)
-        return total_chars < self.MIN_TEXT_THRESHOLD
+        if len(text.strip()) >= self.MIN_PAGE_TEXT_THRESHOLD:
+            return False
+        return bool(page.get_images()) or bool(page.get_drawings())
 
     def extract_text(self, file_path: str, use_ocr_fallback: bool = True) -> List[PageContent]:
         """Extract text content from all pages of a PDF.
 
         First attempts normal text extraction using PyMuPDF.
-        If the PDF appears to be scanned (minimal text extracted),
-        falls back to OCR if available and enabled.
+        Pages with little or no text layer (scanned pages) are then
+        OCR'd individually if OCR is available and enabled.
 
         Args:
             file_path: Path to the PDF file
@@ -405,13 +501,74 @@ class PDFProcessor:
         Returns:
             List of PageContent objects with extracted text
         """
+        pages, _ = self._extract_pages(file_path, use_ocr_fallback)
+        return pages
+
+    def extract_artifact(
+        self,
+        file_path: str,
+        file_hash: Optional[str] = None,
+        use_ocr_fallback: bool = True,
+    ) -> ExtractionArtifact:
+        """Extract text once per file content and cache the result.
+
+        The artifact is keyed by the SHA-256 of the file, so repeated calls
+        for the same bytes (within this process) reuse the earlier
+        extraction, including any OCR pass.
+
+        Args:
+            file_path: Path to the PDF file
+            file_hash: Pre-computed SHA-256 of the file (computed if omitted)
+            use_ocr_fallback: Whether to use OCR for scanned PDFs (default: True)
+
+        Returns:
+            ExtractionArtifact with page texts and extraction method
+        """
+        if file_hash is None:
+            file_hash = compute_file_hash(file_path)
+
+        if use_ocr_fallback:
+            with self._artifact_lock:
+                cached = self._artifact_cache.get(file_hash)
+                if cached is not None:
+                    self._artifact_cache.move_to_end(file_hash)
+                    logger.debug(f"Extraction cache hit for {file_hash[:12]}")
+                    return cached
+
+        pages, method = self._extract_pages(file_path, use_ocr_fallback)
+        artifact = ExtractionArtifact(
+            file_hash=file_hash,
+            pages=pages,
+            extraction_method=method if pages else "none",
+        )
+
+        if use_ocr_fallback and pages:
+            with self._artifact_lock:
+                self._artifact_cache[file_hash] = artifact
+                self._artifact_cache.move_to_end(file_hash)
+                while len(self._artifact_cache) > self.ARTIFACT_CACHE_SIZE:
+                    self._artifact_cache.popitem(last=False)
+
+        return artifact
+
+    def _extract_pages(
+        self, file_path: str, use_ocr_fallback: bool = True
+    ) -> Tuple[List[PageContent], str]:
+        """Extract page texts and report which method produced them.
+
+        Returns:
+            Tuple of (pages, extraction_method) where method is "pymupdf",
+            "ocr" (every page OCR'd) or "hybrid" (some pages OCR'd)
+        """
         if not PDF_PROCESSING_AVAILABLE:
-            return []
+            return [], "none"
 
         pages = []
         extraction_method = "pymupdf"
 
         try:
+            # OCR only the pages without a usable text layer
+            ocr_candidates = []
             doc = fitz.open(file_path)
             for page_num in range(len(doc)):
                 page = doc[page_num]
@@ -421,38 +578,42 @@ class PDFProcessor:
                     text=text,
                     char_count=len(text)
                 ))
+                if use_ocr_fallback and self._needs_ocr(page, text):
+                    ocr_candidates.append(page_num + 1)
             doc.close()
 
             total_chars = sum(p.char_count for p in pages)
             logger.info(f"PyMuPDF extracted {total_chars} characters from {len(pages)} pages")
 
-            # Check if OCR fallback is needed
-            if use_ocr_fallback and self.OCR_ENABLED and self._is_scanned_pdf(pages):
+            if ocr_candidates and self.OCR_ENABLED:
                 if OCR_AVAILABLE:
                     logger.info(
-                        f"Document appears to be scanned (only {total_chars} chars). "
-                        f"Attempting OCR extraction..."
+                        f"{len(ocr_candidates)} of {len(pages)} pages have no usable text layer. "
+                        f"Attempting OCR on pages {ocr_candidates}..."
+                    )
+                    ocr_pages = self.extract_text_with_ocr(file_path, page_numbers=ocr_candidates)
+
+                    replaced = 0
+                    for ocr_page in ocr_pages:
+                        index = ocr_page.page_number - 1
+                        # Use OCR result only if it extracted more text
+                        if ocr_page.char_count > pages[index].char_count:
+                            pages[index] = ocr_page
+                            replaced += 1
+
+                    if replaced == len(pages):
+                        extraction_method = "ocr"
+                    elif replaced:
+                        extraction_method = "hybrid"
+
+                    ocr_total_chars = sum(p.char_count for p in pages)
+                    logger.info(
+                        f"OCR replaced {replaced} of {len(ocr_candidates)} candidate pages "
+                        f"({total_chars} chars -> {ocr_total_chars} chars)"
                     )
-                    ocr_pages = self.extract_text_with_ocr(file_path)
-
-                    if ocr_pages:
-                        ocr_total_chars = sum(p.char_count for p in ocr_pages)
-                        # Use OCR result if it extracted more text
-                        if ocr_total_chars > total_chars:
-                            logger.info(
-                                f"OCR extraction successful. "
-                                f"Using OCR result ({ocr_total_chars} chars vs {total_chars} chars)"
-                            )
-                            pages = ocr_pages
-                            extraction_method = "ocr"
-                        else:
-                            logger.info(
-                                f"OCR did not improve extraction. "
-                                f"Keeping original ({total_chars} chars vs OCR {ocr_total_chars} chars)"
-                            )
                 else:
                     logger.warning(
-                        f"Document appears to be scanned (only {total_chars} chars) "
+                        f"{len(ocr_candidates)} pages have no usable text layer "
                         f"but OCR is not available. Text extraction may be incomplete."
                     )
 
@@ -463,45 +624,50 @@ class PDFProcessor:
         final_chars = sum(p.char_count for p in pages)
         logger.debug(f"Text extraction complete using {extraction_method}: {final_chars} total characters")
 
-        return pages
+        return pages, extraction_method
 
     def extract_reference_number(self, text: str, doc_type: DocumentType) -> Optional[str]:
         """Extract reference number from text based on document type."""
-        patterns = REFERENCE_PATTERNS.get(doc_type, [])
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                # Return the captured group if exists, otherwise full match
-                return match.group(1) if match.lastindex else match.group(0)
-
-        return None
+        return keyword_matcher.extract_reference(text, doc_type)
 
     def detect_document_type_by_keywords(self, text: str) -> List[Tuple[DocumentType, float]]:
         """Detect document type based on keyword matching.
 
         Returns list of (DocumentType, confidence) tuples sorted by confidence.
         """
-        text_lower = text.lower()
+        return self.score_keyword_hits(keyword_matcher.scan(text))
+
+    def score_keyword_hits(self, hits: List[PatternHit]) -> List[Tuple[DocumentType, float]]:
+        """Score document types from a keyword scan.
+
+        Returns list of (DocumentType, confidence) tuples sorted by confidence.
+        """
         scores = {}
 
-        for doc_type, keywords in DOCUMENT_KEYWORDS.items():
-            matches = sum(1 for kw in keywords if kw in text_lower)
-            if matches > 0:
-                # Confidence based on percentage of keywords matched
-                confidence = min(matches / len(keywords), 1.0)
-                # Boost confidence if multiple keywords match
-                if matches >= 3:
-                    confidence = min(confidence + 0.2, 1.0)
-                scores[doc_type] = confidence
+        for doc_type, matched in keyword_matcher.matched_keywords(hits).items():
+            matches = len(matched)
+            # Confidence based on percentage of keywords matched
+            confidence = min(matches / len(DOCUMENT_KEYWORDS[doc_type]), 1.0)
+            # Boost confidence if multiple keywords match
+            if matches >= 3:
+                confidence = min(confidence + 0.2, 1.0)
+            scores[doc_type] = confidence
 
         # Sort by confidence descending
         sorted_types = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         return sorted_types
 
-    def detect_document_boundaries(self, pages: List[PageContent]) -> List[Tuple[int, int]]:
+    def detect_document_boundaries(
+        self,
+        pages: List[PageContent],
+        page_hits: Optional[List[List[PatternHit]]] = None,
+    ) -> List[Tuple[int, int]]:
         """Detect where different documents start and end within a PDF.
 
+        Args:
+            pages: Extracted pages
+            page_hits: keyword_matcher.scan() result per page, if already scanned
+
         Returns list of (start_page, end_page) tuples.
         """
         if not pages:
@@ -510,45 +676,20 @@ class PDFProcessor:
         boundaries = []
         current_start = 1
 
-        # Strong document start indicators (titles/headers that indicate new document)
-        doc_start_patterns = [
-            r'bill of lading',
-            r'certificate of origin',
-            r'phytosanitary certificate',
-            r'veterinary certificate',
-            r'health certificate',
-            r'commercial invoice',
-            r'fumigation certificate',
-            r'certificate of quality.*fumigation',
-            r'federal ministry of industry',
-            r'federal produce inspection',
-            r'nigerian association of chambers',
-            r'quality certificate',
-            r'insurance certificate',
-            r'packing list',
-            r'export declaration',
-            r'customs declaration',
-        ]
-
         for i, page in enumerate(pages):
             page_num = page.page_number
 
             # Check if this page likely starts a new document
             if i > 0:
-                # Look for strong indicators of a new document
-                text_lower = page.text.lower()[:800]  # Check more text
-
-                # Check for document start patterns
-                is_new_doc = False
-                for pattern in doc_start_patterns:
-                    if re.search(pattern, text_lower):
-                        # Verify it's near the start of the page (first 300 chars)
-                        early_text = text_lower[:300]
-                        if re.search(pattern, early_text):
-                            is_new_doc = True
-                            break
+                # Look for strong indicators of a new document near the top of the page
+                if page_hits is not None:
+                    hits = page_hits[i]
+                else:
+                    hits = keyword_matcher.scan(page.text, 0, BOUNDARY_WINDOW)
+                is_new_doc = keyword_matcher.has_boundary(page.text, hits, 0, BOUNDARY_WINDOW)
 
                 # Also check for page 1 indicator
+                text_lower = page.text[:800].lower()
                 if text_lower.strip().startswith('page 1') or 'page: 1' in text_lower[:100]:
                     is_new_doc = True
 
@@ -564,32 +705,45 @@ class PDFProcessor:
 
         return boundaries
 
-    def analyze_pdf(self, file_path: str) -> List[DocumentSection]:
+    def analyze_pdf(
+        self,
+        file_path: str,
+        extraction: Optional[ExtractionArtifact] = None,
+    ) -> List[DocumentSection]:
         """Analyze a PDF and detect all documents within it.
 
         This is the main method for processing combined PDFs.
+
+        Args:
+            file_path: Path to the PDF file
+            extraction: Previously extracted text for this file; when given,
+                the PDF is not re-opened
         """
         if not PDF_PROCESSING_AVAILABLE:
             return []
 
-        # Extract text from all pages
-        pages = self.extract_text(file_path)
+        # Extract text from all pages (unless already extracted upstream)
+        pages = extraction.pages if extraction is not None else self.extract_text(file_path)
         if not pages:
             return []
 
+        # Scan every page once; boundaries and type scoring share the hits
+        page_hits = [keyword_matcher.scan(page.text) for page in pages]
+
         # Detect document boundaries
-        boundaries = self.detect_document_boundaries(pages)
+        boundaries = self.detect_document_boundaries(pages, page_hits)
+
+        # Join page text once; sections are offset ranges into the buffer
+        buffer = PageTextBuffer.from_pages(pages)
 
         sections = []
         for start_page, end_page in boundaries:
-            # Combine text from all pages in this section
-            section_text = ""
-            for page in pages:
-                if start_page <= page.page_number <= end_page:
-                    section_text += page.text + "\n"
+            first, last = buffer.page_range(start_page, end_page)
+            start, end = buffer.span(first, last)
+            section_hits = [hit for hits in page_hits[first:last] for hit in hits]
 
             # Detect document type
-            type_scores = self.detect_document_type_by_keywords(section_text)
+            type_scores = self.score_keyword_hits(section_hits)
 
             if type_scores:
                 doc_type, confidence = type_scores[0]
@@ -598,20 +752,20 @@ class PDFProcessor:
                 confidence = 0.0
 
             # Extract reference number
-            ref_number = self.extract_reference_number(section_text, doc_type) if doc_type else None
+            ref_number = keyword_matcher.extract_reference(buffer.text, doc_type, start, end) if doc_type else None
 
             # Create section - use more text for AI classification (4000 chars)
             sections.append(DocumentSection(
                 document_type=doc_type,
                 page_start=start_page,
                 page_end=end_page,
-                text_preview=section_text[:4000],  # Increased from 500 for better AI classification
+                text_preview=buffer.text[start:min(start + 4000, end)],  # Increased from 500 for better AI classification
                 reference_number=ref_number,
                 confidence=confidence,
                 detection_method="keyword",
                 detected_fields={
                     "page_count": end_page - start_page + 1,
-                    "char_count": len(section_text),
+                    "char_count": end - start,
                     "alternative_types": [
                         {"type": t.value, "confidence": c}
                         for t, c in type_scores[1:4]  # Include top 3 alternatives
@@ -0,0 +1,121 @@
+"""Compiled regular expressions shared by the document parsers.
+
+The BoL parser, shipment data extractor, keyword matcher and BoL rules
+engine each keep their patterns as readable string tables. Passing those
+strings to re.search() on every call leans on the re module's internal
+cache, which holds 512 entries and is shared with every other library in
+the process; under churn the parsers recompile the same patterns over and
+over. This registry compiles each (pattern, flags) pair once and keeps it
+for the life of the process.
+
+Field patterns are registered as named, ordered groups ("bol.vessel",
+"shipment.hs_code") compiled with their flags at import, so the parsers
+look up tuples of compiled patterns instead of strings.
+
+Usage:
+    from app.services.regex_registry import first_match, regex_registry
+
+    VESSEL = regex_registry.register("bol.vessel", VESSEL_PATTERNS, re.IGNORECASE)
+    match = first_match(VESSEL, text)
+
+    regex_registry.compile(r"(\\w+)\\[(\\d+)\\]").match(segment)
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+PatternGroup = Tuple[re.Pattern, ...]
+
+
+class PatternRegistry:
+    """Process-wide store of compiled patterns and named pattern groups."""
+
+    def __init__(self):
+        self._compiled: Dict[Tuple[str, int], re.Pattern] = {}
+        self._groups: Dict[str, PatternGroup] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, pattern: str, flags: int = 0) -> re.Pattern:
+        """Compiled pattern for (pattern, flags), compiling it on first use.
+
+        Raises:
+            re.error: If the pattern is invalid
+        """
+        key = (pattern, int(flags))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = re.compile(pattern, flags)
+            with self._lock:
+                compiled = self._compiled.setdefault(key, compiled)
+        return compiled
+
+    def register(
+        self,
+        name: str,
+        patterns: Iterable[str],
+        flags: int = 0,
+        replace: bool = False,
+    ) -> PatternGroup:
+        """Compile patterns (in priority order) and register them under name.
+
+        Registering the same name again with the same patterns returns the
+        existing group.
+
+        Args:
+            replace: Re-register name even if it holds other patterns
+                (tests and deliberate overrides)
+
+        Raises:
+            ValueError: If name is already registered with other patterns
+                and replace is not set
+        """
+        group = tuple(self.compile(p, flags) for p in patterns)
+        with self._lock:
+            if replace:
+                self._groups[name] = group
+            existing = self._groups.setdefault(name, group)
+        if existing != group:
+            raise ValueError(f"Pattern group {name!r} is already registered")
+        return existing
+
+    def register_fields(
+        self,
+        namespace: str,
+        fields: Dict[str, Sequence[str]],
+        flags: int = 0,
+        replace: bool = False,
+    ) -> Dict[str, PatternGroup]:
+        """Register one group per field as "{namespace}.{field}"."""
+        return {
+            field: self.register(f"{namespace}.{field}", patterns, flags, replace)
+            for field, patterns in fields.items()
+        }
+
+    def group(self, name: str) -> PatternGroup:
+        """A registered pattern group.
+
+        Raises:
+            KeyError: If no group is registered under name
+        """
+        return self._groups[name]
+
+    def group_names(self) -> List[str]:
+        return sorted(self._groups)
+
+    def __len__(self) -> int:
+        """Number of distinct compiled patterns."""
+        return len(self._compiled)
+
+
+def first_match(patterns: Iterable[re.Pattern], text: str) -> Optional[re.Match]:
+    """Search text with each pattern in order; the first match wins."""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+# Global instance
+regex_registry = PatternRegistry()
@@ -0,0 +1,211 @@
+"""AI enhancement of keyword-classified PDF sections.
+
+Shared by both document classifiers (document_classifier and
+document_classifier_v2) so sections of a combined PDF go to the
+LLMBackend the same way whichever classifier is in use.
+
+Only sections without a decisive keyword result are sent (see
+classification_cascade). With more than one pending section they are
+classified concurrently (bounded by llm_max_concurrency, each call limited
+by llm_call_timeout_seconds) unless llm_concurrent_sections is off. With
+llm_batch_sections on, they are instead packed into batched prompts of up
+to llm_batch_token_budget estimated tokens, and the batches run
+concurrently. A section whose call fails or times out keeps its keyword
+result.
+
+Usage:
+    from app.services.section_classification import SectionClassifier
+
+    sections = pdf_processor.analyze_pdf(file_path)
+    SectionClassifier(llm).enhance(sections)
+"""
+
+from typing import List, Optional
+
+from ..config import get_settings
+from .classification_cascade import classification_cascade
+from .llm import ClassificationResult, LLMBackend
+from .llm_async import as_async_backend, gather_bounded, run_sync
+from .pdf_processor import DocumentSection
+
+# Rough token estimate for packing batches (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(texts: List[str], token_budget: int, max_items: int) -> List[List[int]]:
+    """Group text indices, in order, into batches within a token budget.
+
+    A text that alone exceeds the budget gets a batch of its own.
+
+    Returns:
+        Lists of indices into texts
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (used + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pending_sections(sections: List[DocumentSection]) -> List[DocumentSection]:
+    """Sections without a decisive keyword result, which go to the LLM."""
+    return [s for s in sections if classification_cascade.decide_section(s).escalate]
+
+
+def apply_result(
+    section: DocumentSection, result: Optional[ClassificationResult]
+) -> DocumentSection:
+    """Merge an AI result into a keyword-classified section."""
+    if result:
+        # Update section with AI results if confidence is higher
+        if result.confidence > section.confidence:
+            section.document_type = result.document_type
+            section.confidence = result.confidence
+            section.detection_method = "ai"
+
+        # Always update with AI-detected fields
+        if result.reference_number and not section.reference_number:
+            section.reference_number = result.reference_number
+
+        section.detected_fields.update({
+            "ai_reasoning": result.reasoning,
+            # Copy: later stages add to the section's fields, not the result's
+            "ai_fields": dict(result.key_fields or {}),
+        })
+
+    return section
+
+
+class SectionClassifier:
+    """Enhances keyword-classified sections through one LLMBackend.
+
+    Callers check that the backend is available before enhancing.
+    """
+
+    def __init__(self, llm: LLMBackend):
+        self.llm = llm
+
+    def classify_section(self, section: DocumentSection) -> DocumentSection:
+        """Enhance one section, unless its keyword result is decisive."""
+        if not classification_cascade.decide_section(section).escalate:
+            return section
+
+        return apply_result(section, self.llm.classify_document(section.text_preview))
+
+    async def classify_sections_async(
+        self,
+        sections: List[DocumentSection],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[DocumentSection]:
+        """Enhance all sections with AI classification concurrently.
+
+        Args:
+            sections: Keyword-classified sections
+            max_concurrency: Calls in flight at once (default llm_max_concurrency)
+            timeout: Seconds per call (default llm_call_timeout_seconds)
+
+        Returns:
+            The sections in their original order; failed or timed-out
+            sections keep their keyword results
+        """
+        settings = get_settings()
+        llm = as_async_backend(self.llm)
+
+        results = await gather_bounded(
+            lambda section: llm.classify_document(section.text_preview),
+            sections,
+            max_concurrency or settings.llm_max_concurrency,
+            timeout if timeout is not None else settings.llm_call_timeout_seconds,
+        )
+        return [apply_result(s, r) for s, r in zip(sections, results)]
+
+    async def classify_sections_batched_async(
+        self,
+        sections: List[DocumentSection],
+        token_budget: Optional[int] = None,
+        max_sections: Optional[int] = None,
+    ) -> List[DocumentSection]:
+        """Enhance all sections using batched prompts.
+
+        Sections are packed in order into batches of at most max_sections
+        and token_budget estimated tokens; each batch is one classify_batch
+        call, and batches run concurrently like single-section calls.
+
+        Args:
+            sections: Keyword-classified sections
+            token_budget: Section-text tokens per batch (default llm_batch_token_budget)
+            max_sections: Sections per batch (default llm_batch_max_sections)
+
+        Returns:
+            The sections in their original order; sections of a failed or
+            timed-out batch keep their keyword results
+        """
+        settings = get_settings()
+        llm = as_async_backend(self.llm)
+        texts = [s.text_preview for s in sections]
+        batches = pack_batches(
+            texts,
+            token_budget or settings.llm_batch_token_budget,
+            max_sections or settings.llm_batch_max_sections,
+        )
+
+        batch_results = await gather_bounded(
+            lambda batch: llm.classify_batch([texts[i] for i in batch]),
+            batches,
+            settings.llm_max_concurrency,
+            settings.llm_call_timeout_seconds,
+        )
+
+        results: List[Optional[ClassificationResult]] = [None] * len(sections)
+        for batch, batch_result in zip(batches, batch_results):
+            for i, result in zip(batch, batch_result or []):
+                results[i] = result
+        return [apply_result(s, r) for s, r in zip(sections, results)]
+
+    def enhance(self, sections: List[DocumentSection]) -> List[DocumentSection]:
+        """Enhance every pending section in place, blocking until done.
+
+        Async callers should use enhance_async.
+        """
+        pending = pending_sections(sections)
+
+        settings = get_settings()
+        if settings.llm_batch_sections and len(pending) > 1:
+            run_sync(self.classify_sections_batched_async(pending))
+        elif settings.llm_concurrent_sections and len(pending) > 1:
+            run_sync(self.classify_sections_async(pending))
+        else:
+            for section in pending:
+                apply_result(section, self.llm.classify_document(section.text_preview))
+
+        return sections
+
+    async def enhance_async(self, sections: List[DocumentSection]) -> List[DocumentSection]:
+        """Awaitable enhance(); model calls never block the event loop."""
+        pending = pending_sections(sections)
+
+        settings = get_settings()
+        if settings.llm_batch_sections and len(pending) > 1:
+            await self.classify_sections_batched_async(pending)
+        elif settings.llm_concurrent_sections and len(pending) > 1:
+            await self.classify_sections_async(pending)
+        else:
+            llm = as_async_backend(self.llm)
+            for section in pending:
+                apply_result(section, await llm.classify_document(section.text_preview))
+
+        return sections
@@ -11,10 +11,14 @@ Uses keyword-based extraction (always available) with AI enhancement when availa
 
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field
 
 from ..models.document import DocumentType
+from .regex_registry import first_match, regex_registry
+
+if TYPE_CHECKING:
+    from .pdf_processor import ExtractionArtifact
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +33,11 @@ PLACEHOLDER_PATTERNS = [
     r'PLACEHOLDER',     # Contains PLACEHOLDER
     r'^XXXX',           # Placeholder prefix
 ]
+PLACEHOLDER_RES = regex_registry.register("shipment.placeholder", PLACEHOLDER_PATTERNS)
+
+# Separators stripped when normalizing HS codes and container numbers
+HS_CODE_SEPARATOR_RE = regex_registry.compile(r'[\s.]')
+CONTAINER_SEPARATOR_RE = regex_registry.compile(r'[\s-]')
 
 
 def is_valid_iso6346_container(container: str) -> bool:
@@ -66,11 +75,7 @@ def is_placeholder_container(container: str) -> bool:
 
     container_upper = container.upper()
 
-    for pattern in PLACEHOLDER_PATTERNS:
-        if re.search(pattern, container_upper):
-            return True
-
-    return False
+    return first_match(PLACEHOLDER_RES, container_upper) is not None
 
 
 # Common port codes and names (focus on VIBOTAJ routes: Nigeria -> EU)
@@ -253,6 +258,12 @@ PRODUCT_PATTERNS = {
     ],
 }
 
+# Compiled once at import, grouped per field in priority order
+EXTRACTION_RES = regex_registry.register_fields(
+    "shipment", EXTRACTION_PATTERNS, re.IGNORECASE | re.MULTILINE
+)
+PRODUCT_RES = regex_registry.register_fields("shipment.product", PRODUCT_PATTERNS)
+
 
 class ShipmentDataExtractor:
     """Service for extracting shipment-relevant data from document text."""
@@ -271,14 +282,21 @@ class ShipmentDataExtractor:
 
     def __init__(self):
         self._ai_client = None
+        # Subclasses may override the pattern table, so each registers
+        # under its own name.
+        cls = type(self)
+        namespace = "shipment" if cls is ShipmentDataExtractor else f"shipment.{cls.__module__}.{cls.__qualname__}"
+        self._invalid_vessel_res = regex_registry.register(
+            f"{namespace}.invalid_vessel", cls.INVALID_VESSEL_PATTERNS
+        )
 
     def _is_valid_vessel_name(self, name: str) -> bool:
         """Validate that vessel name is not a false positive."""
         if not name or len(name) < 3:
             return False
         name_lower = name.lower().strip()
-        for pattern in self.INVALID_VESSEL_PATTERNS:
-            if re.match(pattern, name_lower):
+        for pattern in self._invalid_vessel_res:
+            if pattern.match(name_lower):
                 return False
         return True
 
@@ -405,12 +423,9 @@ class ShipmentDataExtractor:
 
     def _extract_pattern(self, text: str, field_name: str) -> Optional[str]:
         """Extract first match for a field pattern."""
-        patterns = EXTRACTION_PATTERNS.get(field_name, [])
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return match.group(1) if match.lastindex else match.group(0)
+        match = first_match(EXTRACTION_RES.get(field_name, ()), text)
+        if match:
+            return match.group(1) if match.lastindex else match.group(0)
 
         return None
 
@@ -418,8 +433,8 @@ class ShipmentDataExtractor:
         """Extract all unique HS codes from text."""
         hs_codes = set()
 
-        for pattern in EXTRACTION_PATTERNS["hs_code"]:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in EXTRACTION_RES["hs_code"]:
+            matches = pattern.findall(text)
             for match in matches:
                 # Normalize: remove dots, then reformat
                 normalized = self._normalize_hs_code(match)
@@ -431,7 +446,7 @@ class ShipmentDataExtractor:
     def _normalize_hs_code(self, code: str) -> Optional[str]:
         """Normalize HS code to standard format."""
         # Remove dots and spaces
-        clean = re.sub(r'[\s.]', '', code)
+        clean = HS_CODE_SEPARATOR_RE.sub('', code)
 
         # Must be 4-10 digits
         if not clean.isdigit():
@@ -464,7 +479,7 @@ class ShipmentDataExtractor:
     def _normalize_container_number(self, container: str) -> str:
         """Normalize container number to standard format."""
         # Remove spaces and dashes
-        clean = re.sub(r'[\s-]', '', container.upper())
+        clean = CONTAINER_SEPARATOR_RE.sub('', container.upper())
         return clean
 
     def extract_container_with_confidence(self, text: str) -> Optional[Tuple[str, float]]:
@@ -499,7 +514,7 @@ class ShipmentDataExtractor:
 
         # Try labeled patterns first (higher confidence)
         for pattern, confidence in labeled_patterns:
-            match = re.search(pattern, text_upper, re.IGNORECASE)
+            match = regex_registry.compile(pattern, re.IGNORECASE).search(text_upper)
             if match:
                 container = self._normalize_container_number(match.group(1))
                 if is_valid_iso6346_container(container) and not is_placeholder_container(container):
@@ -507,7 +522,7 @@ class ShipmentDataExtractor:
 
         # Try unlabeled patterns
         for pattern, confidence in unlabeled_patterns:
-            match = re.search(pattern, text_upper)
+            match = regex_registry.compile(pattern).search(text_upper)
             if match:
                 container = self._normalize_container_number(match.group(1))
                 if is_valid_iso6346_container(container) and not is_placeholder_container(container):
@@ -540,9 +555,9 @@ class ShipmentDataExtractor:
         products = []
         text_lower = text.lower()
 
-        for product_name, patterns in PRODUCT_PATTERNS.items():
+        for product_name, patterns in PRODUCT_RES.items():
             for pattern in patterns:
-                if re.search(pattern, text_lower):
+                if pattern.search(text_lower):
                     # Determine HS code for this product
                     hs_code = None
                     if product_name == "hooves":
@@ -617,17 +632,25 @@ class ShipmentDataExtractor:
     def extract_from_document(
         self,
         file_path: str,
-        document_type: Optional[DocumentType] = None
+        document_type: Optional[DocumentType] = None,
+        extraction: Optional["ExtractionArtifact"] = None,
     ) -> ExtractedShipmentData:
         """Extract shipment data from a PDF document file.
 
         Args:
             file_path: Path to the PDF file
             document_type: Optional document type for context
+            extraction: Previously extracted text for this file; when given,
+                the PDF is not re-opened
 
         Returns:
             ExtractedShipmentData with all extracted fields
         """
+        if extraction is not None:
+            if not extraction.pages:
+                return ExtractedShipmentData()
+            return self.extract_from_text(extraction.full_text, document_type)
+
         from .pdf_processor import pdf_processor
 
         if not pdf_processor.is_available():
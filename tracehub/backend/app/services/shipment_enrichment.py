@@ -15,6 +15,7 @@ from datetime import datetime
 from ..models import Shipment, Product, Document
 from ..models.document import DocumentType
 from .shipment_data_extractor import ExtractedShipmentData, shipment_data_extractor
+from .pdf_processor import ExtractionArtifact
 from .entity_factory import create_product
 
 logger = logging.getLogger(__name__)
@@ -66,7 +67,8 @@ class ShipmentEnrichmentService:
         document: Document,
         db: Session,
         auto_create_products: bool = True,
-        overwrite_existing: bool = False
+        overwrite_existing: bool = False,
+        extraction: Optional[ExtractionArtifact] = None,
     ) -> EnrichmentResult:
         """Enrich a shipment with data extracted from a document.
 
@@ -76,6 +78,8 @@ class ShipmentEnrichmentService:
             db: Database session
             auto_create_products: Whether to auto-create products from HS codes
             overwrite_existing: Whether to overwrite existing shipment fields
+            extraction: Previously extracted text for the document's file
+                (avoids re-opening the PDF)
 
         Returns:
             EnrichmentResult with details of updates applied
@@ -93,7 +97,8 @@ class ShipmentEnrichmentService:
         try:
             extracted = shipment_data_extractor.extract_from_document(
                 document.file_path,
-                document.document_type
+                document.document_type,
+                extraction=extraction,
             )
         except Exception as e:
             result.errors.append(f"Extraction failed: {str(e)}")
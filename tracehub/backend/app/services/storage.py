@@ -6,7 +6,7 @@ Supabase Storage (prod/staging) implementations must satisfy.
 PRD-005: Supabase Storage for Documents
 """
 
-from typing import Protocol
+from typing import BinaryIO, Protocol, Union
 
 
 class StorageBackend(Protocol):
@@ -18,14 +18,15 @@ class StorageBackend(Protocol):
     """
 
     async def upload(
-        self, bucket: str, path: str, file: bytes, content_type: str
+        self, bucket: str, path: str, file: Union[bytes, BinaryIO], content_type: str
     ) -> str:
         """Upload file to storage.
 
         Args:
             bucket: Storage bucket name (documents, audit-packs, exports).
             path: Path within bucket ({org_id}/{document_id}/{filename}).
-            file: Raw file bytes.
+            file: Raw file bytes, or a binary file opened for reading
+                (read in chunks, for files too large to hold in memory).
             content_type: MIME type (e.g. application/pdf).
 
         Returns:
@@ -33,6 +34,22 @@ class StorageBackend(Protocol):
         """
         ...
 
+    async def download(self, bucket: str, path: str) -> BinaryIO:
+        """Open a stored file for reading.
+
+        Args:
+            bucket: Storage bucket name.
+            path: Path within bucket.
+
+        Returns:
+            Binary file object positioned at the start; the caller
+            closes it.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        ...
+
     async def download_url(
         self, bucket: str, path: str, expires_in: int = 3600
     ) -> str:
@@ -11,6 +11,7 @@ import logging
 from functools import lru_cache
 
 from ..config import get_settings
+from .latency_sim import get_simulator
 from .storage import StorageBackend
 from .local_storage import LocalStorageBackend
 
@@ -30,7 +31,9 @@ def _create_backend() -> StorageBackend:
                 "storage_backend=supabase but SUPABASE_URL/SUPABASE_SERVICE_KEY "
                 "not set — falling back to local storage"
             )
-            return LocalStorageBackend(base_path=settings.upload_dir)
+            return LocalStorageBackend(
+                base_path=settings.upload_dir, simulator=get_simulator("storage")
+            )
 
         from .supabase_storage import SupabaseStorageBackend
 
@@ -39,7 +42,9 @@ def _create_backend() -> StorageBackend:
             supabase_key=settings.supabase_service_key,
         )
 
-    return LocalStorageBackend(base_path=settings.upload_dir)
+    return LocalStorageBackend(
+        base_path=settings.upload_dir, simulator=get_simulator("storage")
+    )
 
 
 def get_storage() -> StorageBackend:
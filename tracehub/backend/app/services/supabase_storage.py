@@ -6,11 +6,22 @@ Signed URLs provide time-limited access for downloads.
 PRD-005: Supabase Storage for Documents
 """
 
+import asyncio
+import io
 import logging
-from typing import Any
+import tempfile
+from typing import Any, BinaryIO, Union
+
+import httpx
 
 logger = logging.getLogger(__name__)
 
+# Downloads larger than this are spooled to a temporary file on disk
+DOWNLOAD_SPOOL_BYTES = 1024 * 1024
+
+# Bytes per read when streaming a download
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class SupabaseStorageBackend:
     """Storage backend using Supabase Storage (S3-compatible).
@@ -32,17 +43,51 @@ class SupabaseStorageBackend:
         logger.info("SupabaseStorageBackend initialized (url=%s)", supabase_url)
 
     async def upload(
-        self, bucket: str, path: str, file: bytes, content_type: str
+        self, bucket: str, path: str, file: Union[bytes, BinaryIO], content_type: str
     ) -> str:
-        """Upload file to Supabase Storage bucket."""
+        """Upload file to Supabase Storage bucket.
+
+        File objects opened from disk are streamed by the client; other
+        file objects are read into memory first.
+        """
+        if not isinstance(file, (bytes, io.BufferedReader, io.FileIO)):
+            file = file.read()
         self._client.storage.from_(bucket).upload(
             path,
             file,
             {"content-type": content_type, "upsert": "false"},
         )
-        logger.info("Uploaded %s/%s (%d bytes)", bucket, path, len(file))
+        logger.info("Uploaded %s/%s", bucket, path)
         return f"{bucket}/{path}"
 
+    async def download(self, bucket: str, path: str) -> BinaryIO:
+        """Stream a file from Supabase Storage into a spooled temporary file.
+
+        The body is fetched through a short-lived signed URL in chunks;
+        only the first DOWNLOAD_SPOOL_BYTES stay in memory, the rest is
+        written to disk, so concurrent downloads of large files do not
+        each hold a whole file in RAM.
+        """
+        try:
+            url = await self.download_url(bucket, path, expires_in=60)
+        except Exception as e:
+            raise FileNotFoundError(f"Could not download {bucket}/{path}") from e
+
+        spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_BYTES)
+        try:
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                async with client.stream("GET", url) as response:
+                    if response.status_code == 404:
+                        raise FileNotFoundError(f"File not found: {bucket}/{path}")
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(spool.write, chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
     async def download_url(
         self, bucket: str, path: str, expires_in: int = 3600
     ) -> str:
@@ -0,0 +1,134 @@
+"""Streaming upload writer.
+
+Copies an incoming UploadFile to disk in fixed-size chunks, computing the
+SHA-256 digest and byte count as the data passes through. Disk writes run
+on a worker thread so the event loop keeps serving other requests while a
+large PDF is being received.
+
+The size limit is checked after every chunk: as soon as the running total
+crosses it, the partial file is deleted and UploadTooLargeError is raised.
+Data is written to a temporary file next to the destination and renamed
+into place only when complete, so an aborted upload never replaces an
+existing file.
+
+Usage:
+    from app.services.upload_writer import write_upload, UploadTooLargeError
+
+    try:
+        stored = await write_upload(file, "/uploads/<shipment>/bol.pdf", max_bytes)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, ...)
+    stored.size, stored.sha256
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the request body per iteration
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds maximum size of {max_bytes // (1024 * 1024)} MB")
+
+
+@dataclass
+class StoredUpload:
+    """Result of writing an upload to disk."""
+    path: str
+    size: int
+    sha256: str
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def stream_to_temp(
+    upload: UploadFile,
+    directory: str,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> StoredUpload:
+    """Stream an upload to a new temporary file in directory.
+
+    The caller decides where the file ends up once its hash is known
+    (see blob_store) and must move or delete the returned path.
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    # Reject up front when the multipart part declares its size
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except UploadTooLargeError:
+        logger.warning(f"Upload {upload.filename} aborted after {size} bytes (limit {max_bytes})")
+        _remove_quietly(tmp_path)
+        raise
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+    return StoredUpload(path=tmp_path, size=size, sha256=digest.hexdigest())
+
+
+async def write_upload(
+    upload: UploadFile,
+    file_path: str,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> StoredUpload:
+    """Stream an upload to file_path, hashing and size-checking inline.
+
+    Args:
+        upload: Incoming multipart file
+        file_path: Destination path (parent directory must exist)
+        max_bytes: Maximum accepted size; larger uploads are aborted
+        chunk_size: Bytes per read/write
+
+    Returns:
+        StoredUpload with the final path, size in bytes and SHA-256 hex digest
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    stored = await stream_to_temp(upload, os.path.dirname(file_path), max_bytes, chunk_size)
+    try:
+        await asyncio.to_thread(os.replace, stored.path, file_path)
+    except BaseException:
+        _remove_quietly(stored.path)
+        raise
+
+    stored.path = file_path
+    return stored
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for Bill of Lading parsing throughput.
+
+Parses a fixed, deterministic corpus of BoL texts (MSC, Hapag-Lloyd and
+Witatrade layouts with varied values) through the full keyword pipeline:
+
+    bol_parser.parse -> shipment_data_extractor.extract_from_text
+    -> RulesEngine.evaluate(STANDARD_BOL_RULES)
+
+and reports BoLs per second. The corpus is generated from a fixed seed,
+so numbers are comparable between runs and commits on the same machine.
+
+Usage:
+    python scripts/benchmark_bol_parsing.py
+    python scripts/benchmark_bol_parsing.py --count 500 --rounds 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.bol_parser import bol_parser
+from app.services.bol_rules import RulesEngine, STANDARD_BOL_RULES
+from app.services.shipment_data_extractor import shipment_data_extractor
+
+TEMPLATES = [
+    """
+BILL OF LADING
+B/L No.: {bol}
+
+SHIPPER:
+{shipper}
+123 EXPORT ROAD
+LAGOS, NIGERIA
+
+CONSIGNEE:
+{consignee}
+IMPORT STRASSE {n}
+20457 HAMBURG, GERMANY
+
+NOTIFY PARTY:
+SAME AS CONSIGNEE
+
+VESSEL: {vessel}
+VOYAGE NO.: {voyage}
+
+PORT OF LOADING: APAPA, NIGERIA (NGAPP)
+PORT OF DISCHARGE: HAMBURG, GERMANY (DEHAM)
+
+CONTAINER NO.: {container}
+SEAL NO.: SL{n}
+TYPE: 40' HIGH CUBE
+
+DESCRIPTION OF GOODS:
+{cargo}
+HS CODE: {hs}
+GROSS WEIGHT: {gross:,} KGS
+NET WEIGHT: {net:,} KGS
+
+SHIPPED ON BOARD: {day} JAN 2026
+FREIGHT: PREPAID
+""",
+    """
+Hapag-Lloyd
+SEA WAYBILL
+
+Bill of Lading Number: {bol}
+
+Shipper:
+{shipper}
+
+Consignee:
+{consignee}
+
+Vessel/Voyage: {vessel} / {voyage}
+Port of Loading: LAGOS (NGLOS)
+Port of Discharge: HAMBURG (DEHAM)
+
+Container Number: {container}
+Seal: HL{n}
+Type: 40HC
+
+Goods: {cargo}
+Harmonized Code: {hs}
+Gross Weight: {gross} KG
+Net Weight: {net} KG
+
+Date of Issue: {day}-JAN-2026
+""",
+    """
+OCEAN BILL OF LADING
+
+BL NUMBER: {bol}
+
+EXPORTER/SHIPPER:
+{shipper}
+PORT AREA, APAPA
+LAGOS, NIGERIA
+
+CONSIGNEE (TO ORDER):
+{consignee}
+HAFENSTRASSE {n}
+BREMEN, GERMANY
+
+Notify: {consignee}
+
+OCEAN VESSEL: {vessel}
+VOY NO: {voyage}
+
+POL: APAPA PORT (NGAPP)
+POD: BREMERHAVEN (DEBRV)
+
+CONTAINER/SEAL:
+{container} / SEAL-{n}
+
+CARGO DESCRIPTION:
+{cargo}
+HS: {hs}
+GROSS: {gross} KG / NET: {net} KG
+
+ON BOARD DATE: 2026-01-{day}
+TERMS: CFR BREMERHAVEN
+""",
+]
+
+SHIPPERS = ["VIBOTAJ GLOBAL NIGERIA LIMITED", "VIBOTAJ GLOBAL NIGERIA LTD", "LAGOS AGRO EXPORTS LIMITED"]
+CONSIGNEES = ["HAGES GMBH", "WITATRADE GMBH", "BECKMANN GBH", "HANSEATIC FEED GMBH"]
+VESSELS = ["MSC MARINA", "RHINE MAERSK", "EVER GIVEN", "CMA CGM TAGE"]
+CARGO = [("CATTLE HOOVES AND HORNS", "0506"), ("PROCESSED CATTLE HORNS", "0507"),
+         ("WHEAT BRAN PELLETS", "2302"), ("SESAME SEEDS", "1207")]
+
+
+def build_corpus(count: int, seed: int = 2026) -> list:
+    """Deterministic BoL texts."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        cargo, hs = rng.choice(CARGO)
+        net = rng.randrange(18000, 26000, 50)
+        corpus.append(TEMPLATES[i % len(TEMPLATES)].format(
+            bol=f"{rng.choice(['APU', 'HLCU', 'WBL-'])}{rng.randrange(100000, 999999)}",
+            shipper=rng.choice(SHIPPERS),
+            consignee=rng.choice(CONSIGNEES),
+            vessel=rng.choice(VESSELS),
+            voyage=f"VY{rng.randrange(1000, 9999)}N",
+            container=f"{rng.choice(['MRSU', 'HLBU', 'GCXU', 'MSCU'])}{rng.randrange(1000000, 9999999)}",
+            cargo=cargo,
+            hs=hs,
+            gross=net + rng.randrange(200, 800),
+            net=net,
+            day=rng.randrange(10, 29),
+            n=i,
+        ))
+    return corpus
+
+
+def run(corpus: list, engine: RulesEngine) -> None:
+    for text in corpus:
+        bol = bol_parser.parse(text)
+        shipment_data_extractor.extract_from_text(text)
+        engine.evaluate(bol)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=300, help="BoLs in the corpus")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count)
+    engine = RulesEngine(STANDARD_BOL_RULES)
+    run(corpus, engine)  # Warm up
+
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        run(corpus, engine)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"Corpus: {len(corpus)} BoLs, {args.rounds} rounds")
+    print(f"Best:   {best * 1000:.1f} ms/round, {len(corpus) / best:,.0f} BoLs/sec")
+    print(f"Median: {len(corpus) / sorted(timings)[len(timings) // 2]:,.0f} BoLs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -149,20 +149,18 @@ def classify_document(file_path: str, pdf_processor, document_classifier) -> Tup
 
     try:
         if ext == ".pdf":
-            pages = pdf_processor.extract_text(file_path, use_ocr_fallback=True)
-            if pages:
-                text = "\n".join(p.text for p in pages)
-                # Check if OCR was used (low initial text, higher after OCR)
-                initial_chars = sum(p.char_count for p in pages)
-                if initial_chars < 100 and len(text) > 100:
-                    ocr_used = True
+            # Cached by file hash - later passes over the same file reuse it
+            extraction = pdf_processor.extract_artifact(file_path)
+            if extraction.pages:
+                text = extraction.full_text
+                ocr_used = bool(extraction.ocr_pages)
         elif ext in {".jpeg", ".jpg", ".png"}:
-            # Use OCR for images
+            # Use OCR for images (cached by image hash across runs)
             try:
-                import pytesseract
                 from PIL import Image
-                image = Image.open(file_path)
-                text = pytesseract.image_to_string(image, lang="eng")
+                from app.services.ocr_engine import OCROptions, ocr_image_cached
+                with Image.open(file_path) as image:
+                    text, _ = ocr_image_cached(image, OCROptions(language="eng"))
                 ocr_used = True
             except Exception as e:
                 return "other", 0.0, "error", None, 0, False
@@ -487,6 +485,7 @@ def process_documents(env: str, dry_run: bool = False) -> ProcessingReport:
         )
         from app.services.pdf_processor import pdf_processor, PDF_PROCESSING_AVAILABLE, OCR_AVAILABLE
         from app.services.document_classifier import document_classifier
+        from app.services.page_text_store import page_text_store
         print("[OK] Modules loaded")
         print(f"    PDF Processing: {PDF_PROCESSING_AVAILABLE}")
         print(f"    OCR Available: {OCR_AVAILABLE}")
@@ -612,8 +611,7 @@ def process_documents(env: str, dry_run: bool = False) -> ProcessingReport:
                     try:
                         ext = file_path.suffix.lower()
                         if ext == ".pdf":
-                            pages = pdf_processor.extract_text(str(file_path), use_ocr_fallback=True)
-                            full_text = "\n".join(p.text for p in pages) if pages else ""
+                            full_text = pdf_processor.extract_artifact(str(file_path)).full_text
                         elif ext in {".jpeg", ".jpg", ".png"}:
                             import pytesseract
                             from PIL import Image
@@ -681,6 +679,12 @@ def process_documents(env: str, dry_run: bool = False) -> ProcessingReport:
                         db.add(document)
                         db.flush()
 
+                        # Persist page text so later analysis never re-OCRs
+                        if file_path.suffix.lower() == ".pdf":
+                            page_text_store.save(
+                                db, document, pdf_processor.extract_artifact(str(dest_path))
+                            )
+
                         doc_info.uploaded = True
                         report.uploaded += 1
                         print(f"    [OK] Uploaded -> {status}")
@@ -764,6 +768,16 @@ def process_documents(env: str, dry_run: bool = False) -> ProcessingReport:
                     "bol_corrections": report.bol_corrections_by_shipment.get(shipment.reference, []),
                 })
 
+        # OCR cache effectiveness (hits only count OCR run in this process)
+        from app.services.ocr_cache import get_ocr_cache
+        ocr_cache = get_ocr_cache()
+        if ocr_cache is not None:
+            stats = ocr_cache.get_stats()
+            print(
+                f"\n[OCR CACHE] {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries ({stats['size_bytes'] / 1024 / 1024:.1f} MB)"
+            )
+
         # Commit all changes
         if not dry_run:
             db.commit()
@@ -0,0 +1,404 @@
+"""Tests for bulk audit pack exports.
+
+Tests cover:
+- Creating an export snapshots the shipments matching the filters
+- Running an export builds packs on the worker pool and reuses current ones
+- Failed shipments are recorded without stopping the export
+- Status endpoint with signed URLs, organization isolation, permission checks
+- Combined archive download
+- Export copies are unaffected by later pack regenerations
+- Recovering exports interrupted by a restart, leaving live ones alone
+- Purging the pack copies of exports past retention
+"""
+import asyncio
+import io
+import json
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import get_db
+from app.models import AuditPackExportJob
+from app.models.user import User, UserRole
+from app.models.organization import Organization, OrganizationType, OrganizationStatus
+from app.models.shipment import ProductType, Shipment, ShipmentStatus
+from app.routers.auth import get_password_hash, get_current_active_user
+from app.schemas.user import CurrentUser
+from app.services.audit_pack import AUDIT_PACK_BUCKET, build_audit_pack
+from app.services.audit_pack_export import AuditPackExportService
+from app.services.local_storage import LocalStorageBackend
+from app.services.permissions import get_role_permissions
+
+from .conftest import engine, TestingSessionLocal, Base
+
+
+@pytest.fixture(scope="module")
+def db_session():
+    """Create test database session."""
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def client(db_session):
+    """Create test client with database override."""
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    del app.dependency_overrides[get_db]
+
+
+def make_admin(db_session, slug):
+    org = Organization(
+        name=f"Export {slug}",
+        slug=f"{slug}-{uuid.uuid4().hex[:6]}",
+        type=OrganizationType.VIBOTAJ,
+        status=OrganizationStatus.ACTIVE,
+        contact_email=f"{slug}@export.test",
+    )
+    db_session.add(org)
+    db_session.commit()
+    user = User(
+        email=f"admin-{uuid.uuid4().hex[:6]}@export.test",
+        full_name="Export Admin",
+        hashed_password=get_password_hash("Admin123!"),
+        role=UserRole.ADMIN,
+        organization_id=org.id,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def mock_auth(user):
+    permissions = [p.value for p in get_role_permissions(user.role)]
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        organization_id=user.organization_id,
+        permissions=permissions,
+    )
+
+
+@pytest.fixture
+def admin_user(db_session):
+    """A fresh organization per test keeps filter results predictable."""
+    return make_admin(db_session, "export")
+
+
+@pytest.fixture
+def as_admin(admin_user):
+    app.dependency_overrides[get_current_active_user] = lambda: mock_auth(admin_user)
+    yield admin_user
+    del app.dependency_overrides[get_current_active_user]
+
+
+@pytest.fixture
+def shipments(db_session, admin_user):
+    """Two Q1 cocoa shipments, one Q1 ginger shipment and one Q2 cocoa shipment."""
+    specs = [
+        ("Q1-A", datetime(2026, 1, 10, tzinfo=timezone.utc), ProductType.COCOA, ShipmentStatus.DELIVERED),
+        ("Q1-B", datetime(2026, 2, 20, tzinfo=timezone.utc), ProductType.COCOA, ShipmentStatus.IN_TRANSIT),
+        ("Q1-C", datetime(2026, 3, 5, tzinfo=timezone.utc), ProductType.GINGER, ShipmentStatus.DELIVERED),
+        ("Q2-A", datetime(2026, 4, 2, tzinfo=timezone.utc), ProductType.COCOA, ShipmentStatus.DELIVERED),
+    ]
+    created = []
+    for reference, created_at, product_type, status in specs:
+        shipment = Shipment(
+            reference=f"{reference}-{uuid.uuid4().hex[:6]}",
+            container_number="EXPU1234567",
+            status=status,
+            product_type=product_type,
+            organization_id=admin_user.organization_id,
+            created_at=created_at,
+        )
+        db_session.add(shipment)
+        created.append(shipment)
+    db_session.commit()
+    return created
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalStorageBackend(base_path=str(tmp_path))
+    with patch("app.services.audit_pack_export.get_storage", return_value=storage), \
+            patch("app.routers.shipments.get_storage", return_value=storage):
+        yield storage
+
+
+@pytest.fixture
+def service():
+    service = AuditPackExportService(max_workers=2, session_factory=TestingSessionLocal)
+    with patch("app.routers.shipments.audit_pack_export_service", service):
+        yield service
+    service.shutdown(wait=True)
+
+
+Q1 = {"date_from": "2026-01-01T00:00:00Z", "date_to": "2026-04-01T00:00:00Z"}
+
+
+def start_export(client, service, **body):
+    with patch.object(service, "submit") as mock_submit:
+        response = client.post("/api/shipments/audit-pack-exports", json=body)
+    assert response.status_code == 202, response.text
+    job_id = uuid.UUID(response.json()["job_id"])
+    mock_submit.assert_called_once_with(job_id)
+    return job_id
+
+
+class TestCreateExport:
+    """Tests for POST /audit-pack-exports."""
+
+    def test_snapshots_filtered_shipments(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, product_type="cocoa", **Q1)
+
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+        assert job.status == "queued"
+        assert job.organization_id == as_admin.organization_id
+        assert [s["reference"] for s in job.shipments] == [shipments[0].reference, shipments[1].reference]
+        assert all(s["status"] == "pending" for s in job.shipments)
+        assert job.filters["product_type"] == "cocoa"
+
+    def test_status_filter(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, status="delivered")
+
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+        assert {s["reference"] for s in job.shipments} == {
+            shipments[0].reference, shipments[2].reference, shipments[3].reference
+        }
+
+    def test_too_many_shipments_rejected(self, client, as_admin, shipments, storage, service):
+        with patch("app.services.audit_pack_export.get_settings") as get_settings:
+            get_settings.return_value.audit_pack_export_max_shipments = 2
+            response = client.post("/api/shipments/audit-pack-exports", json={})
+
+        assert response.status_code == 400
+
+
+class TestRunExport:
+    """Tests for running an export on the worker pool."""
+
+    def test_builds_then_reuses_packs(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, **Q1)
+        service.run_job(job_id, db=db_session)
+
+        response = client.get(f"/api/shipments/audit-pack-exports/{job_id}")
+        body = response.json()
+        assert body["status"] == "completed"
+        assert (body["total"], body["completed"], body["reused"], body["failed"]) == (3, 3, 0, 0)
+        assert {s["status"] for s in body["shipments"]} == {"generated"}
+        assert all(s["download_url"] for s in body["shipments"])
+        assert body["expires_at"] is not None
+
+        second = start_export(client, service, **Q1)
+        service.run_job(second, db=db_session)
+
+        body = client.get(f"/api/shipments/audit-pack-exports/{second}").json()
+        assert body["reused"] == 3
+
+    def test_failed_shipment_recorded(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, product_type="cocoa", **Q1)
+        failing = shipments[1].id
+        export_shipment = service.export_shipment
+
+        def flaky(shipment_id, job_id):
+            if shipment_id == failing:
+                raise RuntimeError("storage unavailable")
+            return export_shipment(shipment_id, job_id)
+
+        with patch.object(service, "export_shipment", side_effect=flaky):
+            service.run_job(job_id, db=db_session)
+
+        body = client.get(f"/api/shipments/audit-pack-exports/{job_id}").json()
+        assert body["status"] == "completed"
+        assert body["failed"] == 1
+        failed = next(s for s in body["shipments"] if s["status"] == "failed")
+        assert failed["error"] == "storage unavailable"
+        assert failed["download_url"] is None
+
+    def test_export_keeps_its_copy_of_each_pack(
+        self, client, db_session, as_admin, shipments, storage, service
+    ):
+        job_id = start_export(client, service, product_type="cocoa", **Q1)
+        service.run_job(job_id, db=db_session)
+        db_session.expire_all()
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+        entry = job.shipments[0]
+        assert entry["storage_path"].startswith(f"{AUDIT_PACK_BUCKET}/{as_admin.organization_id}/exports/{job_id}/")
+        exported = storage.base_path / entry["storage_path"]
+        before = exported.read_bytes()
+
+        # Regenerating the shipment's pack leaves the completed export as it was
+        shipment = db_session.query(Shipment).filter(Shipment.id == shipments[0].id).first()
+        asyncio.run(build_audit_pack(shipment, db_session, storage))
+
+        assert exported.read_bytes() == before
+        assert shipment.audit_pack_generated_at.isoformat() != entry["generated_at"]
+
+    def test_other_organization_gets_404(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, **Q1)
+        other = make_admin(db_session, "other")
+
+        app.dependency_overrides[get_current_active_user] = lambda: mock_auth(other)
+        response = client.get(f"/api/shipments/audit-pack-exports/{job_id}")
+
+        assert response.status_code == 404
+
+
+    def test_role_without_download_permission_gets_403(
+        self, client, db_session, as_admin, shipments, storage, service
+    ):
+        job_id = start_export(client, service, output="archive", **Q1)
+        service.run_job(job_id, db=db_session)
+        viewer = User(
+            email=f"viewer-{uuid.uuid4().hex[:6]}@export.test",
+            full_name="Export Viewer",
+            hashed_password=get_password_hash("Viewer123!"),
+            role=UserRole.VIEWER,
+            organization_id=as_admin.organization_id,
+            is_active=True,
+        )
+        db_session.add(viewer)
+        db_session.commit()
+
+        app.dependency_overrides[get_current_active_user] = lambda: mock_auth(viewer)
+        assert client.get(f"/api/shipments/audit-pack-exports/{job_id}").status_code == 403
+        assert client.get(f"/api/shipments/audit-pack-exports/{job_id}/archive").status_code == 403
+
+
+class TestRecoverJobs:
+    """Tests for recover_jobs() at startup."""
+
+    def make_running(self, db_session, job_id, heartbeat_age):
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+        job.status = "running"
+        job.started_at = datetime.utcnow() - heartbeat_age
+        job.heartbeat_at = datetime.utcnow() - heartbeat_age
+        db_session.commit()
+
+    def test_requeues_queued_and_fails_interrupted(self, client, db_session, as_admin, shipments, storage, service):
+        queued = start_export(client, service, **Q1)
+        interrupted = start_export(client, service, **Q1)
+        live = start_export(client, service, **Q1)
+        self.make_running(db_session, interrupted, timedelta(hours=1))
+        self.make_running(db_session, live, timedelta(seconds=5))
+
+        restarted = AuditPackExportService(max_workers=2, session_factory=TestingSessionLocal)
+        with patch.object(restarted, "submit") as mock_submit, \
+                patch.object(restarted.lease, "start"):
+            restarted.recover_jobs(db=db_session)
+        restarted.shutdown(wait=True)
+
+        submitted = [c.args[0] for c in mock_submit.call_args_list]
+        assert queued in submitted
+        assert interrupted not in submitted and live not in submitted
+        db_session.expire_all()
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == interrupted).first()
+        assert job.status == "failed"
+        assert "restart" in job.error_message
+        # Another worker is still running this one
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == live).first()
+        assert job.status == "running"
+
+    def test_expired_failure_is_not_overwritten(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, **Q1)
+        real_update = service._update_shipment
+
+        def expire_mid_export(db, job, index, **changes):
+            # The lease lapses while the export is still building packs
+            self.make_running(db_session, job_id, timedelta(hours=1))
+            service.lease.expire(db_session)
+            real_update(db, job, index, **changes)
+
+        with patch.object(service, "_update_shipment", side_effect=expire_mid_export):
+            service.run_job(job_id, db=db_session)
+
+        db_session.expire_all()
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == job_id).first()
+        assert job.status == "failed"
+
+    def test_job_runs_once(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, **Q1)
+        service.run_job(job_id, db=db_session)
+
+        # A second submission (e.g. from another worker's recover_jobs) is a no-op
+        with patch.object(service, "export_shipment") as mock_export:
+            service.run_job(job_id, db=db_session)
+        mock_export.assert_not_called()
+
+
+class TestPurgeExpired:
+    """Tests for deleting the pack copies of old exports."""
+
+    def test_deletes_copies_past_retention(self, client, db_session, as_admin, shipments, storage, service):
+        old = start_export(client, service, **Q1)
+        recent = start_export(client, service, **Q1)
+        service.run_job(old, db=db_session)
+        service.run_job(recent, db=db_session)
+        db_session.expire_all()
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == old).first()
+        old_keys = [e["storage_path"].split("/", 1)[1] for e in job.shipments]
+        job.completed_at = datetime.utcnow() - timedelta(days=30)
+        db_session.commit()
+
+        assert service.purge_expired(db=db_session) == 1
+
+        db_session.expire_all()
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == old).first()
+        assert job.status == "expired"
+        assert all(e["storage_path"] is None for e in job.shipments)
+        for key in old_keys:
+            assert not asyncio.run(storage.exists(AUDIT_PACK_BUCKET, key))
+        assert client.get(f"/api/shipments/audit-pack-exports/{old}/archive").status_code == 409
+        job = db_session.query(AuditPackExportJob).filter(AuditPackExportJob.id == recent).first()
+        assert job.status == "completed"
+        for entry in job.shipments:
+            assert asyncio.run(storage.exists(AUDIT_PACK_BUCKET, entry["storage_path"].split("/", 1)[1]))
+
+
+class TestExportArchive:
+    """Tests for GET /audit-pack-exports/{job_id}/archive."""
+
+    def test_streams_combined_archive(self, client, db_session, as_admin, shipments, storage, service):
+        job_id = start_export(client, service, output="archive", product_type="cocoa", **Q1)
+
+        assert client.get(f"/api/shipments/audit-pack-exports/{job_id}/archive").status_code == 409
+
+        service.run_job(job_id, db=db_session)
+        body = client.get(f"/api/shipments/audit-pack-exports/{job_id}").json()
+        assert body["archive_url"] == f"/api/shipments/audit-pack-exports/{job_id}/archive"
+
+        response = client.get(body["archive_url"])
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == [
+                f"{shipments[0].reference}-audit-pack.zip",
+                f"{shipments[1].reference}-audit-pack.zip",
+                "manifest.json",
+            ]
+            manifest = json.loads(archive.read("manifest.json"))
+            assert manifest["export_id"] == str(job_id)
+            with zipfile.ZipFile(io.BytesIO(archive.read(archive.namelist()[0]))) as pack:
+                assert "00-SHIPMENT-INDEX.pdf" in pack.namelist()
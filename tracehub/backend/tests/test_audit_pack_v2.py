@@ -1,12 +1,21 @@
 """Tests for audit pack v2 service (PRD-017).
 
 Tests: Supabase Storage integration, signed URL generation,
-compliance in metadata/PDF, caching, and status endpoints.
+compliance in metadata/PDF, caching, status endpoints, streaming,
+per-entry compression, concurrent document fetching and incremental
+rebuilds, including the raw entry copy self-check.
 """
 
+import asyncio
+import hashlib
 import io
 import json
+import os
+import shutil
+import threading
+import time
 import zipfile
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
@@ -14,15 +23,22 @@ from datetime import datetime, timedelta, timezone
 
 from app.models import DocumentStatus
 from app.models.shipment import ShipmentStatus
+from app.services import audit_pack as audit_pack_module
 from app.services.audit_pack import (
+    STREAM_CHUNK_SIZE,
     generate_audit_pack,
     get_audit_pack_status,
     get_or_generate_audit_pack,
+    stream_audit_pack,
+    stream_pack_archive,
     _is_pack_outdated,
     _get_storage_key,
     _build_contents_list,
+    _PreviousPack,
     AUDIT_PACK_BUCKET,
 )
+from app.services.local_storage import LocalStorageBackend
+from app.services.supabase_storage import DOWNLOAD_SPOOL_BYTES, SupabaseStorageBackend
 from app.schemas.audit_pack import AuditPackStatusResponse
 
 
@@ -87,6 +103,13 @@ def make_storage():
     return storage
 
 
+def collect(chunks):
+    """Consume an async chunk iterator from synchronous test code."""
+    async def consume():
+        return [chunk async for chunk in chunks]
+    return asyncio.run(consume())
+
+
 def make_db(documents=None, products=None, events=None):
     """Create a mock database session."""
     db = MagicMock()
@@ -368,3 +391,465 @@ class TestComplianceInPdf:
         with zipfile.ZipFile(result) as zf:
             pdf_data = zf.read("00-SHIPMENT-INDEX.pdf")
             assert pdf_data[:4] == b"%PDF"
+
+
+class TestStreamingAuditPack:
+    """Packs are written entry by entry without holding documents in memory."""
+
+    @pytest.fixture
+    def large_doc(self, tmp_path):
+        content = os.urandom(STREAM_CHUNK_SIZE * 2 + 123)
+        path = tmp_path / "scan.pdf"
+        path.write_bytes(content)
+        with patch("app.services.audit_pack.get_full_path", return_value=str(path)):
+            yield make_doc(), content
+
+    def test_stream_yields_bounded_chunks(self, large_doc):
+        doc, content = large_doc
+        db = make_db(documents=[doc])
+
+        chunks = collect(stream_audit_pack(make_shipment(), db))
+
+        assert len(chunks) > 2
+        assert max(len(c) for c in chunks) <= STREAM_CHUNK_SIZE * 2
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.read("01-bill_of_lading.pdf") == content
+            assert zf.testzip() is None
+
+    def test_stream_matches_in_memory_pack(self, large_doc):
+        doc, _ = large_doc
+        db = make_db(documents=[doc])
+
+        streamed = zipfile.ZipFile(io.BytesIO(b"".join(collect(stream_audit_pack(make_shipment(), db)))))
+        buffered = zipfile.ZipFile(generate_audit_pack(make_shipment(), db))
+
+        assert streamed.namelist() == buffered.namelist()
+
+    def test_stream_needs_no_session_after_start(self, large_doc):
+        doc, content = large_doc
+        db = make_db(documents=[doc])
+
+        chunks = stream_audit_pack(make_shipment(), db)
+        db.query.side_effect = AssertionError("session used while streaming")
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(collect(chunks)))) as zf:
+            assert zf.read("01-bill_of_lading.pdf") == content
+
+    @pytest.mark.asyncio
+    async def test_upload_receives_file_not_bytes(self, large_doc):
+        doc, content = large_doc
+        db = make_db(documents=[doc])
+        storage = make_storage()
+        uploaded = {}
+
+        async def capture(bucket, path, file, content_type):
+            assert not isinstance(file, bytes)
+            uploaded["zip"] = file.read()
+            return f"{bucket}/{path}"
+
+        storage.upload = AsyncMock(side_effect=capture)
+
+        await get_or_generate_audit_pack(make_shipment(), db, storage)
+
+        with zipfile.ZipFile(io.BytesIO(uploaded["zip"])) as zf:
+            assert zf.read("01-bill_of_lading.pdf") == content
+
+    @pytest.mark.asyncio
+    async def test_local_storage_saves_file_object(self, tmp_path):
+        storage = LocalStorageBackend(base_path=str(tmp_path))
+
+        await storage.upload(AUDIT_PACK_BUCKET, "org/pack.zip", io.BytesIO(b"PK\x03\x04data"), "application/zip")
+
+        assert (tmp_path / AUDIT_PACK_BUCKET / "org" / "pack.zip").read_bytes() == b"PK\x03\x04data"
+
+    @pytest.mark.asyncio
+    async def test_local_storage_copies_off_event_loop(self, tmp_path):
+        storage = LocalStorageBackend(base_path=str(tmp_path))
+        loop_thread = threading.get_ident()
+        copy_threads = []
+        copyfileobj = shutil.copyfileobj
+
+        def record(*args):
+            copy_threads.append(threading.get_ident())
+            return copyfileobj(*args)
+
+        with patch("app.services.local_storage.shutil.copyfileobj", side_effect=record):
+            await storage.upload(AUDIT_PACK_BUCKET, "org/pack.zip", io.BytesIO(b"PK"), "application/zip")
+
+        assert copy_threads and copy_threads[0] != loop_thread
+
+
+class TestEntryCompression:
+    """Already-compressed entries are stored; JSON is deflated at a fast level."""
+
+    @pytest.fixture
+    def docs(self, tmp_path):
+        pdf = tmp_path / "scan.pdf"
+        pdf.write_bytes(b"%PDF-1.7 " + os.urandom(4096))
+        csv = tmp_path / "weights.csv"
+        csv.write_bytes(b"container,kg\n" * 500)
+        paths = {"scan.pdf": str(pdf), "weights.csv": str(csv)}
+
+        pdf_doc = make_doc(file_path="docs/scan.pdf")
+        pdf_doc.file_name = "scan.pdf"
+        csv_doc = make_doc(doc_type="packing_list", file_path="docs/weights.csv")
+        csv_doc.file_name = "weights.csv"
+
+        with patch(
+            "app.services.audit_pack.get_full_path",
+            side_effect=lambda p: paths[os.path.basename(p)],
+        ):
+            yield [pdf_doc, csv_doc]
+
+    def test_compression_per_entry(self, docs):
+        with zipfile.ZipFile(generate_audit_pack(make_shipment(), make_db(documents=docs))) as zf:
+            methods = {info.filename: info.compress_type for info in zf.infolist()}
+
+        assert methods == {
+            "00-SHIPMENT-INDEX.pdf": zipfile.ZIP_STORED,
+            "01-bill_of_lading.pdf": zipfile.ZIP_STORED,
+            "02-packing_list.csv": zipfile.ZIP_DEFLATED,
+            "container-tracking-log.json": zipfile.ZIP_DEFLATED,
+            "metadata.json": zipfile.ZIP_DEFLATED,
+        }
+
+    def test_choices_recorded_in_metadata(self, docs):
+        with zipfile.ZipFile(generate_audit_pack(make_shipment(), make_db(documents=docs))) as zf:
+            entries = {e["name"]: e for e in json.loads(zf.read("metadata.json"))["entries"]}
+
+        assert set(entries) == set(zf.namelist())
+        assert entries["01-bill_of_lading.pdf"]["compression"] == "stored"
+        assert entries["01-bill_of_lading.pdf"]["content_type"] == "application/pdf"
+        assert entries["metadata.json"]["compression"] == "deflated"
+        assert entries["metadata.json"]["compress_level"] == 1
+        assert entries["02-packing_list.csv"]["compress_level"] is None
+
+    def test_can_deflate_everything(self, docs):
+        with patch("app.services.audit_pack.get_settings") as get_settings:
+            get_settings.return_value.audit_pack_store_precompressed = False
+            get_settings.return_value.audit_pack_json_compress_level = 9
+            get_settings.return_value.audit_pack_fetch_concurrency = 8
+            pack = generate_audit_pack(make_shipment(), make_db(documents=docs))
+
+        with zipfile.ZipFile(pack) as zf:
+            assert {info.compress_type for info in zf.infolist()} == {zipfile.ZIP_DEFLATED}
+
+
+class TestConcurrentFetch:
+    """Blob bodies are fetched through storage concurrently, written in order."""
+
+    class SlowStorage:
+        """Storage whose downloads take a while; tracks concurrent fetches."""
+
+        def __init__(self, bodies, delay=0.05, missing=()):
+            self.bodies = bodies
+            self.delay = delay
+            self.missing = set(missing)
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        async def download(self, bucket, path):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.delay)
+                if path in self.missing:
+                    raise FileNotFoundError(path)
+                return io.BytesIO(self.bodies[path])
+            finally:
+                self.in_flight -= 1
+
+    @pytest.fixture
+    def blob_docs(self):
+        docs, bodies = [], {}
+        for i in range(6):
+            doc = make_doc(file_path=f"documents/blobs/{i:02d}/hash{i}")
+            doc.file_hash = f"{i:02d}hash{i}"
+            docs.append(doc)
+            bodies[f"{i:02d}/{doc.file_hash}"] = f"%PDF body {i}".encode()
+        with patch("app.services.audit_pack.blob_key", side_effect=lambda h: f"{h[:2]}/{h}"), \
+                patch("app.services.audit_pack.blob_store.is_blob_path", return_value=True):
+            yield docs, bodies
+
+    def settings(self, concurrency):
+        settings = MagicMock()
+        settings.audit_pack_store_precompressed = True
+        settings.audit_pack_json_compress_level = 1
+        settings.audit_pack_fetch_concurrency = concurrency
+        return patch("app.services.audit_pack.get_settings", return_value=settings)
+
+    def test_fetches_overlap_within_limit(self, blob_docs):
+        docs, bodies = blob_docs
+        storage = self.SlowStorage(bodies)
+
+        with self.settings(3):
+            start = time.monotonic()
+            chunks = collect(stream_audit_pack(make_shipment(), make_db(documents=docs), storage))
+            elapsed = time.monotonic() - start
+
+        assert storage.max_in_flight == 3
+        assert elapsed < 6 * storage.delay
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.namelist()[1:7] == [f"{i:02d}-bill_of_lading.pdf" for i in range(1, 7)]
+            assert zf.read("03-bill_of_lading.pdf") == b"%PDF body 2"
+
+    def test_order_kept_when_later_bodies_arrive_first(self, blob_docs):
+        docs, bodies = blob_docs
+        storage = self.SlowStorage(bodies)
+        download = storage.download
+
+        async def first_is_slowest(bucket, path):
+            if path.startswith("00/"):
+                await asyncio.sleep(0.1)
+            return await download(bucket, path)
+
+        storage.download = first_is_slowest
+        with self.settings(8):
+            pack = generate_audit_pack(make_shipment(), make_db(documents=docs), storage)
+
+        with zipfile.ZipFile(pack) as zf:
+            assert zf.namelist()[1] == "01-bill_of_lading.pdf"
+            assert zf.read("01-bill_of_lading.pdf") == b"%PDF body 0"
+
+    def test_failed_fetch_skipped(self, blob_docs):
+        docs, bodies = blob_docs
+        storage = self.SlowStorage(bodies, delay=0, missing={"01/01hash1"})
+
+        with self.settings(2):
+            pack = generate_audit_pack(make_shipment(), make_db(documents=docs), storage)
+
+        with zipfile.ZipFile(pack) as zf:
+            entries = [e["name"] for e in json.loads(zf.read("metadata.json"))["entries"]]
+            assert "02-bill_of_lading.pdf" not in zf.namelist()
+            assert entries == zf.namelist()
+
+    @pytest.mark.asyncio
+    async def test_pack_archive_fetched_one_at_a_time(self):
+        bodies = {f"packs/{i}.zip": f"pack {i}".encode() for i in range(4)}
+        storage = self.SlowStorage(bodies, delay=0.01)
+        packs = [(f"{i}-audit-pack.zip", f"packs/{i}.zip") for i in range(4)]
+
+        with self.settings(3):
+            data = b"".join([chunk async for chunk in stream_pack_archive(packs, b"{}", storage)])
+
+        assert storage.max_in_flight == 1
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.namelist() == [name for name, _ in packs] + ["manifest.json"]
+            assert zf.read("2-audit-pack.zip") == b"pack 2"
+
+    def test_without_storage_blob_docs_skipped(self, blob_docs):
+        docs, _ = blob_docs
+
+        with zipfile.ZipFile(generate_audit_pack(make_shipment(), make_db(documents=docs))) as zf:
+            assert zf.namelist() == ["00-SHIPMENT-INDEX.pdf", "container-tracking-log.json", "metadata.json"]
+
+    @pytest.mark.asyncio
+    async def test_supabase_download_is_spooled(self):
+        body = os.urandom(DOWNLOAD_SPOOL_BYTES * 3)
+        storage = SupabaseStorageBackend.__new__(SupabaseStorageBackend)
+        storage._client = MagicMock()
+        storage._client.storage.from_.return_value.create_signed_url.return_value = {
+            "signedURL": "https://supabase.test/object/sign/documents/ab/abc"
+        }
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        client = httpx.AsyncClient
+
+        with patch(
+            "app.services.supabase_storage.httpx.AsyncClient",
+            side_effect=lambda **kwargs: client(transport=transport, **kwargs),
+        ):
+            f = await storage.download("documents", "ab/abc")
+
+        with f:
+            assert not isinstance(f, io.BytesIO)
+            assert f._rolled  # spilled to disk instead of held in memory
+            assert f.read() == body
+
+    @pytest.mark.asyncio
+    async def test_supabase_download_missing(self):
+        storage = SupabaseStorageBackend.__new__(SupabaseStorageBackend)
+        storage._client = MagicMock()
+        storage._client.storage.from_.return_value.create_signed_url.return_value = {
+            "signedURL": "https://supabase.test/object/sign/documents/ab/missing"
+        }
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        client = httpx.AsyncClient
+
+        with patch(
+            "app.services.supabase_storage.httpx.AsyncClient",
+            side_effect=lambda **kwargs: client(transport=transport, **kwargs),
+        ):
+            with pytest.raises(FileNotFoundError):
+                await storage.download("documents", "ab/missing")
+
+    @pytest.mark.asyncio
+    async def test_local_storage_download(self, tmp_path):
+        storage = LocalStorageBackend(base_path=str(tmp_path))
+        await storage.upload("documents", "ab/abc", b"%PDF", "application/pdf")
+
+        with await storage.download("documents", "ab/abc") as f:
+            assert f.read() == b"%PDF"
+        with pytest.raises(FileNotFoundError):
+            await storage.download("documents", "ab/missing")
+
+
+class TestIncrementalRebuild:
+    """Rebuilds copy unchanged entries from the previous pack."""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        storage = LocalStorageBackend(base_path=str(tmp_path))
+        storage.fetched = []
+        download = storage.download
+
+        async def counting_download(bucket, path):
+            storage.fetched.append(f"{bucket}/{path}")
+            return await download(bucket, path)
+
+        storage.download = counting_download
+        with patch("app.services.audit_pack.get_full_path", return_value=None), \
+                patch("app.services.audit_pack.blob_store.is_blob_path", return_value=True):
+            yield storage
+
+    async def add_doc(self, storage, content, doc_type="certificate_of_origin", file_name="cert.pdf"):
+        file_hash = hashlib.sha256(content).hexdigest()
+        await storage.upload("documents", f"blobs/{file_hash[:2]}/{file_hash}", content, "application/pdf")
+        doc = make_doc(doc_type=doc_type, file_path=f"documents/blobs/{file_hash[:2]}/{file_hash}")
+        doc.file_name = file_name
+        doc.file_hash = file_hash
+        doc.updated_at = datetime(2026, 2, 15, tzinfo=timezone.utc)
+        return doc
+
+    async def build(self, storage, shipment, docs, **kwargs):
+        storage.fetched.clear()
+        await get_or_generate_audit_pack(shipment, make_db(documents=docs), storage, **kwargs)
+        pack = (storage.base_path / AUDIT_PACK_BUCKET / _get_storage_key(shipment)).read_bytes()
+        return zipfile.ZipFile(io.BytesIO(pack))
+
+    @pytest.mark.asyncio
+    async def test_only_new_document_fetched(self, storage):
+        docs = [await self.add_doc(storage, f"%PDF doc {i}".encode() * 100) for i in range(3)]
+        docs.append(await self.add_doc(storage, b"hs_code,kg\n" * 500, "packing_list", "weights.csv"))
+        shipment = make_shipment()
+        first = await self.build(storage, shipment, docs)
+        assert len(storage.fetched) == 4
+
+        new_doc = await self.add_doc(storage, b"%PDF new certificate")
+        second = await self.build(storage, shipment, [new_doc] + docs, force=True)
+
+        assert storage.fetched == [
+            f"{AUDIT_PACK_BUCKET}/{_get_storage_key(shipment)}",
+            f"documents/blobs/{new_doc.file_hash[:2]}/{new_doc.file_hash}",
+        ]
+        assert second.testzip() is None
+        assert second.read("01-certificate_of_origin.pdf") == b"%PDF new certificate"
+        assert second.read("05-packing_list.csv") == first.read("04-packing_list.csv")
+        assert second.getinfo("05-packing_list.csv").compress_type == zipfile.ZIP_DEFLATED
+        assert second.getinfo("05-packing_list.csv").compress_size == first.getinfo("04-packing_list.csv").compress_size
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("raw_copy", [True, False])
+    async def test_rebuilt_pack_is_valid(self, storage, raw_copy):
+        docs = [await self.add_doc(storage, f"%PDF doc {i}".encode() * 100) for i in range(2)]
+        docs.append(await self.add_doc(storage, b"hs_code,kg\n" * 500, "packing_list", "weights.csv"))
+        shipment = make_shipment()
+        first = await self.build(storage, shipment, docs)
+
+        with patch("app.services.audit_pack.raw_entry_copy_available", return_value=raw_copy):
+            second = await self.build(storage, shipment, docs, force=True)
+
+        assert second.testzip() is None
+        assert len(storage.fetched) == 1  # Only the previous pack
+        names = [n for n in first.namelist() if "certificate_of_origin" in n or "packing_list" in n]
+        assert len(names) == 3
+        for name in names:
+            assert second.read(name) == first.read(name)
+            assert second.getinfo(name).compress_type == first.getinfo(name).compress_type
+
+    @pytest.mark.asyncio
+    async def test_rebuild_copies_raw_on_this_python(self, storage):
+        # A Python release that changes ZipFile's writer internals fails
+        # here instead of quietly losing raw copies
+        assert audit_pack_module._raw_entry_copy_works() is True
+        docs = [await self.add_doc(storage, f"%PDF doc {i}".encode() * 100) for i in range(2)]
+        shipment = make_shipment()
+        await self.build(storage, shipment, docs)
+
+        writer = audit_pack_module._RawEntryWriter
+        with patch.object(writer, "begin", autospec=True, side_effect=writer.begin) as begin:
+            second = await self.build(storage, shipment, docs, force=True)
+
+        assert begin.call_count == 2
+        assert second.testzip() is None
+
+    def test_self_check_rejects_corrupt_copies(self):
+        def corrupt_copy(source, zip_file, info, name):
+            zip_file.writestr(name, b"not the original bytes")
+            yield
+
+        with patch("app.services.audit_pack._copy_raw_entry", corrupt_copy):
+            assert audit_pack_module._raw_entry_copy_works() is False
+
+    def test_fallback_is_logged_once(self, caplog):
+        with patch("app.services.audit_pack._raw_entry_copy_works", return_value=False) as check, \
+                patch("app.services.audit_pack._raw_copy_available", None):
+            assert audit_pack_module.raw_entry_copy_available() is False
+            assert audit_pack_module.raw_entry_copy_available() is False
+
+        check.assert_called_once()
+        assert sum("self-check" in r.message for r in caplog.records) == 1
+
+    @pytest.mark.asyncio
+    async def test_manifest_records_hashes(self, storage):
+        doc = await self.add_doc(storage, b"%PDF certificate")
+
+        pack = await self.build(storage, make_shipment(), [doc])
+
+        entries = {e["name"]: e for e in json.loads(pack.read("metadata.json"))["entries"]}
+        assert entries["01-certificate_of_origin.pdf"]["sha256"] == doc.file_hash
+        tracking = pack.read("container-tracking-log.json")
+        assert entries["container-tracking-log.json"]["sha256"] == hashlib.sha256(tracking).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_full_rebuild_when_disabled(self, storage):
+        docs = [await self.add_doc(storage, f"%PDF doc {i}".encode()) for i in range(2)]
+        shipment = make_shipment()
+        await self.build(storage, shipment, docs)
+
+        with patch("app.services.audit_pack.get_settings") as get_settings:
+            get_settings.return_value.audit_pack_incremental = False
+            get_settings.return_value.audit_pack_store_precompressed = True
+            get_settings.return_value.audit_pack_json_compress_level = 1
+            get_settings.return_value.audit_pack_fetch_concurrency = 8
+            await self.build(storage, shipment, docs, force=True)
+
+        assert len(storage.fetched) == 2
+
+    @pytest.mark.asyncio
+    async def test_previous_pack_read_from_disk(self, storage):
+        doc = await self.add_doc(storage, b"%PDF certificate")
+        shipment = make_shipment()
+        await self.build(storage, shipment, [doc])
+        opened = []
+
+        class SpyPack(_PreviousPack):
+            def __init__(self, fileobj):
+                opened.append(fileobj)
+                super().__init__(fileobj)
+
+        with patch("app.services.audit_pack._PreviousPack", SpyPack):
+            await self.build(storage, shipment, [doc], force=True)
+
+        assert os.path.basename(opened[0].name) == "previous.zip"
+        assert opened[0].closed
+
+    @pytest.mark.asyncio
+    async def test_unreadable_previous_pack_ignored(self, storage):
+        doc = await self.add_doc(storage, b"%PDF certificate")
+        shipment = make_shipment()
+        await self.build(storage, shipment, [doc])
+        await storage.upload(AUDIT_PACK_BUCKET, _get_storage_key(shipment), b"not a zip", "application/zip")
+
+        pack = await self.build(storage, shipment, [doc], force=True)
+
+        assert pack.read("01-certificate_of_origin.pdf") == b"%PDF certificate"
@@ -0,0 +1,421 @@
+"""Tests for content-addressed document storage.
+
+Tests cover:
+- Identical uploads share one blob; different content gets its own
+- Reference counting: blobs survive until their last document is released
+- Purge re-checks references, legacy per-shipment files are deleted directly
+- Discarding a reference no document kept
+- Mirroring new blobs to a remote storage backend after the upload returns
+- Upload endpoint dedupe, per-organization page text reuse and delete
+  endpoint integration
+"""
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import get_db
+from app.models import Document, FileBlob
+from app.models.user import User, UserRole
+from app.models.organization import Organization, OrganizationType, OrganizationStatus
+from app.models.shipment import Shipment, ShipmentStatus
+from app.routers.auth import get_password_hash, get_current_active_user
+from app.schemas.user import CurrentUser
+from app.services.blob_store import BlobStore, blob_key, blob_store
+from app.services.document_ingest import document_ingest_service
+from app.services.local_storage import LocalStorageBackend
+from app.services.pdf_processor import PDF_PROCESSING_AVAILABLE, pdf_processor
+from app.services.permissions import get_role_permissions
+
+from .conftest import engine, TestingSessionLocal, Base
+
+
+def make_pdf_bytes(label):
+    """Build a one-page text PDF."""
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), f"PACKING LIST {label} - VIBOTAJ Global Nigeria Ltd")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(scope="module")
+def db_session():
+    """Create test database session."""
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    base = str(tmp_path / "uploads")
+    return BlobStore(base_dir=base, storage=LocalStorageBackend(base_path=base))
+
+
+def store_bytes(store, db, data, filename="bol.pdf"):
+    upload = UploadFile(file=io.BytesIO(data), filename=filename)
+    stored = asyncio.run(store.store_upload(db, upload, max_bytes=10 * 1024 * 1024, mime_type="application/pdf"))
+    db.commit()
+    return stored
+
+
+def as_document(stored):
+    return SimpleNamespace(id=uuid.uuid4(), file_hash=stored.file_hash, file_path=stored.file_path)
+
+
+def get_blob(db, file_hash):
+    db.expire_all()
+    return db.query(FileBlob).filter(FileBlob.file_hash == file_hash).first()
+
+
+class TestStoreUpload:
+    """Tests for BlobStore.store_upload."""
+
+    def test_identical_content_is_stored_once(self, db_session, store):
+        data = b"%PDF-1.4 same certificate " + uuid.uuid4().bytes
+
+        first = store_bytes(store, db_session, data, "a.pdf")
+        second = store_bytes(store, db_session, data, "b.pdf")
+
+        assert first.file_hash == hashlib.sha256(data).hexdigest()
+        assert second.file_path == first.file_path
+        assert first.file_path.endswith(blob_key(first.file_hash))
+        assert get_blob(db_session, first.file_hash).ref_count == 2
+        with open(first.file_path, "rb") as f:
+            assert f.read() == data
+        # Nothing left in the staging directory
+        assert os.listdir(os.path.join(store.base_dir, "documents", "blobs", "tmp")) == []
+
+    def test_same_filename_different_content(self, db_session, store):
+        first = store_bytes(store, db_session, b"%PDF-1.4 v1 " + uuid.uuid4().bytes, "bol.pdf")
+        second = store_bytes(store, db_session, b"%PDF-1.4 v2 " + uuid.uuid4().bytes, "bol.pdf")
+
+        assert first.file_path != second.file_path
+        assert os.path.exists(first.file_path) and os.path.exists(second.file_path)
+
+    def test_new_blob_is_mirrored_to_remote_storage(self, db_session, tmp_path):
+        uploaded = {}
+
+        async def upload(bucket, path, file, content_type):
+            uploaded[path] = (file.read(), content_type)
+
+        remote = AsyncMock()
+        remote.exists.return_value = False
+        remote.upload.side_effect = upload
+        store = BlobStore(base_dir=str(tmp_path), storage=remote)
+        data = b"%PDF-1.4 remote " + uuid.uuid4().bytes
+
+        stored = store_bytes(store, db_session, data)
+        store_bytes(store, db_session, data)
+        store.shutdown()
+
+        remote.upload.assert_awaited_once()
+        assert uploaded == {blob_key(stored.file_hash): (data, "application/pdf")}
+
+    def test_upload_does_not_wait_for_mirror(self, db_session, tmp_path):
+        release = threading.Event()
+
+        async def upload(bucket, path, file, content_type):
+            await asyncio.to_thread(release.wait, 5)
+
+        remote = AsyncMock()
+        remote.exists.return_value = False
+        remote.upload.side_effect = upload
+        store = BlobStore(base_dir=str(tmp_path), storage=remote)
+
+        start = time.perf_counter()
+        stored = store_bytes(store, db_session, b"%PDF-1.4 slow remote " + uuid.uuid4().bytes)
+
+        # The remote upload is still blocked, so the upload returned without it
+        assert time.perf_counter() - start < 2
+        release.set()
+        asyncio.run(store.wait_for_mirror(stored.file_hash))
+        remote.upload.assert_awaited_once()
+        store.shutdown()
+
+
+class TestReferenceCounting:
+    """Tests for release() and purge()."""
+
+    def test_blob_kept_until_last_reference_released(self, db_session, store):
+        data = b"%PDF-1.4 shared " + uuid.uuid4().bytes
+        first = store_bytes(store, db_session, data)
+        second = store_bytes(store, db_session, data)
+
+        assert store.release(db_session, as_document(first)) is None
+        db_session.commit()
+        assert os.path.exists(first.file_path)
+
+        orphaned = store.release(db_session, as_document(second))
+        db_session.commit()
+        assert orphaned == first.file_hash
+
+        assert asyncio.run(store.purge(db_session, orphaned)) is True
+        assert not os.path.exists(first.file_path)
+        assert get_blob(db_session, first.file_hash) is None
+
+    def test_purge_keeps_blob_referenced_again(self, db_session, store):
+        data = b"%PDF-1.4 re-uploaded " + uuid.uuid4().bytes
+        stored = store_bytes(store, db_session, data)
+        orphaned = store.release(db_session, as_document(stored))
+        db_session.commit()
+
+        # Same content uploaded again before the purge runs
+        store_bytes(store, db_session, data)
+
+        assert asyncio.run(store.purge(db_session, orphaned)) is False
+        assert os.path.exists(stored.file_path)
+        assert get_blob(db_session, stored.file_hash).ref_count == 1
+
+    def test_discard_gives_back_reference(self, db_session, store):
+        data = b"%PDF-1.4 abandoned " + uuid.uuid4().bytes
+        kept = store_bytes(store, db_session, data)
+        abandoned = store_bytes(store, db_session, data)
+
+        asyncio.run(store.discard(db_session, abandoned.file_hash))
+        assert get_blob(db_session, kept.file_hash).ref_count == 1
+        assert os.path.exists(kept.file_path)
+
+        asyncio.run(store.discard(db_session, kept.file_hash))
+        assert get_blob(db_session, kept.file_hash) is None
+        assert not os.path.exists(kept.file_path)
+
+    def test_reference_committed_before_caller_commits(self, db_session, store):
+        data = b"%PDF-1.4 uncommitted " + uuid.uuid4().bytes
+        upload = UploadFile(file=io.BytesIO(data), filename="bol.pdf")
+        stored = asyncio.run(store.store_upload(db_session, upload, max_bytes=1024 * 1024))
+        db_session.rollback()
+
+        # The row is not left locked in the caller's transaction
+        assert get_blob(db_session, stored.file_hash).ref_count == 1
+
+    def test_legacy_file_deleted_directly(self, db_session, store, tmp_path):
+        legacy = tmp_path / "shipment" / "old.pdf"
+        legacy.parent.mkdir()
+        legacy.write_bytes(b"%PDF-1.4 legacy")
+        document = SimpleNamespace(id=uuid.uuid4(), file_hash=None, file_path=str(legacy))
+
+        assert store.release(db_session, document) is None
+        assert not legacy.exists()
+
+
+def mock_auth(user):
+    permissions = [p.value for p in get_role_permissions(user.role)]
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        organization_id=user.organization_id,
+        permissions=permissions,
+    )
+
+
+@pytest.fixture(scope="module")
+def client(db_session):
+    """Create test client with database override."""
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    del app.dependency_overrides[get_db]
+
+
+@pytest.fixture(scope="module")
+def admin_user(db_session):
+    org = Organization(
+        name="Blob Org",
+        slug=f"blob-{uuid.uuid4().hex[:6]}",
+        type=OrganizationType.VIBOTAJ,
+        status=OrganizationStatus.ACTIVE,
+        contact_email="blob@blob.test",
+    )
+    db_session.add(org)
+    db_session.commit()
+    user = User(
+        email=f"admin-{uuid.uuid4().hex[:6]}@blob.test",
+        full_name="Blob Admin",
+        hashed_password=get_password_hash("Admin123!"),
+        role=UserRole.ADMIN,
+        organization_id=org.id,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture(scope="module")
+def other_org_admin(db_session):
+    org = Organization(
+        name="Other Blob Org",
+        slug=f"blob-other-{uuid.uuid4().hex[:6]}",
+        type=OrganizationType.BUYER,
+        status=OrganizationStatus.ACTIVE,
+        contact_email="other@blob.test",
+    )
+    db_session.add(org)
+    db_session.commit()
+    user = User(
+        email=f"other-{uuid.uuid4().hex[:6]}@blob.test",
+        full_name="Other Blob Admin",
+        hashed_password=get_password_hash("Admin123!"),
+        role=UserRole.ADMIN,
+        organization_id=org.id,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def blob_dir(tmp_path):
+    base = str(tmp_path / "uploads")
+    with patch.object(blob_store, "_base_dir", base), \
+            patch.object(blob_store, "_storage", LocalStorageBackend(base_path=base)):
+        yield base
+
+
+def act_as(user):
+    app.dependency_overrides[get_current_active_user] = lambda: mock_auth(user)
+
+
+@pytest.fixture
+def as_admin(admin_user, blob_dir):
+    act_as(admin_user)
+    yield admin_user
+    del app.dependency_overrides[get_current_active_user]
+
+
+def make_shipment(db_session, user):
+    shipment = Shipment(
+        reference=f"BLOB-{uuid.uuid4().hex[:6]}",
+        container_number="BLBU1234567",
+        status=ShipmentStatus.DRAFT,
+        organization_id=user.organization_id,
+    )
+    db_session.add(shipment)
+    db_session.commit()
+    db_session.refresh(shipment)
+    return shipment
+
+
+def upload(client, shipment, content, filename="packing.pdf"):
+    files = {"file": (filename, io.BytesIO(content), "application/pdf")}
+    data = {"shipment_id": str(shipment.id), "document_type": "packing_list"}
+    response = client.post("/api/documents/upload", files=files, data=data)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def get_document(db_session, document_id):
+    db_session.expire_all()
+    return db_session.query(Document).filter(Document.id == uuid.UUID(document_id)).first()
+
+
+@pytest.mark.skipif(not PDF_PROCESSING_AVAILABLE, reason="PyMuPDF not installed")
+class TestUploadEndpoint:
+    """Upload and delete endpoints go through the blob store."""
+
+    def test_same_pdf_on_two_shipments(self, client, db_session, as_admin):
+        content = make_pdf_bytes(uuid.uuid4().hex)
+        first_id = upload(client, make_shipment(db_session, as_admin), content)
+
+        with patch.object(pdf_processor, "extract_artifact") as mock_extract:
+            second_id = upload(client, make_shipment(db_session, as_admin), content)
+
+        first, second = get_document(db_session, first_id), get_document(db_session, second_id)
+        assert first.file_path == second.file_path
+        assert blob_store.is_blob_path(first.file_path)
+        assert get_blob(db_session, first.file_hash).ref_count == 2
+        # Page text stored for the first upload is reused
+        mock_extract.assert_not_called()
+        assert second.page_text is not None
+        assert second.page_text.file_hash == first.file_hash
+
+    def test_page_text_not_reused_across_organizations(
+        self, client, db_session, admin_user, other_org_admin, blob_dir
+    ):
+        content = make_pdf_bytes(uuid.uuid4().hex)
+        try:
+            act_as(admin_user)
+            first_id = upload(client, make_shipment(db_session, admin_user), content)
+
+            act_as(other_org_admin)
+            with patch.object(
+                pdf_processor, "extract_artifact", wraps=pdf_processor.extract_artifact
+            ) as mock_extract:
+                response_id = upload(client, make_shipment(db_session, other_org_admin), content)
+        finally:
+            del app.dependency_overrides[get_current_active_user]
+
+        first, second = get_document(db_session, first_id), get_document(db_session, response_id)
+        # Storage is shared, but the other organization extracts its own text
+        assert first.file_path == second.file_path
+        mock_extract.assert_called_once()
+        assert second.page_text.organization_id == other_org_admin.organization_id
+
+    def test_bulk_response_does_not_reveal_shared_content(
+        self, client, db_session, admin_user, other_org_admin, blob_dir
+    ):
+        content = make_pdf_bytes(uuid.uuid4().hex)
+        try:
+            act_as(admin_user)
+            upload(client, make_shipment(db_session, admin_user), content)
+
+            act_as(other_org_admin)
+            shipment = make_shipment(db_session, other_org_admin)
+            files = [("files", ("copy.pdf", io.BytesIO(content), "application/pdf"))]
+            with patch.object(document_ingest_service, "submit"):
+                response = client.post(
+                    "/api/documents/upload/bulk", files=files, data={"shipment_id": str(shipment.id)}
+                )
+        finally:
+            del app.dependency_overrides[get_current_active_user]
+
+        assert response.status_code == 202, response.text
+        assert "deduplicated" not in response.json()["documents"][0]
+
+    def test_delete_removes_blob_with_last_document(self, client, db_session, as_admin):
+        content = make_pdf_bytes(uuid.uuid4().hex)
+        shipment = make_shipment(db_session, as_admin)
+        first_id = upload(client, shipment, content, "copy1.pdf")
+        second_id = upload(client, shipment, content, "copy2.pdf")
+        path = get_document(db_session, first_id).file_path
+
+        body = {"reason": "Duplicate upload"}
+        response = client.request("DELETE", f"/api/documents/{first_id}", json=body)
+        assert response.status_code == 200
+        assert os.path.exists(path)
+
+        response = client.request("DELETE", f"/api/documents/{second_id}", json=body)
+        assert response.status_code == 200
+        assert not os.path.exists(path)
@@ -0,0 +1,277 @@
+"""Tests for bulk document upload.
+
+Tests cover:
+- Multiple files in one request create documents and queued ingest jobs
+- ZIP archives are expanded (metadata entries skipped, nested archives rejected)
+- One aggregated notification per admin
+- File count and per-file size limits
+"""
+import io
+import uuid
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.database import get_db
+from app.models import Document, IngestJob, Notification
+from app.models.user import User, UserRole
+from app.models.organization import Organization, OrganizationType, OrganizationStatus
+from app.models.shipment import Shipment, ShipmentStatus
+from app.routers.auth import get_password_hash, get_current_active_user
+from app.schemas.user import CurrentUser
+from app.services.blob_store import blob_store
+from app.services.document_ingest import document_ingest_service
+from app.services.local_storage import LocalStorageBackend
+from app.services.permissions import get_role_permissions
+
+from .conftest import engine, TestingSessionLocal, Base
+
+
+@pytest.fixture(scope="module")
+def db_session():
+    """Create test database session."""
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def client(db_session):
+    """Create test client with database override."""
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    del app.dependency_overrides[get_db]
+
+
+@pytest.fixture(scope="module")
+def org(db_session):
+    org = Organization(
+        name="Bulk Org",
+        slug=f"bulk-{uuid.uuid4().hex[:6]}",
+        type=OrganizationType.VIBOTAJ,
+        status=OrganizationStatus.ACTIVE,
+        contact_email="bulk@bulk.test",
+    )
+    db_session.add(org)
+    db_session.commit()
+    return org
+
+
+def make_admin(db_session, org):
+    user = User(
+        email=f"admin-{uuid.uuid4().hex[:6]}@bulk.test",
+        full_name="Bulk Admin",
+        hashed_password=get_password_hash("Admin123!"),
+        role=UserRole.ADMIN,
+        organization_id=org.id,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture(scope="module")
+def uploader(db_session, org):
+    return make_admin(db_session, org)
+
+
+@pytest.fixture(scope="module")
+def reviewer(db_session, org):
+    return make_admin(db_session, org)
+
+
+def mock_auth(user):
+    permissions = [p.value for p in get_role_permissions(user.role)]
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        organization_id=user.organization_id,
+        permissions=permissions,
+    )
+
+
+@pytest.fixture
+def as_uploader(uploader, tmp_path):
+    app.dependency_overrides[get_current_active_user] = lambda: mock_auth(uploader)
+    base = str(tmp_path / "uploads")
+    with patch.object(blob_store, "_base_dir", base), \
+            patch.object(blob_store, "_storage", LocalStorageBackend(base_path=base)):
+        yield uploader
+    del app.dependency_overrides[get_current_active_user]
+
+
+@pytest.fixture
+def test_shipment(db_session, uploader):
+    shipment = Shipment(
+        reference=f"BULK-{uuid.uuid4().hex[:6]}",
+        container_number="BLKU1234567",
+        status=ShipmentStatus.DRAFT,
+        organization_id=uploader.organization_id,
+    )
+    db_session.add(shipment)
+    db_session.commit()
+    db_session.refresh(shipment)
+    return shipment
+
+
+def make_zip(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def pdf(label):
+    return f"%PDF-1.4 {label} {uuid.uuid4().hex}".encode()
+
+
+def bulk_upload(client, shipment, files):
+    data = {"shipment_id": str(shipment.id)}
+    with patch.object(document_ingest_service, "submit") as mock_submit:
+        response = client.post("/api/documents/upload/bulk", files=files, data=data)
+    return response, mock_submit
+
+
+class TestBulkUpload:
+    """Tests for POST /upload/bulk."""
+
+    def test_multiple_files_in_one_request(self, client, db_session, as_uploader, test_shipment):
+        files = [
+            ("files", ("invoice.pdf", io.BytesIO(pdf("invoice")), "application/pdf")),
+            ("files", ("packing.pdf", io.BytesIO(pdf("packing")), "application/pdf")),
+            ("files", ("origin.pdf", io.BytesIO(pdf("origin")), "application/pdf")),
+        ]
+
+        response, mock_submit = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["count"] == 3
+        assert [d["name"] for d in body["documents"]] == ["invoice.pdf", "packing.pdf", "origin.pdf"]
+        assert body["rejected"] == []
+
+        job_ids = [uuid.UUID(d["job_id"]) for d in body["documents"]]
+        assert [c.args[0] for c in mock_submit.call_args_list] == job_ids
+
+        jobs = db_session.query(IngestJob).filter(IngestJob.id.in_(job_ids)).all()
+        assert all(job.status == "queued" and job.options["auto_detect"] for job in jobs)
+        documents = db_session.query(Document).filter(Document.shipment_id == test_shipment.id).all()
+        assert len(documents) == 3
+        assert all(d.file_hash and blob_store.is_blob_path(d.file_path) for d in documents)
+
+    def test_zip_archive_is_expanded(self, client, db_session, as_uploader, test_shipment):
+        archive = make_zip({
+            "shipment/bol.pdf": pdf("bol"),
+            "shipment/phyto.pdf": pdf("phyto"),
+            "__MACOSX/shipment/._bol.pdf": b"resource fork",
+            "shipment/.DS_Store": b"finder",
+            "shipment/old.zip": make_zip({"x.pdf": pdf("x")}),
+        })
+        files = [
+            ("files", ("docs.zip", io.BytesIO(archive), "application/zip")),
+            ("files", ("invoice.pdf", io.BytesIO(pdf("invoice")), "application/pdf")),
+        ]
+
+        response, mock_submit = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 202
+        body = response.json()
+        assert sorted(d["name"] for d in body["documents"]) == ["bol.pdf", "invoice.pdf", "phyto.pdf"]
+        assert body["rejected"] == [
+            {"file_name": "old.zip", "source": "docs.zip", "error": "Nested archives are not supported"}
+        ]
+        assert mock_submit.call_count == 3
+
+        document = db_session.query(Document).filter(
+            Document.shipment_id == test_shipment.id, Document.name == "bol.pdf"
+        ).first()
+        assert document.mime_type == "application/pdf"
+        with open(document.file_path, "rb") as f:
+            assert f.read().startswith(b"%PDF-1.4 bol")
+
+    def test_one_notification_per_admin(self, client, db_session, as_uploader, reviewer, test_shipment):
+        files = [
+            ("files", (f"doc{i}.pdf", io.BytesIO(pdf(i)), "application/pdf"))
+            for i in range(4)
+        ]
+
+        response, _ = bulk_upload(client, test_shipment, files)
+
+        notifications = db_session.query(Notification).filter(
+            Notification.user_id == reviewer.id,
+            Notification.data["shipment_id"].astext == str(test_shipment.id),
+        ).all()
+        assert len(notifications) == 1
+        assert notifications[0].data["document_count"] == 4
+        assert notifications[0].data["document_ids"] == [d["id"] for d in response.json()["documents"]]
+
+    def test_too_many_files(self, client, db_session, as_uploader, test_shipment):
+        archive = make_zip({f"doc{i}.pdf": pdf(i) for i in range(3)})
+        files = [("files", ("docs.zip", io.BytesIO(archive), "application/zip"))]
+
+        with patch("app.routers.documents.settings.bulk_upload_max_files", 2):
+            response, mock_submit = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 400
+        mock_submit.assert_not_called()
+        assert db_session.query(Document).filter(Document.shipment_id == test_shipment.id).count() == 0
+
+    def test_oversized_file_rejected_rest_accepted(self, client, db_session, as_uploader, test_shipment):
+        archive = make_zip({"small.pdf": pdf("small"), "big.pdf": b"%PDF-1.4 " + b"x" * (1024 * 1024)})
+        files = [("files", ("docs.zip", io.BytesIO(archive), "application/zip"))]
+
+        with patch("app.routers.documents.settings.max_upload_size_mb", 1):
+            response, _ = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 202
+        body = response.json()
+        assert [d["name"] for d in body["documents"]] == ["small.pdf"]
+        assert [r["file_name"] for r in body["rejected"]] == ["big.pdf"]
+
+    def test_invalid_zip_only(self, client, db_session, as_uploader, test_shipment):
+        files = [("files", ("broken.zip", io.BytesIO(b"not a zip"), "application/zip"))]
+
+        response, _ = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 400
+        assert response.json()["detail"]["rejected"][0]["error"] == "Not a valid ZIP archive"
+
+    def test_corrupt_member_rejected_rest_accepted(self, client, db_session, as_uploader, test_shipment):
+        good, bad = pdf("good"), pdf("bad")
+        archive = bytearray(make_zip({"good.pdf": good, "bad.pdf": bad}))
+        # Flip a byte inside bad.pdf's compressed data so its CRC check fails
+        with zipfile.ZipFile(io.BytesIO(bytes(archive))) as zf:
+            info = zf.getinfo("bad.pdf")
+        data_offset = info.header_offset + 30 + len(info.filename) + len(info.extra)
+        archive[data_offset + info.compress_size // 2] ^= 0xFF
+        files = [("files", ("docs.zip", io.BytesIO(bytes(archive)), "application/zip"))]
+
+        response, mock_submit = bulk_upload(client, test_shipment, files)
+
+        assert response.status_code == 202
+        body = response.json()
+        assert [d["name"] for d in body["documents"]] == ["good.pdf"]
+        assert body["rejected"][0]["file_name"] == "bad.pdf"
+        assert body["rejected"][0]["error"].startswith("Corrupt archive member")
+        assert mock_submit.call_count == 1
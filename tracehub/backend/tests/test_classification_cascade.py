@@ -0,0 +1,147 @@
+"""Tests for the keyword-first classification cascade.
+
+Tests: escalation by confidence and margin thresholds, decisions recorded
+on sections, escalation statistics, and both classifiers skipping the
+LLM for decisive keyword results.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.models.document import DocumentType
+from app.services.classification_cascade import ClassificationCascade
+from app.services.document_classifier import DocumentClassifier
+from app.services.document_classifier_v2 import DocumentClassifierV2
+from app.services.llm_mock import MockLLMBackend
+from app.services.pdf_processor import DocumentSection
+
+
+def make_section(confidence, runner_up=None):
+    alternatives = [{"type": "packing_list", "confidence": runner_up}] if runner_up is not None else []
+    return DocumentSection(
+        document_type=DocumentType.BILL_OF_LADING,
+        page_start=1,
+        page_end=2,
+        text_preview="BILL OF LADING ...",
+        reference_number="APU123456",
+        confidence=confidence,
+        detection_method="keyword",
+        detected_fields={"alternative_types": alternatives},
+    )
+
+
+@pytest.fixture
+def cascade():
+    return ClassificationCascade(min_confidence=0.8, min_margin=0.3, enabled=True)
+
+
+@pytest.fixture
+def fresh_cascade(cascade):
+    with patch("app.services.document_classifier.classification_cascade", cascade), \
+            patch("app.services.document_classifier_v2.classification_cascade", cascade), \
+            patch("app.services.section_classification.classification_cascade", cascade):
+        yield cascade
+
+
+class TestDecisions:
+    """Tests for ClassificationCascade.decide."""
+
+    @pytest.mark.parametrize("confidence,runner_up,reason", [
+        (1.0, 0.1, "decisive"),
+        (0.6, 0.0, "low_confidence"),
+        (0.9, 0.7, "low_margin"),
+        (0.8, 0.5, "decisive"),
+    ])
+    def test_thresholds(self, cascade, confidence, runner_up, reason):
+        decision = cascade.decide(confidence, runner_up)
+
+        assert decision.reason == reason
+        assert decision.escalate == (reason != "decisive")
+
+    def test_disabled_always_escalates(self):
+        assert ClassificationCascade(enabled=False).decide(1.0, 0.0).reason == "disabled"
+
+    def test_section_decision_recorded(self, cascade):
+        section = make_section(0.95, runner_up=0.8)
+
+        decision = cascade.decide_section(section)
+
+        assert decision.reason == "low_margin"
+        assert section.detected_fields["cascade"]["margin"] == pytest.approx(0.15)
+
+    def test_stats(self, cascade):
+        cascade.decide(1.0)
+        cascade.decide(1.0)
+        cascade.decide(0.4)
+        cascade.decide(0.9, 0.85)
+
+        stats = cascade.get_stats()
+
+        assert (stats["decisions"], stats["escalated"], stats["keyword_only"]) == (4, 2, 2)
+        assert stats["escalation_rate"] == 0.5
+        assert stats["by_reason"]["low_confidence"] == 1
+        assert stats["by_reason"]["low_margin"] == 1
+
+
+class TestClassifierV2Cascade:
+    """DocumentClassifierV2 only calls the LLM when keywords are not decisive."""
+
+    def test_decisive_section_skips_llm(self, fresh_cascade):
+        llm = MockLLMBackend(default_type=DocumentType.PACKING_LIST)
+
+        section = DocumentClassifierV2(llm=llm).classify_section(make_section(1.0, runner_up=0.1))
+
+        assert llm.call_count == 0
+        assert section.detection_method == "keyword"
+        assert section.document_type == DocumentType.BILL_OF_LADING
+
+    def test_ambiguous_section_escalates(self, fresh_cascade):
+        llm = MockLLMBackend(default_type=DocumentType.PACKING_LIST, default_confidence=0.97)
+
+        section = DocumentClassifierV2(llm=llm).classify_section(make_section(0.9, runner_up=0.8))
+
+        assert llm.call_count == 1
+        assert section.detection_method == "ai"
+        assert section.document_type == DocumentType.PACKING_LIST
+
+    def test_analyze_pdf_escalates_only_pending(self, fresh_cascade):
+        llm = MockLLMBackend()
+        sections = [make_section(1.0), make_section(0.3), make_section(1.0, runner_up=0.9)]
+
+        with patch(
+            "app.services.document_classifier_v2.pdf_processor.analyze_pdf", return_value=sections
+        ):
+            result = DocumentClassifierV2(llm=llm).analyze_pdf("combined.pdf")
+
+        assert llm.call_count == 2
+        assert [s.detected_fields["cascade"]["escalate"] for s in result] == [False, True, True]
+        assert fresh_cascade.get_stats()["escalation_rate"] == pytest.approx(0.667)
+
+    def test_classify_text_returns_decisive_keyword_result(self, fresh_cascade):
+        llm = MockLLMBackend()
+        classifier = DocumentClassifierV2(llm=llm)
+        fresh_cascade._min_confidence = fresh_cascade._min_margin = 0.0
+
+        result = classifier.classify("BILL OF LADING shipper consignee port of loading vessel")
+
+        assert llm.call_count == 0
+        assert result.method == "keyword"
+        assert result.document_type == DocumentType.BILL_OF_LADING
+        assert classifier.get_ai_status()["cascade"]["keyword_only"] == 1
+
+
+class TestLegacyClassifierCascade:
+    """The v1 classifier used by ingest applies the same cascade."""
+
+    def test_decisive_sections_skip_ai(self, fresh_cascade):
+        llm = MockLLMBackend()
+        classifier = DocumentClassifier(llm=llm)
+        sections = [make_section(1.0), make_section(0.2)]
+
+        with patch("app.services.document_classifier.pdf_processor.analyze_pdf", return_value=sections):
+            classifier.analyze_pdf("combined.pdf")
+
+        assert llm.call_count == 1
+        assert llm.last_prompt == sections[1].text_preview
+        assert classifier.get_ai_status()["cascade"]["escalated"] == 1
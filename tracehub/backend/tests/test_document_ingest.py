@@ -0,0 +1,487 @@
+"""Tests for asynchronous document ingest.
+
+Tests cover:
+- Async upload returns 202 with a queued ingest job
+- Background stages run and record per-stage progress and results
+- Job status endpoint and organization isolation
+- Classification auto-apply helper shared with synchronous upload
+- Upload size limit and stored content hash
+- Upload-time text extraction running off the event loop
+- Recovering jobs interrupted by a worker stopping, and job leases
+"""
+import asyncio
+import time
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from unittest.mock import patch
+import hashlib
+import uuid
+import io
+
+from app.main import app
+from app.database import get_db
+from app.models import IngestJob, DocumentContent
+from app.models.user import User, UserRole
+from app.models.organization import Organization, OrganizationType, OrganizationStatus
+from app.models.shipment import Shipment, ShipmentStatus
+from app.models.document import Document, DocumentStatus, DocumentType
+from app.routers.auth import get_password_hash, get_current_active_user
+from app.schemas.user import CurrentUser
+from app.services.document_ingest import (
+    INGEST_STAGES,
+    DocumentIngestService,
+    IngestOutcome,
+    document_ingest_service,
+    run_extract_stage_async,
+    select_document_type,
+)
+from app.services.pdf_processor import PDF_PROCESSING_AVAILABLE, DocumentSection
+from app.services.permissions import get_role_permissions
+
+from .conftest import engine, TestingSessionLocal, Base
+
+
+BOL_TEXT = [
+    "BILL OF LADING",
+    "B/L No.: 262495038",
+    "Shipper: VIBOTAJ Global Nigeria Ltd",
+    "Port of Loading: Apapa, Lagos",
+    "Port of Discharge: Hamburg",
+    "Container No.: MSCU1234567",
+]
+
+
+BOL_SECTION = DocumentSection(
+    document_type=DocumentType.BILL_OF_LADING,
+    page_start=1,
+    page_end=1,
+    text_preview="BILL OF LADING",
+    reference_number="262495038",
+    confidence=0.9,
+    detection_method="ai",
+    detected_fields={},
+)
+
+
+def make_pdf_bytes(lines):
+    """Build a one-page text PDF."""
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(lines):
+        page.insert_text((72, 72 + 14 * i), line)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(scope="module")
+def db_session():
+    """Create test database session."""
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def client(db_session):
+    """Create test client with database override."""
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    del app.dependency_overrides[get_db]
+
+
+def make_org(db_session, slug):
+    org = Organization(
+        name=f"Ingest {slug}",
+        slug=f"{slug}-{uuid.uuid4().hex[:6]}",
+        type=OrganizationType.VIBOTAJ,
+        status=OrganizationStatus.ACTIVE,
+        contact_email=f"{slug}@ingest.test",
+    )
+    db_session.add(org)
+    db_session.commit()
+    db_session.refresh(org)
+    return org
+
+
+def make_admin(db_session, org):
+    user = User(
+        email=f"admin-{uuid.uuid4().hex[:6]}@ingest.test",
+        full_name="Ingest Admin",
+        hashed_password=get_password_hash("Admin123!"),
+        role=UserRole.ADMIN,
+        organization_id=org.id,
+        is_active=True,
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def mock_auth(user):
+    permissions = [p.value for p in get_role_permissions(user.role)]
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        organization_id=user.organization_id,
+        permissions=permissions,
+    )
+
+
+@pytest.fixture(scope="module")
+def admin_user(db_session):
+    return make_admin(db_session, make_org(db_session, "ingest"))
+
+
+@pytest.fixture(scope="module")
+def other_admin(db_session):
+    return make_admin(db_session, make_org(db_session, "other"))
+
+
+@pytest.fixture
+def test_shipment(db_session, admin_user):
+    shipment = Shipment(
+        reference=f"INGEST-{uuid.uuid4().hex[:6]}",
+        container_number="INGU1234567",
+        status=ShipmentStatus.DRAFT,
+        organization_id=admin_user.organization_id,
+    )
+    db_session.add(shipment)
+    db_session.commit()
+    db_session.refresh(shipment)
+    return shipment
+
+
+@pytest.fixture
+def as_admin(admin_user):
+    app.dependency_overrides[get_current_active_user] = lambda: mock_auth(admin_user)
+    yield admin_user
+    del app.dependency_overrides[get_current_active_user]
+
+
+def upload_async(client, shipment, content, document_type="other", auto_detect=True):
+    files = {"file": ("combined.pdf", io.BytesIO(content), "application/pdf")}
+    data = {
+        "shipment_id": str(shipment.id),
+        "document_type": document_type,
+        "auto_detect": str(auto_detect).lower(),
+        "async_processing": "true",
+    }
+    with patch.object(document_ingest_service, "submit") as mock_submit:
+        response = client.post("/api/documents/upload", files=files, data=data)
+    return response, mock_submit
+
+
+class TestAsyncUpload:
+    """Tests for POST /upload with async_processing=true."""
+
+    def test_returns_202_with_queued_job(self, client, db_session, as_admin, test_shipment):
+        response, mock_submit = upload_async(client, test_shipment, b"%PDF-1.4 fake pdf content")
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["job_status"] == "queued"
+        assert body["status_url"] == f"/api/documents/ingest-jobs/{body['job_id']}"
+
+        job_id = uuid.UUID(body["job_id"])
+        mock_submit.assert_called_once_with(job_id)
+
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        assert str(job.document_id) == body["id"]
+        assert job.organization_id == as_admin.organization_id
+        assert [s["name"] for s in job.stages] == INGEST_STAGES
+        assert all(s["status"] == "pending" for s in job.stages)
+
+        # Heavy stages have not run yet
+        assert db_session.query(DocumentContent).filter(
+            DocumentContent.document_id == job.document_id
+        ).count() == 0
+
+
+@pytest.fixture
+def mock_classifier():
+    """Keep section detection offline and deterministic."""
+    with patch(
+        "app.services.document_ingest.document_classifier.analyze_pdf",
+        return_value=[BOL_SECTION],
+    ) as mock_analyze:
+        yield mock_analyze
+
+
+@pytest.mark.skipif(not PDF_PROCESSING_AVAILABLE, reason="PyMuPDF not installed")
+@pytest.mark.usefixtures("mock_classifier")
+class TestRunJob:
+    """Tests for running ingest stages in the background."""
+
+    def test_stages_complete_and_reclassify(self, client, db_session, as_admin, test_shipment):
+        response, _ = upload_async(client, test_shipment, make_pdf_bytes(BOL_TEXT))
+        job_id = uuid.UUID(response.json()["job_id"])
+
+        document_ingest_service.run_job(job_id, db=db_session)
+
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        db_session.refresh(job)
+        assert job.status == "completed"
+        stages = {s["name"]: s for s in job.stages}
+        assert stages["extract"]["status"] == "completed"
+        assert stages["extract"]["result"]["page_count"] == 1
+        assert stages["detect"]["status"] == "completed"
+        assert stages["detect"]["result"]["document_type"] == "bill_of_lading"
+        assert all(s["status"] != "pending" for s in job.stages)
+
+        document = db_session.query(Document).filter(Document.id == job.document_id).first()
+        assert document.document_type == DocumentType.BILL_OF_LADING
+        assert document.page_text is not None
+        assert job.result["type"] == "bill_of_lading"
+        assert job.result["page_count"] == 1
+
+    def test_non_pdf_skips_pdf_stages(self, client, db_session, as_admin, test_shipment):
+        files = {"file": ("notes.txt", io.BytesIO(b"plain text"), "text/plain")}
+        data = {
+            "shipment_id": str(test_shipment.id),
+            "document_type": "other",
+            "async_processing": "true",
+        }
+        with patch.object(document_ingest_service, "submit"):
+            response = client.post("/api/documents/upload", files=files, data=data)
+        job_id = uuid.UUID(response.json()["job_id"])
+
+        document_ingest_service.run_job(job_id, db=db_session)
+
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        db_session.refresh(job)
+        assert job.status == "completed"
+        assert all(s["status"] == "skipped" for s in job.stages)
+
+    def test_failed_stage_does_not_stop_pipeline(self, client, db_session, as_admin, test_shipment):
+        response, _ = upload_async(client, test_shipment, make_pdf_bytes(BOL_TEXT))
+        job_id = uuid.UUID(response.json()["job_id"])
+
+        with patch(
+            "app.services.document_ingest.shipment_enrichment_service.enrich_from_document",
+            side_effect=RuntimeError("enrichment down"),
+        ):
+            document_ingest_service.run_job(job_id, db=db_session)
+
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        db_session.refresh(job)
+        stages = {s["name"]: s for s in job.stages}
+        assert job.status == "completed"
+        assert stages["enrich"]["status"] == "failed"
+        assert "enrichment down" in stages["enrich"]["error"]
+        assert stages["bol_parse"]["status"] in ("completed", "failed")
+
+
+class TestIngestJobStatus:
+    """Tests for GET /ingest-jobs/{job_id}."""
+
+    def test_reports_stages(self, client, db_session, as_admin, test_shipment):
+        response, _ = upload_async(client, test_shipment, b"%PDF-1.4 fake pdf content")
+        job_id = response.json()["job_id"]
+
+        status_response = client.get(f"/api/documents/ingest-jobs/{job_id}")
+
+        assert status_response.status_code == 200
+        body = status_response.json()
+        assert body["status"] == "queued"
+        assert [s["name"] for s in body["stages"]] == INGEST_STAGES
+        assert body["result"] is None
+
+    def test_other_organization_gets_404(self, client, db_session, as_admin, other_admin, test_shipment):
+        response, _ = upload_async(client, test_shipment, b"%PDF-1.4 fake pdf content")
+        job_id = response.json()["job_id"]
+
+        app.dependency_overrides[get_current_active_user] = lambda: mock_auth(other_admin)
+        status_response = client.get(f"/api/documents/ingest-jobs/{job_id}")
+
+        assert status_response.status_code == 404
+
+
+class TestRecoverJobs:
+    """Tests for recover_jobs() at startup and job leases."""
+
+    def make_jobs(self, db_session, shipment, count):
+        """Queued jobs for a plain-text document (no upload, no rate limit)."""
+        document = Document(
+            shipment_id=shipment.id,
+            organization_id=shipment.organization_id,
+            name="notes.txt",
+            file_name="notes.txt",
+            mime_type="text/plain",
+            document_type=DocumentType.OTHER,
+            status=DocumentStatus.UPLOADED,
+        )
+        db_session.add(document)
+        db_session.flush()
+        jobs = document_ingest_service.create_jobs(
+            db_session, [document] * count, shipment, DocumentType.OTHER, auto_detect=False
+        )
+        db_session.commit()
+        return [job.id for job in jobs]
+
+    def make_running(self, db_session, job_id, heartbeat_age):
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        job.status = "running"
+        job.started_at = datetime.utcnow() - heartbeat_age
+        job.heartbeat_at = datetime.utcnow() - heartbeat_age
+        db_session.commit()
+
+    def test_requeues_queued_and_fails_expired(self, db_session, test_shipment):
+        queued, stale, live = self.make_jobs(db_session, test_shipment, 3)
+        self.make_running(db_session, stale, timedelta(hours=1))
+        self.make_running(db_session, live, timedelta(seconds=5))
+
+        restarted = DocumentIngestService(max_workers=1, session_factory=TestingSessionLocal)
+        with patch.object(restarted, "submit") as mock_submit, \
+                patch.object(restarted.lease, "start"):
+            restarted.recover_jobs(db=db_session)
+
+        submitted = [c.args[0] for c in mock_submit.call_args_list]
+        assert queued in submitted
+        assert stale not in submitted and live not in submitted
+        db_session.expire_all()
+        jobs = {
+            job.id: job for job in db_session.query(IngestJob).filter(IngestJob.id.in_([stale, live]))
+        }
+        assert jobs[stale].status == "failed"
+        assert "restart" in jobs[stale].error_message
+        # Another worker is still running this one
+        assert jobs[live].status == "running"
+
+    def test_job_runs_once(self, db_session, test_shipment):
+        job_id, = self.make_jobs(db_session, test_shipment, 1)
+        document_ingest_service.run_job(job_id, db=db_session)
+        db_session.expire_all()
+        assert db_session.query(IngestJob).filter(IngestJob.id == job_id).first().status == "completed"
+
+        # A second submission (e.g. from another worker's recover_jobs) is a no-op
+        with patch.object(document_ingest_service, "_run_stage") as mock_stage, \
+                patch.object(document_ingest_service, "_update_stage") as mock_update:
+            document_ingest_service.run_job(job_id, db=db_session)
+        mock_stage.assert_not_called()
+        mock_update.assert_not_called()
+
+    def test_expired_failure_is_not_overwritten(self, db_session, test_shipment):
+        job_id, = self.make_jobs(db_session, test_shipment, 1)
+        lease = document_ingest_service.lease
+        with patch.object(lease, "start"):
+            assert lease.claim(db_session, job_id)
+        self.make_running(db_session, job_id, timedelta(hours=1))
+        assert lease.expire(db_session) >= 1
+
+        assert not lease.finish(db_session, job_id, status="completed", completed_at=datetime.utcnow())
+        db_session.expire_all()
+        job = db_session.query(IngestJob).filter(IngestJob.id == job_id).first()
+        assert job.status == "failed"
+
+
+class TestUploadStreaming:
+    """Upload is hashed while streaming and size-limited."""
+
+    def test_stores_content_hash(self, client, db_session, as_admin, test_shipment):
+        content = b"%PDF-1.4 fake pdf content"
+        response, _ = upload_async(client, test_shipment, content)
+
+        document = db_session.query(Document).filter(
+            Document.id == uuid.UUID(response.json()["id"])
+        ).first()
+        assert document.file_hash == hashlib.sha256(content).hexdigest()
+        assert document.file_size == len(content)
+
+    def test_oversized_upload_is_rejected(self, client, db_session, as_admin, test_shipment):
+        before = db_session.query(Document).count()
+
+        with patch("app.routers.documents.settings") as mock_settings:
+            mock_settings.upload_dir = "./uploads"
+            mock_settings.max_upload_size_mb = 1
+            response, mock_submit = upload_async(
+                client, test_shipment, b"%PDF-1.4 " + b"x" * (1024 * 1024)
+            )
+
+        assert response.status_code == 413
+        mock_submit.assert_not_called()
+        assert db_session.query(Document).count() == before
+
+
+class TestExtractStage:
+    """Upload-time text extraction stays off the event loop."""
+
+    def test_run_extract_stage_async_leaves_event_loop_free(self):
+        outcome = IngestOutcome(
+            requested_type=DocumentType.OTHER,
+            final_document_type=DocumentType.OTHER,
+            is_pdf=True,
+        )
+
+        def slow_page_count(file_path):
+            time.sleep(0.2)
+            return 3
+
+        async def extract_while_ticking():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            try:
+                await run_extract_stage_async(outcome, "doc.pdf", auto_detect=False)
+            finally:
+                ticker.cancel()
+            return ticks
+
+        with patch("app.services.document_ingest.pdf_processor") as processor:
+            processor.is_available.return_value = True
+            processor.get_page_count.side_effect = slow_page_count
+            ticks = asyncio.run(extract_while_ticking())
+
+        assert outcome.page_count == 3
+        assert ticks >= 5
+
+
+class TestSelectDocumentType:
+    """Tests for PRD-019 auto-apply of detected types."""
+
+    def test_applies_best_confident_detection(self):
+        detected = [
+            {"document_type": "commercial_invoice", "confidence": 0.75, "detection_method": "keyword"},
+            {"document_type": "bill_of_lading", "confidence": 0.9, "detection_method": "ai"},
+        ]
+        final_type, info = select_document_type(DocumentType.OTHER, detected, 0.7)
+        assert final_type == DocumentType.BILL_OF_LADING
+        assert info.method == "ai"
+        assert info.auto_applied is True
+
+    def test_keeps_user_selection(self):
+        detected = [{"document_type": "bill_of_lading", "confidence": 0.9, "detection_method": "ai"}]
+        final_type, info = select_document_type(DocumentType.PACKING_LIST, detected, 0.7)
+        assert final_type == DocumentType.PACKING_LIST
+        assert info is None
+
+    def test_ignores_low_confidence(self):
+        detected = [{"document_type": "bill_of_lading", "confidence": 0.5, "detection_method": "keyword"}]
+        final_type, info = select_document_type(DocumentType.OTHER, detected, 0.7)
+        assert final_type == DocumentType.OTHER
+        assert info is None
@@ -0,0 +1,160 @@
+"""Tests for the per-file extraction artifact shared by the ingest pipeline.
+
+Tests: SHA-256 keyed caching, extraction method reporting, and that
+downstream stages (enrichment, BoL auto-parse, section analysis) read
+the artifact instead of re-opening the PDF.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.models.document import DocumentType
+from app.services.file_utils import compute_file_hash
+from app.services.pdf_processor import (
+    PDFProcessor,
+    PageContent,
+    ExtractionArtifact,
+    PDF_PROCESSING_AVAILABLE,
+)
+from app.services.shipment_data_extractor import ShipmentDataExtractor
+
+
+BOL_TEXT = (
+    "BILL OF LADING\n"
+    "B/L No.: 262495038\n"
+    "Shipper: VIBOTAJ Global Nigeria Ltd\n"
+    "Port of Loading: Apapa, Lagos\n"
+    "Container No.: MSCU1234567\n"
+)
+
+
+def make_pdf(path, page_texts):
+    """Write a simple text PDF with one page per entry."""
+    import fitz
+
+    doc = fitz.open()
+    for text in page_texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def make_artifact(text=BOL_TEXT, method="pymupdf"):
+    pages = [PageContent(page_number=1, text=text, char_count=len(text))]
+    return ExtractionArtifact(file_hash="abc123", pages=pages, extraction_method=method)
+
+
+class TestComputeFileHash:
+    """Tests for compute_file_hash."""
+
+    def test_matches_hashlib(self, tmp_path):
+        import hashlib
+
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"tracehub" * 1000)
+        assert compute_file_hash(str(path)) == hashlib.sha256(b"tracehub" * 1000).hexdigest()
+
+    def test_small_chunks_same_digest(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"0123456789" * 50)
+        assert compute_file_hash(str(path), chunk_size=7) == compute_file_hash(str(path))
+
+
+class TestExtractionArtifact:
+    """Tests for ExtractionArtifact properties."""
+
+    def test_page_char_counts_and_full_text(self):
+        pages = [
+            PageContent(page_number=1, text="abc", char_count=3),
+            PageContent(page_number=2, text="de", char_count=2),
+        ]
+        artifact = ExtractionArtifact(file_hash="h", pages=pages, extraction_method="pymupdf")
+        assert artifact.page_char_counts == [3, 2]
+        assert artifact.total_chars == 5
+        assert artifact.full_text == "abc\nde"
+
+
+@pytest.mark.skipif(not PDF_PROCESSING_AVAILABLE, reason="PyMuPDF not installed")
+class TestExtractArtifact:
+    """Tests for PDFProcessor.extract_artifact caching."""
+
+    def test_extracts_pages_with_method(self, tmp_path):
+        processor = PDFProcessor()
+        path = make_pdf(tmp_path / "bol.pdf", ["Bill of Lading page one", "Page two text"])
+
+        artifact = processor.extract_artifact(path, use_ocr_fallback=False)
+        assert artifact.file_hash == compute_file_hash(path)
+        assert artifact.extraction_method == "pymupdf"
+        assert len(artifact.pages) == 2
+        assert "Bill of Lading" in artifact.pages[0].text
+
+    def test_same_content_extracted_once(self, tmp_path):
+        processor = PDFProcessor()
+        text = "Bill of Lading " * 20
+        path_a = make_pdf(tmp_path / "a.pdf", [text])
+        path_b = tmp_path / "b.pdf"
+        path_b.write_bytes(open(path_a, "rb").read())
+
+        with patch.object(processor, "_extract_pages", wraps=processor._extract_pages) as spy:
+            first = processor.extract_artifact(path_a)
+            second = processor.extract_artifact(str(path_b))
+
+        assert spy.call_count == 1
+        assert first is second
+
+    def test_cache_is_bounded(self, tmp_path):
+        processor = PDFProcessor()
+        processor.ARTIFACT_CACHE_SIZE = 2
+        for i in range(4):
+            path = make_pdf(tmp_path / f"{i}.pdf", [f"Document number {i} " * 10])
+            processor.extract_artifact(path)
+        assert len(processor._artifact_cache) == 2
+
+    def test_analyze_pdf_uses_artifact(self, tmp_path):
+        processor = PDFProcessor()
+        artifact = make_artifact()
+
+        with patch.object(processor, "extract_text") as mock_extract:
+            sections = processor.analyze_pdf("/nonexistent.pdf", extraction=artifact)
+
+        mock_extract.assert_not_called()
+        assert len(sections) == 1
+        assert sections[0].document_type == DocumentType.BILL_OF_LADING
+
+
+class TestStagesReuseArtifact:
+    """Downstream stages read the artifact instead of the file."""
+
+    def test_extract_from_document_uses_artifact(self):
+        extractor = ShipmentDataExtractor()
+        with patch("app.services.pdf_processor.pdf_processor") as mock_processor:
+            data = extractor.extract_from_document(
+                "/nonexistent.pdf",
+                DocumentType.BILL_OF_LADING,
+                extraction=make_artifact(),
+            )
+        mock_processor.extract_text.assert_not_called()
+        assert data.container_number == "MSCU1234567"
+
+    def test_extract_from_document_empty_artifact(self):
+        extractor = ShipmentDataExtractor()
+        empty = ExtractionArtifact(file_hash="h", pages=[], extraction_method="none")
+        data = extractor.extract_from_document("/nonexistent.pdf", extraction=empty)
+        assert data.container_number is None
+
+    @patch("app.services.bol_auto_parse._extract_text_from_document")
+    @patch("app.services.bol_auto_parse.bol_parser")
+    def test_auto_parse_bol_uses_artifact(self, mock_parser, mock_extract):
+        from app.services.bol_auto_parse import auto_parse_bol
+
+        mock_parser.parse.side_effect = Exception("stop after text lookup")
+        doc = MagicMock()
+        doc.document_type = DocumentType.BILL_OF_LADING
+
+        result = auto_parse_bol(doc, MagicMock(), auto_sync=False, extraction=make_artifact())
+
+        mock_extract.assert_not_called()
+        mock_parser.parse.assert_called_once_with(BOL_TEXT)
+        assert result.parse_status == "failed"
@@ -0,0 +1,172 @@
+"""Tests for the single-pass document pattern matcher.
+
+Tests: overlapping and case-insensitive keyword hits with offsets, the
+str.find fallback matching the automaton, boundary anchors verified
+against full patterns, reference pattern priority, PDFProcessor
+scoring/boundaries fed from one scan, and analyze_pdf sections assembled
+as views into one page buffer.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.models.document import DocumentType
+from app.services import keyword_matcher as keyword_matcher_module
+from app.services.keyword_matcher import DocumentPatternMatcher, PatternHit
+from app.services.pdf_processor import (
+    DOCUMENT_KEYWORDS,
+    ExtractionArtifact,
+    PageContent,
+    PageTextBuffer,
+    PDF_PROCESSING_AVAILABLE,
+    PDFProcessor,
+)
+
+
+KEYWORDS = {
+    "phyto": ["phytosanitary", "plant protection"],
+    "sanitary": ["sanitary", "veterinary"],
+    "customs": ["customs", "customs declaration"],
+}
+BOUNDARIES = [r"customs declaration", r"certificate of quality.*fumigation"]
+REFERENCES = {
+    "bol": [r"B/L\s*(?:No\.?|#|:)?\s*[:\s]*(\d{6,})", r"MSKU\d+"],
+}
+
+
+@pytest.fixture
+def matcher():
+    return DocumentPatternMatcher(KEYWORDS, BOUNDARIES, REFERENCES)
+
+
+class TestScan:
+    """Tests for DocumentPatternMatcher.scan."""
+
+    def test_overlapping_hits_with_offsets(self, matcher):
+        text = "SANITARY and Phytosanitary: Customs Declaration"
+
+        hits = matcher.scan(text)
+
+        assert PatternHit("sanitary", 0, 8) in hits
+        assert PatternHit("phytosanitary", 13, 26) in hits
+        assert PatternHit("sanitary", 18, 26) in hits
+        assert PatternHit("customs", 28, 35) in hits
+        assert PatternHit("customs declaration", 28, 47) in hits
+        assert all(text[h.start:h.end].lower() == h.term for h in hits)
+
+    def test_scan_range_keeps_absolute_offsets(self, matcher):
+        text = "veterinary | customs"
+
+        assert matcher.scan(text, 5) == [PatternHit("customs", 13, 20)]
+
+    def test_fallback_finds_same_hits(self):
+        text = "customs declaration, veterinary and phytosanitary " * 3
+
+        with patch.object(keyword_matcher_module, "AHOCORASICK_AVAILABLE", False):
+            fallback = DocumentPatternMatcher(KEYWORDS, BOUNDARIES, REFERENCES)
+
+        assert sorted(fallback.scan(text)) == sorted(DocumentPatternMatcher(KEYWORDS, BOUNDARIES, REFERENCES).scan(text))
+
+    def test_matched_keywords_per_key(self, matcher):
+        hits = matcher.scan("phytosanitary certificate, sanitary, plant protection")
+
+        assert matcher.matched_keywords(hits) == {
+            "phyto": {"phytosanitary", "plant protection"},
+            "sanitary": {"sanitary"},
+        }
+
+
+class TestBoundaries:
+    """Tests for DocumentPatternMatcher.has_boundary."""
+
+    def test_pattern_verified_at_anchor(self, matcher):
+        text = "Certificate of Quality and Fumigation"
+
+        assert matcher.has_boundary(text, matcher.scan(text), 0, 300)
+        other = "Certificate of Quality only"
+        assert not matcher.has_boundary(other, matcher.scan(other), 0, 300)
+
+    def test_match_must_end_inside_window(self, matcher):
+        text = "x" * 290 + " customs declaration"
+
+        assert not matcher.has_boundary(text, matcher.scan(text), 0, 300)
+        assert matcher.has_boundary(text, matcher.scan(text), 0, 320)
+
+
+class TestReferences:
+    """Tests for DocumentPatternMatcher.extract_reference."""
+
+    def test_earlier_pattern_wins_over_earlier_match(self, matcher):
+        text = "Container MSKU1234567, B/L No: 98765432"
+
+        assert matcher.extract_reference(text, "bol") == "98765432"
+
+    def test_full_match_without_group(self, matcher):
+        assert matcher.extract_reference("Container MSKU1234567", "bol") == "MSKU1234567"
+
+    def test_unknown_key(self, matcher):
+        assert matcher.extract_reference("B/L 12345678", "invoice") is None
+
+
+class TestPDFProcessorScoring:
+    """PDFProcessor keyword scoring and boundaries use the shared scan."""
+
+    def test_scores_match_keyword_fractions(self):
+        text = "BILL OF LADING  Shipper: VIBOTAJ  Consignee: HAGES  Port of Loading: Apapa"
+
+        scores = dict(PDFProcessor().detect_document_type_by_keywords(text))
+
+        keywords = DOCUMENT_KEYWORDS[DocumentType.BILL_OF_LADING]
+        matched = sum(1 for kw in keywords if kw in text.lower())
+        assert matched >= 3
+        assert scores[DocumentType.BILL_OF_LADING] == min(matched / len(keywords) + 0.2, 1.0)
+
+    def test_boundaries_from_page_titles(self):
+        texts = ["COMMERCIAL INVOICE no 1", "continued lines", "PACKING LIST", "more items"]
+        pages = [PageContent(page_number=i + 1, text=t, char_count=len(t)) for i, t in enumerate(texts)]
+
+        assert PDFProcessor().detect_document_boundaries(pages) == [(1, 2), (3, 4)]
+
+
+def make_pages(texts):
+    return [PageContent(page_number=i + 1, text=t, char_count=len(t)) for i, t in enumerate(texts)]
+
+
+class TestPageTextBuffer:
+    """Tests for PageTextBuffer."""
+
+    def test_spans_match_concatenated_pages(self):
+        pages = make_pages(["first", "", "third page", "4"])
+
+        buffer = PageTextBuffer.from_pages(pages)
+
+        first, last = buffer.page_range(2, 3)
+        start, end = buffer.span(first, last)
+        assert (first, last) == (1, 3)
+        assert buffer.text[start:end] == "\nthird page\n"
+        assert buffer.text[slice(*buffer.span(0, 4))] == "".join(p.text + "\n" for p in pages)
+
+    def test_empty(self):
+        assert PageTextBuffer.from_pages([]).text == ""
+
+
+@pytest.mark.skipif(not PDF_PROCESSING_AVAILABLE, reason="PyMuPDF not installed")
+class TestAnalyzeSections:
+    """analyze_pdf builds sections from page-offset views."""
+
+    def test_sections_text_and_references(self):
+        texts = [
+            "COMMERCIAL INVOICE No: INV-2026-7 sold to HAGES unit price",
+            "total amount due",
+            "BILL OF LADING B/L No: 26249503 shipper consignee port of loading",
+            "notify party carrier",
+        ]
+        artifact = ExtractionArtifact(file_hash="h", pages=make_pages(texts), extraction_method="pymupdf")
+
+        sections = PDFProcessor().analyze_pdf("/nonexistent.pdf", extraction=artifact)
+
+        assert [(s.page_start, s.page_end) for s in sections] == [(1, 2), (3, 4)]
+        assert [s.document_type for s in sections] == [DocumentType.COMMERCIAL_INVOICE, DocumentType.BILL_OF_LADING]
+        assert [s.reference_number for s in sections] == ["INV-2026-7", "26249503"]
+        assert sections[1].text_preview == texts[2] + "\n" + texts[3] + "\n"
+        assert sections[1].detected_fields["char_count"] == len(sections[1].text_preview)
@@ -0,0 +1,185 @@
+"""Tests for load-test latency and fault simulation.
+
+Tests: the log-normal delay distribution, error and rate-limit injection,
+back-pressure from max_in_flight, simulators built from settings, and the
+mock LLM, local storage, customs mock and v1 classifier under simulation.
+"""
+
+import asyncio
+import random
+import statistics
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.config import Settings
+from app.models.document import DocumentType
+from app.services.customs_mock import MockCustomsBackend
+from app.services.document_classifier import DocumentClassifier
+from app.services.latency_sim import (
+    LatencySimulator,
+    SimulatedError,
+    SimulatedRateLimit,
+    SimulationProfile,
+    get_simulator,
+)
+from app.services.llm_factory import reset_llm
+from app.services.llm_metrics import LLMMetrics
+from app.services.llm_mock import MockLLMBackend
+from app.services.local_storage import LocalStorageBackend
+
+
+def simulator(**profile):
+    return LatencySimulator("test", SimulationProfile(**profile), random.Random(42))
+
+
+class TestDistribution:
+    """Tests for LatencySimulator.sample_delay."""
+
+    def test_median_and_p95(self):
+        sim = simulator(latency_ms=100, latency_p95_ms=400)
+
+        samples = sorted(sim.sample_delay() * 1000 for _ in range(5000))
+
+        assert statistics.median(samples) == pytest.approx(100, rel=0.1)
+        assert samples[int(0.95 * len(samples))] == pytest.approx(400, rel=0.15)
+
+    def test_fixed_delay_without_tail(self):
+        sim = simulator(latency_ms=5)
+
+        assert {round(sim.sample_delay(), 6) for _ in range(10)} == {0.005}
+
+    def test_no_delay_by_default(self):
+        assert simulator().sample_delay() == 0.0
+
+
+class TestFaults:
+    """Errors, rate limits and back-pressure."""
+
+    def test_error_raised_before_work(self):
+        sim = simulator(error_rate=1.0)
+        ran = []
+
+        with pytest.raises(SimulatedError) as exc_info:
+            with sim.call():
+                ran.append(True)
+
+        assert not ran
+        assert exc_info.value.status_code == 503
+        assert sim.get_status()["errors"] == 1
+        assert sim.get_status()["in_flight"] == 0
+
+    def test_rate_limit(self):
+        sim = simulator(rate_limit_rate=1.0)
+
+        with pytest.raises(SimulatedRateLimit) as exc_info:
+            with sim.call():
+                pass
+
+        assert "429" in str(exc_info.value)
+        assert sim.get_status()["rate_limited"] == 1
+
+    def test_max_in_flight_back_pressure(self):
+        sim = simulator(max_in_flight=2)
+
+        async def hold():
+            async with sim.acall():
+                await asyncio.sleep(0.05)
+
+        async def main():
+            return await asyncio.gather(*(hold() for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(main())
+
+        assert sum(isinstance(r, SimulatedRateLimit) for r in results) == 1
+        assert sim.get_status()["in_flight"] == 0
+
+    def test_async_delay_does_not_block_loop(self):
+        sim = simulator(latency_ms=100)
+
+        async def call():
+            async with sim.acall():
+                pass
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await asyncio.gather(*(call() for _ in range(5)))
+            return loop.time() - start
+
+        assert asyncio.run(main()) < 0.3
+
+
+class TestFromSettings:
+    """get_simulator builds profiles from settings."""
+
+    def test_disabled_by_default(self):
+        with patch("app.services.latency_sim.get_settings", return_value=Settings()):
+            assert get_simulator("llm") is None
+
+    def test_profile_from_settings(self):
+        settings = Settings(
+            simulation_enabled=True,
+            simulation_seed=3,
+            sim_customs_latency_ms=250.0,
+            sim_customs_error_rate=0.5,
+        )
+        with patch("app.services.latency_sim.get_settings", return_value=settings):
+            sim = get_simulator("customs")
+
+        assert sim.profile.latency_ms == 250.0
+        assert sim.profile.error_rate == 0.5
+
+    def test_unknown_component(self):
+        with pytest.raises(ValueError):
+            get_simulator("ocr")
+
+
+class TestSimulatedBackends:
+    """Backends take simulated time and surface faults like their real counterparts."""
+
+    def test_mock_llm_returns_none_on_fault(self):
+        metrics = LLMMetrics(window=timedelta(minutes=5))
+        llm = MockLLMBackend(simulator=simulator(rate_limit_rate=1.0))
+
+        with metrics.track("mock", "mock-v1", "classify"):
+            assert llm.classify_document("BILL OF LADING") is None
+
+        assert metrics.get_summary()["by_outcome"] == {"rate_limited": 1}
+        assert llm.get_status()["simulation"]["rate_limited"] == 1
+
+    def test_failed_upload_writes_nothing(self, tmp_path):
+        storage = LocalStorageBackend(base_path=str(tmp_path), simulator=simulator(error_rate=1.0))
+
+        with pytest.raises(SimulatedError):
+            asyncio.run(storage.upload("documents", "org/doc/a.pdf", b"%PDF", "application/pdf"))
+
+        assert not (tmp_path / "documents" / "org" / "doc" / "a.pdf").exists()
+
+    def test_customs_mock_raises(self):
+        customs = MockCustomsBackend(simulator=simulator(error_rate=1.0))
+
+        with pytest.raises(SimulatedError):
+            customs.check_pre_clearance("0506", "NG")
+
+    def test_v1_classifier_uses_simulated_backend(self):
+        settings = Settings(simulation_enabled=True, llm_provider="mock", sim_llm_latency_ms=1.0)
+        with patch("app.services.llm_factory.get_settings", return_value=settings), \
+                patch("app.services.latency_sim.get_settings", return_value=settings), \
+                patch("app.services.llm_cache.get_classification_cache", return_value=None):
+            reset_llm()
+            try:
+                classifier = DocumentClassifier()
+                result = classifier.classify_with_ai("BILL OF LADING")
+
+                assert classifier.is_ai_available()
+                assert classifier.get_ai_status()["provider"] == "mock"
+                assert result.document_type == DocumentType.BILL_OF_LADING
+
+                classifier.llm.backend._simulator.profile.rate_limit_rate = 1.0
+                assert classifier.classify_with_ai("BILL OF LADING") is None
+                fallback = classifier.classify("BILL OF LADING")
+                assert fallback.detected_fields["detection_method"] == "keyword"
+            finally:
+                reset_llm()
@@ -0,0 +1,264 @@
+"""Tests for concurrent section classification.
+
+Tests: bounded concurrency with ordered results, per-call timeouts
+leaving keyword results in place, the threaded async adapter, running
+from inside an event loop, both classifiers' analyze_pdf fanning
+sections out concurrently, and analyze_pdf_async and classify_async not
+blocking the event loop.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.models.document import DocumentType
+from app.services.document_classifier import DocumentClassifier
+from app.services.document_classifier_v2 import DocumentClassifierV2
+from app.services.llm import ClassificationResult
+from app.services.llm_async import (
+    ThreadedAsyncBackend,
+    as_async_backend,
+    gather_bounded,
+    run_sync,
+)
+from app.services.llm_mock import MockLLMBackend
+from app.services.pdf_processor import DocumentSection
+
+
+class SlowBackend(MockLLMBackend):
+    """Mock backend with a fixed latency that tracks calls in flight."""
+
+    def __init__(self, delay: float = 0.2, slow_texts=()):
+        super().__init__()
+        self.delay = delay
+        self.slow_texts = set(slow_texts)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def classify_document(self, text):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay * (5 if text in self.slow_texts else 1))
+            return ClassificationResult(
+                document_type=DocumentType(text),
+                confidence=0.95,
+                method="ai",
+                provider="mock",
+                reasoning=f"section {text}",
+            )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_sections(types):
+    return [
+        DocumentSection(
+            document_type=DocumentType.OTHER,
+            confidence=0.3,
+            page_start=i + 1,
+            page_end=i + 1,
+            reference_number=None,
+            text_preview=t.value,
+            detection_method="keyword",
+            detected_fields={},
+        )
+        for i, t in enumerate(types)
+    ]
+
+
+SECTION_TYPES = [
+    DocumentType.BILL_OF_LADING,
+    DocumentType.COMMERCIAL_INVOICE,
+    DocumentType.PACKING_LIST,
+    DocumentType.CERTIFICATE_OF_ORIGIN,
+    DocumentType.FUMIGATION_CERTIFICATE,
+    DocumentType.QUALITY_CERTIFICATE,
+]
+
+
+class TestGatherBounded:
+    """Tests for gather_bounded."""
+
+    def test_results_in_input_order(self):
+        async def echo(n):
+            await asyncio.sleep(0.01 * (5 - n))
+            return n
+
+        assert asyncio.run(gather_bounded(echo, list(range(5)), 5)) == [0, 1, 2, 3, 4]
+
+    def test_failures_and_timeouts_are_none(self):
+        async def call(n):
+            if n == 1:
+                raise RuntimeError("boom")
+            if n == 2:
+                await asyncio.sleep(1)
+            return n
+
+        assert asyncio.run(gather_bounded(call, [0, 1, 2], 3, timeout=0.05)) == [0, None, None]
+
+    def test_run_sync_inside_running_loop(self):
+        async def inner():
+            return run_sync(asyncio.sleep(0, result="done"))
+
+        assert asyncio.run(inner()) == "done"
+
+
+class TestAsyncAdapter:
+    """Tests for as_async_backend."""
+
+    def test_wraps_blocking_backend(self):
+        mock = MockLLMBackend()
+        llm = as_async_backend(mock)
+
+        assert isinstance(llm, ThreadedAsyncBackend)
+        assert asyncio.run(llm.classify_document("B/L")).provider == "mock"
+        assert llm.get_status()["call_count"] == 1
+
+    def test_async_backend_returned_as_is(self):
+        class NativeAsync:
+            async def classify_document(self, text):
+                return None
+
+        backend = NativeAsync()
+        assert as_async_backend(backend) is backend
+
+
+class TestClassifierV2Concurrency:
+    """DocumentClassifierV2 classifies sections concurrently."""
+
+    def test_bounded_and_ordered(self):
+        llm = SlowBackend(delay=0.2)
+        classifier = DocumentClassifierV2(llm=llm)
+        sections = make_sections(SECTION_TYPES)
+
+        start = time.perf_counter()
+        result = asyncio.run(classifier.classify_sections_async(sections, max_concurrency=3, timeout=5))
+        elapsed = time.perf_counter() - start
+
+        assert [s.document_type for s in result] == SECTION_TYPES
+        assert all(s.detection_method == "ai" for s in result)
+        assert llm.max_in_flight == 3
+        assert elapsed < 0.2 * len(SECTION_TYPES) * 0.75
+
+    def test_timed_out_section_keeps_keyword_result(self):
+        llm = SlowBackend(delay=0.05, slow_texts={"packing_list"})
+        sections = make_sections(SECTION_TYPES[:3])
+
+        result = asyncio.run(
+            DocumentClassifierV2(llm=llm).classify_sections_async(sections, max_concurrency=3, timeout=0.15)
+        )
+
+        assert [s.document_type for s in result] == [
+            DocumentType.BILL_OF_LADING,
+            DocumentType.COMMERCIAL_INVOICE,
+            DocumentType.OTHER,
+        ]
+        assert "ai_reasoning" not in result[2].detected_fields
+
+    @pytest.mark.parametrize("concurrent", [True, False])
+    def test_analyze_pdf_modes(self, concurrent):
+        llm = SlowBackend(delay=0.1)
+        classifier = DocumentClassifierV2(llm=llm)
+
+        with patch(
+            "app.services.document_classifier_v2.pdf_processor.analyze_pdf",
+            return_value=make_sections(SECTION_TYPES[:4]),
+        ), patch(
+            "app.services.section_classification.get_settings"
+        ) as settings:
+            settings.return_value.llm_batch_sections = False
+            settings.return_value.llm_concurrent_sections = concurrent
+            settings.return_value.llm_max_concurrency = 4
+            settings.return_value.llm_call_timeout_seconds = 5.0
+            result = classifier.analyze_pdf("combined.pdf")
+
+        assert [s.document_type for s in result] == SECTION_TYPES[:4]
+        assert llm.max_in_flight == (4 if concurrent else 1)
+
+
+class TestLegacyClassifierConcurrency:
+    """The v1 classifier fans section calls out over its LLM backend."""
+
+    def test_sections_classified_concurrently(self):
+        llm = SlowBackend(delay=0.1)
+        classifier = DocumentClassifier(llm=llm)
+
+        sections = make_sections(SECTION_TYPES[:4])
+        start = time.perf_counter()
+        result = asyncio.run(classifier.classify_sections_async(sections, max_concurrency=4, timeout=5))
+        elapsed = time.perf_counter() - start
+
+        assert [s.document_type for s in result] == SECTION_TYPES[:4]
+        assert result[0].detected_fields["ai_reasoning"] == f"section {SECTION_TYPES[0].value}"
+        assert llm.max_in_flight == 4
+        assert elapsed < 0.3
+
+    @pytest.mark.parametrize("classifier_class", [DocumentClassifier, DocumentClassifierV2])
+    def test_analyze_pdf_async_leaves_event_loop_free(self, classifier_class):
+        llm = SlowBackend(delay=0.1)
+        classifier = classifier_class(llm=llm)
+
+        async def analyze_while_ticking():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            try:
+                sections = await classifier.analyze_pdf_async("combined.pdf")
+            finally:
+                ticker.cancel()
+            return sections, ticks
+
+        with patch(
+            "app.services.document_classifier.pdf_processor.analyze_pdf",
+            return_value=make_sections(SECTION_TYPES[:2]),
+        ), patch(
+            "app.services.section_classification.get_settings"
+        ) as settings:
+            settings.return_value.llm_batch_sections = False
+            settings.return_value.llm_concurrent_sections = True
+            settings.return_value.llm_max_concurrency = 4
+            settings.return_value.llm_call_timeout_seconds = 5.0
+            result, ticks = asyncio.run(analyze_while_ticking())
+
+        assert [s.document_type for s in result] == SECTION_TYPES[:2]
+        # The loop kept running other tasks while the model calls were in flight
+        assert ticks >= 5
+
+    def test_classify_async_leaves_event_loop_free(self):
+        llm = SlowBackend(delay=0.1)
+        classifier = DocumentClassifier(llm=llm)
+
+        async def classify_while_ticking():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            try:
+                result = await classifier.classify_async(DocumentType.BILL_OF_LADING.value)
+            finally:
+                ticker.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(classify_while_ticking())
+
+        assert result.document_type == DocumentType.BILL_OF_LADING
+        assert result.detected_fields["detection_method"] == "ai"
+        assert ticks >= 5
@@ -0,0 +1,199 @@
+"""Tests for batched multi-section classification.
+
+Tests: packing sections into batches by token budget, the Anthropic
+batch prompt and JSON-array parsing, partial answers, the cache only
+sending uncached texts, both classifiers' batched mode, and upload and
+ingest section detection using it.
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models.document import DocumentType
+from app.services.document_classifier import document_classifier
+from app.services.document_classifier_v2 import DocumentClassifierV2
+from app.services.document_ingest import detect_sections, detect_sections_async
+from app.services.llm_anthropic import AnthropicBackend
+from app.services.llm_cache import CachedLLMBackend, ClassificationCache
+from app.services.llm_mock import MockLLMBackend
+from app.services.pdf_processor import DocumentSection
+from app.services.section_classification import estimate_tokens, pack_batches
+
+
+def anthropic_with_response(text):
+    backend = AnthropicBackend()
+    backend._client = MagicMock()
+    backend._client.messages.create.return_value = SimpleNamespace(
+        content=[SimpleNamespace(text=text)]
+    )
+    return backend
+
+
+def make_section(text):
+    return DocumentSection(
+        document_type=DocumentType.OTHER,
+        page_start=1,
+        page_end=1,
+        text_preview=text,
+        reference_number=None,
+        confidence=0.2,
+        detection_method="keyword",
+        detected_fields={},
+    )
+
+
+class TestPackBatches:
+    """Tests for pack_batches."""
+
+    def test_respects_budget_and_order(self):
+        texts = ["a" * 400, "b" * 400, "c" * 400, "d" * 40]  # ~101, 101, 101, 11 tokens
+
+        assert pack_batches(texts, token_budget=250, max_items=10) == [[0, 1], [2, 3]]
+
+    def test_max_items(self):
+        assert pack_batches(["x"] * 5, token_budget=10_000, max_items=2) == [[0, 1], [2, 3], [4]]
+
+    def test_long_text_gets_own_batch(self):
+        texts = ["short", "y" * 8000, "short"]
+
+        assert pack_batches(texts, token_budget=1000, max_items=10) == [[0], [1], [2]]
+        assert estimate_tokens("y" * 8000) > 1000
+
+
+class TestAnthropicBatch:
+    """Tests for AnthropicBackend.classify_batch."""
+
+    def test_one_request_for_all_extracts(self):
+        response = json.dumps([
+            {"extract": 1, "document_type": "bill_of_lading", "confidence": 0.9, "reference_number": "APU1"},
+            {"extract": 2, "document_type": "commercial_invoice", "confidence": 0.8},
+        ])
+        backend = anthropic_with_response(f"```json\n{response}\n```")
+
+        results = backend.classify_batch(["B/L APU1", "INVOICE 7"])
+
+        assert backend._client.messages.create.call_count == 1
+        prompt = backend._client.messages.create.call_args.kwargs["messages"][0]["content"]
+        assert "2 document extracts" in prompt
+        assert "Extract 1:\n---\nB/L APU1\n---" in prompt
+        assert [r.document_type for r in results] == [
+            DocumentType.BILL_OF_LADING,
+            DocumentType.COMMERCIAL_INVOICE,
+        ]
+        assert results[0].reference_number == "APU1"
+
+    def test_results_matched_by_extract_number(self):
+        backend = anthropic_with_response(json.dumps([
+            {"extract": 3, "document_type": "packing_list", "confidence": 0.7},
+            {"extract": 1, "document_type": "contract", "confidence": 0.6},
+        ]))
+
+        results = backend.classify_batch(["a", "b", "c"])
+
+        assert results[0].document_type == DocumentType.CONTRACT
+        assert results[1] is None
+        assert results[2].document_type == DocumentType.PACKING_LIST
+
+    def test_unparseable_response(self):
+        backend = anthropic_with_response("Sorry, I cannot help with that.")
+
+        assert backend.classify_batch(["a", "b"]) == [None, None]
+
+    def test_api_error(self):
+        backend = anthropic_with_response("")
+        backend._client.messages.create.side_effect = RuntimeError("529 overloaded")
+
+        assert backend.classify_batch(["a", "b"]) == [None, None]
+        assert backend.get_status()["last_error"] == "529 overloaded"
+
+
+class TestCachedBatch:
+    """CachedLLMBackend sends only uncached texts."""
+
+    def test_only_misses_sent(self):
+        mock = MockLLMBackend()
+        cached = CachedLLMBackend(mock, ClassificationCache())
+        cached.classify_document("B/L one")
+
+        results = cached.classify_batch(["B/L one", "B/L two", "B/L three"])
+
+        assert mock.batch_sizes == [2]
+        assert all(r is not None for r in results)
+        cached.classify_batch(["B/L two", "B/L three"])
+        assert mock.batch_sizes == [2]
+
+
+class TestClassifierBatchedMode:
+    """DocumentClassifierV2 batched mode."""
+
+    def test_sections_packed_into_batches(self):
+        mock = MockLLMBackend(default_type=DocumentType.PACKING_LIST, default_confidence=0.9)
+        sections = [make_section(f"section {i}") for i in range(7)]
+
+        result = asyncio.run(
+            DocumentClassifierV2(llm=mock).classify_sections_batched_async(sections, token_budget=10_000, max_sections=3)
+        )
+
+        assert sorted(mock.batch_sizes) == [1, 3, 3]
+        assert all(s.document_type == DocumentType.PACKING_LIST for s in result)
+        assert all(s.detection_method == "ai" for s in result)
+
+    def test_analyze_pdf_uses_batches_when_enabled(self):
+        mock = MockLLMBackend()
+        sections = [make_section(f"section {i}") for i in range(4)]
+
+        with patch(
+            "app.services.document_classifier_v2.pdf_processor.analyze_pdf", return_value=sections
+        ), patch("app.services.section_classification.get_settings") as settings:
+            settings.return_value.llm_batch_sections = True
+            settings.return_value.llm_batch_token_budget = 6000
+            settings.return_value.llm_batch_max_sections = 10
+            settings.return_value.llm_max_concurrency = 4
+            settings.return_value.llm_call_timeout_seconds = 5.0
+            DocumentClassifierV2(llm=mock).analyze_pdf("combined.pdf")
+
+        assert mock.batch_sizes == [4]
+        assert mock.call_count == 1
+
+
+class TestIngestBatchedMode:
+    """Upload and ingest section detection use batches when enabled."""
+
+    @pytest.fixture
+    def batched(self):
+        mock = MockLLMBackend(default_type=DocumentType.PACKING_LIST, default_confidence=0.9)
+        with patch.object(document_classifier, "_llm", mock), patch(
+            "app.services.document_classifier.pdf_processor.analyze_pdf",
+            side_effect=lambda *a, **k: [make_section(f"section {i}") for i in range(4)],
+        ), patch("app.services.section_classification.get_settings") as settings:
+            settings.return_value.llm_batch_sections = True
+            settings.return_value.llm_batch_token_budget = 6000
+            settings.return_value.llm_batch_max_sections = 10
+            settings.return_value.llm_max_concurrency = 4
+            settings.return_value.llm_call_timeout_seconds = 5.0
+            yield mock
+
+    @pytest.fixture
+    def db(self):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = None  # No duplicates
+        return db
+
+    def test_upload_detection(self, batched, db):
+        contents, _ = asyncio.run(detect_sections_async(db, uuid.uuid4(), "combined.pdf", None))
+
+        assert batched.batch_sizes == [4]
+        assert batched.call_count == 1
+        assert [c["document_type"] for c in contents] == ["packing_list"] * 4
+        assert all(c["detection_method"] == "ai" for c in contents)
+
+    def test_ingest_job_detection(self, batched, db):
+        contents, _ = detect_sections(db, uuid.uuid4(), "combined.pdf", None)
+
+        assert batched.batch_sizes == [4]
+        assert [c["document_type"] for c in contents] == ["packing_list"] * 4
@@ -0,0 +1,171 @@
+"""Tests for the LLM classification cache.
+
+Tests: repeat classifications answered without backend calls, key
+normalization, truncation to the text the model sees and versioning, LRU eviction and TTL expiry, the database
+tier shared between workers, status counters, and the v1 classifier
+reusing cached classifications.
+"""
+
+import uuid
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import text
+
+from app.models import LLMCacheEntry
+from app.models.document import DocumentType
+from app.services.document_classifier import DocumentClassifier
+from app.services.llm_anthropic import MAX_TEXT_LENGTH
+from app.services.llm_cache import CachedLLMBackend, ClassificationCache
+from app.services.llm_mock import MockLLMBackend
+
+from .conftest import engine, TestingSessionLocal, Base
+
+
+BOL_TEXT = "BILL OF LADING\nB/L No: 262495038\nShipper: VIBOTAJ Global Nigeria Ltd"
+
+
+@pytest.fixture
+def mock_llm():
+    return MockLLMBackend()
+
+
+@pytest.fixture
+def cached(mock_llm):
+    return CachedLLMBackend(mock_llm, ClassificationCache(max_entries=8))
+
+
+class TestCachedLLMBackend:
+    """Tests for CachedLLMBackend."""
+
+    def test_repeat_classification_uses_cache(self, cached, mock_llm):
+        first = cached.classify_document(BOL_TEXT)
+        second = cached.classify_document(BOL_TEXT)
+
+        assert mock_llm.call_count == 1
+        assert second == first
+        assert second is not first
+        assert cached.get_status()["cache"]["memory_hits"] == 1
+        assert cached.get_status()["cache"]["misses"] == 1
+
+    def test_whitespace_differences_share_entry(self, cached, mock_llm):
+        cached.classify_document(BOL_TEXT)
+        cached.classify_document("  BILL OF LADING B/L No: 262495038\n\nShipper:  VIBOTAJ Global Nigeria Ltd ")
+
+        assert mock_llm.call_count == 1
+
+    def test_text_past_model_limit_shares_entry(self, cached, mock_llm):
+        head = BOL_TEXT.ljust(MAX_TEXT_LENGTH, "x")
+        cached.classify_document(head + " page 2 of the first upload")
+        cached.classify_document(head + " a different second page")
+        cached.classify_document(BOL_TEXT)
+
+        # Only the first MAX_TEXT_LENGTH characters reach the model
+        assert mock_llm.call_count == 2
+
+    def test_prompt_version_is_part_of_key(self, mock_llm):
+        cache = ClassificationCache()
+        CachedLLMBackend(mock_llm, cache).classify_document(BOL_TEXT)
+
+        with patch.object(MockLLMBackend, "prompt_version", "mock-2"):
+            CachedLLMBackend(mock_llm, cache).classify_document(BOL_TEXT)
+
+        assert mock_llm.call_count == 2
+
+    def test_failures_not_cached(self, cached, mock_llm):
+        mock_llm.set_available(False)
+        assert cached.classify_document(BOL_TEXT) is None
+
+        mock_llm.set_available(True)
+        assert cached.classify_document(BOL_TEXT) is not None
+        assert mock_llm.call_count == 1
+
+    def test_complete_not_cached(self, cached, mock_llm):
+        cached.complete("Hello")
+        cached.complete("Hello")
+
+        assert mock_llm.call_count == 2
+
+
+class TestClassificationCache:
+    """Tests for ClassificationCache eviction and expiry."""
+
+    def test_lru_eviction(self):
+        cache = ClassificationCache(max_entries=2)
+        for name in ("a", "b"):
+            cache.put(name, {"v": name}, "m", "1")
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", {"v": "c"}, "m", "1")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": "a"}
+        assert cache.get_stats()["entries"] == 2
+
+    def test_expired_entries_miss(self):
+        cache = ClassificationCache(ttl=timedelta(0))
+        cache.put("k", {"v": 1}, "m", "1")
+
+        assert cache.get("k") is None
+        assert cache.get_stats()["entries"] == 0
+
+
+@pytest.fixture(scope="module")
+def db_session():
+    """Create test database session."""
+    with engine.connect() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+        conn.commit()
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+class TestPersistentTier:
+    """The database tier is shared by all workers."""
+
+    def test_entry_shared_between_workers(self, db_session):
+        worker_a = ClassificationCache(session_factory=TestingSessionLocal)
+        worker_b = ClassificationCache(session_factory=TestingSessionLocal)
+        key = worker_a.make_key(f"{BOL_TEXT} {uuid.uuid4()}", "mock-v1", "1")
+
+        worker_a.put(key, {"document_type": "bill_of_lading"}, "mock-v1", "1")
+
+        assert worker_b.get(key) == {"document_type": "bill_of_lading"}
+        assert worker_b.get(key) == {"document_type": "bill_of_lading"}
+        assert (worker_b.db_hits, worker_b.memory_hits) == (1, 1)
+        db_session.expire_all()
+        entry = db_session.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == key).one()
+        assert entry.hit_count == 1
+
+    def test_purge_expired(self, db_session):
+        cache = ClassificationCache(ttl=timedelta(0), session_factory=TestingSessionLocal)
+        cache.put(uuid.uuid4().hex, {"v": 1}, "m", "1")
+
+        assert cache.purge_expired() >= 1
+
+    def test_database_errors_are_misses(self):
+        broken = MagicMock()
+        broken.query.side_effect = RuntimeError("connection refused")
+        cache = ClassificationCache(session_factory=lambda: broken)
+
+        assert cache.get("k") is None
+        cache.put("k", {"v": 1}, "m", "1")
+        assert cache.get("k") == {"v": 1}
+
+
+class TestLegacyClassifierCache:
+    """The v1 classifier reuses cached classifications through its LLM backend."""
+
+    def test_second_call_skips_api(self, mock_llm, cached):
+        classifier = DocumentClassifier(llm=cached)
+
+        first = classifier.classify(BOL_TEXT)
+        second = classifier.classify(BOL_TEXT)
+
+        assert mock_llm.call_count == 1
+        assert second.document_type == DocumentType.BILL_OF_LADING
+        assert second.confidence == first.confidence == 0.85
+        assert second.detected_fields["detection_method"] == "ai"
\ No newline at end of file
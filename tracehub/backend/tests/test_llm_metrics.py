@@ -0,0 +1,183 @@
+"""Tests for LLM call instrumentation.
+
+Tests: nearest-rank percentiles, latency/outcome recording, cache status
+marked by the cached backend, token usage reported by the async Anthropic
+backend across the LLM loop, failure reasons, the rolling window, and the
+summary served by /api/documents/ai/metrics.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.llm_anthropic import AsyncAnthropicBackend
+from app.services.llm_async import BlockingLLMBackend, gather_bounded
+from app.services.llm_cache import CachedLLMBackend, ClassificationCache
+from app.services.llm_metrics import (
+    InstrumentedLLMBackend,
+    LLMCall,
+    LLMMetrics,
+    mark_outcome,
+    percentile,
+    record_usage,
+)
+from app.services.llm_mock import MockLLMBackend
+
+
+BOL_RESPONSE = json.dumps({"document_type": "bill_of_lading", "confidence": 0.93})
+
+
+class FakeMessages:
+    async def create(self, **kwargs):
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=BOL_RESPONSE)],
+            usage=SimpleNamespace(input_tokens=120, output_tokens=30),
+        )
+
+
+class OverloadedMessages:
+    async def create(self, **kwargs):
+        error = RuntimeError("Error code: 503")
+        error.status_code = 503
+        raise error
+
+
+def make_anthropic(messages):
+    backend = AsyncAnthropicBackend()
+    backend._api_key = "sk-test"
+    backend._available = True
+    backend._model = "claude-test"
+    backend._client = SimpleNamespace(messages=messages)
+    backend._max_retries = 0
+    backend.breaker = CircuitBreaker("anthropic", failure_threshold=1, reset_timeout=60)
+    return backend
+
+
+@pytest.fixture
+def metrics():
+    return LLMMetrics(window=timedelta(minutes=60))
+
+
+class TestPercentile:
+    """Tests for the nearest-rank percentile."""
+
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([7.0], 99) == 7.0
+        assert percentile([], 50) == 0.0
+
+
+class TestTrack:
+    """Tests for LLMMetrics.track."""
+
+    def test_records_latency_and_outcome(self, metrics):
+        with metrics.track("mock", "m", "classify") as call:
+            time.sleep(0.02)
+            call.succeeded = True
+        with metrics.track("mock", "m", "classify"):
+            mark_outcome("timeout")
+
+        summary = metrics.get_summary()
+
+        assert summary["calls"] == 2
+        assert summary["latency_ms"]["max"] >= 20
+        assert summary["by_outcome"] == {"ok": 1, "timeout": 1}
+
+    def test_exception_recorded_as_error(self, metrics):
+        with pytest.raises(ValueError):
+            with metrics.track("mock", "m", "complete"):
+                raise ValueError("bad")
+
+        assert metrics.get_summary()["by_outcome"] == {"error": 1}
+
+    def test_usage_outside_tracked_call_ignored(self, metrics):
+        record_usage(SimpleNamespace(usage=SimpleNamespace(input_tokens=5, output_tokens=5)))
+
+        assert metrics.get_summary()["calls"] == 0
+
+    def test_old_records_leave_window(self, metrics):
+        metrics.record(LLMCall("mock", "m", "classify", started_at=datetime.utcnow() - timedelta(hours=2)))
+        metrics.record(LLMCall("mock", "m", "classify"))
+
+        assert metrics.get_summary()["calls"] == 1
+
+
+class TestInstrumentedBackend:
+    """InstrumentedLLMBackend records each call with cache status and tokens."""
+
+    def test_cache_hits_and_misses(self, metrics):
+        llm = InstrumentedLLMBackend(
+            CachedLLMBackend(MockLLMBackend(), ClassificationCache(max_entries=8)), metrics
+        )
+
+        llm.classify_document("BILL OF LADING")
+        llm.classify_document("BILL OF LADING")
+        llm.classify_batch(["BILL OF LADING", "COMMERCIAL INVOICE"])
+        llm.complete("hello")
+
+        summary = metrics.get_summary()
+
+        assert summary["by_cache"] == {"miss": 1, "hit": 1, "partial": 1, "bypass": 1}
+        assert set(summary["by_kind"]) == {"classify", "classify_batch", "complete"}
+        assert summary["by_provider"] == {"mock": 4}
+
+    def test_token_usage_from_async_backend(self, metrics):
+        llm = InstrumentedLLMBackend(BlockingLLMBackend(make_anthropic(FakeMessages())), metrics)
+
+        assert llm.classify_document("BILL OF LADING") is not None
+
+        summary = metrics.get_summary()
+        assert summary["api_requests"] == 1
+        assert summary["tokens"]["input"] == 120
+        assert summary["tokens"]["output"] == 30
+        assert summary["by_kind"]["classify"]["input_tokens"] == 120
+
+    def test_usage_attributed_per_call_when_concurrent(self, metrics):
+        llm = InstrumentedLLMBackend(BlockingLLMBackend(make_anthropic(FakeMessages())), metrics)
+
+        async def classify(text):
+            await asyncio.to_thread(llm.classify_document, text)
+
+        asyncio.run(gather_bounded(classify, ["a", "b", "c", "d"], max_concurrency=4))
+
+        calls = metrics._recent()
+        assert len(calls) == 4
+        assert all(c.requests == 1 and c.input_tokens == 120 for c in calls)
+
+    def test_failure_and_circuit_open_outcomes(self, metrics):
+        llm = InstrumentedLLMBackend(BlockingLLMBackend(make_anthropic(OverloadedMessages())), metrics)
+
+        llm.classify_document("one")  # fails and opens the breaker
+        llm.classify_document("two")  # refused while open
+
+        assert metrics.get_summary()["by_outcome"] == {"error": 1, "circuit_open": 1}
+
+    def test_cost_estimate(self, metrics):
+        llm = InstrumentedLLMBackend(BlockingLLMBackend(make_anthropic(FakeMessages())), metrics)
+        llm.classify_document("BILL OF LADING")
+
+        with patch("app.config.get_settings") as get_settings:
+            get_settings.return_value.llm_input_cost_per_mtok = 1.0
+            get_settings.return_value.llm_output_cost_per_mtok = 5.0
+            summary = metrics.get_summary()
+
+        assert summary["estimated_cost_usd"] == pytest.approx((120 * 1.0 + 30 * 5.0) / 1_000_000, abs=1e-4)
+
+    def test_status_includes_metrics(self, metrics):
+        llm = InstrumentedLLMBackend(MockLLMBackend(), metrics)
+        llm.classify_document("x")
+
+        status = llm.get_status()
+
+        assert status["provider"] == "mock"
+        assert status["metrics"]["calls"] == 1
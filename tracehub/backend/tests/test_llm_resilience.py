@@ -0,0 +1,186 @@
+"""Tests for the async Anthropic backend's resilience features.
+
+Tests: circuit breaker state transitions, retries with backoff for
+429/5xx/timeouts (and none for client errors), the per-call deadline,
+failing fast to keyword classification while the breaker is open, the
+shared LLM event loop, and breaker state in status output.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.document import DocumentType
+from app.services.circuit_breaker import BreakerState, CircuitBreaker
+from app.services.document_classifier_v2 import DocumentClassifierV2
+from app.services.llm_anthropic import AsyncAnthropicBackend
+from app.services.llm_async import BlockingLLMBackend, as_async_backend, get_llm_loop, run_sync
+
+
+BOL_RESPONSE = json.dumps({"document_type": "bill_of_lading", "confidence": 0.93})
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+class FakeMessages:
+    """messages.create stand-in: each call consumes the next outcome."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.loops = set()
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.loops.add(asyncio.get_running_loop())
+        outcome = self.outcomes.pop(0) if self.outcomes else BOL_RESPONSE
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, (int, float)):
+            await asyncio.sleep(outcome)
+            outcome = BOL_RESPONSE
+        return SimpleNamespace(content=[SimpleNamespace(text=outcome)])
+
+
+def make_backend(outcomes=(), retries=2, timeout=5.0, threshold=3):
+    backend = AsyncAnthropicBackend()
+    backend._api_key = "sk-test"
+    backend._available = True
+    backend._client = SimpleNamespace(messages=FakeMessages(outcomes))
+    backend._max_retries = retries
+    backend._retry_base_delay = 0.001
+    backend._timeout = timeout
+    backend.breaker = CircuitBreaker("anthropic", failure_threshold=threshold, reset_timeout=60)
+    return backend
+
+
+def classify(backend, text="BILL OF LADING"):
+    return run_sync(backend.classify_document(text))
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_probes_after_reset(self):
+        now = [0.0]
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+
+        now[0] = 11.0
+        assert breaker.allow_request()  # half-open probe
+        assert not breaker.allow_request()  # only one probe at a time
+        breaker.record_success()
+
+        assert breaker.state == BreakerState.CLOSED
+        assert breaker.get_state()["rejected_calls"] == 2
+
+    def test_failed_probe_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 6.0
+
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == BreakerState.OPEN
+        assert breaker.get_state()["retry_in_seconds"] == 5.0
+        assert breaker.times_opened == 2
+
+
+class TestRetries:
+    """AsyncAnthropicBackend retries transient provider errors."""
+
+    def test_retries_rate_limit_and_overload(self):
+        backend = make_backend([FakeStatusError(429), FakeStatusError(529)])
+
+        result = classify(backend)
+
+        assert result.document_type == DocumentType.BILL_OF_LADING
+        assert backend._client.messages.calls == 3
+        assert backend.breaker.state == BreakerState.CLOSED
+
+    def test_client_errors_not_retried(self):
+        backend = make_backend([FakeStatusError(400)])
+
+        assert classify(backend) is None
+        assert backend._client.messages.calls == 1
+        assert backend.breaker.get_state()["consecutive_failures"] == 0
+
+    def test_retry_after_respected(self):
+        backend = make_backend([FakeStatusError(429, retry_after=0.2)])
+
+        start = time.perf_counter()
+        classify(backend)
+
+        assert time.perf_counter() - start >= 0.2
+
+    def test_deadline_covers_all_attempts(self):
+        backend = make_backend([1.0, 1.0, 1.0], retries=5, timeout=0.3)
+
+        start = time.perf_counter()
+        assert classify(backend) is None
+
+        assert time.perf_counter() - start < 0.6
+        assert backend.breaker.get_state()["consecutive_failures"] == 1
+
+
+class TestFailFast:
+    """While the breaker is open, classification falls back to keywords at once."""
+
+    def test_breaker_opens_and_classifier_uses_keywords(self):
+        backend = make_backend([FakeStatusError(503)] * 9, retries=0, threshold=3)
+        classifier = DocumentClassifierV2(llm=BlockingLLMBackend(backend))
+
+        for _ in range(3):
+            assert classify(backend) is None
+        assert backend.breaker.state == BreakerState.OPEN
+
+        result = classifier.classify("xyzzy document")
+
+        assert result.method == "keyword"
+        assert backend._client.messages.calls == 3
+        assert "Circuit open" in backend.get_status()["last_error"]
+        assert backend.get_status()["circuit_breaker"]["state"] == "open"
+
+
+class TestLLMLoop:
+    """Async backends run on one long-lived event loop."""
+
+    def test_client_used_on_llm_loop_from_any_caller(self):
+        backend = make_backend()
+
+        classify(backend)
+        asyncio.run(backend.classify_document("BILL OF LADING"))
+        asyncio.run(DocumentClassifierV2(llm=BlockingLLMBackend(backend)).classify_async("xyzzy"))
+
+        assert backend._client.messages.loops == {get_llm_loop()}
+        assert backend._client.messages.calls == 3
+
+    def test_blocking_adapter_unwraps(self):
+        backend = make_backend()
+
+        assert as_async_backend(BlockingLLMBackend(backend)) is backend
+
+    def test_run_sync_refuses_on_llm_loop(self):
+        async def nested():
+            coro = asyncio.sleep(0)
+            with pytest.raises(RuntimeError):
+                run_sync(coro)
+
+        run_sync(nested())
@@ -0,0 +1,137 @@
+"""Tests for the on-disk OCR result cache.
+
+Tests: bitmap/settings keying, hit/miss accounting, LRU eviction by size,
+and ocr_image_cached skipping Tesseract on repeated page images.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from app.services import ocr_cache as ocr_cache_module
+from app.services import ocr_engine as ocr_engine_module
+from app.services.ocr_cache import OCRCache, get_ocr_cache
+from app.services.ocr_engine import OCROptions, ocr_image_cached
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_image(shade=255, size=(40, 20)):
+    return Image.new("L", size, color=shade)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OCRCache(str(tmp_path / "ocr-cache"), max_bytes=1024 * 1024)
+
+
+class TestOCRCache:
+    """Tests for OCRCache storage and keying."""
+
+    def test_put_then_get(self, cache):
+        key = cache.make_key(make_image(), "eng|psm1|string")
+        assert cache.get(key) is None
+
+        cache.put(key, {"text": "FUMIGATION CERTIFICATE", "confidence": None})
+
+        assert cache.get(key) == {"text": "FUMIGATION CERTIFICATE", "confidence": None}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_on_pixels_and_settings(self, cache):
+        base = cache.make_key(make_image(), "eng|psm1|string")
+
+        assert cache.make_key(make_image(), "eng|psm1|string") == base
+        assert cache.make_key(make_image(shade=0), "eng|psm1|string") != base
+        assert cache.make_key(make_image(size=(20, 40)), "eng|psm1|string") != base
+        assert cache.make_key(make_image(), "fra|psm1|string") != base
+        assert cache.make_key(make_image(), "eng|psm6|string") != base
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        key = cache.make_key(make_image(), "eng|psm1|string")
+        cache.put(key, {"text": "x"})
+        with open(cache._path(key), "w") as f:
+            f.write("{not json")
+
+        assert cache.get(key) is None
+
+    def test_evicts_least_recently_used(self, cache):
+        keys = [cache.make_key(make_image(shade=i), "eng|psm1|string") for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, {"text": "x" * 100})
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+        # Reading the oldest entry makes it the most recently used
+        cache.get(keys[0])
+        entry_size = os.path.getsize(cache._path(keys[0]))
+        cache.max_bytes = entry_size * 2
+
+        assert cache.evict() == 1
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+
+    def test_stats(self, cache):
+        cache.put(cache.make_key(make_image(), "k"), {"text": "abc"})
+        stats = cache.get_stats()
+        assert stats["entries"] == 1
+        assert stats["size_bytes"] > 0
+
+
+class TestGetOCRCache:
+    """Tests for the settings-driven process-wide cache."""
+
+    def test_disabled_in_settings(self):
+        with patch.object(ocr_cache_module, "_cache", None), \
+                patch("app.config.get_settings") as mock_settings:
+            mock_settings.return_value.ocr_cache_enabled = False
+            assert get_ocr_cache() is None
+
+    def test_uses_configured_directory(self, tmp_path):
+        with patch.object(ocr_cache_module, "_cache", None), \
+                patch("app.config.get_settings") as mock_settings:
+            mock_settings.return_value.ocr_cache_enabled = True
+            mock_settings.return_value.ocr_cache_dir = str(tmp_path / "cache")
+            mock_settings.return_value.ocr_cache_max_mb = 1
+            cache = get_ocr_cache()
+
+        assert cache.directory == str(tmp_path / "cache")
+        assert cache.max_bytes == 1024 * 1024
+
+
+class TestOCRImageCached:
+    """Repeated page images skip Tesseract."""
+
+    def test_second_identical_page_hits_cache(self, cache):
+        options = OCROptions()
+        with patch.object(ocr_engine_module, "get_ocr_cache", return_value=cache), \
+                patch.object(ocr_engine_module, "ocr_image", return_value="PHYTO 123") as mock_ocr:
+            first = ocr_image_cached(make_image(), options)
+            second = ocr_image_cached(make_image(), options)
+
+        assert first == second == ("PHYTO 123", None)
+        mock_ocr.assert_called_once()
+
+    def test_confidence_mode_cached_separately(self, cache):
+        options = OCROptions(initial_dpi=150)
+        with patch.object(ocr_engine_module, "get_ocr_cache", return_value=cache), \
+                patch.object(ocr_engine_module, "ocr_image", return_value="plain"), \
+                patch.object(
+                    ocr_engine_module, "ocr_image_with_confidence", return_value=("data", 91.0)
+                ) as mock_data:
+            ocr_image_cached(make_image(), options)
+            result = ocr_image_cached(make_image(), options, with_confidence=True)
+            again = ocr_image_cached(make_image(), options, with_confidence=True)
+
+        assert result == again == ("data", 91.0)
+        mock_data.assert_called_once()
+
+    def test_failures_are_not_cached(self, cache):
+        options = OCROptions()
+        with patch.object(ocr_engine_module, "get_ocr_cache", return_value=cache), \
+                patch.object(
+                    ocr_engine_module, "ocr_image", side_effect=[RuntimeError("timeout"), "ok"]
+                ) as mock_ocr:
+            assert ocr_image_cached(make_image(), options) == ("", None)
+            assert ocr_image_cached(make_image(), options) == ("ok", None)
+
+        assert mock_ocr.call_count == 2
@@ -0,0 +1,301 @@
+"""Tests for the page-parallel OCR engine.
+
+Tests: single-page rendering, page-ordered results (serial and process
+pool), PDFProcessor.extract_text_with_ocr delegating to the engine,
+per-page selective OCR of mixed digital/scanned PDFs (blank pages
+skipped), and adaptive DPI.
+Tesseract itself is mocked; only PyMuPDF is needed.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.services import ocr_engine as ocr_engine_module
+from app.services.ocr_engine import OCREngine, OCROptions, PageOCRResult, render_page
+from app.services.pdf_processor import PDFProcessor, PDF_PROCESSING_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not PDF_PROCESSING_AVAILABLE, reason="PyMuPDF not installed")
+
+
+@pytest.fixture(autouse=True)
+def no_ocr_cache():
+    """Keep results from earlier tests (identical bitmaps) out of these tests."""
+    with patch.object(ocr_engine_module, "get_ocr_cache", return_value=None):
+        yield
+
+
+def make_pdf(path, page_count):
+    """Write an A4 PDF with page_count pages."""
+    import fitz
+
+    doc = fitz.open()
+    for i in range(page_count):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Page {i + 1}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def fake_ocr_page(file_path, page_number, options):
+    return PageOCRResult(page_number=page_number, text=f"text {page_number}", dpi=options.dpi)
+
+
+class TestRenderPage:
+    """Tests for render_page."""
+
+    def test_renders_one_grayscale_page_at_dpi(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 3)
+
+        image = render_page(path, 2, dpi=144)
+
+        assert image.mode == "L"
+        assert image.size == (1190, 1684)  # A4 at 2x 72 DPI
+
+
+class TestOCRPages:
+    """Tests for OCREngine.ocr_pages."""
+
+    def test_empty_page_list(self, tmp_path):
+        assert OCREngine(workers=1).ocr_pages("/nonexistent.pdf", [], OCROptions()) == []
+
+    def test_serial_results_in_requested_order(self):
+        engine = OCREngine(workers=1)
+        with patch.object(ocr_engine_module, "ocr_page", side_effect=fake_ocr_page):
+            results = engine.ocr_pages("/scan.pdf", [3, 1, 2], OCROptions(dpi=200))
+
+        assert [r.page_number for r in results] == [3, 1, 2]
+        assert [r.text for r in results] == ["text 3", "text 1", "text 2"]
+        assert all(r.dpi == 200 for r in results)
+
+    def test_renders_each_page_separately(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 3)
+        engine = OCREngine(workers=1)
+
+        with patch.object(ocr_engine_module, "render_page", wraps=render_page) as spy, \
+                patch.object(ocr_engine_module, "ocr_image", return_value="ok"):
+            results = engine.ocr_pages(path, [1, 2, 3], OCROptions(dpi=72))
+
+        assert [c.args[1] for c in spy.call_args_list] == [1, 2, 3]
+        assert [r.text for r in results] == ["ok", "ok", "ok"]
+
+    def test_process_pool_preserves_page_order(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 4)
+        engine = OCREngine(workers=2)
+        try:
+            results = engine.ocr_pages(path, [4, 2, 3, 1], OCROptions(dpi=72))
+        finally:
+            engine.shutdown()
+
+        assert [r.page_number for r in results] == [4, 2, 3, 1]
+
+    def test_worker_count_from_settings(self):
+        with patch("app.config.get_settings") as mock_settings:
+            mock_settings.return_value.ocr_workers = 3
+            assert OCREngine().workers == 3
+            mock_settings.return_value.ocr_workers = 0
+            assert OCREngine().workers >= 1
+
+
+class TestExtractTextWithOCR:
+    """PDFProcessor.extract_text_with_ocr uses the engine."""
+
+    @patch("app.services.pdf_processor.OCR_AVAILABLE", True)
+    def test_ocrs_all_pages_in_order(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 3)
+        processor = PDFProcessor()
+
+        with patch("app.services.pdf_processor.ocr_engine") as mock_engine:
+            mock_engine.ocr_pages.side_effect = lambda f, pages, options: [
+                fake_ocr_page(f, n, options) for n in pages
+            ]
+            pages = processor.extract_text_with_ocr(path)
+
+        args = mock_engine.ocr_pages.call_args[0]
+        assert args[1] == [1, 2, 3]
+        assert args[2].dpi == processor.OCR_DPI
+        assert [p.page_number for p in pages] == [1, 2, 3]
+        assert pages[1].text == "text 2"
+        assert pages[1].char_count == len("text 2")
+
+    @patch("app.services.pdf_processor.OCR_AVAILABLE", True)
+    def test_ocrs_selected_pages(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 3)
+        processor = PDFProcessor()
+
+        with patch("app.services.pdf_processor.ocr_engine") as mock_engine:
+            mock_engine.ocr_pages.return_value = []
+            processor.extract_text_with_ocr(path, page_numbers=[2])
+
+        assert mock_engine.ocr_pages.call_args[0][1] == [2]
+
+
+DIGITAL_TEXT = "COMMERCIAL INVOICE No. INV-2026-001 issued by VIBOTAJ Global Nigeria Ltd"
+
+
+def make_mixed_pdf(path, digital_pages, blank_pages=()):
+    """Write a PDF where only the given pages have a text layer.
+
+    The other pages hold a scanned image, except blank_pages, which are empty.
+    """
+    import fitz
+
+    doc = fitz.open()
+    scan = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 64, 64), False)
+    scan.clear_with(200)
+    for i in range(1, 4):
+        page = doc.new_page()
+        if i in digital_pages:
+            page.insert_text((72, 72), DIGITAL_TEXT, fontsize=8)
+        elif i not in blank_pages:
+            page.insert_image(page.rect, pixmap=scan)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@patch("app.services.pdf_processor.OCR_AVAILABLE", True)
+class TestSelectiveOCR:
+    """Only scanned pages without a usable text layer are OCR'd."""
+
+    def run_extraction(self, path, ocr_text="SCANNED PHYTOSANITARY CERTIFICATE " * 3):
+        processor = PDFProcessor()
+        processor.OCR_ENABLED = True
+        with patch("app.services.pdf_processor.ocr_engine") as mock_engine:
+            mock_engine.ocr_pages.side_effect = lambda f, pages, options: [
+                PageOCRResult(page_number=n, text=ocr_text, dpi=options.dpi) for n in pages
+            ]
+            artifact = processor.extract_artifact(path)
+        return artifact, mock_engine
+
+    def test_mixed_document_is_hybrid(self, tmp_path):
+        path = make_mixed_pdf(tmp_path / "bundle.pdf", digital_pages={1, 3})
+
+        artifact, mock_engine = self.run_extraction(path)
+
+        assert mock_engine.ocr_pages.call_args[0][1] == [2]
+        assert artifact.extraction_method == "hybrid"
+        assert [p.extraction_method for p in artifact.pages] == ["pymupdf", "ocr", "pymupdf"]
+        assert artifact.ocr_pages == [2]
+        assert "INV-2026-001" in artifact.pages[0].text
+        assert "PHYTOSANITARY" in artifact.pages[1].text
+
+    def test_fully_scanned_document_is_ocr(self, tmp_path):
+        path = make_mixed_pdf(tmp_path / "scan.pdf", digital_pages=set())
+
+        artifact, mock_engine = self.run_extraction(path)
+
+        assert mock_engine.ocr_pages.call_args[0][1] == [1, 2, 3]
+        assert artifact.extraction_method == "ocr"
+        assert artifact.ocr_pages == [1, 2, 3]
+
+    def test_digital_document_skips_ocr(self, tmp_path):
+        path = make_mixed_pdf(tmp_path / "digital.pdf", digital_pages={1, 2, 3})
+
+        artifact, mock_engine = self.run_extraction(path)
+
+        mock_engine.ocr_pages.assert_not_called()
+        assert artifact.extraction_method == "pymupdf"
+        assert artifact.ocr_pages == []
+
+    def test_blank_pages_skip_ocr(self, tmp_path):
+        path = make_mixed_pdf(tmp_path / "bundle.pdf", digital_pages={1}, blank_pages={3})
+
+        artifact, mock_engine = self.run_extraction(path)
+
+        assert mock_engine.ocr_pages.call_args[0][1] == [2]
+        assert artifact.ocr_pages == [2]
+        assert artifact.pages[2].extraction_method == "pymupdf"
+
+    def test_keeps_text_layer_when_ocr_finds_less(self, tmp_path):
+        path = make_mixed_pdf(tmp_path / "bundle.pdf", digital_pages={1, 3})
+
+        artifact, _ = self.run_extraction(path, ocr_text="")
+
+        assert artifact.extraction_method == "pymupdf"
+        assert artifact.pages[1].extraction_method == "pymupdf"
+
+
+TESSERACT_DATA = {
+    "text": ["", "FUMIGATION", "CERTIFICATE", "", "No.", "FC-001"],
+    "conf": [-1, 95, 91, -1, 88, 42],
+    "block_num": [1, 1, 1, 1, 2, 2],
+    "par_num": [1, 1, 1, 1, 1, 1],
+    "line_num": [0, 1, 1, 0, 1, 1],
+}
+
+
+class TestAdaptiveDPI:
+    """Low-DPI first pass, escalation on low Tesseract confidence."""
+
+    def test_text_and_confidence_from_image_to_data(self):
+        with patch.object(ocr_engine_module.pytesseract, "image_to_data", return_value=TESSERACT_DATA):
+            text, confidence = ocr_engine_module.ocr_image_with_confidence(
+                object(), OCROptions(initial_dpi=150)
+            )
+
+        assert text == "FUMIGATION CERTIFICATE\n\nNo. FC-001"
+        assert confidence == pytest.approx((95 + 91 + 88 + 42) / 4)
+
+    def test_no_words_is_zero_confidence(self):
+        empty = {k: [] for k in TESSERACT_DATA}
+        with patch.object(ocr_engine_module.pytesseract, "image_to_data", return_value=empty):
+            assert ocr_engine_module.ocr_image_with_confidence(object(), OCROptions()) == ("", 0.0)
+
+    def run_ocr_page(self, tmp_path, confidences, options):
+        path = make_pdf(tmp_path / "scan.pdf", 1)
+        passes = iter(confidences)
+        with patch.object(ocr_engine_module, "render_page", wraps=render_page) as spy, \
+                patch.object(
+                    ocr_engine_module,
+                    "ocr_image_with_confidence",
+                    side_effect=lambda image, opts: ("text", next(passes)),
+                ):
+            result = ocr_engine_module.ocr_page(path, 1, options)
+        return result, [c.args[2] for c in spy.call_args_list]
+
+    def test_confident_first_pass_keeps_low_dpi(self, tmp_path):
+        options = OCROptions(dpi=300, initial_dpi=150, min_confidence=70)
+        result, rendered_dpis = self.run_ocr_page(tmp_path, [85.0], options)
+
+        assert rendered_dpis == [150]
+        assert result.dpi == 150
+        assert result.confidence == 85.0
+
+    def test_low_confidence_escalates_to_full_dpi(self, tmp_path):
+        options = OCROptions(dpi=300, initial_dpi=150, min_confidence=70)
+        result, rendered_dpis = self.run_ocr_page(tmp_path, [40.0, 80.0], options)
+
+        assert rendered_dpis == [150, 300]
+        assert result.dpi == 300
+        assert result.confidence == 80.0
+
+    def test_non_adaptive_single_pass_at_full_dpi(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 1)
+        with patch.object(ocr_engine_module, "render_page", wraps=render_page) as spy, \
+                patch.object(ocr_engine_module, "ocr_image", return_value="text"):
+            result = ocr_engine_module.ocr_page(path, 1, OCROptions(dpi=300))
+
+        assert [c.args[2] for c in spy.call_args_list] == [300]
+        assert result.dpi == 300
+        assert result.confidence is None
+
+    @patch("app.services.pdf_processor.OCR_AVAILABLE", True)
+    def test_processor_records_dpi_per_page(self, tmp_path):
+        path = make_pdf(tmp_path / "scan.pdf", 2)
+        processor = PDFProcessor()
+        processor.OCR_ADAPTIVE_DPI = True
+        processor.OCR_INITIAL_DPI = 150
+        processor.OCR_DPI = 300
+
+        with patch("app.services.pdf_processor.ocr_engine") as mock_engine:
+            mock_engine.ocr_pages.return_value = [
+                PageOCRResult(page_number=1, text="a", dpi=150, confidence=90.0),
+                PageOCRResult(page_number=2, text="b", dpi=300, confidence=65.0),
+            ]
+            pages = processor.extract_text_with_ocr(path)
+
+        options = mock_engine.ocr_pages.call_args[0][2]
+        assert options.adaptive and options.initial_dpi == 150 and options.dpi == 300
+        assert [p.ocr_dpi for p in pages] == [150, 300]
+        assert [p.ocr_confidence for p in pages] == [90.0, 65.0]
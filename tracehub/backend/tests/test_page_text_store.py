@@ -0,0 +1,210 @@
+"""Tests for the persisted page-text store.
+
+Tests: compression round trip, hash-based invalidation, extract-on-first-use,
+and read-only extraction that stores nothing.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from app.models import DocumentPageText
+from app.services.file_utils import compute_file_hash
+from app.services.page_text_store import (
+    PageTextStore,
+    compress_pages,
+    decompress_pages,
+)
+from app.services.pdf_processor import ExtractionArtifact, PageContent
+
+
+# --- Helpers ---
+
+def make_pages(*texts):
+    return [
+        PageContent(page_number=i, text=t, char_count=len(t))
+        for i, t in enumerate(texts, start=1)
+    ]
+
+
+def make_document(file_path, file_hash=None):
+    doc = MagicMock()
+    doc.id = uuid4()
+    doc.organization_id = uuid4()
+    doc.file_path = file_path
+    doc.file_hash = file_hash
+    return doc
+
+
+def make_db(row=None):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = row
+    return db
+
+
+def make_row(file_hash, pages, method="ocr"):
+    row = DocumentPageText(
+        document_id=uuid4(),
+        file_hash=file_hash,
+        extraction_method=method,
+        page_count=len(pages),
+        page_char_counts=[p.char_count for p in pages],
+        compressed_pages=compress_pages(pages),
+    )
+    return row
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 stored text test")
+    return str(path)
+
+
+class TestCompression:
+    """Tests for compress_pages / decompress_pages."""
+
+    def test_round_trip(self):
+        pages = make_pages("Bill of Lading", "Página dos — ünïcode", "")
+        restored = decompress_pages(compress_pages(pages))
+        assert [p.text for p in restored] == [p.text for p in pages]
+        assert [p.page_number for p in restored] == [1, 2, 3]
+        assert [p.char_count for p in restored] == [p.char_count for p in pages]
+
+    def test_round_trip_keeps_page_methods(self):
+        pages = make_pages("digital invoice", "scanned certificate")
+        pages[1].extraction_method = "ocr"
+        pages[1].ocr_dpi = 150
+        pages[1].ocr_confidence = 88.5
+        restored = decompress_pages(compress_pages(pages))
+        assert [p.extraction_method for p in restored] == ["pymupdf", "ocr"]
+        assert [p.ocr_dpi for p in restored] == [None, 150]
+        assert restored[1].ocr_confidence == 88.5
+
+    def test_reads_plain_text_rows(self):
+        import json
+        import zlib
+
+        blob = zlib.compress(json.dumps(["page one", "page two"]).encode("utf-8"))
+        restored = decompress_pages(blob)
+        assert [p.text for p in restored] == ["page one", "page two"]
+        assert all(p.extraction_method == "pymupdf" for p in restored)
+
+    def test_compresses_repetitive_text(self):
+        pages = make_pages("CONTAINER MSCU1234567 " * 500)
+        assert len(compress_pages(pages)) < len(pages[0].text) // 10
+
+
+class TestLoad:
+    """Tests for PageTextStore.load."""
+
+    def test_returns_none_when_nothing_stored(self, pdf_file):
+        store = PageTextStore()
+        assert store.load(make_db(None), make_document(pdf_file)) is None
+
+    def test_returns_stored_text_when_hash_matches(self, pdf_file):
+        pages = make_pages("page one", "page two")
+        row = make_row(compute_file_hash(pdf_file), pages)
+        store = PageTextStore()
+
+        extraction = store.load(make_db(row), make_document(pdf_file))
+        assert extraction is not None
+        assert extraction.extraction_method == "ocr"
+        assert extraction.full_text == "page one\npage two"
+
+    def test_stale_when_file_changed(self, pdf_file):
+        row = make_row("0" * 64, make_pages("old text"))
+        store = PageTextStore()
+        assert store.load(make_db(row), make_document(pdf_file)) is None
+
+    @patch("app.services.page_text_store.compute_file_hash")
+    def test_uses_hash_recorded_at_upload(self, mock_hash, pdf_file):
+        row = make_row("a" * 64, make_pages("stored"))
+        store = PageTextStore()
+
+        extraction = store.load(make_db(row), make_document(pdf_file, file_hash="a" * 64))
+
+        mock_hash.assert_not_called()
+        assert extraction.full_text == "stored"
+
+
+class TestGetOrExtract:
+    """Tests for PageTextStore.get_or_extract."""
+
+    @patch("app.services.page_text_store.pdf_processor")
+    def test_uses_store_without_extracting(self, mock_processor, pdf_file):
+        row = make_row(compute_file_hash(pdf_file), make_pages("stored"))
+        store = PageTextStore()
+
+        extraction = store.get_or_extract(make_db(row), make_document(pdf_file))
+
+        mock_processor.extract_artifact.assert_not_called()
+        assert extraction.full_text == "stored"
+
+    @patch("app.services.page_text_store.pdf_processor")
+    def test_extracts_and_saves_on_first_use(self, mock_processor, pdf_file):
+        file_hash = compute_file_hash(pdf_file)
+        mock_processor.is_available.return_value = True
+        mock_processor.extract_artifact.return_value = ExtractionArtifact(
+            file_hash=file_hash, pages=make_pages("fresh"), extraction_method="pymupdf"
+        )
+        db = make_db(None)
+        store = PageTextStore()
+
+        extraction = store.get_or_extract(db, make_document(pdf_file))
+
+        mock_processor.extract_artifact.assert_called_once_with(pdf_file, file_hash=file_hash)
+        assert extraction.full_text == "fresh"
+        saved = db.add.call_args[0][0]
+        assert isinstance(saved, DocumentPageText)
+        assert saved.file_hash == file_hash
+        assert saved.page_char_counts == [5]
+        assert decompress_pages(saved.compressed_pages)[0].text == "fresh"
+
+    @patch("app.services.page_text_store.compute_file_hash")
+    @patch("app.services.page_text_store.pdf_processor")
+    def test_uses_hash_recorded_at_upload(self, mock_processor, mock_hash, pdf_file):
+        row = make_row("a" * 64, make_pages("stored"))
+        store = PageTextStore()
+
+        extraction = store.get_or_extract(make_db(row), make_document(pdf_file, file_hash="a" * 64))
+
+        mock_hash.assert_not_called()
+        mock_processor.extract_artifact.assert_not_called()
+        assert extraction.full_text == "stored"
+
+    @patch("app.services.page_text_store.pdf_processor")
+    def test_replaces_stale_row(self, mock_processor, pdf_file):
+        file_hash = compute_file_hash(pdf_file)
+        mock_processor.is_available.return_value = True
+        mock_processor.extract_artifact.return_value = ExtractionArtifact(
+            file_hash=file_hash, pages=make_pages("new"), extraction_method="pymupdf"
+        )
+        row = make_row("0" * 64, make_pages("old"))
+        store = PageTextStore()
+
+        store.get_or_extract(make_db(row), make_document(pdf_file))
+
+        assert row.file_hash == file_hash
+        assert row.extraction_method == "pymupdf"
+        assert decompress_pages(row.compressed_pages)[0].text == "new"
+
+    @patch("app.services.page_text_store.pdf_processor")
+    def test_read_only_extraction_stores_nothing(self, mock_processor, pdf_file):
+        file_hash = compute_file_hash(pdf_file)
+        mock_processor.is_available.return_value = True
+        mock_processor.extract_artifact.return_value = ExtractionArtifact(
+            file_hash=file_hash, pages=make_pages("fresh"), extraction_method="pymupdf"
+        )
+        db = make_db(None)
+        store = PageTextStore()
+
+        extraction = store.get_or_extract(db, make_document(pdf_file), store=False)
+
+        assert extraction.full_text == "fresh"
+        db.add.assert_not_called()
+        db.begin_nested.assert_not_called()
+
+    def test_missing_file_returns_none(self):
+        store = PageTextStore()
+        assert store.get_or_extract(make_db(None), make_document("/nonexistent/x.pdf")) is None
@@ -0,0 +1,97 @@
+"""Tests for the shared compiled-pattern registry.
+
+Tests: patterns compiled once per (pattern, flags), named groups keep
+priority order and are idempotent, explicit re-registration, and the
+parsers register their field groups at construction/import.
+"""
+
+import re
+
+import pytest
+
+from app.services.bol_parser import BolParser
+from app.services.regex_registry import PatternRegistry, first_match, regex_registry
+from app.services.shipment_data_extractor import (
+    EXTRACTION_PATTERNS,
+    EXTRACTION_RES,
+    ShipmentDataExtractor,
+)
+
+
+class TestPatternRegistry:
+    """Tests for PatternRegistry."""
+
+    def test_compile_once_per_flags(self):
+        registry = PatternRegistry()
+
+        first = registry.compile(r"B/L\s*(\d+)", re.IGNORECASE)
+
+        assert registry.compile(r"B/L\s*(\d+)", re.IGNORECASE) is first
+        assert registry.compile(r"B/L\s*(\d+)") is not first
+        assert len(registry) == 2
+
+    def test_register_group_in_order(self):
+        registry = PatternRegistry()
+
+        group = registry.register("bol.number", [r"B/L No\.?\s*(\w+)", r"BL\s*(\w+)"], re.IGNORECASE)
+
+        assert registry.group("bol.number") is group
+        assert [p.pattern for p in group] == [r"B/L No\.?\s*(\w+)", r"BL\s*(\w+)"]
+        assert first_match(group, "bl 1 / b/l no. APU1").group(1) == "APU1"
+
+    def test_register_is_idempotent(self):
+        registry = PatternRegistry()
+
+        group = registry.register("voyage", [r"VOY\s*(\w+)"])
+
+        assert registry.register("voyage", [r"VOY\s*(\w+)"]) is group
+        with pytest.raises(ValueError):
+            registry.register("voyage", [r"VOYAGE\s*(\w+)"])
+
+    def test_explicit_replace(self):
+        registry = PatternRegistry()
+        registry.register("voyage", [r"VOY\s*(\w+)"])
+
+        group = registry.register("voyage", [r"VOYAGE\s*(\w+)"], replace=True)
+
+        assert registry.group("voyage") is group
+        assert [p.pattern for p in group] == [r"VOYAGE\s*(\w+)"]
+
+    def test_first_match_none(self):
+        assert first_match(PatternRegistry().register("x", [r"\d{4}"]), "no digits") is None
+
+
+class TestParserPatterns:
+    """The parsers share compiled groups from the global registry."""
+
+    def test_bol_parser_instances_share_groups(self):
+        first, second = BolParser(), BolParser()
+
+        assert first.patterns["vessel"] is second.patterns["vessel"]
+        assert first.patterns["vessel"] is regex_registry.group("bol.vessel")
+        assert all(p.flags & re.IGNORECASE for p in first.patterns["bol_number"])
+
+    def test_shipment_extraction_groups(self):
+        assert set(EXTRACTION_RES) == set(EXTRACTION_PATTERNS)
+        assert [p.pattern for p in EXTRACTION_RES["hs_code"]] == EXTRACTION_PATTERNS["hs_code"]
+
+    def test_bol_parser_subclass_overrides_patterns(self):
+        class CarrierParser(BolParser):
+            VESSEL_PATTERNS = [r"SHIP\s*:\s*([A-Z ]+)"]
+
+        parser, base = CarrierParser(), BolParser()
+
+        assert [p.pattern for p in parser.patterns["vessel"]] == CarrierParser.VESSEL_PATTERNS
+        assert base.patterns["vessel"] is regex_registry.group("bol.vessel")
+        assert parser.patterns["bol_number"] == base.patterns["bol_number"]
+
+    def test_shipment_extractor_subclass_overrides_patterns(self):
+        class StrictExtractor(ShipmentDataExtractor):
+            INVALID_VESSEL_PATTERNS = [r"^tba$"]
+
+        extractor, base = StrictExtractor(), ShipmentDataExtractor()
+
+        assert not extractor._is_valid_vessel_name("TBA")
+        assert extractor._is_valid_vessel_name("vessel")
+        assert base._is_valid_vessel_name("TBA")
+        assert base._invalid_vessel_res is regex_registry.group("shipment.invalid_vessel")
@@ -0,0 +1,85 @@
+"""Tests for the streaming upload writer.
+
+Tests: size and SHA-256 computed while streaming, chunked reads, early
+abort when the size limit is crossed (partial file removed, existing
+file untouched), and rejection from the declared part size.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.upload_writer import UploadTooLargeError, write_upload
+
+
+def make_upload(data, size=None):
+    return UploadFile(file=io.BytesIO(data), filename="bol.pdf", size=size)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestWriteUpload:
+    """Tests for write_upload."""
+
+    def test_writes_file_with_size_and_hash(self, tmp_path):
+        data = b"%PDF-1.4 " + os.urandom(5000)
+        dest = str(tmp_path / "bol.pdf")
+
+        stored = run(write_upload(make_upload(data), dest, max_bytes=10_000, chunk_size=1024))
+
+        assert stored.path == dest
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        with open(dest, "rb") as f:
+            assert f.read() == data
+        assert os.listdir(tmp_path) == ["bol.pdf"]
+
+    def test_reads_in_chunks(self, tmp_path):
+        upload = make_upload(b"x" * 2500)
+        reads = []
+        original_read = upload.read
+
+        async def spy_read(size=-1):
+            reads.append(size)
+            return await original_read(size)
+
+        upload.read = spy_read
+        run(write_upload(upload, str(tmp_path / "bol.pdf"), max_bytes=10_000, chunk_size=1000))
+
+        assert reads == [1000, 1000, 1000, 1000]
+
+    def test_aborts_once_limit_crossed(self, tmp_path):
+        upload = make_upload(b"x" * 10_000)
+        dest = str(tmp_path / "bol.pdf")
+
+        with pytest.raises(UploadTooLargeError):
+            run(write_upload(upload, dest, max_bytes=2500, chunk_size=1000))
+
+        # Stopped at the third chunk instead of reading the whole body
+        assert upload.file.tell() == 3000
+        assert os.listdir(tmp_path) == []
+
+    def test_failed_upload_keeps_existing_file(self, tmp_path):
+        dest = tmp_path / "bol.pdf"
+        dest.write_bytes(b"original")
+
+        with pytest.raises(UploadTooLargeError):
+            run(write_upload(make_upload(b"x" * 5000), str(dest), max_bytes=1000, chunk_size=1000))
+
+        assert dest.read_bytes() == b"original"
+        assert os.listdir(tmp_path) == ["bol.pdf"]
+
+    def test_rejects_declared_size_without_reading(self, tmp_path):
+        upload = make_upload(b"x" * 100, size=5 * 1024 * 1024)
+
+        with pytest.raises(UploadTooLargeError, match="1 MB"):
+            run(write_upload(upload, str(tmp_path / "bol.pdf"), max_bytes=1024 * 1024))
+
+        assert upload.file.tell() == 0
+        assert os.listdir(tmp_path) == []